@@ -0,0 +1,362 @@
+"""HTTP load test against a running ``run_app.py``.
+
+Virtual users replay the classroom workflow of ``scripts/apit.py``
+(using its ``make_request``): students log in, list the books and pick an
+available one; librarians log in, list the books, approve a picked book
+and return a borrowed one. Between steps each user thinks for an
+exponentially distributed time (mean ``--think`` seconds).
+
+Two arrival models:
+
+``closed``  ``--users`` virtual users each run sessions back to back, so
+            the offered load drops when the server slows down.
+``open``    sessions start at ``--rate`` per second (Poisson arrivals,
+            ``--burst`` sessions at a time for a bell ringing) whatever
+            the response times; arrivals beyond ``--max-in-flight``
+            running sessions are counted as dropped.
+
+Results are reported per endpoint (throughput, p50/p95/p99 latency, error
+rate and outcomes) and can be saved and compared like the other
+benchmarks::
+
+    python run_app.py 8000 --workers 4 &
+    python benchmarks/bench_http.py --users 50 --label prefork --json a.json
+    # restart the server as: python run_app.py 8000 --async
+    python benchmarks/bench_http.py --users 50 --label async --baseline a.json
+
+The server's rate limits (429) and load shedding (503) show up as
+outcomes; to measure capacity rather than the limits start the server with
+``RATE_LIMITS=/api/login:ip=0/1,/api/login:username=0/1,/api/execute:ip=0/1``.
+Note that picks and approvals race between virtual users, so some
+``failed`` outcomes (success: false) are expected under load.
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import (  # noqa: E402
+    compare,
+    load_results,
+    print_comparison,
+    print_results,
+    run_metadata,
+    summarize,
+    write_results,
+)
+from scripts.apit import make_request  # noqa: E402
+
+Account = Tuple[str, str]
+
+
+def outcome(result: dict) -> str:
+    """``ok``, ``failed`` (success: false), ``http_<status>`` or ``connection``."""
+    if result["status"] is None:
+        return "connection"
+    if result["status"] != 200:
+        return f"http_{result['status']}"
+    data = result["data"]
+    if isinstance(data, dict) and data.get("success") is False:
+        return "failed"
+    return "ok"
+
+
+class Recorder:
+    """Per-endpoint latencies and outcomes, shared by all virtual users."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.outcomes: Dict[str, Counter] = defaultdict(Counter)
+        self.sessions = 0
+        self.dropped = 0
+
+    def record(self, endpoint: str, seconds: float, result: str) -> None:
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.outcomes[endpoint][result] += 1
+
+    def count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def results(self, elapsed: float, arrival: str, size: float) -> List[dict]:
+        rows = []
+        for endpoint in sorted(self.latencies):
+            outcomes = self.outcomes[endpoint]
+            total = sum(outcomes.values())
+            rows.append(
+                {
+                    "suite": "http",
+                    "backend": arrival,
+                    "size": size,
+                    "op": endpoint,
+                    **summarize(self.latencies[endpoint]),
+                    # Requests per second of wall time, not 1 / mean latency
+                    "ops_per_sec": round(total / elapsed, 1),
+                    "error_rate": round(1 - outcomes["ok"] / total, 4),
+                    "outcomes": dict(outcomes),
+                }
+            )
+        return rows
+
+
+class VirtualUser:
+    """One simulated person: a role, an account and a think-time generator."""
+
+    def __init__(self, base_url, recorder, account, librarian, rng, think, timeout):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.username, self.password = account
+        self.librarian = librarian
+        self.rng = rng
+        self.think = think
+        self.timeout = timeout
+
+    def call(self, endpoint, path, method="GET", data=None) -> dict:
+        start = time.perf_counter()
+        result = make_request(
+            self.base_url + path, method=method, data=data, timeout=self.timeout
+        )
+        self.recorder.record(endpoint, time.perf_counter() - start, outcome(result))
+        return result
+
+    def execute(self, command: str, args: List[str]) -> dict:
+        return self.call(
+            f"POST /api/execute {command}",
+            "/api/execute",
+            method="POST",
+            data={"command": command, "args": args},
+        )
+
+    def pause(self) -> None:
+        if self.think > 0:
+            time.sleep(self.rng.expovariate(1 / self.think))
+
+    def books_with_status(self, books: list, status: str) -> List[dict]:
+        return [b for b in books if isinstance(b, dict) and b.get("status") == status]
+
+    def session(self) -> None:
+        credentials = {"username": self.username, "password": self.password}
+        login = self.call("POST /api/login", "/api/login", "POST", credentials)
+        self.pause()
+        if outcome(login) != "ok":
+            return
+        books = self.call("GET /api/books", "/api/books")["data"] or []
+        self.pause()
+        if self.librarian:
+            self.librarian_steps(books)
+        else:
+            available = self.books_with_status(books, "Available")
+            if available:
+                book = self.rng.choice(available)
+                self.execute(
+                    "pick-book", ["--id", str(book["id"]), "--username", self.username]
+                )
+
+    def librarian_steps(self, books: list) -> None:
+        picked = self.books_with_status(books, "Picked")
+        if picked:
+            book = self.rng.choice(picked)
+            self.execute("approve-borrow", ["--id", str(book["id"]), "--librarian"])
+            self.pause()
+        borrowed = self.books_with_status(books, "Borrowed")
+        if borrowed:
+            book = self.rng.choice(borrowed)
+            self.execute("return-book", ["--id", str(book["id"]), "--librarian"])
+
+
+UserFactory = Callable[[random.Random], VirtualUser]
+
+
+def run_session(user: VirtualUser) -> None:
+    try:
+        user.session()
+    finally:
+        user.recorder.count("sessions")
+
+
+def run_closed(make_user: UserFactory, users: int, duration: float, seed: int):
+    """``users`` virtual users running sessions back to back for ``duration``."""
+    stop = time.monotonic() + duration
+
+    def loop(rng):
+        user = make_user(rng)
+        while time.monotonic() < stop:
+            run_session(user)
+
+    threads = [
+        threading.Thread(target=loop, args=(random.Random(seed + i),), daemon=True)
+        for i in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_open(
+    make_user: UserFactory,
+    recorder: Recorder,
+    rate: float,
+    burst: int,
+    duration: float,
+    max_in_flight: int,
+    seed: int,
+) -> None:
+    """Start ``rate`` new users per second, ``burst`` at a time, for ``duration``."""
+    rng = random.Random(seed)
+    slots = threading.BoundedSemaphore(max_in_flight)
+    threads = []
+
+    def one(session_rng):
+        try:
+            run_session(make_user(session_rng))
+        finally:
+            slots.release()
+
+    next_at = time.monotonic()
+    stop = next_at + duration
+    while next_at < stop:
+        time.sleep(max(0.0, next_at - time.monotonic()))
+        for _ in range(burst):
+            if not slots.acquire(blocking=False):
+                recorder.count("dropped")
+                continue
+            thread = threading.Thread(
+                target=one, args=(random.Random(rng.random()),), daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+        next_at += rng.expovariate(rate / burst)
+    for thread in threads:
+        thread.join()
+
+
+def parse_accounts(spec: str) -> List[Account]:
+    accounts = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        username, sep, password = item.partition(":")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected user:password, got {item!r}")
+        accounts.append((username, password))
+    if not accounts:
+        raise argparse.ArgumentTypeError("At least one account is required")
+    return accounts
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--arrival", choices=("closed", "open"), default="closed")
+    parser.add_argument("--users", type=int, default=20, help="closed-loop users")
+    parser.add_argument(
+        "--rate", type=float, default=5.0, help="open-loop sessions per second"
+    )
+    parser.add_argument(
+        "--burst", type=int, default=1, help="open-loop sessions per arrival"
+    )
+    parser.add_argument("--max-in-flight", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--think", type=float, default=1.0, help="mean seconds")
+    parser.add_argument("--librarian-ratio", type=float, default=0.1)
+    parser.add_argument(
+        "--students", type=parse_accounts, default=parse_accounts("tala:1234")
+    )
+    parser.add_argument(
+        "--librarians", type=parse_accounts, default=parse_accounts("admin:1234")
+    )
+    parser.add_argument("--timeout", type=float, default=10.0, help="per request")
+    parser.add_argument("--label", default=None, help="server mode / backend name")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json file")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    return parser.parse_args(argv)
+
+
+def print_errors(results: List[dict]) -> None:
+    print(f"\n{'endpoint':<36} {'requests':>9} {'errors':>8}  outcomes")
+    for r in results:
+        outcomes = ", ".join(f"{k}={v}" for k, v in sorted(r["outcomes"].items()))
+        print(f"{r['op']:<36} {r['samples']:>9} {r['error_rate']:>8.1%}  {outcomes}")
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    base_url = args.url.rstrip("/")
+    health = make_request(f"{base_url}/health", timeout=args.timeout)
+    if health["status"] != 200:
+        print(f"Cannot reach {base_url}/health: {health['error']}", file=sys.stderr)
+        return 2
+
+    recorder = Recorder()
+
+    def make_user(rng: random.Random) -> VirtualUser:
+        librarian = rng.random() < args.librarian_ratio
+        account = rng.choice(args.librarians if librarian else args.students)
+        return VirtualUser(
+            base_url, recorder, account, librarian, rng, args.think, args.timeout
+        )
+
+    start = time.monotonic()
+    if args.arrival == "closed":
+        size: float = args.users
+        run_closed(make_user, args.users, args.duration, args.seed)
+    else:
+        size = args.rate
+        run_open(
+            make_user,
+            recorder,
+            args.rate,
+            args.burst,
+            args.duration,
+            args.max_in_flight,
+            args.seed,
+        )
+    elapsed = time.monotonic() - start
+
+    # Keyed by arrival model and load, not label: runs against different
+    # server modes or backends compare with --baseline
+    results = recorder.results(elapsed, args.arrival, size)
+    print_results(results)
+    print_errors(results)
+    print(
+        f"\n{recorder.sessions} sessions in {elapsed:.1f}s"
+        f" ({recorder.dropped} open-loop arrivals dropped)"
+    )
+
+    if args.json:
+        meta = run_metadata(
+            url=base_url,
+            label=args.label,
+            arrival=args.arrival,
+            users=args.users,
+            rate=args.rate,
+            burst=args.burst,
+            think=args.think,
+            duration=round(elapsed, 2),
+            librarian_ratio=args.librarian_ratio,
+            sessions=recorder.sessions,
+            dropped=recorder.dropped,
+        )
+        write_results(args.json, meta, results)
+        print(f"Results written to {args.json}")
+
+    if args.baseline:
+        print()
+        rows = compare(load_results(args.baseline), results, args.threshold)
+        if print_comparison(rows, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
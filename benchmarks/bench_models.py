@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for the Book model: memory per instance and codec throughput.
+
+Compares the slotted ``Book`` against an equivalent ``__dict__``-backed
+dataclass so the saving is visible on the machine running it.
+
+Usage: python benchmarks/bench_models.py [--count 100000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.book import Book  # noqa: E402
+
+# Same fields as Book, but without slots (the pre-slots layout).
+DictBook = make_dataclass("DictBook", [(f.name, f.type) for f in fields(Book)])
+
+
+def make_docs(count: int) -> List[dict]:
+    """Build ``count`` book documents shaped like data/books.json entries."""
+    statuses = ("Available", "Picked", "Borrowed")
+    docs = []
+    for i in range(count):
+        doc = {
+            "id": 1000 + i,
+            "title": f"Title {i}",
+            "author": f"Author {i % 500}",
+            "status": statuses[i % 3],
+        }
+        if i % 3:
+            doc["picked_by"] = f"user{i % 200}"
+        docs.append(doc)
+    return docs
+
+
+def bytes_per_instance(factory: Callable[[dict], object], docs: List[dict]) -> float:
+    """Average traced allocation per instance built from ``docs``."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = [factory(d) for d in docs]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(objs) == len(docs)
+    return (after - before) / len(docs)
+
+
+def throughput(func: Callable, items: list, repeat: int = 3) -> float:
+    """Best-of-``repeat`` items per second for ``func`` applied to ``items``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return len(items) / best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000, help="Books to build")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    docs = make_docs(args.count)
+
+    def dict_book(d: dict) -> object:
+        b = Book.from_dict(d)
+        return DictBook(b.id, b.title, b.author, b.status, b.picked_by, b.isbn)
+
+    books = [Book.from_dict(d) for d in docs]
+    results = {
+        "count": args.count,
+        "bytes_per_book_slotted": round(bytes_per_instance(Book.from_dict, docs), 1),
+        "bytes_per_book_dict": round(bytes_per_instance(dict_book, docs), 1),
+        "decode_per_sec": round(throughput(Book.from_dict, docs)),
+        "encode_per_sec": round(throughput(Book.to_dict, books)),
+    }
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for key, value in results.items():
+            print(f"{key:<24} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
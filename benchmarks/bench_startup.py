@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Cold-start regression benchmark for ``main.py``.
+
+Runs a CLI command in fresh interpreters and compares the median start-up
+overhead (wall time minus a bare ``python -c pass``) with a budget. Exits
+with status 1 when the budget is exceeded, so it can gate CI.
+
+Usage: python benchmarks/bench_startup.py [--runs 15] [--budget-ms 200]
+       [--json results.json] [-- list-books --librarian]
+
+Use ``python main.py --profile-startup <command>`` to see which imports
+are responsible when the budget is exceeded.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_COMMAND = ["list-books", "--librarian"]
+DEFAULT_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", "200"))
+
+
+def time_runs(cmd: List[str], runs: int, env: dict, cwd: str) -> List[float]:
+    """Wall time in milliseconds of each of ``runs`` executions of ``cmd``."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            cmd,
+            env=env,
+            cwd=cwd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--json", dest="json_path", help="Write results to a file")
+    parser.add_argument("command", nargs="*", default=DEFAULT_COMMAND)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The in-memory backend keeps the measurement about start-up, not I/O
+        env = dict(os.environ, DATABASE_TYPE="fake", LOG_DIR=tmp)
+        baseline = time_runs([sys.executable, "-c", "pass"], args.runs, env, tmp)
+        command = [sys.executable, str(ROOT / "main.py"), *args.command]
+        samples = time_runs(command, args.runs, env, tmp)
+
+    bare = statistics.median(baseline)
+    median = statistics.median(samples)
+    overhead = median - bare
+    results = {
+        "command": args.command,
+        "runs": args.runs,
+        "interpreter_ms": round(bare, 1),
+        "median_ms": round(median, 1),
+        "min_ms": round(min(samples), 1),
+        "max_ms": round(max(samples), 1),
+        "overhead_ms": round(overhead, 1),
+        "budget_ms": args.budget_ms,
+        "within_budget": overhead <= args.budget_ms,
+    }
+
+    print(f"command      : main.py {' '.join(args.command)}")
+    print(f"interpreter  : {bare:8.1f} ms (python -c pass)")
+    print(
+        f"median       : {median:8.1f} ms (min {min(samples):.1f}, max {max(samples):.1f})"
+    )
+    print(f"overhead     : {overhead:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+    if not results["within_budget"]:
+        print("FAIL: start-up overhead exceeds budget", file=sys.stderr)
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
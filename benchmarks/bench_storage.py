@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""Throughput and latency benchmark for the storage backends and services.
+
+For each backend and catalog size it seeds a synthetic catalog and user
+base, then times every ``BookRepository``/``UserRepository`` operation and
+the main ``BookService`` workflows, reporting ops/s and p50/p95/p99 latency.
+
+Backends: ``fake`` and ``json`` always run; ``mongodb`` uses the MongoDB
+server from the usual ``MONGODB_*`` settings (database ``library_bench``,
+dropped afterwards); ``mongomock`` runs the MongoDB backend in-process when
+the ``mongomock`` package is installed. Logging is silenced so the numbers
+measure storage rather than log I/O.
+
+Usage: python benchmarks/bench_storage.py [--backends fake,json]
+       [--sizes 1000,10000,100000] [--users 10000] [--seconds 1.0]
+       [--json results.json] [--baseline previous.json [--threshold 0.25]]
+
+With ``--baseline`` the run is compared with an earlier result file and the
+script exits with status 1 if any median latency regressed beyond the
+threshold.
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import (  # noqa: E402
+    FIRST_BOOK_ID,
+    compare,
+    load_results,
+    make_books,
+    make_users,
+    measure,
+    print_comparison,
+    print_results,
+    run_metadata,
+    write_results,
+)
+from models.book import Book, BookStatus  # noqa: E402
+from models.role import Role  # noqa: E402
+from services.book_service import BookService  # noqa: E402
+
+BACKENDS = ("fake", "json", "mongodb", "mongomock")
+DEFAULT_BACKENDS = "fake,json"
+DEFAULT_SIZES = "1000,10000,100000"
+BATCH = 100
+MONGO_BENCH_DB = "library_bench"
+
+# (op name, timed call, untimed argument factory, sample limit)
+Op = Tuple[str, Callable, Optional[Callable[[], tuple]], Optional[Callable[[], int]]]
+
+
+class Backend:
+    """A fresh pair of book/user storages for one benchmark run."""
+
+    def __init__(self, name: str, workdir: Path):
+        self.name = name
+        self.workdir = workdir
+        self.books, self.users = self._open()
+
+    def _open(self):
+        if self.name == "fake":
+            from storage.fake.book_storage import FakeBookStorage
+            from storage.fake.user_storage import FakeUserStorage
+
+            return FakeBookStorage(), FakeUserStorage()
+        if self.name == "json":
+            from storage.book_storage import BookStorage
+            from storage.user_storage import UserStorage
+
+            self.workdir.mkdir(parents=True)
+            return BookStorage(self.workdir), UserStorage(self.workdir)
+        return self._open_mongodb()
+
+    def _open_mongodb(self):
+        from config.database import MongoDBConnection
+
+        os.environ["MONGODB_DATABASE"] = MONGO_BENCH_DB
+        MongoDBConnection.reset()
+        if self.name == "mongomock":
+            import mongomock
+
+            MongoDBConnection._instance = mongomock.MongoClient()
+        MongoDBConnection.get_database().client.drop_database(MONGO_BENCH_DB)
+
+        from storage.mongodb.book_storage import MongoDBBookStorage
+        from storage.mongodb.user_storage import MongoDBUserStorage
+
+        return MongoDBBookStorage(), MongoDBUserStorage()
+
+    def close(self) -> None:
+        if self.name in ("mongodb", "mongomock"):
+            from config.database import MongoDBConnection
+
+            MongoDBConnection.get_database().client.drop_database(MONGO_BENCH_DB)
+            MongoDBConnection.reset()
+
+
+def available(name: str) -> Optional[str]:
+    """None if backend ``name`` can run here, otherwise the reason."""
+    if name == "mongomock":
+        try:
+            import mongomock  # noqa: F401
+        except ImportError:
+            return "mongomock is not installed"
+    if name == "mongodb":
+        try:
+            from config.database import MongoDBConnection
+
+            MongoDBConnection.get_connection()
+        except Exception as e:
+            return f"MongoDB is not reachable ({e.__class__.__name__})"
+    return None
+
+
+def _new_ids(start: int) -> Iterator[int]:
+    next_id = start
+    while True:
+        yield next_id
+        next_id += 1
+
+
+def book_ops(storage, size: int, rng: random.Random) -> List[Op]:
+    """Every ``BookRepository`` operation on a catalog of ``size`` books."""
+    ids = list(range(FIRST_BOOK_ID, FIRST_BOOK_ID + size))
+    fresh = _new_ids(FIRST_BOOK_ID + size + 1)
+    added: List[int] = []
+    added_batches: List[List[int]] = []
+
+    def one_new():
+        book = Book.create(next(fresh), "New", "Bench")
+        added.append(book.id)
+        return (book,)
+
+    def batch_new():
+        books = [Book.create(next(fresh), "New", "Bench") for _ in range(BATCH)]
+        added_batches.append([b.id for b in books])
+        return (books,)
+
+    def changed_book():
+        book = storage.get_book_by_id(rng.choice(ids))
+        return (replace(book, title=book.title + "!"),)
+
+    def changed_batch():
+        found = storage.get_books_by_ids(rng.sample(ids, min(BATCH, size)))
+        return ([replace(b, title=b.title + "!") for b in found.values()],)
+
+    ops: List[Op] = [
+        ("load_books", storage.load_books, None, None),
+        ("get_book_by_id", storage.get_book_by_id, lambda: (rng.choice(ids),), None),
+        (
+            f"get_books_by_ids[{BATCH}]",
+            storage.get_books_by_ids,
+            lambda: (rng.sample(ids, min(BATCH, size)),),
+            None,
+        ),
+        ("update_book", storage.update_book, changed_book, None),
+        ("add_book", storage.add_book, one_new, None),
+        ("remove_book", storage.remove_book, lambda: (added.pop(),), added.__len__),
+        (f"update_books[{BATCH}]", storage.update_books, changed_batch, None),
+        (f"add_books[{BATCH}]", storage.add_books, batch_new, None),
+        (
+            f"remove_books[{BATCH}]",
+            storage.remove_books,
+            lambda: (added_batches.pop(),),
+            added_batches.__len__,
+        ),
+    ]
+    if hasattr(storage, "iter_book_records"):
+
+        def drain():
+            return sum(1 for _ in storage.iter_book_records())
+
+        ops.insert(1, ("iter_book_records", drain, None, None))
+    return ops
+
+
+def user_ops(storage, count: int, rng: random.Random) -> List[Op]:
+    """``UserRepository`` operations the backend implements."""
+    names = [f"{'librarian' if i % 50 == 0 else 'student'}{i}" for i in range(count)]
+    fresh = _new_ids(count + 1)
+    created: List[int] = []
+
+    def new_user():
+        return (f"bench{next(fresh)}", "123456", Role.USER)
+
+    def create_user(username, password, role):
+        user = storage.create_user(username, password, role)
+        created.append(user.id)
+
+    def changed_user():
+        user = storage.get_user_by_id(rng.randint(1, count))
+        return (replace(user, password="654321"),)
+
+    ops: List[Op] = [
+        ("load_users", storage.load_users, None, None),
+        (
+            "get_user_by_username",
+            storage.get_user_by_username,
+            lambda: (rng.choice(names),),
+            None,
+        ),
+        ("user_exists", storage.user_exists, lambda: (rng.choice(names),), None),
+        ("create_user", create_user, new_user, None),
+    ]
+    if hasattr(storage, "get_user_by_id"):
+        ops.append(
+            (
+                "get_user_by_id",
+                storage.get_user_by_id,
+                lambda: (rng.randint(1, count),),
+                None,
+            )
+        )
+    if hasattr(storage, "update_user"):
+        ops.append(("update_user", storage.update_user, changed_user, None))
+    if hasattr(storage, "remove_user"):
+        ops.append(
+            (
+                "remove_user",
+                storage.remove_user,
+                lambda: (created.pop(),),
+                created.__len__,
+            )
+        )
+    return ops
+
+
+def service_ops(storage, size: int, rng: random.Random) -> List[Op]:
+    """End-to-end ``BookService`` workflows."""
+    service = BookService(storage=storage)
+    available_ids = [
+        b.id for b in storage.load_books() if b.status == BookStatus.AVAILABLE
+    ]
+    fresh = _new_ids(FIRST_BOOK_ID + size + 500_000)
+    batch = min(50, len(available_ids))
+
+    def check(result):
+        if result[0] is None:
+            raise RuntimeError(result[1])
+
+    def borrow_cycle(book_id):
+        check(service.pick_book(book_id, "student1"))
+        check(service.approve_borrow(book_id))
+        check(service.return_book(book_id))
+
+    def add_delete(book_id):
+        check(service.add_book(book_id, "Bench title", "Bench author"))
+        if not service.delete_book(book_id)[0]:
+            raise RuntimeError(f"could not delete {book_id}")
+
+    def picked_batch():
+        chosen = rng.sample(available_ids, batch)
+        books = storage.get_books_by_ids(chosen).values()
+        storage.update_books(
+            [replace(b, status=BookStatus.PICKED, picked_by="student1") for b in books]
+        )
+        return (chosen,)
+
+    def approve_and_return(book_ids):
+        for results in (
+            service.approve_borrows(book_ids),
+            service.return_books(book_ids),
+        ):
+            if not all(r.success for r in results):
+                raise RuntimeError("batch workflow failed")
+
+    return [
+        ("list_all_books", service.list_all_books, None, None),
+        (
+            "pick_approve_return",
+            borrow_cycle,
+            lambda: (rng.choice(available_ids),),
+            None,
+        ),
+        ("add_delete_book", add_delete, lambda: (next(fresh),), None),
+        (f"batch_approve_return[{batch}]", approve_and_return, picked_batch, None),
+    ]
+
+
+def run_ops(ops: List[Op], suite: str, backend: str, size: int, args) -> List[dict]:
+    results = []
+    for name, call, prepare, limit in ops:
+        max_samples = (
+            args.max_samples if limit is None else min(args.max_samples, limit())
+        )
+        if max_samples < 1:
+            continue
+        stats = measure(
+            call,
+            prepare,
+            seconds=args.seconds,
+            min_samples=min(3, max_samples),
+            max_samples=max_samples,
+        )
+        result = {"suite": suite, "backend": backend, "size": size, "op": name}
+        results.append({**result, **stats})
+        print(f"  {suite:<8} {name:<28} {stats['p50_ms']:>10.3f} ms p50", flush=True)
+    return results
+
+
+def bench_backend(name: str, args, workdir: Path) -> List[dict]:
+    results = []
+    for size in args.sizes:
+        print(f"{name}: {size} books", flush=True)
+        backend = Backend(name, workdir / f"{name}-{size}")
+        try:
+            backend.books.add_books(make_books(size))
+            rng = random.Random(size)
+            results += run_ops(
+                book_ops(backend.books, size, rng), "books", name, size, args
+            )
+            results += run_ops(
+                service_ops(backend.books, size, rng), "service", name, size, args
+            )
+        finally:
+            backend.close()
+
+    print(f"{name}: {args.users} users", flush=True)
+    backend = Backend(name, workdir / f"{name}-users")
+    try:
+        seed_users(backend.users, args.users)
+        rng = random.Random(args.users)
+        results += run_ops(
+            user_ops(backend.users, args.users, rng), "users", name, args.users, args
+        )
+    finally:
+        backend.close()
+    return results
+
+
+def seed_users(storage, count: int) -> None:
+    users = make_users(count)
+    if hasattr(storage, "save_users"):
+        storage.save_users(users)
+        return
+    for user in users:
+        storage.create_user(user.username, user.password, user.role)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", default=DEFAULT_BACKENDS)
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        type=lambda v: [int(s) for s in v.split(",")],
+        help="Catalog sizes (books)",
+    )
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument(
+        "--seconds", type=float, default=1.0, help="Timed budget per operation"
+    )
+    parser.add_argument("--max-samples", type=int, default=1000)
+    parser.add_argument("--json", dest="json_path", help="Write results to a file")
+    parser.add_argument("--baseline", help="Earlier result file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        print(f"Unknown backends: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    results: List[dict] = []
+    skipped = {}
+    workdir = Path(tempfile.mkdtemp(prefix="library-bench-"))
+    try:
+        for name in backends:
+            reason = available(name)
+            if reason:
+                skipped[name] = reason
+                print(f"Skipping {name}: {reason}", file=sys.stderr)
+                continue
+            results += bench_backend(name, args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print_results(results)
+    if args.json_path:
+        meta = run_metadata(
+            sizes=args.sizes, users=args.users, seconds=args.seconds, skipped=skipped
+        )
+        write_results(args.json_path, meta, results)
+    if args.baseline:
+        print()
+        rows = compare(load_results(args.baseline), results, args.threshold)
+        return 1 if print_comparison(rows, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""Shared helpers for the benchmark scripts.
+
+Synthetic data, latency sampling, and result files that can be compared
+between commits::
+
+    python benchmarks/bench_storage.py --json before.json
+    git checkout my-branch
+    python benchmarks/bench_storage.py --json after.json --baseline before.json
+
+Result files hold ``{"meta": {...}, "results": [...]}``; each result is
+identified by its ``KEY_FIELDS`` and carries throughput and latency
+percentiles in milliseconds.
+"""
+
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from models.book import Book, BookStatus  # noqa: E402
+from models.role import Role  # noqa: E402
+from models.user import User  # noqa: E402
+
+# Fields that identify a result across runs
+KEY_FIELDS = ("suite", "backend", "size", "op")
+
+FIRST_BOOK_ID = 1000
+
+
+def make_books(count: int, seed: int = 42) -> List[Book]:
+    """A catalog shaped like data/books.json: about half picked or borrowed."""
+    rng = random.Random(seed)
+    statuses = (
+        BookStatus.AVAILABLE,
+        BookStatus.AVAILABLE,
+        BookStatus.PICKED,
+        BookStatus.BORROWED,
+    )
+    books = []
+    for i in range(count):
+        status = rng.choice(statuses)
+        books.append(
+            Book(
+                id=FIRST_BOOK_ID + i,
+                title=f"Title {i} {rng.randrange(10**6)}",
+                author=f"Author {rng.randrange(max(1, count // 20))}",
+                status=status,
+                picked_by=(
+                    None
+                    if status == BookStatus.AVAILABLE
+                    else f"student{rng.randrange(500)}"
+                ),
+            )
+        )
+    return books
+
+
+def make_users(count: int) -> List[User]:
+    """``count`` users, one librarian per fifty students (``Role.USER``)."""
+    return [
+        User(
+            id=i + 1,
+            username=f"{'librarian' if i % 50 == 0 else 'student'}{i}",
+            password=str(100000 + i),
+            role=Role.LIBRARIAN if i % 50 == 0 else Role.USER,
+        )
+        for i in range(count)
+    ]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * pct / 100))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Throughput and latency percentiles (ms) of per-call seconds."""
+    values = sorted(latencies)
+    total = sum(values)
+    return {
+        "samples": len(values),
+        "ops_per_sec": round(len(values) / total, 1) if total else 0.0,
+        "mean_ms": round(total / len(values) * 1000, 4) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 4),
+        "p95_ms": round(percentile(values, 95) * 1000, 4),
+        "p99_ms": round(percentile(values, 99) * 1000, 4),
+        "max_ms": round(values[-1] * 1000, 4) if values else 0.0,
+    }
+
+
+def measure(
+    call: Callable[..., object],
+    prepare: Optional[Callable[[], Tuple]] = None,
+    seconds: float = 1.0,
+    min_samples: int = 3,
+    max_samples: int = 1000,
+) -> Dict[str, float]:
+    """Time ``call(*prepare())`` repeatedly; only ``call`` is timed.
+
+    Sampling stops after ``max_samples`` calls or once ``seconds`` of timed
+    work have been spent, but never before ``min_samples`` calls.
+    """
+    latencies: List[float] = []
+    spent = 0.0
+    while len(latencies) < max_samples and (
+        spent < seconds or len(latencies) < min_samples
+    ):
+        args = prepare() if prepare else ()
+        start = time.perf_counter()
+        call(*args)
+        elapsed = time.perf_counter() - start
+        latencies.append(elapsed)
+        spent += elapsed
+    return summarize(latencies)
+
+
+def git_commit() -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_metadata(**extra) -> dict:
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        **extra,
+    }
+
+
+def write_results(path: str, meta: dict, results: List[dict]) -> None:
+    Path(path).write_text(
+        json.dumps({"meta": meta, "results": results}, indent=2) + "\n",
+        encoding="utf-8",
+    )
+
+
+def load_results(path: str) -> List[dict]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))["results"]
+
+
+def result_key(result: dict) -> Tuple:
+    return tuple(result.get(field) for field in KEY_FIELDS)
+
+
+def compare(
+    baseline: Iterable[dict], current: Iterable[dict], threshold: float = 0.25
+) -> List[dict]:
+    """Results present in both runs, with their p50 change.
+
+    ``regression`` is set when the median latency grew by more than
+    ``threshold`` (0.25 = 25%).
+    """
+    before = {result_key(r): r for r in baseline}
+    rows = []
+    for result in current:
+        old = before.get(result_key(result))
+        if old is None or not old.get("p50_ms"):
+            continue
+        change = result["p50_ms"] / old["p50_ms"] - 1
+        rows.append(
+            {
+                **{field: result.get(field) for field in KEY_FIELDS},
+                "p50_ms_before": old["p50_ms"],
+                "p50_ms_after": result["p50_ms"],
+                "change": round(change, 3),
+                "regression": change > threshold,
+            }
+        )
+    return rows
+
+
+def _op_width(rows: List[dict]) -> int:
+    return max([28, *(len(str(r["op"])) for r in rows)])
+
+
+def print_results(results: List[dict]) -> None:
+    width = _op_width(results)
+    header = (
+        f"{'suite':<9} {'backend':<9} {'size':>7} {'op':<{width}}"
+        f" {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['suite']:<9} {r['backend']:<9} {r['size']:>7} {r['op']:<{width}}"
+            f" {r['ops_per_sec']:>10} {r['p50_ms']:>9.3f}"
+            f" {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f}"
+        )
+
+
+def print_comparison(rows: List[dict], threshold: float) -> int:
+    """Print the comparison; returns how many results regressed."""
+    regressions = [r for r in rows if r["regression"]]
+    width = _op_width(rows)
+    for r in rows:
+        flag = "REGRESSION" if r["regression"] else ""
+        print(
+            f"{r['suite']:<9} {r['backend']:<9} {r['size']:>7} {r['op']:<{width}}"
+            f" {r['p50_ms_before']:>9.3f} -> {r['p50_ms_after']:>9.3f} ms"
+            f" {r['change']:>+8.1%} {flag}"
+        )
+    print(
+        f"\n{len(regressions)} of {len(rows)} results regressed by more than "
+        f"{threshold:.0%} (median latency)"
+    )
+    return len(regressions)
@@ -1,17 +1,10 @@
-"""CLI package for the Library Management System."""
+"""CLI package for the Library Management System.
 
-from .commands import (
-    handle_add_book,
-    handle_approve_borrow,
-    handle_delete_book,
-    handle_list_books,
-    handle_list_picked,
-    handle_pick_book,
-    handle_register_user,
-    handle_return_book,
-    handle_update_book,
-    handle_update_status,
-)
+Handlers are resolved lazily (PEP 562) so that the thin daemon client
+(``cli.daemon``) starts without importing the services behind them.
+"""
+
+from importlib import import_module
 
 __all__ = [
     "handle_add_book",
@@ -24,4 +17,14 @@ __all__ = [
     "handle_approve_borrow",
     "handle_return_book",
     "handle_register_user",
+    "handle_stats",
+    "handle_book_batch",
+    "handle_import_books",
+    "handle_export_books",
 ]
+
+
+def __getattr__(name):
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(".commands", __name__), name)
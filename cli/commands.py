@@ -1,18 +1,24 @@
 """CLI command handlers with role-based access control."""
 
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from core.factory import ServiceFactory
 from lib_logging.logger import get_logger
 from models.book import BookStatus
 from models.role import Role
-from services.book_service import BookService
-from services.user_service import UserService
+
+# Services are only needed for annotations here; ServiceFactory imports the
+# one a command uses, which keeps CLI start-up cheap.
+if TYPE_CHECKING:
+    from services.book_service import BookService
+    from services.import_export_service import ImportExportService, ImportReport
+    from services.stats_service import StatsService
+    from services.user_service import UserService
 
 logger = get_logger(__name__)
 
 
-def _resolve_book_service(book_service: Optional[BookService]) -> BookService:
+def _resolve_book_service(book_service: Optional["BookService"]) -> "BookService":
     """Resolve BookService (injected or default). Enables DI and backward-compat tests."""
     if book_service is not None:
         return book_service
@@ -20,13 +26,29 @@ def _resolve_book_service(book_service: Optional[BookService]) -> BookService:
     return ServiceFactory().create_book_service()
 
 
-def _resolve_user_service(user_service: Optional[UserService]) -> UserService:
+def _resolve_user_service(user_service: Optional["UserService"]) -> "UserService":
     """Resolve UserService (injected or default)."""
     if user_service is not None:
         return user_service
     return ServiceFactory().create_user_service()
 
 
+def _resolve_stats_service(stats_service: Optional["StatsService"]) -> "StatsService":
+    """Resolve StatsService (injected or default)."""
+    if stats_service is not None:
+        return stats_service
+    return ServiceFactory().create_stats_service()
+
+
+def _resolve_import_export_service(
+    service: Optional["ImportExportService"],
+) -> "ImportExportService":
+    """Resolve ImportExportService (injected or default)."""
+    if service is not None:
+        return service
+    return ServiceFactory().create_import_export_service()
+
+
 def _check_role_permission(required_role: Role, provided_role: Optional[Role]) -> bool:
     """
     Check if provided role has permission for an operation.
@@ -70,6 +92,22 @@ def _get_role_from_login(
     return Role.USER, None
 
 
+def _require_librarian(
+    is_librarian: bool, username: Optional[str], action: str
+) -> bool:
+    """Print an error and return False unless the caller is a librarian."""
+    user_role, error_msg = _get_role_from_login(is_librarian, username)
+    if error_msg:
+        print(f"ERROR: {error_msg}")
+        return False
+
+    assert user_role is not None, "user_role should not be None after validation"
+    if not _check_role_permission(Role.LIBRARIAN, user_role):
+        print(f"ERROR: Only librarians can {action}. Your role: {user_role.value}")
+        return False
+    return True
+
+
 def _parse_book_id(book_id_str: str) -> Tuple[Optional[int], Optional[str]]:
     """
     Parse book ID string to integer.
@@ -89,13 +127,40 @@ def _parse_book_id(book_id_str: str) -> Tuple[Optional[int], Optional[str]]:
         return None, f"Invalid book ID format: {book_id_str}. Must be an integer."
 
 
+def _parse_book_ids(book_ids_str: str) -> Tuple[List[int], List[str]]:
+    """
+    Parse a comma-separated list of book IDs in one pass.
+
+    Args:
+        book_ids_str: Book IDs, e.g. "1001,1002,1003"
+
+    Returns:
+        Tuple of (book_ids, error_messages); every invalid entry is reported
+    """
+    book_ids: List[int] = []
+    errors: List[str] = []
+    for part in book_ids_str.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        book_id, error_msg = _parse_book_id(part)
+        if error_msg:
+            errors.append(error_msg)
+        else:
+            assert book_id is not None
+            book_ids.append(book_id)
+    if not book_ids and not errors:
+        errors.append("At least one book ID is required")
+    return book_ids, errors
+
+
 def handle_add_book(
     book_id_str: str,
     title: str,
     author: str,
     is_librarian: bool = False,
     username: Optional[str] = None,
-    book_service: Optional[BookService] = None,
+    book_service: Optional["BookService"] = None,
 ) -> int:
     """
     Handle add-book command (librarian only).
@@ -148,7 +213,7 @@ def handle_delete_book(
     book_id: str,
     is_librarian: bool = False,
     username: Optional[str] = None,
-    book_service: Optional[BookService] = None,
+    book_service: Optional["BookService"] = None,
 ) -> int:
     """
     Handle delete-book command (librarian only).
@@ -195,7 +260,7 @@ def handle_update_book(
     username: Optional[str] = None,
     title: Optional[str] = None,
     author: Optional[str] = None,
-    book_service: Optional[BookService] = None,
+    book_service: Optional["BookService"] = None,
 ) -> int:
     """
     Handle update-book command (librarian only).
@@ -249,7 +314,7 @@ def handle_update_status(
     status: str,
     is_librarian: bool = False,
     username: Optional[str] = None,
-    book_service: Optional[BookService] = None,
+    book_service: Optional["BookService"] = None,
 ) -> int:
     """
     Handle update-status command (librarian only).
@@ -309,7 +374,7 @@ def handle_update_status(
 def handle_list_books(
     is_librarian: bool = False,
     username: Optional[str] = None,
-    book_service: Optional[BookService] = None,
+    book_service: Optional["BookService"] = None,
 ) -> int:
     """
     Handle list-books command (user and librarian can view).
@@ -350,7 +415,7 @@ def handle_list_books(
 def handle_pick_book(
     book_id: str,
     username: str,
-    book_service: Optional[BookService] = None,
+    book_service: Optional["BookService"] = None,
 ) -> int:
     """
     Handle pick-book command (user only).
@@ -398,7 +463,7 @@ def handle_pick_book(
 def handle_list_picked(
     is_librarian: bool = False,
     username: Optional[str] = None,
-    book_service: Optional[BookService] = None,
+    book_service: Optional["BookService"] = None,
 ) -> int:
     """
     Handle list-picked command (librarian only).
@@ -447,7 +512,7 @@ def handle_approve_borrow(
     book_id: str,
     is_librarian: bool = False,
     username: Optional[str] = None,
-    book_service: Optional[BookService] = None,
+    book_service: Optional["BookService"] = None,
 ) -> int:
     """
     Handle approve-borrow command (librarian only).
@@ -497,7 +562,7 @@ def handle_return_book(
     book_id: str,
     is_librarian: bool = False,
     username: Optional[str] = None,
-    book_service: Optional[BookService] = None,
+    book_service: Optional["BookService"] = None,
 ) -> int:
     """
     Handle return-book command (librarian only).
@@ -543,7 +608,7 @@ def handle_register_user(
     username: str,
     password: str,
     role_string: str,
-    user_service: Optional[UserService] = None,
+    user_service: Optional["UserService"] = None,
 ) -> int:
     """
     Handle register-user command.
@@ -568,3 +633,222 @@ def handle_register_user(
         f"SUCCESS: Registered user '{user.username}' with role '{user.role.value}' (ID: {user.id})"
     )
     return 0
+
+
+def handle_stats(
+    is_librarian: bool = False,
+    username: Optional[str] = None,
+    top: int = 10,
+    stats_service: Optional["StatsService"] = None,
+) -> int:
+    """
+    Handle stats command (librarian only).
+
+    Args:
+        is_librarian: True if logging in as librarian
+        username: Username (not used for librarian)
+        top: Number of authors / users to list
+
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    if not _require_librarian(is_librarian, username, "view catalog statistics"):
+        return 1
+
+    svc = _resolve_stats_service(stats_service)
+    stats = svc.get_stats(top=top)
+
+    print(f"Catalog statistics ({stats['total']} books):")
+    for status, count in stats["by_status"].items():
+        print(f"  {status:<12} {count}")
+
+    print(f"\nTop authors (up to {top}):")
+    for row in stats["top_authors"]:
+        print(f"  {row['author'][:40]:<42} {row['count']}")
+
+    print(f"\nBooks picked per user (up to {top}):")
+    if not stats["picked_per_user"]:
+        print("  -")
+    for row in stats["picked_per_user"]:
+        print(f"  {row['username']:<42} {row['count']}")
+
+    return 0
+
+
+# Batch actions: CLI command -> (BookService method, past-tense verb)
+_BATCH_ACTIONS = {
+    "approve-borrow": ("approve_borrows", "Approved borrow for"),
+    "return-book": ("return_books", "Returned"),
+    "delete-book": ("delete_books", "Deleted"),
+}
+
+
+def handle_book_batch(
+    command: str,
+    book_ids_str: str,
+    is_librarian: bool = False,
+    username: Optional[str] = None,
+    book_service: Optional["BookService"] = None,
+) -> int:
+    """
+    Handle batch variants of approve-borrow, return-book and delete-book
+    (librarian only), e.g. ``approve-borrow --ids 1001,1002``.
+
+    Args:
+        command: One of approve-borrow, return-book, delete-book
+        book_ids_str: Comma-separated book IDs
+        is_librarian: True if logging in as librarian
+        username: Username (not used for librarian)
+
+    Returns:
+        Exit code (0 if every book succeeded, 1 otherwise)
+    """
+    if command not in _BATCH_ACTIONS:
+        print(f"ERROR: Command '{command}' does not support --ids")
+        return 1
+
+    if not _require_librarian(is_librarian, username, "run batch operations"):
+        return 1
+
+    # Validate all IDs before touching storage
+    book_ids, errors = _parse_book_ids(book_ids_str)
+    if errors:
+        for error_msg in errors:
+            print(f"ERROR: {error_msg}")
+        return 1
+
+    method_name, verb = _BATCH_ACTIONS[command]
+    svc = _resolve_book_service(book_service)
+    results = getattr(svc, method_name)(book_ids)
+
+    failed = 0
+    for r in results:
+        if r.success:
+            title = r.book.title if r.book else ""
+            print(f"SUCCESS: {verb} book '{title}' (ID: {r.book_id})")
+        else:
+            failed += 1
+            print(f"ERROR: {r.error}")
+
+    print(f"Batch {command}: {len(results) - failed} succeeded, {failed} failed")
+    return 0 if failed == 0 else 1
+
+
+def _progress_printer(interval: float = 1.0):
+    """Return a progress callback that prints at most once per ``interval`` seconds."""
+    last = [0.0]
+
+    def _print(report: "ImportReport") -> None:
+        if report.elapsed - last[0] < interval:
+            return
+        last[0] = report.elapsed
+        print(
+            f"  ... {report.processed} rows, {report.added} added "
+            f"({report.rows_per_second:,.0f} rows/s)",
+            flush=True,
+        )
+
+    return _print
+
+
+def handle_import_books(
+    file_path: str,
+    fmt: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    is_librarian: bool = False,
+    username: Optional[str] = None,
+    service: Optional["ImportExportService"] = None,
+) -> int:
+    """
+    Handle import-books command (librarian only).
+
+    Args:
+        file_path: CSV or NDJSON file to import
+        fmt: "csv" or "ndjson" (default: from file extension)
+        batch_size: Rows validated and written per storage call (default: per backend)
+        is_librarian: True if logging in as librarian
+        username: Username (not used for librarian)
+
+    Returns:
+        Exit code (0 if no row was rejected, 1 otherwise)
+    """
+    if not _require_librarian(is_librarian, username, "import books"):
+        return 1
+
+    try:
+        from services.import_export_service import detect_format
+
+        fmt = detect_format(file_path, fmt)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    svc = _resolve_import_export_service(service)
+    try:
+        with open(file_path, "r", encoding="utf-8", newline="") as f:
+            report = svc.import_file(f, fmt, batch_size, progress=_progress_printer())
+    except OSError as e:
+        print(f"ERROR: Cannot read '{file_path}': {e}")
+        return 1
+
+    for error_msg in report.errors:
+        print(f"ERROR: {error_msg}")
+    if report.rejected > len(report.errors):
+        print(f"ERROR: ... {report.rejected - len(report.errors)} more rejected rows")
+
+    print(
+        f"SUCCESS: Imported {report.added} books from {report.processed} rows "
+        f"({report.duplicates} duplicates skipped, {report.rejected} rejected) "
+        f"in {report.elapsed:.2f}s ({report.rows_per_second:,.0f} rows/s)"
+    )
+    return 0 if report.rejected == 0 else 1
+
+
+def handle_export_books(
+    file_path: str,
+    fmt: Optional[str] = None,
+    is_librarian: bool = False,
+    username: Optional[str] = None,
+    service: Optional["ImportExportService"] = None,
+) -> int:
+    """
+    Handle export-books command (librarian only).
+
+    Args:
+        file_path: Destination CSV or NDJSON file
+        fmt: "csv" or "ndjson" (default: from file extension)
+        is_librarian: True if logging in as librarian
+        username: Username (not used for librarian)
+
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    if not _require_librarian(is_librarian, username, "export books"):
+        return 1
+
+    try:
+        from services.import_export_service import detect_format
+
+        fmt = detect_format(file_path, fmt)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    svc = _resolve_import_export_service(service)
+    try:
+        f = open(file_path, "w", encoding="utf-8", newline="")
+    except OSError as e:
+        print(f"ERROR: Cannot write '{file_path}': {e}")
+        return 1
+    with f:
+        try:
+            report = svc.export_file(f, fmt, progress=_progress_printer())
+        except (OSError, ValueError) as e:
+            print(f"ERROR: Export to '{file_path}' failed: {e}")
+            return 1
+
+    print(
+        f"SUCCESS: Exported {report.processed} books to '{file_path}' "
+        f"in {report.elapsed:.2f}s ({report.rows_per_second:,.0f} rows/s)"
+    )
+    return 0
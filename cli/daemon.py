@@ -0,0 +1,306 @@
+"""Persistent CLI daemon and its thin client.
+
+``main.py serve-cli`` runs commands received over a Unix domain socket in one
+long-lived process, so the interpreter, the imported services and the storage
+connections (cached by ``StorageFactory``) stay warm between commands.
+``main.py <command>`` forwards to the daemon when one is listening and falls
+back to running in-process otherwise.
+
+Protocol (one JSON object per line):
+    client -> daemon  {"argv": [...], "cwd": "...", "config": "<fingerprint>"}
+    daemon -> client  {"accepted": true} or {"error": "..."}
+                      {"stdout": "..."} / {"stderr": "..."} as output is produced
+                      {"exit": <code>}
+
+The daemon only accepts commands from clients whose storage configuration
+(``DATABASE_TYPE`` and the MongoDB settings) matches its own.
+"""
+
+import hashlib
+import io
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import IO, Callable, List, Optional
+
+SOCKET_ENV = "LIBRARY_CLI_SOCKET"
+DISABLE_ENV = "LIBRARY_CLI_NO_DAEMON"
+
+# Environment that selects the storage backend; must match client and daemon
+CONFIG_ENV_VARS = (
+    "DATABASE_TYPE",
+    "MONGODB_URI",
+    "MONGO_URI",
+    "MONGODB_HOST",
+    "MONGODB_PORT",
+    "MONGODB_DATABASE",
+    "MONGODB_USERNAME",
+    "MONGODB_PASSWORD",
+)
+
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = 5.0
+
+# Output is sent to the client in frames of roughly this many characters
+FRAME_CHARS = 8 * 1024
+
+
+def socket_path() -> Path:
+    """Socket location: ``$LIBRARY_CLI_SOCKET`` or a per-user file in the temp dir."""
+    configured = os.environ.get(SOCKET_ENV)
+    if configured:
+        return Path(configured)
+    import tempfile
+
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(tempfile.gettempdir()) / f"library-cli-{uid}.sock"
+
+
+def config_fingerprint() -> str:
+    """Hash of the storage configuration (values never leave the process)."""
+    digest = hashlib.sha256()
+    for name in CONFIG_ENV_VARS:
+        digest.update(f"{name}={os.environ.get(name, '')}\0".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _send(stream: IO[bytes], message: dict) -> None:
+    stream.write(json.dumps(message).encode("utf-8") + b"\n")
+    stream.flush()
+
+
+# --- client -----------------------------------------------------------------
+
+
+def _connect(path: Optional[Path]) -> Optional[socket.socket]:
+    if not hasattr(socket, "AF_UNIX") or os.environ.get(DISABLE_ENV):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(path or socket_path()))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _relay(stream: IO[bytes], stdout: IO[str], stderr: IO[str]) -> Optional[int]:
+    """Copy output frames until the exit code arrives (None if it never does)."""
+    for line in stream:
+        message = json.loads(line)
+        if "exit" in message:
+            return int(message["exit"])
+        for key, target in (("stdout", stdout), ("stderr", stderr)):
+            if key in message:
+                target.write(message[key])
+                target.flush()
+    return None
+
+
+def call(
+    argv: List[str],
+    stdout: Optional[IO[str]] = None,
+    stderr: Optional[IO[str]] = None,
+    path: Optional[Path] = None,
+    timeout: Optional[float] = None,
+) -> Optional[int]:
+    """Run ``argv`` in the daemon, copying its output to ``stdout``/``stderr``.
+
+    Returns the command's exit code, or None when no compatible daemon is
+    available, in which case nothing has been executed and the caller should
+    run the command itself. Raises ``TimeoutError`` if the daemon does not
+    answer within ``timeout`` seconds.
+    """
+    sock = _connect(path)
+    if sock is None:
+        return None
+    sock.settimeout(timeout)
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+
+    with sock, sock.makefile("rwb") as stream:
+        request = {"argv": argv, "cwd": os.getcwd(), "config": config_fingerprint()}
+        try:
+            _send(stream, request)
+            reply = json.loads(stream.readline() or b"{}")
+        except (OSError, ValueError):
+            return None
+        if not reply.get("accepted"):
+            return None
+
+        # From here on the command is running: never fall back (it would run twice)
+        try:
+            exit_code = _relay(stream, stdout, stderr)
+        except TimeoutError:
+            raise
+        except (OSError, ValueError):
+            exit_code = None
+    if exit_code is None:
+        print("ERROR: Lost connection to the CLI daemon", file=stderr)
+        return 1
+    return exit_code
+
+
+# --- daemon -----------------------------------------------------------------
+
+
+class _FrameWriter(io.TextIOBase):
+    """Text stream that forwards writes to the client as JSON frames."""
+
+    def __init__(self, stream: IO[bytes], key: str):
+        self._stream = stream
+        self._key = key
+        self._pending: List[str] = []
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._pending.append(text)
+        self._size += len(text)
+        if self._size >= FRAME_CHARS:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if self._pending:
+            text = "".join(self._pending)
+            self._pending.clear()
+            self._size = 0
+            _send(self._stream, {self._key: text})
+
+
+def _exit_code(exc: SystemExit) -> int:
+    if exc.code is None:
+        return 0
+    return exc.code if isinstance(exc.code, int) else 1
+
+
+def _run_request(
+    runner: Callable[[List[str]], int], request: dict, stream: IO[bytes]
+) -> int:
+    """Execute one request with stdout/stderr redirected to the client."""
+    from contextlib import redirect_stderr, redirect_stdout
+
+    out = _FrameWriter(stream, "stdout")
+    err = _FrameWriter(stream, "stderr")
+    previous_cwd = os.getcwd()
+    try:
+        os.chdir(request.get("cwd") or previous_cwd)
+        with redirect_stdout(out), redirect_stderr(err):
+            try:
+                return runner([str(a) for a in request["argv"]])
+            except SystemExit as exc:  # argparse errors, --help
+                return _exit_code(exc)
+            except Exception as exc:
+                print(f"ERROR: Unexpected error: {exc}")
+                return 1
+    finally:
+        os.chdir(previous_cwd)
+        out.flush()
+        err.flush()
+
+
+def _handle_connection(conn: socket.socket, runner, logger) -> None:
+    # A client that connects but never sends its request must not block others
+    conn.settimeout(REQUEST_TIMEOUT)
+    with conn, conn.makefile("rwb") as stream:
+        try:
+            request = json.loads(stream.readline())
+            if not isinstance(request.get("argv"), list):
+                raise ValueError("argv must be a list")
+        except (ValueError, AttributeError) as exc:
+            _send(stream, {"error": f"Invalid request: {exc}"})
+            return
+        if request.get("config") != config_fingerprint():
+            _send(stream, {"error": "Daemon uses a different storage configuration"})
+            return
+
+        conn.settimeout(None)
+        _send(stream, {"accepted": True})
+        logger.info(f"CLI daemon running: {' '.join(request['argv'])}")
+        code = _run_request(runner, request, stream)
+        _send(stream, {"exit": code})
+
+
+def _is_listening(path: Path) -> bool:
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    probe.settimeout(CONNECT_TIMEOUT)
+    try:
+        probe.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def _listen(path: Path) -> socket.socket:
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)  # owner-only socket from the moment it exists
+    try:
+        listener.bind(str(path))
+    finally:
+        os.umask(old_umask)
+    listener.listen(16)
+    return listener
+
+
+def serve(runner: Callable[[List[str]], int], path: Optional[Path] = None) -> int:
+    """Serve CLI commands on a Unix domain socket until interrupted.
+
+    ``runner`` executes one argv in-process and returns its exit code.
+    Commands are run one at a time, in the order they arrive.
+    """
+    import signal
+
+    from lib_logging.logger import get_logger
+
+    logger = get_logger(__name__)
+    if not hasattr(socket, "AF_UNIX"):
+        print("ERROR: serve-cli requires Unix domain sockets")
+        return 1
+
+    path = Path(path) if path else socket_path()
+    if _is_listening(path):
+        print(f"ERROR: A CLI daemon is already listening on {path}")
+        return 1
+    path.unlink(missing_ok=True)  # stale socket of a daemon that was killed
+
+    listener = _listen(path)
+
+    # SIGTERM and Ctrl+C stop the daemon (removing the socket), but only
+    # between commands: interrupting one could leave it half-applied, and an
+    # exception raised inside buffered socket I/O can be lost.
+    state = {"stop": False, "idle": False}
+
+    def request_stop(signum, frame):
+        state["stop"] = True
+        if state["idle"]:
+            raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    print(f"SUCCESS: CLI daemon listening on {path}", flush=True)
+    logger.info(f"CLI daemon listening on {path}")
+    try:
+        while not state["stop"]:
+            state["idle"] = True
+            conn, _ = listener.accept()
+            state["idle"] = False
+            try:
+                _handle_connection(conn, runner, logger)
+            except OSError as exc:  # client went away mid-command
+                logger.warning(f"CLI daemon connection error: {exc}")
+        print("Shutting down CLI daemon")
+    except KeyboardInterrupt:
+        print("\nShutting down CLI daemon")
+    finally:
+        listener.close()
+        path.unlink(missing_ok=True)
+        logger.info("CLI daemon stopped")
+    return 0
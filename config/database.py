@@ -1,11 +1,13 @@
 """Database connection configuration and management."""
 
 import os
+import threading
 from typing import Optional
 
 from pymongo import MongoClient
 from pymongo.database import Database
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo.monitoring import ConnectionPoolListener
 
 from lib_logging.logger import get_logger
 
@@ -32,6 +34,10 @@ class MongoDBConfig:
         self.database = os.getenv("MONGODB_DATABASE", "school_library")
         self.username = os.getenv("MONGODB_USERNAME", "")
         self.password = os.getenv("MONGODB_PASSWORD", "")
+        # How long an operation waits for a reachable server before failing
+        self.server_selection_timeout_ms = int(
+            os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")
+        )
 
     @property
     def connection_string(self) -> str:
@@ -52,6 +58,75 @@ class MongoDBConfig:
         )
 
 
+class PoolMonitor(ConnectionPoolListener):
+    """Counts the client's connection checkouts (for readiness reporting).
+
+    ``waiting`` is the number of operations waiting for a connection; it
+    only rises above zero when every pooled connection is in use.
+    """
+
+    def __init__(self):
+        self.max_size: Optional[int] = None
+        self.in_use = 0
+        self.waiting = 0
+        self.checkout_failures = 0
+        self._lock = threading.Lock()
+
+    def _add(self, in_use: int = 0, waiting: int = 0, failures: int = 0) -> None:
+        with self._lock:
+            self.in_use += in_use
+            self.waiting += waiting
+            self.checkout_failures += failures
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            in_use, waiting = self.in_use, self.waiting
+            failures = self.checkout_failures
+        return {
+            "in_use": in_use,
+            "max_size": self.max_size,
+            "waiting": waiting,
+            "checkout_failures": failures,
+            "saturation": round(in_use / self.max_size, 3) if self.max_size else None,
+        }
+
+    def connection_check_out_started(self, event) -> None:
+        self._add(waiting=1)
+
+    def connection_checked_out(self, event) -> None:
+        self._add(in_use=1, waiting=-1)
+
+    def connection_check_out_failed(self, event) -> None:
+        self._add(waiting=-1, failures=1)
+
+    def connection_checked_in(self, event) -> None:
+        self._add(in_use=-1)
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        pass
+
+
+POOL_MONITOR = PoolMonitor()
+
+
 class MongoDBConnection:
     """MongoDB connection manager with singleton pattern."""
 
@@ -98,10 +173,12 @@ class MongoDBConnection:
             logger.info(f"Connecting to MongoDB: {config}")
             client: MongoClient = MongoClient(
                 config.connection_string,
-                serverSelectionTimeoutMS=5000,
+                serverSelectionTimeoutMS=config.server_selection_timeout_ms,
                 connectTimeoutMS=10000,
                 retryWrites=True,
+                event_listeners=[POOL_MONITOR],
             )
+            POOL_MONITOR.max_size = client.options.pool_options.max_pool_size
 
             # Verify connection
             client.admin.command("ping")
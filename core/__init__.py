@@ -1,16 +1,26 @@
-"""Core abstractions and design patterns."""
+"""Core abstractions and design patterns.
 
-from .factory import ServiceFactory, StorageFactory
-from .repository import BookRepository, Repository, UserRepository
-from .strategy import BookValidationStrategy, UserValidationStrategy, ValidationStrategy
+Exports are resolved lazily (PEP 562): ``core.factory`` pulls in the
+services, which most importers of ``core`` do not need.
+"""
 
-__all__ = [
-    "Repository",
-    "BookRepository",
-    "UserRepository",
-    "ServiceFactory",
-    "StorageFactory",
-    "ValidationStrategy",
-    "BookValidationStrategy",
-    "UserValidationStrategy",
-]
+from importlib import import_module
+
+_EXPORTS = {
+    "Repository": ".repository",
+    "BookRepository": ".repository",
+    "UserRepository": ".repository",
+    "ServiceFactory": ".factory",
+    "StorageFactory": ".factory",
+    "ValidationStrategy": ".strategy",
+    "BookValidationStrategy": ".strategy",
+    "UserValidationStrategy": ".strategy",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
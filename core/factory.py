@@ -1,14 +1,22 @@
-"""Factory pattern: centralize creation of services and storage for DI and consistency."""
+"""Factory pattern: centralize creation of services and storage for DI and consistency.
+
+Services are imported inside the ``create_*`` methods so a CLI command only
+pays for the modules it actually uses.
+"""
 
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, cast
 
-from services.book_service import BookService
-from services.user_service import UserService
-from storage.book_storage import BookStorage
 from storage.factory import StorageFactory as ConfigurableStorageFactory
-from storage.interfaces import BookRepository, UserRepository
-from storage.user_storage import UserStorage
+
+if TYPE_CHECKING:
+    from services.book_service import BookService
+    from services.import_export_service import ImportExportService
+    from services.stats_service import StatsService
+    from services.user_service import UserService
+    from storage.book_storage import BookStorage
+    from storage.interfaces import BookRepository, EventLog, UserRepository
+    from storage.user_storage import UserStorage
 
 
 class StorageFactory:
@@ -31,6 +39,10 @@ class StorageFactory:
         # Use the configurable factory that respects env vars (JSON or MongoDB)
         return self._configurable_factory.create_user_storage()
 
+    def create_event_log(self):
+        """Create the change event log based on DATABASE_TYPE."""
+        return self._configurable_factory.create_event_log()
+
 
 class ServiceFactory:
     """
@@ -40,34 +52,62 @@ class ServiceFactory:
 
     def __init__(
         self,
-        book_storage: Optional[BookStorage] = None,
-        user_storage: Optional[UserStorage] = None,
+        book_storage: Optional["BookStorage"] = None,
+        user_storage: Optional["UserStorage"] = None,
         data_dir: Optional[Path] = None,
+        event_log: Optional["EventLog"] = None,
     ):
         self._book_storage = book_storage
         self._user_storage = user_storage
+        self._event_log = event_log
         self._storage_factory = (
             StorageFactory(data_dir=data_dir) if data_dir else StorageFactory()
         )
 
-    def create_book_service(self) -> BookService:
+    def _events(self) -> Optional["EventLog"]:
+        """The injected event log; the configured one unless storage was injected."""
+        if self._event_log is not None or self._book_storage is not None:
+            return self._event_log
+        return self._storage_factory.create_event_log()
+
+    def create_book_service(self) -> "BookService":
         """Create BookService, reusing injected storage if set."""
+        from services.book_service import BookService
+
         # `create_book_storage()` may be untyped in the underlying factory;
         # cast to the `BookRepository` protocol so mypy understands compatibility.
-        from typing import cast
-
         storage = cast(
-            BookRepository,
+            "BookRepository",
             self._book_storage or self._storage_factory.create_book_storage(),
         )
-        return BookService(storage=storage)
+        return BookService(storage=storage, events=self._events())
 
-    def create_user_service(self) -> UserService:
+    def create_user_service(self) -> "UserService":
         """Create UserService, reusing injected storage if set."""
-        from typing import cast
+        from services.user_service import UserService
 
         storage = cast(
-            UserRepository,
+            "UserRepository",
             self._user_storage or self._storage_factory.create_user_storage(),
         )
         return UserService(storage=storage)
+
+    def create_stats_service(self) -> "StatsService":
+        """Create StatsService over the same book storage as BookService."""
+        from services.stats_service import StatsService
+
+        storage = cast(
+            "BookRepository",
+            self._book_storage or self._storage_factory.create_book_storage(),
+        )
+        return StatsService(storage=storage)
+
+    def create_import_export_service(self) -> "ImportExportService":
+        """Create ImportExportService over the configured book storage."""
+        from services.import_export_service import ImportExportService
+
+        storage = cast(
+            "BookRepository",
+            self._book_storage or self._storage_factory.create_book_storage(),
+        )
+        return ImportExportService(storage=storage, events=self._events())
@@ -40,6 +40,9 @@ class BookRepository(Protocol):
     def get_next_book_id(self) -> int:
         pass
 
+    def get_next_book_ids(self, count: int) -> List[int]:
+        pass
+
     def add_book(self, book: "Book") -> bool:
         pass
 
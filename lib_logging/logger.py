@@ -8,8 +8,10 @@ import json
 import logging
 import os
 import sys
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, Tuple
 
 
 class StructuredFormatter(logging.Formatter):
@@ -33,29 +35,41 @@ class StructuredFormatter(logging.Formatter):
         return json.dumps(log_obj, ensure_ascii=False)
 
 
+# Handlers are shared by every logger writing to the same file, so a process
+# opens library.log once instead of once per module.
+_SHARED_HANDLERS: Dict[Path, Tuple[logging.Handler, logging.Handler]] = {}
+_HANDLERS_LOCK = threading.Lock()
+
+
+def _shared_handlers(log_file: Path) -> Tuple[logging.Handler, logging.Handler]:
+    with _HANDLERS_LOCK:
+        handlers = _SHARED_HANDLERS.get(log_file)
+        if handlers is None:
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            formatter = StructuredFormatter()
+
+            # File handler: NDJSON for ELK / analysis (opened on first record)
+            fh = logging.FileHandler(log_file, encoding="utf-8", delay=True)
+            fh.setLevel(logging.DEBUG)
+            fh.setFormatter(formatter)
+
+            # Console handler: same format for Docker/K8s stdout (captured by log shippers)
+            ch = logging.StreamHandler(sys.stdout)
+            ch.setLevel(logging.INFO)
+            ch.setFormatter(formatter)
+
+            handlers = _SHARED_HANDLERS[log_file] = (fh, ch)
+        return handlers
+
+
 def get_logger(name: str) -> logging.Logger:
     """Return a logger with structured (NDJSON) output to file and console."""
-    log_dir = Path(os.environ.get("LOG_DIR", "logs"))
-    log_dir.mkdir(parents=True, exist_ok=True)
-    log_file = log_dir / "library.log"
-
     logger = logging.getLogger(name)
     if logger.handlers:
         return logger
 
+    log_file = Path(os.environ.get("LOG_DIR", "logs")) / "library.log"
     logger.setLevel(logging.DEBUG)
-    formatter = StructuredFormatter()
-
-    # File handler: NDJSON for ELK / analysis
-    fh = logging.FileHandler(log_file, encoding="utf-8")
-    fh.setLevel(logging.DEBUG)
-    fh.setFormatter(formatter)
-    logger.addHandler(fh)
-
-    # Console handler: same format for Docker/K8s stdout (captured by log shippers)
-    ch = logging.StreamHandler(sys.stdout)
-    ch.setLevel(logging.INFO)
-    ch.setFormatter(formatter)
-    logger.addHandler(ch)
-
+    for handler in _shared_handlers(log_file):
+        logger.addHandler(handler)
     return logger
@@ -0,0 +1,278 @@
+"""Slow-operation log for repository and service calls.
+
+Classes decorated with ``@instrument(backend)`` have their public methods
+timed. A call that takes at least ``SLOW_OPS.threshold`` seconds is kept
+with its (redacted) arguments, duration, backend and a short stack summary
+in a bounded in-memory buffer (served at ``/api/debug/slow-ops``) and
+appended to ``slow_ops.ndjson`` next to library.log.
+
+Configuration (environment):
+
+* ``SLOW_OP_THRESHOLD_MS``: threshold in milliseconds (default 500;
+  ``off`` disables recording, leaving one clock read per call)
+* ``SLOW_OP_BUFFER``: operations kept in memory (default 200)
+
+Methods returning iterators are timed until they return, not while the
+caller consumes the result; generator methods are not timed at all.
+
+Every instrumented call that returns normally also updates its backend's
+``last_success`` time, which the readiness probe reports.
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import is_dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_THRESHOLD_MS = 500.0
+DEFAULT_BUFFER_SIZE = 200
+# slow_ops.ndjson is moved to slow_ops.ndjson.1 once it grows past this
+MAX_FILE_BYTES = 5 * 1024 * 1024
+# Project frames kept in an operation's stack summary
+STACK_DEPTH = 6
+
+# Health probes run on a timer; timing them would only add noise
+UNTIMED = frozenset({"ping"})
+
+# Argument names whose values are never recorded
+SENSITIVE_NAMES = ("password", "token", "secret", "authorization", "cookie")
+_MAX_STR = 120
+_MAX_ITEMS = 5
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+
+# library_slow_operations_total, created with the first slow operation:
+# importing prometheus_client would cost every CLI command ~40 ms at start-up
+# (False if prometheus_client is not installed)
+_slow_operations_total: Any = None
+_counter_lock = threading.Lock()
+
+
+def _count_slow_op(backend: str, op: str) -> None:
+    global _slow_operations_total
+    if _slow_operations_total is None:
+        with _counter_lock:
+            if _slow_operations_total is None:
+                try:
+                    from prometheus_client import Counter
+                except ImportError:
+                    _slow_operations_total = False
+                else:
+                    _slow_operations_total = Counter(
+                        "library_slow_operations_total",
+                        "Repository and service calls slower than the slow-op threshold",
+                        ["backend", "op"],
+                    )
+    if _slow_operations_total:
+        _slow_operations_total.labels(backend=backend, op=op).inc()
+
+
+def _sensitive(name: str) -> bool:
+    name = name.lower()
+    return any(s in name for s in SENSITIVE_NAMES)
+
+
+def redact(value: Any, depth: int = 0) -> Any:
+    """A small JSON-safe summary of ``value`` without credentials.
+
+    Model objects are reduced to their type and id, long strings and
+    collections are truncated and iterators are never consumed.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, Enum):
+        return redact(value.value, depth)
+    if isinstance(value, str):
+        return value if len(value) <= _MAX_STR else value[:_MAX_STR] + "..."
+    if depth < 2 and isinstance(value, (dict, list, tuple, set, frozenset)):
+        return _redact_collection(value, depth)
+    if (is_dataclass(value) or hasattr(value, "__slots__")) and hasattr(value, "id"):
+        return f"{type(value).__name__}(id={redact(value.id, depth + 1)})"
+    return f"<{type(value).__name__}>"
+
+
+def _redact_collection(value: Any, depth: int) -> Any:
+    if isinstance(value, dict):
+        items = list(value.items())
+        summary = {
+            str(k): "***" if _sensitive(str(k)) else redact(v, depth + 1)
+            for k, v in items[:_MAX_ITEMS]
+        }
+        if len(items) > _MAX_ITEMS:
+            summary["..."] = f"{len(items)} keys"
+        return summary
+    items = list(value)
+    result = [redact(v, depth + 1) for v in items[:_MAX_ITEMS]]
+    if len(items) > _MAX_ITEMS:
+        result.append(f"... {len(items)} items")
+    return result
+
+
+def stack_summary(limit: int = STACK_DEPTH) -> List[str]:
+    """``file:line in function`` for the innermost project frames of the caller."""
+    frames = [
+        f
+        for f in traceback.extract_stack()[:-1]
+        if f.filename.startswith(_PROJECT_ROOT)
+        and f.filename != __file__
+        and "site-packages" not in f.filename
+    ]
+    return [
+        f"{os.path.relpath(f.filename, _PROJECT_ROOT)}:{f.lineno} in {f.name}"
+        for f in frames[-limit:]
+    ]
+
+
+class SlowOpRecorder:
+    """Keeps the calls slower than ``threshold`` seconds (None = recording off)."""
+
+    def __init__(
+        self,
+        threshold: Optional[float] = DEFAULT_THRESHOLD_MS / 1000,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        log_file: Optional[Path] = None,
+    ):
+        self.threshold = threshold
+        self.log_file = log_file
+        self._ops: Deque[dict] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SlowOpRecorder":
+        raw = os.environ.get("SLOW_OP_THRESHOLD_MS", "").strip().lower()
+        threshold: Optional[float] = DEFAULT_THRESHOLD_MS / 1000
+        if raw in ("off", "none", "disabled"):
+            threshold = None
+        elif raw:
+            try:
+                threshold = max(float(raw), 0.0) / 1000
+            except ValueError:
+                logger.warning(f"Ignoring invalid SLOW_OP_THRESHOLD_MS={raw!r}")
+        try:
+            buffer_size = int(os.environ.get("SLOW_OP_BUFFER", DEFAULT_BUFFER_SIZE))
+        except ValueError:
+            buffer_size = DEFAULT_BUFFER_SIZE
+        log_file = Path(os.environ.get("LOG_DIR", "logs")) / "slow_ops.ndjson"
+        return cls(threshold, max(buffer_size, 1), log_file)
+
+    def record(
+        self,
+        op: str,
+        backend: str,
+        duration: float,
+        args: dict,
+        error: Optional[str] = None,
+    ) -> dict:
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "op": op,
+            "backend": backend,
+            "duration_ms": round(duration * 1000, 1),
+            "args": {k: "***" if _sensitive(k) else redact(v) for k, v in args.items()},
+            "stack": stack_summary(),
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+        }
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self._ops.append(entry)
+            self._append_to_file(entry)
+        _count_slow_op(backend, op)
+        return entry
+
+    def _append_to_file(self, entry: dict) -> None:
+        """Append ``entry`` as one NDJSON line (caller holds the lock)."""
+        if self.log_file is None:
+            return
+        try:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                if self.log_file.stat().st_size > MAX_FILE_BYTES:
+                    os.replace(self.log_file, f"{self.log_file}.1")
+            except FileNotFoundError:
+                pass
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write the slow-op log: {e}")
+
+    def recent(self, limit: Optional[int] = None) -> List[dict]:
+        """Recorded operations, newest first."""
+        with self._lock:
+            ops = list(self._ops)
+        ops.reverse()
+        return ops[:limit] if limit is not None else ops
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ops.clear()
+
+
+SLOW_OPS = SlowOpRecorder.from_env()
+
+# backend -> time.time() of the last instrumented call that returned
+_LAST_SUCCESS: Dict[str, float] = {}
+
+
+def last_success(backend: str) -> Optional[float]:
+    """When a call to ``backend`` last returned without raising (this process)."""
+    return _LAST_SUCCESS.get(backend)
+
+
+def _timed(fn: Callable, op: str, backend: str) -> Callable:
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        error = None
+        try:
+            result = fn(*args, **kwargs)
+            _LAST_SUCCESS[backend] = time.time()
+            return result
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            threshold = SLOW_OPS.threshold
+            if threshold is not None and elapsed >= threshold:
+                try:
+                    bound = signature.bind_partial(*args, **kwargs).arguments
+                except TypeError:
+                    bound = {"args": args[1:], "kwargs": kwargs}
+                bound.pop("self", None)
+                SLOW_OPS.record(op, backend, elapsed, dict(bound), error)
+
+    return wrapper
+
+
+def instrument(backend: str) -> Callable[[type], type]:
+    """Class decorator: record slow calls of the class's public methods."""
+
+    def decorate(cls: type) -> type:
+        for name, attr in list(vars(cls).items()):
+            if name.startswith("_") or name in UNTIMED:
+                continue
+            if not inspect.isfunction(attr):
+                continue
+            if inspect.isgeneratorfunction(attr):
+                continue
+            setattr(cls, name, _timed(attr, f"{cls.__name__}.{name}", backend))
+        return cls
+
+    return decorate
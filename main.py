@@ -3,42 +3,41 @@
 import argparse
 import sys
 from pathlib import Path
+from typing import List, Optional
 
-try:
-    from cli.commands import (
-        handle_add_book,
-        handle_approve_borrow,
-        handle_delete_book,
-        handle_list_books,
-        handle_list_picked,
-        handle_pick_book,
-        handle_register_user,
-        handle_return_book,
-        handle_update_book,
-        handle_update_status,
-    )
-    from core.factory import ServiceFactory
-except Exception:
-    from dotenv import load_dotenv
-
-    # Load environment variables from .env file (fallback when necessary)
-    env_file = Path(__file__).parent / ".env"
-    if env_file.exists():
-        load_dotenv(env_file)
-
-    from cli.commands import (
-        handle_add_book,
-        handle_approve_borrow,
-        handle_delete_book,
-        handle_list_books,
-        handle_list_picked,
-        handle_pick_book,
-        handle_register_user,
-        handle_return_book,
-        handle_update_book,
-        handle_update_status,
+PROFILE_FLAG = "--profile-startup"
+
+
+def _import_commands():
+    """Import the CLI handlers on first use.
+
+    Parsing arguments and printing help never pay for the handlers, the
+    services behind them or the storage drivers.
+    """
+    try:
+        from cli import commands
+    except Exception:
+        from dotenv import load_dotenv
+
+        # Load environment variables from .env file (fallback when necessary)
+        env_file = Path(__file__).parent / ".env"
+        if env_file.exists():
+            load_dotenv(env_file)
+
+        from cli import commands
+    return commands
+
+
+def _add_id_or_ids(subparser: argparse.ArgumentParser) -> None:
+    """Accept either a single --id or a comma-separated --ids batch."""
+    id_group = subparser.add_mutually_exclusive_group(required=True)
+    id_group.add_argument("--id", dest="book_id", type=str, help="Book ID (integer)")
+    id_group.add_argument(
+        "--ids",
+        dest="book_ids",
+        type=str,
+        help="Comma-separated book IDs for a batch operation (e.g. 1001,1002)",
     )
-    from core.factory import ServiceFactory
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -48,6 +47,12 @@ def create_parser() -> argparse.ArgumentParser:
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
 
+    parser.add_argument(
+        PROFILE_FLAG,
+        action="store_true",
+        help="Print an import-time breakdown of this invocation to stderr",
+    )
+
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     # --- add-book ---
@@ -69,9 +74,7 @@ def create_parser() -> argparse.ArgumentParser:
     delete_book_parser = subparsers.add_parser(
         "delete-book", help="Delete a book (librarian only)"
     )
-    delete_book_parser.add_argument(
-        "--id", required=True, dest="book_id", type=str, help="Book ID (integer)"
-    )
+    _add_id_or_ids(delete_book_parser)
     delete_book_parser.add_argument(
         "--librarian", action="store_true", help="Login as librarian"
     )
@@ -141,9 +144,7 @@ def create_parser() -> argparse.ArgumentParser:
         "approve-borrow",
         help="Approve a picked book and change status to Borrowed (librarian only)",
     )
-    approve_borrow_parser.add_argument(
-        "--id", required=True, dest="book_id", type=str, help="Book ID (integer)"
-    )
+    _add_id_or_ids(approve_borrow_parser)
     approve_borrow_parser.add_argument(
         "--librarian", action="store_true", help="Login as librarian"
     )
@@ -153,9 +154,7 @@ def create_parser() -> argparse.ArgumentParser:
         "return-book",
         help="Return a borrowed book to Available status (librarian only)",
     )
-    return_book_parser.add_argument(
-        "--id", required=True, dest="book_id", type=str, help="Book ID (integer)"
-    )
+    _add_id_or_ids(return_book_parser)
     return_book_parser.add_argument(
         "--librarian", action="store_true", help="Login as librarian"
     )
@@ -174,13 +173,76 @@ def create_parser() -> argparse.ArgumentParser:
         help="User role",
     )
 
+    # --- stats ---
+    stats_parser = subparsers.add_parser(
+        "stats", help="Show catalog statistics (librarian only)"
+    )
+    stats_parser.add_argument(
+        "--librarian", action="store_true", help="Login as librarian"
+    )
+    stats_parser.add_argument(
+        "--top", type=int, default=10, help="Number of authors/users to list"
+    )
+
+    # --- import-books / export-books ---
+    import_parser = subparsers.add_parser(
+        "import-books", help="Bulk import books from CSV/NDJSON (librarian only)"
+    )
+    import_parser.add_argument(
+        "--file", required=True, dest="file_path", type=str, help="Input file"
+    )
+    import_parser.add_argument(
+        "--format", dest="fmt", choices=["csv", "ndjson"], help="Default: by extension"
+    )
+    import_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Rows per storage write (default depends on DATABASE_TYPE)",
+    )
+    import_parser.add_argument(
+        "--librarian", action="store_true", help="Login as librarian"
+    )
+
+    export_parser = subparsers.add_parser(
+        "export-books", help="Export all books to CSV/NDJSON (librarian only)"
+    )
+    export_parser.add_argument(
+        "--file", required=True, dest="file_path", type=str, help="Output file"
+    )
+    export_parser.add_argument(
+        "--format", dest="fmt", choices=["csv", "ndjson"], help="Default: by extension"
+    )
+    export_parser.add_argument(
+        "--librarian", action="store_true", help="Login as librarian"
+    )
+
+    # --- serve-cli ---
+    serve_parser = subparsers.add_parser(
+        "serve-cli",
+        help="Run a CLI daemon that keeps services warm; other commands are "
+        "forwarded to it when it is running",
+    )
+    serve_parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Unix socket path (default: $LIBRARY_CLI_SOCKET or a per-user temp file)",
+    )
+
     return parser
 
 
-def execute_command(args, book_service, user_service):
+def execute_command(args, book_service, user_service, stats_service=None):
     """Route to the appropriate CLI handler using a mapping."""
+    commands = _import_commands()
+    if getattr(args, "book_ids", None):
+        return commands.handle_book_batch(
+            args.command, args.book_ids, args.librarian, None, book_service
+        )
+
     command_map = {
-        "add-book": lambda: handle_add_book(
+        "add-book": lambda: commands.handle_add_book(
             args.book_id,
             args.title,
             args.author,
@@ -188,31 +250,42 @@ def execute_command(args, book_service, user_service):
             None,
             book_service,
         ),
-        "delete-book": lambda: handle_delete_book(
+        "delete-book": lambda: commands.handle_delete_book(
             args.book_id, args.librarian, None, book_service
         ),
-        "update-book": lambda: handle_update_book(
+        "update-book": lambda: commands.handle_update_book(
             args.book_id, args.librarian, None, args.title, args.author, book_service
         ),
-        "update-status": lambda: handle_update_status(
+        "update-status": lambda: commands.handle_update_status(
             args.book_id, args.status, args.librarian, None, book_service
         ),
-        "list-books": lambda: handle_list_books(
+        "list-books": lambda: commands.handle_list_books(
             args.librarian, args.username, book_service
         ),
-        "pick-book": lambda: handle_pick_book(
+        "pick-book": lambda: commands.handle_pick_book(
             args.book_id, args.username, book_service
         ),
-        "list-picked": lambda: handle_list_picked(args.librarian, None, book_service),
-        "approve-borrow": lambda: handle_approve_borrow(
+        "list-picked": lambda: commands.handle_list_picked(
+            args.librarian, None, book_service
+        ),
+        "approve-borrow": lambda: commands.handle_approve_borrow(
             args.book_id, args.librarian, None, book_service
         ),
-        "return-book": lambda: handle_return_book(
+        "return-book": lambda: commands.handle_return_book(
             args.book_id, args.librarian, None, book_service
         ),
-        "register-user": lambda: handle_register_user(
+        "register-user": lambda: commands.handle_register_user(
             args.username, args.password, args.role, user_service
         ),
+        "stats": lambda: commands.handle_stats(
+            args.librarian, None, args.top, stats_service
+        ),
+        "import-books": lambda: commands.handle_import_books(
+            args.file_path, args.fmt, args.batch_size, args.librarian
+        ),
+        "export-books": lambda: commands.handle_export_books(
+            args.file_path, args.fmt, args.librarian
+        ),
     }
 
     func = command_map.get(args.command)
@@ -223,19 +296,65 @@ def execute_command(args, book_service, user_service):
     return func()
 
 
-def main():
-    """Execute the CLI main entry point."""
-    parser = create_parser()
-    args = parser.parse_args()
+def profile_startup(argv: List[str], top: int = 15) -> int:
+    """Run ``argv`` in a fresh interpreter with ``-X importtime`` and
+    print the total start-up time and the slowest imports to stderr."""
+    import subprocess
+    import time
+
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(Path(__file__).resolve()), *argv],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    rows = []  # (cumulative_us, self_us, module, depth)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            print(line, file=sys.stderr)
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # column header
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(fields[1]), int(fields[0]), name.strip(), depth))
+
+    imports_ms = sum(r[0] for r in rows if r[3] == 0) / 1000
+    print(
+        f"STARTUP: {wall_ms:.1f} ms total, {imports_ms:.1f} ms importing "
+        f"{len(rows)} modules",
+        file=sys.stderr,
+    )
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module", file=sys.stderr)
+    for cumulative, self_us, name, _ in sorted(rows, reverse=True)[:top]:
+        print(
+            f"{cumulative / 1000:14.1f} {self_us / 1000:9.1f}  {name}", file=sys.stderr
+        )
+    return proc.returncode
 
+
+def run_in_process(argv: List[str]) -> int:
+    """Parse ``argv`` and execute it in this process (used by the CLI daemon)."""
+    args = create_parser().parse_args(argv)
+    if args.command == "serve-cli":
+        print("ERROR: serve-cli cannot be run through the CLI daemon")
+        return 1
     if not args.command:
-        parser.print_help()
+        create_parser().print_help()
         return 1
+    return run_command(args)
 
+
+def run_command(args) -> int:
+    """Create the services ``args.command`` needs and execute it."""
     # Only create services that are actually needed for the command
     # This reduces startup time and MongoDB connection errors for simple commands
     book_service = None
     user_service = None
+    stats_service = None
 
     # Commands that require book service
     book_commands = {
@@ -251,14 +370,19 @@ def main():
     }
     # Commands that require user service
     user_commands = {"register-user"}
+
+    from core.factory import ServiceFactory
+
     service_factory = ServiceFactory()
     if args.command in book_commands:
         book_service = service_factory.create_book_service()
     if args.command in user_commands:
         user_service = service_factory.create_user_service()
+    if args.command == "stats":
+        stats_service = service_factory.create_stats_service()
 
     try:
-        return execute_command(args, book_service, user_service)
+        return execute_command(args, book_service, user_service, stats_service)
     except KeyboardInterrupt:
         print("\nOperation cancelled by user")
         return 1
@@ -267,5 +391,44 @@ def main():
         return 1
 
 
+def serve_cli(socket_path: Optional[str]) -> int:
+    """Warm up the storage backends and serve commands until interrupted."""
+    from cli.daemon import serve
+    from core.factory import ServiceFactory
+
+    # Open storage connections once, before the first command arrives
+    factory = ServiceFactory()
+    try:
+        factory.create_book_service()
+        factory.create_user_service()
+    except Exception as e:
+        print(f"WARNING: Could not warm up storage: {e}")
+    return serve(run_in_process, Path(socket_path) if socket_path else None)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Execute the CLI main entry point."""
+    argv = sys.argv[1:] if argv is None else argv
+    if PROFILE_FLAG in argv:
+        return profile_startup([a for a in argv if a != PROFILE_FLAG])
+
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    if not args.command:
+        parser.print_help()
+        return 1
+    if args.command == "serve-cli":
+        return serve_cli(args.socket)
+
+    # Forward to a running CLI daemon; run in-process when there is none
+    from cli.daemon import call
+
+    exit_code = call(argv)
+    if exit_code is not None:
+        return exit_code
+    return run_command(args)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -1,7 +1,7 @@
 """Models package for the Library Management System."""
 
-from .book import Book, BookStatus
-from .role import Role
+from .book import Book, BookStatus, parse_status
+from .role import Role, parse_role
 from .user import User
 
-__all__ = ["Role", "Book", "BookStatus", "User"]
+__all__ = ["Role", "Book", "BookStatus", "User", "parse_status", "parse_role"]
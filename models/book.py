@@ -16,9 +16,29 @@ class BookStatus(Enum):
         return self.value
 
 
-@dataclass
+# Cached value -> member table used by the decoder. ``BookStatus(value)`` goes
+# through ``EnumMeta.__call__`` on every record; a dict lookup does not.
+# Case variants cover legacy documents written before statuses were title-cased.
+_STATUS_BY_VALUE: dict[str, BookStatus] = {}
+for _status in BookStatus:
+    for _key in (_status.value, _status.value.lower(), _status.value.upper()):
+        _STATUS_BY_VALUE[_key] = _status
+del _status, _key
+
+
+def parse_status(value: object) -> BookStatus:
+    """Map a stored status value to ``BookStatus`` (unknown values -> AVAILABLE)."""
+    if isinstance(value, BookStatus):
+        return value
+    return _STATUS_BY_VALUE.get(value, BookStatus.AVAILABLE)  # type: ignore[arg-type]
+
+
+@dataclass(slots=True)
 class Book:
-    """Represents a book in the library system."""
+    """Represents a book in the library system.
+
+    Slotted so large in-memory catalogs don't pay for a per-instance ``__dict__``.
+    """
 
     id: int
     title: str
@@ -26,6 +46,8 @@ class Book:
     status: BookStatus
     picked_by: Optional[str] = None  # Username who picked the book
     isbn: Optional[str] = None  # Optional ISBN (backwards-compatible)
+    # Optimistic-concurrency version; storages bump it on every successful update
+    version: int = 0
 
     @classmethod
     def create(
@@ -65,7 +87,10 @@ class Book:
         )
 
     def to_dict(self) -> dict:
-        """Convert book to dictionary for JSON serialization."""
+        """Convert book to dictionary for JSON serialization.
+
+        This is the single codec shared by the JSON and MongoDB backends.
+        """
         result = {
             "id": self.id,
             "title": self.title,
@@ -76,32 +101,43 @@ class Book:
             result["picked_by"] = self.picked_by
         if self.isbn:
             result["isbn"] = self.isbn
+        if self.version:
+            result["version"] = self.version
         return result
 
     @classmethod
     def from_dict(cls, data: dict) -> "Book":
-        """Create book from dictionary (JSON deserialization)."""
-        # ID should already be migrated to int by storage layer
-        book_id = int(data["id"])
-
-        # Handle status
-        status_str = data.get("status", "Available")
-        try:
-            status = BookStatus(status_str)
-        except ValueError:
-            # Map old statuses to new ones
-            if status_str == "Available":
-                status = BookStatus.AVAILABLE
-            elif status_str == "Borrowed":
-                status = BookStatus.BORROWED
-            else:
-                status = BookStatus.AVAILABLE
+        """Create book from dictionary (JSON or MongoDB document).
 
+        ``int()`` accepts both ints and digit strings, and legacy/unknown
+        status strings are resolved through the cached lookup table.
+        """
+        get = data.get
         return cls(
-            id=book_id,
-            title=data["title"],
-            author=data["author"],
-            status=status,
-            picked_by=data.get("picked_by"),
-            isbn=data.get("isbn"),
+            int(data["id"]),
+            data["title"],
+            data["author"],
+            parse_status(get("status", "Available")),
+            get("picked_by"),
+            get("isbn"),
+            get("version") or 0,
+        )
+
+    @classmethod
+    def from_record(cls, data: dict) -> "Book":
+        """Create book from a stored record already in the current schema.
+
+        Storages use this instead of ``from_dict`` once their data has been
+        migrated (see ``storage.migrations``): ids are ints and statuses
+        canonical, so nothing is coerced.
+        """
+        get = data.get
+        return cls(
+            data["id"],
+            data["title"],
+            data["author"],
+            _STATUS_BY_VALUE[data["status"]],
+            get("picked_by"),
+            get("isbn"),
+            get("version", 0),
         )
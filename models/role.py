@@ -11,3 +11,26 @@ class Role(Enum):
 
     def __str__(self):
         return self.value
+
+
+# Cached value -> member table (see ``models.book``). Upper-case variants accept
+# documents seeded with ``LIBRARIAN``/``USER`` role names.
+_ROLE_BY_VALUE: dict[str, Role] = {}
+for _role in Role:
+    for _key in (_role.value, _role.value.upper(), _role.name):
+        _ROLE_BY_VALUE[_key] = _role
+del _role, _key
+
+
+def parse_role(value: object) -> Role:
+    """Map a stored role value to ``Role``.
+
+    Raises:
+        ValueError: If the value is not a known role
+    """
+    if isinstance(value, Role):
+        return value
+    try:
+        return _ROLE_BY_VALUE[value]  # type: ignore[index]
+    except (KeyError, TypeError):
+        raise ValueError(f"{value!r} is not a valid Role") from None
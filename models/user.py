@@ -2,12 +2,12 @@
 
 from dataclasses import dataclass, field
 
-from .role import Role
+from .role import Role, parse_role
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
-    """Represents a user in the library system."""
+    """Represents a user in the library system (slotted, like ``Book``)."""
 
     id: int
     username: str
@@ -34,11 +34,12 @@ class User:
 
     @classmethod
     def from_dict(cls, data: dict) -> "User":
-        """Create user from dictionary (JSON deserialization)."""
+        """Create user from dictionary (JSON or MongoDB document)."""
+        get = data.get
         return cls(
-            id=int(data["id"]),
-            username=data["username"],
-            password=data.get("password", ""),
-            role=Role(data["role"]),
-            borrowed_book_ids=data.get("borrowed_book_ids", []),
+            int(data["id"]),
+            data["username"],
+            get("password", ""),
+            parse_role(data["role"]),
+            get("borrowed_book_ids") or [],
         )
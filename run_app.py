@@ -4,10 +4,13 @@
 Run the new user interface
 
 يستخدم الخادم الموسّع الذي يدعم /app
-Usage: python run_app.py [port]
+Usage: python run_app.py [port] [--async] [--workers N|auto]
        PORT=8000 python run_app.py
+       SERVER_MODE=async python run_app.py   (asyncio server, web/async_server.py)
+       WEB_WORKERS=auto python run_app.py    (pre-fork workers, web/prefork.py)
 """
 
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -23,6 +26,34 @@ if env_file.exists():
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the library web interface")
+    parser.add_argument("port", nargs="?", type=int, default=8000)
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        default=os.environ.get("SERVER_MODE", "").lower() == "async",
+        help="use the asyncio server",
+    )
+    parser.add_argument(
+        "--workers",
+        default=os.environ.get("WEB_WORKERS"),
+        help="worker processes sharing the port ('auto' = one per CPU)",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from web.prefork import parse_workers, prepare_metrics_dir
+
+    ARGS = parse_args()
+    WORKERS = parse_workers(ARGS.workers)
+    if WORKERS > 1:
+        # Must happen before prometheus_client is imported by web.server
+        prepare_metrics_dir()
+
 # Attempt to import the web app entrypoint and provide an actionable
 # diagnostic message if it fails — this helps users who run the wrong
 # Python interpreter or have a conflicting/global `web` package.
@@ -64,5 +95,14 @@ except ModuleNotFoundError:  # provide clear, actionable diagnostics
     raise
 
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", sys.argv[1] if len(sys.argv) > 1 else 8000))
-    run_server(port)
+    port = int(os.environ.get("PORT", ARGS.port))
+    if WORKERS > 1:
+        from web.prefork import run_prefork
+
+        sys.exit(run_prefork(port, WORKERS, use_async=ARGS.use_async))
+    elif ARGS.use_async:
+        from web.async_server import run_server as run_async_server
+
+        run_async_server(port)
+    else:
+        run_server(port)
@@ -42,7 +42,7 @@ def print_warning(text):
     print(f"{Colors.YELLOW}⚠ {text}{Colors.RESET}")
 
 
-def make_request(url, method="GET", data=None, headers=None):
+def make_request(url, method="GET", data=None, headers=None, timeout=10):
     """Make HTTP request and return response."""
     if headers is None:
         headers = {}
@@ -54,7 +54,7 @@ def make_request(url, method="GET", data=None, headers=None):
                 data = json.dumps(data).encode("utf-8")
 
         req = Request(url, data=data, headers=headers, method=method)
-        with urlopen(req, timeout=10) as response:
+        with urlopen(req, timeout=timeout) as response:
             response_data = response.read().decode("utf-8")
             return {
                 "status": response.status,
@@ -64,7 +64,8 @@ def make_request(url, method="GET", data=None, headers=None):
     except HTTPError as e:
         error_data = e.read().decode("utf-8")
         return {"status": e.code, "data": None, "error": error_data}
-    except URLError as e:
+    except (URLError, OSError) as e:
+        # Refused, reset or timed out mid-response
         return {"status": None, "data": None, "error": str(e)}
     except json.JSONDecodeError as e:
         return {"status": 500, "data": None, "error": f"Invalid JSON: {str(e)}"}
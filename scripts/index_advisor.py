@@ -0,0 +1,60 @@
+"""Report how MongoDB answers the repositories' queries (see storage/mongodb/indexes.py).
+
+Each known query shape is run through ``explain()``; shapes answered by a
+collection scan (COLLSCAN) or an in-memory sort (SORT) are flagged, and
+registry indexes missing from the database are listed.
+
+Usage: python scripts/index_advisor.py [--strict]
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+
+def main(argv=None) -> int:
+    # Add project root to path so imports work when run as a script
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    load_dotenv()
+
+    from config.database import MongoDBConnection
+    from storage.mongodb.indexes import advise, missing_indexes
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="exit with status 1 if any query scans or sorts in memory",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        db = MongoDBConnection.get_database()
+        report = advise(db)
+        missing = missing_indexes(db)
+    except Exception as e:
+        print("Index advice failed:", e)
+        return 1
+
+    for advice in report:
+        flags = []
+        if advice.collection_scan:
+            flags.append("COLLECTION SCAN")
+        if advice.in_memory_sort:
+            flags.append("IN-MEMORY SORT")
+        verdict = ", ".join(flags) or "ok"
+        used = ", ".join(advice.indexes) or "no index"
+        print(f"{advice.query.collection}: {advice.query.name:<28} {verdict} ({used})")
+
+    for collection, spec in missing:
+        print(f"Missing index {collection}.{spec.name} ({spec.purpose})")
+
+    flagged = [a for a in report if not a.ok]
+    print(f"{len(flagged)} of {len(report)} queries need attention")
+    return 1 if args.strict and flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,6 +27,15 @@ db.books.createIndex({ "id": 1 }, { unique: true });
 db.books.createIndex({ "title": 1 });
 db.books.createIndex({ "author": 1 });
 db.books.createIndex({ "status": 1 });
+// Keep in step with INDEXES in storage/mongodb/indexes.py
+db.books.createIndex(
+    { "status": 1, "id": 1 },
+    { name: "status_1_id_1_partial", partialFilterExpression: { "status": { $gt: "Available" } } }
+);
+db.books.createIndex(
+    { "picked_by": 1, "id": 1 },
+    { name: "picked_by_1_id_1_partial", partialFilterExpression: { "picked_by": { $exists: true } } }
+);
 
 db.users.createIndex({ "id": 1 }, { unique: true });
 db.users.createIndex({ "username": 1 }, { unique: true });
@@ -14,6 +14,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # local imports (project path must be on sys.path) — keep as explicit imports but allow E402
 from config.database import MongoDBConfig, MongoDBConnection  # noqa: E402
 from lib_logging.logger import get_logger  # noqa: E402
+from storage.mongodb.indexes import INDEXES, ensure_indexes  # noqa: E402
 
 logger = get_logger(__name__)
 
@@ -66,17 +67,11 @@ def create_indexes() -> None:
             db.create_collection("users")
             logger.info("Created 'users' collection")
 
-        # Create indexes
-        db.books.create_index([("id", 1)], unique=True)
-        db.books.create_index([("title", 1)])
-        db.books.create_index([("author", 1)])
-        db.books.create_index([("status", 1)])
-        logger.info("Created indexes on 'books' collection")
-
-        db.users.create_index([("id", 1)], unique=True)
-        db.users.create_index([("username", 1)], unique=True)
-        db.users.create_index([("role", 1)])
-        logger.info("Created indexes on 'users' collection")
+        # Create the registry's indexes, waiting for each build
+        for name, specs in INDEXES.items():
+            if ensure_indexes(db[name], specs):
+                raise RuntimeError(f"Some '{name}' indexes could not be created")
+            logger.info(f"Created indexes on '{name}' collection")
 
     except Exception as e:
         logger.error(f"Error creating indexes: {e}")
@@ -3,7 +3,6 @@
 Usage: python scripts/migrate_json_to_mongo.py
 """
 
-import json
 import os
 import sys
 from pathlib import Path
@@ -20,7 +19,8 @@ def main():
 
     from config.database import MongoDBConfig
     from lib_logging.logger import get_logger
-    from models.book import Book
+    from services.import_export_service import ImportExportService
+    from storage.book_storage import BookStorage
     from storage.mongodb.book_storage import MongoDBBookStorage
 
     logger = get_logger(__name__)
@@ -53,36 +53,17 @@ def main():
             print(f"Sample documents (up to 5): {samples}")
             return
 
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        if not isinstance(data, list):
-            print("JSON file format invalid: expected a list of book objects")
-            return
-
-        added = 0
-        skipped = 0
-        for item in data:
-            try:
-                book = Book.from_dict(item)
-            except Exception as e:
-                logger.warning(f"Skipping invalid book entry: {e} | item={item}")
-                skipped += 1
-                continue
-
-            # Avoid duplicates by id
-            if storage.get_book_by_id(book.id) is not None:
-                logger.info(f"Skipping existing book ID {book.id}")
-                skipped += 1
-                continue
-
-            if storage.add_book(book):
-                added += 1
-            else:
-                logger.warning(f"Failed to add book ID {book.id}")
-                skipped += 1
-
-        print(f"Migration complete. Added: {added}, Skipped: {skipped}")
+        # Stream records through the bulk import pipeline: rows are validated
+        # and inserted in batches with one insert_many each (duplicates by id
+        # are skipped by the unique index) instead of one round trip per book.
+        json_storage = BookStorage(data_dir=DATA_FILE.parent)
+        rows = enumerate(json_storage.iter_book_records(), 1)
+        report = ImportExportService(storage).import_rows(rows)
+
+        for error in report.errors:
+            logger.warning(f"Skipping invalid book entry: {error}")
+        skipped = report.duplicates + report.rejected
+        print(f"Migration complete. Added: {report.added}, Skipped: {skipped}")
         print(f"Total books in MongoDB now: {storage.collection.count_documents({})}")
 
     except Exception as e:
@@ -0,0 +1,83 @@
+"""Migrate stored books to the current schema (see storage/migrations.py).
+
+Works on the backend selected by DATABASE_TYPE (json or mongodb) and is
+safe to run while the application is serving: an interrupted run resumes
+where it stopped. Restart running servers afterwards so they switch to the
+fast read path.
+
+Usage: python scripts/migrate_schema.py [--status] [--batch-size N]
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+
+def main(argv=None) -> int:
+    # Add project root to path so imports work when run as a script
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    load_dotenv()
+
+    from storage.migrations import (
+        CURRENT_SCHEMA_VERSION,
+        DEFAULT_BATCH_SIZE,
+        MIGRATIONS,
+        migrate_books,
+    )
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--status", action="store_true", help="show the schema version and exit"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="MongoDB documents per batch",
+    )
+    args = parser.parse_args(argv)
+
+    if os.getenv("DATABASE_TYPE", "json").lower() == "mongodb":
+        from storage.mongodb.book_storage import MongoDBBookStorage
+
+        storage = MongoDBBookStorage()
+    else:
+        from storage.book_storage import BookStorage
+
+        storage = BookStorage()
+
+    version = storage.schema_version
+    print(f"Books schema: version {version} of {CURRENT_SCHEMA_VERSION}")
+    for migration in MIGRATIONS:
+        if migration.version > version:
+            print(f"  pending {migration.version}: {migration.description}")
+    if args.status or version >= CURRENT_SCHEMA_VERSION:
+        return 0
+
+    def progress(report):
+        print(f"  scanned {report.scanned}, updated {report.updated}")
+
+    try:
+        report = migrate_books(storage, args.batch_size, progress)
+    except Exception as e:
+        print("Migration failed:", e)
+        return 1
+    if report.resumed:
+        print("Resumed an interrupted migration")
+    if not report.completed:
+        print(
+            f"{report.conflicts} books could not be migrated (see the log); "
+            "fix them and run the migration again"
+        )
+        return 1
+    print(
+        f"Migrated to schema {report.to_version}: "
+        f"{report.updated} of {report.scanned} records updated"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,26 @@
-"""Services package for the Library Management System."""
+"""Services package for the Library Management System.
 
-from .book_service import BookService
-from .borrow_service import BorrowService
-from .user_service import UserService
+Exports are resolved lazily (PEP 562) so importing one service module does
+not import every other service and its dependencies.
+"""
 
-__all__ = ["BookService", "UserService", "BorrowService"]
+from importlib import import_module
+
+_EXPORTS = {
+    "BookService": ".book_service",
+    "UserService": ".user_service",
+    "BorrowService": ".borrow_service",
+    "StatsService": ".stats_service",
+    "CatalogSnapshot": ".stats_service",
+    "ImportExportService": ".import_export_service",
+    "ImportReport": ".import_export_service",
+    "RetryPolicy": ".retry",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
@@ -1,28 +1,143 @@
 """Book service with business logic for book operations."""
 
-from typing import List, Optional, Tuple
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from lib_logging.logger import get_logger
+from lib_logging.slow_ops import instrument
 from models.book import Book, BookStatus
-from storage.interfaces import BookRepository
+from storage.errors import VersionConflictError
+from storage.interfaces import BookRepository, EventLog
+from storage.migrations import schema_is_current
 from validation.book_validator import (
     validate_book_for_creation,
     validate_book_for_update,
 )
 
+from .events import book_event, publish
+from .retry import DEFAULT_RETRY_POLICY, RetryPolicy
+
 logger = get_logger(__name__)
 
 
+@dataclass
+class BatchItemResult:
+    """Outcome of one book in a batch operation."""
+
+    book_id: int
+    success: bool
+    error: str = ""
+    book: Optional[Book] = None
+
+    def to_dict(self) -> dict:
+        """Convert result to dictionary for JSON responses."""
+        result = {"id": self.book_id, "success": self.success}
+        if self.error:
+            result["error"] = self.error
+        if self.book is not None:
+            result["book"] = self.book.to_dict()
+        return result
+
+
+def _approve_transition(book: Book) -> str:
+    """Move a Picked book to Borrowed. Returns an error message or ""."""
+    if book.status != BookStatus.PICKED:
+        return f"Book '{book.title}' is not in Picked status (current: {book.status.value})"
+    # Keep picked_by for reference
+    book.status = BookStatus.BORROWED
+    return ""
+
+
+def _return_transition(book: Book) -> str:
+    """Move a Borrowed book back to Available. Returns an error message or ""."""
+    if book.status != BookStatus.BORROWED:
+        return f"Book '{book.title}' is not currently borrowed (status: {book.status.value})"
+    book.status = BookStatus.AVAILABLE
+    book.picked_by = None
+    return ""
+
+
+def _delete_check(book: Book) -> str:
+    """Check a book may be deleted. Returns an error message or ""."""
+    if book.status == BookStatus.BORROWED:
+        return f"Cannot delete book '{book.title}' - it is currently borrowed"
+    return ""
+
+
+@instrument("service")
 class BookService:
     """Service for book-related operations.
 
     This service depends on a storage repository (injected as `BookRepository`).
     Dependency Injection is required and no default repository is constructed here.
+
+    Updates are optimistic: when the storage reports a version conflict the
+    book is re-read and the change re-validated and re-applied, following
+    ``retry_policy``.
+
+    With an ``events`` log, every committed change is also recorded there
+    for the web change feed (see ``services.events``).
     """
 
-    def __init__(self, storage: BookRepository):
+    def __init__(
+        self,
+        storage: BookRepository,
+        retry_policy: Optional[RetryPolicy] = None,
+        events: Optional[EventLog] = None,
+    ):
         """Initialize BookService with an explicit repository (Dependency Injection)."""
         self.storage: BookRepository = storage
+        self.retry_policy: RetryPolicy = retry_policy or DEFAULT_RETRY_POLICY
+        self.events: Optional[EventLog] = events
+
+    def _update_with_retry(
+        self,
+        book_id: int,
+        change: Callable[[Book], str],
+        failure_msg: str = "Failed to update book in storage",
+    ) -> Tuple[Optional[Book], str]:
+        """
+        Read a book, apply ``change`` and write it back, retrying on conflicts.
+
+        ``change`` validates and mutates the freshly read book, returning an
+        error message (or "" to proceed). It runs again after every conflict,
+        so a retry never overwrites a newer state it has not checked.
+
+        Returns:
+            Tuple of (book, error_message)
+        """
+        attempt = 1
+        while True:
+            book = self.storage.get_book_by_id(book_id)
+            if not book:
+                error_msg = f"Book with ID '{book_id}' not found"
+                logger.warning(error_msg)
+                return None, error_msg
+
+            error_msg = change(book)
+            if error_msg:
+                logger.warning(error_msg)
+                return None, error_msg
+
+            try:
+                if self.storage.update_book(book):
+                    publish(self.events, [book_event("updated", book_id, book)])
+                    return book, ""
+                logger.error(failure_msg)
+                return None, failure_msg
+            except VersionConflictError:
+                if attempt >= self.retry_policy.max_attempts:
+                    error_msg = (
+                        f"Book with ID '{book_id}' was modified concurrently, "
+                        f"gave up after {attempt} attempts"
+                    )
+                    logger.error(error_msg)
+                    return None, error_msg
+                logger.info(
+                    f"Version conflict on book {book_id} (attempt {attempt}), retrying"
+                )
+                self.retry_policy.sleep(attempt)
+                attempt += 1
 
     def add_book(
         self, book_id: int, title: str, author: str
@@ -64,6 +179,7 @@ class BookService:
         # Save to storage
         if self.storage.add_book(book):
             logger.info(f"Added book: '{book.title}' by {book.author} (ID: {book.id})")
+            publish(self.events, [book_event("created", book.id, book)])
             return book, ""
         else:
             error_msg = "Failed to save book to storage"
@@ -90,14 +206,15 @@ class BookService:
             return False, error_msg
 
         # Check if book is borrowed
-        if book.status == BookStatus.BORROWED:
-            error_msg = f"Cannot delete book '{book.title}' - it is currently borrowed"
+        error_msg = _delete_check(book)
+        if error_msg:
             logger.warning(error_msg)
             return False, error_msg
 
         # Delete book
         if self.storage.remove_book(book_id):
             logger.info(f"Deleted book: '{book.title}' (ID: {book_id})")
+            publish(self.events, [book_event("deleted", book_id)])
             return True, ""
         else:
             error_msg = "Failed to delete book from storage"
@@ -120,13 +237,6 @@ class BookService:
             If successful: (Updated Book object, "")
             If failed: (None, error_message)
         """
-        # Check if book exists
-        book = self.storage.get_book_by_id(book_id)
-        if not book:
-            error_msg = f"Book with ID '{book_id}' not found"
-            logger.warning(error_msg)
-            return None, error_msg
-
         # Trim inputs
         if title is not None:
             title = title.strip()
@@ -134,40 +244,25 @@ class BookService:
         if author is not None:
             author = author.strip()
 
-        if title is None and author is None:
-            error_msg = "No fields to update"
-            logger.warning(error_msg)
-            return None, error_msg
+        def change(book: Book) -> str:
+            if title is None and author is None:
+                return "No fields to update"
 
-        # Validate fields (title/author only); ID is provided as an integer and assumed valid
-        is_valid, error_msg = validate_book_for_update(title=title, author=author)
-        if not is_valid:
-            logger.warning(f"Book update validation failed: {error_msg}")
-            return None, error_msg
+            # Validate fields (title/author only); ID is provided as an integer and assumed valid
+            is_valid, error_msg = validate_book_for_update(title=title, author=author)
+            if not is_valid:
+                return error_msg
 
-        # Update fields
-        updated = False
-        if title is not None:
-            book.title = title
-            updated = True
-
-        if author is not None:
-            book.author = author
-            updated = True
-
-        if not updated:
-            error_msg = "No fields to update"
-            logger.warning(error_msg)
-            return None, error_msg
+            if title is not None:
+                book.title = title
+            if author is not None:
+                book.author = author
+            return ""
 
-        # Save to storage
-        if self.storage.update_book(book):
+        book, error_msg = self._update_with_retry(book_id, change)
+        if book:
             logger.info(f"Updated book info: '{book.title}' (ID: {book_id})")
-            return book, ""
-        else:
-            error_msg = "Failed to update book in storage"
-            logger.error(error_msg)
-            return None, error_msg
+        return book, error_msg
 
     def update_book_status(
         self, book_id: int, status: BookStatus
@@ -184,30 +279,22 @@ class BookService:
             If successful: (Updated Book object, "")
             If failed: (None, error_message)
         """
-        # Check if book exists
-        book = self.storage.get_book_by_id(book_id)
-        if not book:
-            error_msg = f"Book with ID '{book_id}' not found"
-            logger.warning(error_msg)
-            return None, error_msg
 
-        # Update status
-        book.status = status
+        def change(book: Book) -> str:
+            book.status = status
+            # Clear picked_by if status is not Picked
+            if status != BookStatus.PICKED:
+                book.picked_by = None
+            return ""
 
-        # Clear picked_by if status is not Picked
-        if status != BookStatus.PICKED:
-            book.picked_by = None
-
-        # Save to storage
-        if self.storage.update_book(book):
+        book, error_msg = self._update_with_retry(
+            book_id, change, "Failed to update book status in storage"
+        )
+        if book:
             logger.info(
                 f"Updated book status: '{book.title}' (ID: {book_id}) to {status.value}"
             )
-            return book, ""
-        else:
-            error_msg = "Failed to update book status in storage"
-            logger.error(error_msg)
-            return None, error_msg
+        return book, error_msg
 
     def pick_book(self, book_id: int, username: str) -> Tuple[Optional[Book], str]:
         """
@@ -222,33 +309,20 @@ class BookService:
             If successful: (Book object, "")
             If failed: (None, error_message)
         """
-        # Check if book exists
-        book = self.storage.get_book_by_id(book_id)
-        if not book:
-            error_msg = f"Book with ID '{book_id}' not found"
-            logger.warning(error_msg)
-            return None, error_msg
-
-        # Check if book is available
-        if book.status != BookStatus.AVAILABLE:
-            error_msg = (
-                f"Book '{book.title}' is not available (status: {book.status.value})"
-            )
-            logger.warning(error_msg)
-            return None, error_msg
-
-        # Set status to Picked and record username
-        book.status = BookStatus.PICKED
-        book.picked_by = username
 
-        # Save to storage
-        if self.storage.update_book(book):
+        def change(book: Book) -> str:
+            # Check if book is available
+            if book.status != BookStatus.AVAILABLE:
+                return f"Book '{book.title}' is not available (status: {book.status.value})"
+            # Set status to Picked and record username
+            book.status = BookStatus.PICKED
+            book.picked_by = username
+            return ""
+
+        book, error_msg = self._update_with_retry(book_id, change)
+        if book:
             logger.info(f"User '{username}' picked book '{book.title}' (ID: {book_id})")
-            return book, ""
-        else:
-            error_msg = "Failed to update book in storage"
-            logger.error(error_msg)
-            return None, error_msg
+        return book, error_msg
 
     def approve_borrow(self, book_id: int) -> Tuple[Optional[Book], str]:
         """
@@ -262,32 +336,13 @@ class BookService:
             If successful: (Book object, "")
             If failed: (None, error_message)
         """
-        # Check if book exists
-        book = self.storage.get_book_by_id(book_id)
-        if not book:
-            error_msg = f"Book with ID '{book_id}' not found"
-            logger.warning(error_msg)
-            return None, error_msg
-
-        # Check if book is picked
-        if book.status != BookStatus.PICKED:
-            error_msg = f"Book '{book.title}' is not in Picked status (current: {book.status.value})"
-            logger.warning(error_msg)
-            return None, error_msg
-
-        # Change status to Borrowed (keep picked_by for reference)
-        book.status = BookStatus.BORROWED
-
-        # Save to storage
-        if self.storage.update_book(book):
+        # Check if book is picked and change status to Borrowed
+        book, error_msg = self._update_with_retry(book_id, _approve_transition)
+        if book:
             logger.info(
                 f"Librarian approved borrow for book '{book.title}' (ID: {book_id}) by '{book.picked_by}'"
             )
-            return book, ""
-        else:
-            error_msg = "Failed to update book in storage"
-            logger.error(error_msg)
-            return None, error_msg
+        return book, error_msg
 
     def return_book(self, book_id: int) -> Tuple[Optional[Book], str]:
         """
@@ -301,33 +356,181 @@ class BookService:
             If successful: (Book object, "")
             If failed: (None, error_message)
         """
-        # Check if book exists
-        book = self.storage.get_book_by_id(book_id)
-        if not book:
-            error_msg = f"Book with ID '{book_id}' not found"
-            logger.warning(error_msg)
-            return None, error_msg
-
-        # Check if book is borrowed
-        if book.status != BookStatus.BORROWED:
-            error_msg = f"Book '{book.title}' is not currently borrowed (status: {book.status.value})"
-            logger.warning(error_msg)
-            return None, error_msg
-
-        # Change status to Available and clear picked_by
-        book.status = BookStatus.AVAILABLE
-        book.picked_by = None
-
-        # Save to storage
-        if self.storage.update_book(book):
+        # Check if book is borrowed, then make it Available and clear picked_by
+        book, error_msg = self._update_with_retry(book_id, _return_transition)
+        if book:
             logger.info(
                 f"Librarian returned book '{book.title}' (ID: {book_id}) to Available"
             )
-            return book, ""
-        else:
-            error_msg = "Failed to update book in storage"
-            logger.error(error_msg)
-            return None, error_msg
+        return book, error_msg
+
+    def _check_batch(
+        self, book_ids: Iterable[int], check: Callable[[Book], str]
+    ) -> Tuple[List[BatchItemResult], Dict[int, Book]]:
+        """
+        Load and check every book of a batch in one pass.
+
+        Returns:
+            Tuple of (results in request order, books that passed the check).
+            Results for books that passed are filled in by the caller once the
+            storage write succeeds.
+        """
+        ids = list(book_ids)
+        books = self.storage.get_books_by_ids(ids)
+        results: List[BatchItemResult] = []
+        accepted: Dict[int, Book] = {}
+        seen = set()
+
+        for book_id in ids:
+            if book_id in seen:
+                results.append(
+                    BatchItemResult(
+                        book_id, False, f"Duplicate ID '{book_id}' in batch"
+                    )
+                )
+                continue
+            seen.add(book_id)
+            book = books.get(book_id)
+            if book is None:
+                error_msg = f"Book with ID '{book_id}' not found"
+            else:
+                error_msg = check(book)
+            if error_msg:
+                results.append(BatchItemResult(book_id, False, error_msg))
+            else:
+                accepted[book_id] = book
+                results.append(BatchItemResult(book_id, True, "", book))
+        return results, accepted
+
+    def _recheck(
+        self,
+        book_ids: List[int],
+        check: Callable[[Book], str],
+        pending: Dict[int, BatchItemResult],
+    ) -> Dict[int, Book]:
+        """Re-read conflicted books and check them again against fresh state."""
+        books = self.storage.get_books_by_ids(book_ids)
+        accepted: Dict[int, Book] = {}
+        for book_id in book_ids:
+            book = books.get(book_id)
+            result = pending[book_id]
+            error_msg = check(book) if book else f"Book with ID '{book_id}' not found"
+            if error_msg:
+                result.success, result.error, result.book = False, error_msg, None
+            else:
+                result.book = accepted[book_id] = book
+        return accepted
+
+    def _apply_batch(
+        self,
+        action: str,
+        book_ids: Iterable[int],
+        check: Callable[[Book], str],
+        write: Callable[[Dict[int, Book]], bool],
+        event: str = "updated",
+    ) -> List[BatchItemResult]:
+        """Check all books, write the accepted ones at once, report per item.
+
+        Books that hit a version conflict are re-read, re-checked and written
+        again (following ``retry_policy``); the rest of the batch is kept.
+        One ``event`` is recorded per book written.
+        """
+        results, accepted = self._check_batch(book_ids, check)
+        pending = {r.book_id: r for r in results if r.success}
+        attempt = 1
+        while accepted:
+            try:
+                conflicts: List[int] = []
+                written = write(accepted)
+            except VersionConflictError as e:
+                conflicts = [i for i in e.book_ids if i in accepted]
+                written = True
+            if not written:
+                error_msg = f"Failed to {action} books in storage"
+                logger.error(error_msg)
+                for book_id in accepted:
+                    pending[book_id].success = False
+                    pending[book_id].error, pending[book_id].book = error_msg, None
+                break
+            if not conflicts:
+                break
+            if attempt >= self.retry_policy.max_attempts:
+                for book_id in conflicts:
+                    pending[book_id].success = False
+                    pending[book_id].error = (
+                        f"Book with ID '{book_id}' was modified concurrently"
+                    )
+                    pending[book_id].book = None
+                break
+            self.retry_policy.sleep(attempt)
+            attempt += 1
+            accepted = self._recheck(conflicts, check, pending)
+
+        failed = sum(1 for r in results if not r.success)
+        logger.info(
+            f"Batch {action}: {len(results) - failed} succeeded, {failed} failed"
+        )
+        publish(
+            self.events,
+            [
+                book_event(event, r.book_id, r.book if event != "deleted" else None)
+                for r in results
+                if r.success
+            ],
+        )
+        return results
+
+    def approve_borrows(self, book_ids: Iterable[int]) -> List[BatchItemResult]:
+        """
+        Approve several picked books (Picked -> Borrowed) in one storage write.
+
+        Args:
+            book_ids: Integer IDs of the books to approve
+
+        Returns:
+            One BatchItemResult per requested ID, in request order
+        """
+        return self._apply_batch(
+            "approve",
+            book_ids,
+            _approve_transition,
+            lambda books: self.storage.update_books(list(books.values())),
+        )
+
+    def return_books(self, book_ids: Iterable[int]) -> List[BatchItemResult]:
+        """
+        Return several borrowed books (Borrowed -> Available) in one storage write.
+
+        Args:
+            book_ids: Integer IDs of the books to return
+
+        Returns:
+            One BatchItemResult per requested ID, in request order
+        """
+        return self._apply_batch(
+            "return",
+            book_ids,
+            _return_transition,
+            lambda books: self.storage.update_books(list(books.values())),
+        )
+
+    def delete_books(self, book_ids: Iterable[int]) -> List[BatchItemResult]:
+        """
+        Delete several books (none may be borrowed) in one storage write.
+
+        Args:
+            book_ids: Integer IDs of the books to delete
+
+        Returns:
+            One BatchItemResult per requested ID, in request order
+        """
+        return self._apply_batch(
+            "delete",
+            book_ids,
+            _delete_check,
+            lambda books: self.storage.remove_books(list(books)),
+            event="deleted",
+        )
 
     def get_book(self, book_id: int) -> Optional[Book]:
         """
@@ -350,14 +553,40 @@ class BookService:
         """
         return self.storage.load_books()
 
+    def iter_book_dicts(self) -> Iterator[dict]:
+        """
+        Yield every book as a ``to_dict()`` dict, one at a time.
+
+        Uses the storage's ``iter_book_records`` when available so large
+        catalogs are never held in memory as a whole; each record is
+        normalized through ``Book.from_dict`` unless the storage's schema is
+        current (``storage.migrations``), in which case records pass as-is.
+
+        Returns:
+            Iterator of book dicts
+        """
+        iter_fn = getattr(self.storage, "iter_book_records", None)
+        if not callable(iter_fn):
+            return (book.to_dict() for book in self.storage.load_books())
+        if schema_is_current(self.storage):
+            return iter_fn()
+        return (Book.from_dict(record).to_dict() for record in iter_fn())
+
     def list_picked_books(self) -> List[Book]:
         """
         Get all picked books (for librarian to see pending requests).
 
+        Uses the storage's ``find_books_by_status`` query when it has one
+        (MongoDB serves it from an index) instead of loading the catalog.
+
         Returns:
             List of Book objects with Picked status
         """
-        books = self.storage.load_books()
-        picked_books = [book for book in books if book.status == BookStatus.PICKED]
+        find_fn = getattr(self.storage, "find_books_by_status", None)
+        if callable(find_fn):
+            picked_books = find_fn(BookStatus.PICKED)
+        else:
+            books = self.storage.load_books()
+            picked_books = [b for b in books if b.status == BookStatus.PICKED]
         logger.info(f"Listed {len(picked_books)} picked books")
         return picked_books
@@ -5,6 +5,7 @@ from typing import List, Optional, Tuple
 from lib_logging.logger import get_logger
 from models.book import Book, BookStatus
 from storage.book_storage import BookStorage
+from storage.errors import VersionConflictError
 
 logger = get_logger(__name__)
 
@@ -21,6 +22,14 @@ class BorrowService:
         """
         self.storage = storage or BookStorage()
 
+    def _save(self, book: Book) -> bool:
+        """Write a book back; a concurrent change counts as a failed update."""
+        try:
+            return self.storage.update_book(book)
+        except VersionConflictError:
+            logger.warning(f"Book {book.id} was modified concurrently")
+            return False
+
     def borrow_book(self, book_id: int, username: str) -> Tuple[Optional[Book], str]:
         """
         Borrow a book (change status to BORROWED).
@@ -47,7 +56,7 @@ class BorrowService:
 
         book.status = BookStatus.BORROWED
 
-        if self.storage.update_book(book):
+        if self._save(book):
             logger.info(
                 f"User '{username}' borrowed book '{book.title}' (ID: {book_id})"
             )
@@ -80,7 +89,7 @@ class BorrowService:
 
         book.status = BookStatus.AVAILABLE
 
-        if self.storage.update_book(book):
+        if self._save(book):
             logger.info(f"Book '{book.title}' returned (ID: {book_id})")
             return book, ""
         else:
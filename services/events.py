@@ -0,0 +1,42 @@
+"""Catalog change events recorded by the services for the web change feed.
+
+Every committed change to the catalog is appended to the configured
+``EventLog`` as one event::
+
+    {"type": "book.created" | "book.updated" | "book.deleted",
+     "book_id": 7, "book": {...} or None}
+
+or, after a bulk import, ``{"type": "catalog.reset"}``, telling clients to
+reload the whole catalog. The log adds ``id`` and ``at``. Recording an event
+never fails the change itself: the change is already committed, and clients
+that miss an event catch up on their next full reload.
+"""
+
+from typing import List, Optional
+
+from lib_logging.logger import get_logger
+from models.book import Book
+from storage.interfaces import EventLog
+
+logger = get_logger(__name__)
+
+CATALOG_RESET = "catalog.reset"
+
+
+def book_event(kind: str, book_id: int, book: Optional[Book] = None) -> dict:
+    """Event for a created, updated or deleted book (``book`` as written)."""
+    return {
+        "type": f"book.{kind}",
+        "book_id": book_id,
+        "book": book.to_dict() if book is not None else None,
+    }
+
+
+def publish(log: Optional[EventLog], events: List[dict]) -> None:
+    """Append ``events`` to ``log`` (if any), logging instead of raising."""
+    if log is None or not events:
+        return
+    try:
+        log.append(events)
+    except Exception as e:
+        logger.warning(f"Could not record {len(events)} change event(s): {e}")
@@ -0,0 +1,34 @@
+"""Retry policy for optimistic-concurrency conflicts."""
+
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Bounded retries with capped exponential backoff and full jitter.
+
+    Attributes:
+        max_attempts: Total attempts including the first (1 disables retries)
+        base_delay: Backoff before the second attempt, in seconds
+        max_delay: Upper bound for any single backoff, in seconds
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 0.005
+    max_delay: float = 0.1
+
+    def delay(self, attempt: int) -> float:
+        """Backoff to wait after failed attempt number ``attempt`` (1-based)."""
+        import random  # only needed once a conflict happens
+
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+    def sleep(self, attempt: int) -> None:
+        """Sleep for the backoff after failed attempt ``attempt``."""
+        time.sleep(self.delay(attempt))
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+NO_RETRY = RetryPolicy(max_attempts=1)
@@ -0,0 +1,190 @@
+"""Catalog statistics backed by a read-only columnar snapshot.
+
+Aggregate questions (counts by status, top authors, books picked per user)
+do not need full ``Book`` objects. ``CatalogSnapshot`` keeps only the
+columns they touch in compact arrays, and ``StatsService`` rebuilds it only
+when the storage reports a new catalog version.
+"""
+
+import time
+import weakref
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from lib_logging.logger import get_logger
+from lib_logging.slow_ops import instrument
+from models.book import BookStatus, parse_status
+from storage.interfaces import BookRepository
+
+logger = get_logger(__name__)
+
+# Status column codes: index into STATUS_ORDER.
+STATUS_ORDER: Tuple[BookStatus, ...] = tuple(BookStatus)
+_CODE_BY_STATUS = {status: code for code, status in enumerate(STATUS_ORDER)}
+
+# Only these fields are read from storage when building a snapshot.
+_SNAPSHOT_FIELDS = ("id", "author", "status", "picked_by")
+
+
+class CatalogSnapshot:
+    """Immutable columnar view of the catalog.
+
+    Columns:
+        ids: book ids (``array('q')``)
+        status_codes: index into ``STATUS_ORDER`` (``array('B')``)
+        author_codes: index into ``authors`` (dictionary-encoded)
+        picked_by_codes: index into ``picked_by`` (0 means "nobody")
+    """
+
+    __slots__ = (
+        "version",
+        "built_at",
+        "ids",
+        "status_codes",
+        "authors",
+        "author_codes",
+        "picked_by",
+        "picked_by_codes",
+    )
+
+    def __init__(self, version: Optional[str] = None):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.ids = array("q")
+        self.status_codes = array("B")
+        self.authors: List[str] = []
+        self.author_codes = array("I")
+        self.picked_by: List[Optional[str]] = [None]
+        self.picked_by_codes = array("I")
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[dict], version: Optional[str] = None
+    ) -> "CatalogSnapshot":
+        """Build a snapshot from raw book dicts (JSON items or Mongo documents)."""
+        snap = cls(version)
+        author_index: Dict[str, int] = {}
+        picked_index: Dict[Optional[str], int] = {None: 0}
+        ids_append = snap.ids.append
+        status_append = snap.status_codes.append
+        author_append = snap.author_codes.append
+        picked_append = snap.picked_by_codes.append
+
+        for rec in records:
+            ids_append(int(rec["id"]))
+            status_append(_CODE_BY_STATUS[parse_status(rec.get("status", "Available"))])
+
+            author = rec.get("author") or ""
+            code = author_index.get(author)
+            if code is None:
+                code = author_index[author] = len(snap.authors)
+                snap.authors.append(author)
+            author_append(code)
+
+            picked = rec.get("picked_by") or None
+            code = picked_index.get(picked)
+            if code is None:
+                code = picked_index[picked] = len(snap.picked_by)
+                snap.picked_by.append(picked)
+            picked_append(code)
+
+        return snap
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Number of books per status value."""
+        codes = self.status_codes
+        return {status.value: codes.count(i) for i, status in enumerate(STATUS_ORDER)}
+
+    def top_authors(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Authors with the most books, most frequent first."""
+        counts = Counter(self.author_codes).most_common(limit)
+        return [(self.authors[code], n) for code, n in counts]
+
+    def picked_per_user(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Books currently picked or borrowed per username, most first."""
+        counts = Counter(self.picked_by_codes)
+        counts.pop(0, None)
+        return [
+            (self.picked_by[code] or "", n) for code, n in counts.most_common(limit)
+        ]
+
+    def to_dict(self, top: int = 10) -> Dict[str, Any]:
+        """Summary used by the CLI ``stats`` command and ``/api/stats``."""
+        return {
+            "version": self.version,
+            "total": len(self),
+            "by_status": self.count_by_status(),
+            "top_authors": [
+                {"author": a, "count": n} for a, n in self.top_authors(top)
+            ],
+            "picked_per_user": [
+                {"username": u, "count": n} for u, n in self.picked_per_user(top)
+            ],
+        }
+
+
+@instrument("service")
+class StatsService:
+    """Service for catalog-wide aggregate queries.
+
+    Snapshots are cached per storage instance and reused while the storage's
+    ``catalog_version()`` is unchanged. Storages without a version token
+    (e.g. MongoDB) reuse a snapshot for ``ttl_seconds``.
+    """
+
+    _snapshots: "weakref.WeakKeyDictionary[Any, CatalogSnapshot]" = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def __init__(self, storage: BookRepository, ttl_seconds: float = 5.0):
+        """Initialize StatsService with an explicit repository (Dependency Injection)."""
+        self.storage: BookRepository = storage
+        self.ttl_seconds = ttl_seconds
+
+    def _current_version(self) -> Optional[str]:
+        version_fn = getattr(self.storage, "catalog_version", None)
+        return version_fn() if callable(version_fn) else None
+
+    def _records(self) -> Iterable[dict]:
+        iter_fn = getattr(self.storage, "iter_book_records", None)
+        if callable(iter_fn):
+            return iter_fn(fields=_SNAPSHOT_FIELDS)
+        return (b.to_dict() for b in self.storage.load_books())
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Return the cached snapshot, rebuilding it if the catalog changed."""
+        version = self._current_version()
+        try:
+            cached = self._snapshots.get(self.storage)
+        except TypeError:  # storage not weak-referenceable
+            cached = None
+
+        if cached is not None:
+            if version is not None and cached.version == version:
+                return cached
+            if (
+                version is None
+                and cached.version is None
+                and time.monotonic() - cached.built_at < self.ttl_seconds
+            ):
+                return cached
+
+        start = time.perf_counter()
+        snap = CatalogSnapshot.from_records(self._records(), version)
+        logger.info(
+            f"Built catalog snapshot of {len(snap)} books "
+            f"in {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+        try:
+            self._snapshots[self.storage] = snap
+        except TypeError:
+            pass
+        return snap
+
+    def get_stats(self, top: int = 10) -> Dict[str, Any]:
+        """Return catalog statistics as a JSON-serializable dict."""
+        return self.snapshot().to_dict(top=top)
@@ -3,6 +3,7 @@
 from typing import Optional, Tuple
 
 from lib_logging.logger import get_logger
+from lib_logging.slow_ops import instrument
 from models.role import Role
 from models.user import User
 from storage.interfaces import UserRepository
@@ -15,6 +16,7 @@ from validation.user_validator import (
 logger = get_logger(__name__)
 
 
+@instrument("service")
 class UserService:
     """Service for user-related operations.
 
@@ -1,6 +1,24 @@
-"""Storage package for the Library Management System."""
+"""Storage package for the Library Management System.
 
-from .book_storage import BookStorage
-from .user_storage import UserStorage
+Exports are resolved lazily (PEP 562) so that importing e.g.
+``storage.errors`` does not load the JSON storage implementations.
+"""
 
-__all__ = ["BookStorage", "UserStorage"]
+from importlib import import_module
+
+_EXPORTS = {
+    "AsyncBookRepository": ".async_adapters",
+    "AsyncUserRepository": ".async_adapters",
+    "StorageExecutor": ".async_adapters",
+    "BookStorage": ".book_storage",
+    "UserStorage": ".user_storage",
+    "VersionConflictError": ".errors",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
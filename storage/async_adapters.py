@@ -0,0 +1,159 @@
+"""Async adapters over the blocking repositories.
+
+``AsyncBookRepository`` and ``AsyncUserRepository`` expose the
+``BookRepository``/``UserRepository`` methods as coroutines. Each call runs
+the wrapped storage on a bounded thread pool (``StorageExecutor``), so an
+event loop can serve many clients while only ``max_workers`` threads ever
+wait on disk or on MongoDB round trips. Calls beyond that limit queue as
+cheap futures instead of new threads.
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+from models.book import Book
+from models.role import Role
+from models.user import User
+from storage.interfaces import BookRepository, UserRepository
+from storage.migrations import schema_is_current
+
+DEFAULT_MAX_WORKERS = int(os.environ.get("ASYNC_STORAGE_WORKERS", "8"))
+
+# Records fetched per executor hop when iterating the catalog
+ITER_BATCH_SIZE = 500
+
+
+class StorageExecutor:
+    """Bounded thread pool that runs blocking calls for coroutines."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, name: str = "storage"):
+        self.max_workers = max_workers
+        # Calls submitted and not yet finished (running or queued); only
+        # touched from the event loop
+        self.pending = 0
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Await ``fn(*args, **kwargs)`` executed on the pool."""
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            return await loop.run_in_executor(
+                self._pool, functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self.pending -= 1
+
+    def snapshot(self) -> dict:
+        """Workers and pending calls (more pending than workers means a queue)."""
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "saturation": round(self.pending / self.max_workers, 3),
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+class AsyncBookRepository:
+    """Coroutine interface to a ``BookRepository``."""
+
+    def __init__(self, storage: BookRepository, executor: StorageExecutor):
+        self.storage = storage
+        self.executor = executor
+
+    async def load_books(self) -> List[Book]:
+        return await self.executor.run(self.storage.load_books)
+
+    async def get_book_by_id(self, book_id: int) -> Optional[Book]:
+        return await self.executor.run(self.storage.get_book_by_id, book_id)
+
+    async def add_book(self, book: Book) -> bool:
+        return await self.executor.run(self.storage.add_book, book)
+
+    async def update_book(self, book: Book) -> bool:
+        return await self.executor.run(self.storage.update_book, book)
+
+    async def remove_book(self, book_id: int) -> bool:
+        return await self.executor.run(self.storage.remove_book, book_id)
+
+    async def get_books_by_ids(self, book_ids: Iterable[int]) -> Dict[int, Book]:
+        return await self.executor.run(self.storage.get_books_by_ids, list(book_ids))
+
+    async def add_books(self, books: List[Book]) -> List[int]:
+        return await self.executor.run(self.storage.add_books, books)
+
+    async def update_books(self, books: List[Book]) -> bool:
+        return await self.executor.run(self.storage.update_books, books)
+
+    async def remove_books(self, book_ids: Iterable[int]) -> bool:
+        return await self.executor.run(self.storage.remove_books, list(book_ids))
+
+    async def iter_book_batches(
+        self, batch_size: int = ITER_BATCH_SIZE
+    ) -> AsyncIterator[List[dict]]:
+        """Yield the catalog as lists of book dicts, ``batch_size`` at a time.
+
+        Uses the storage's streaming ``iter_book_records`` when it has one;
+        records are normalized through ``Book.from_dict`` like
+        ``BookService.iter_book_dicts`` (and likewise passed as-is once the
+        storage's schema is current).
+        """
+        iter_fn = getattr(self.storage, "iter_book_records", None)
+        current = schema_is_current(self.storage)
+        if callable(iter_fn):
+            records = await self.executor.run(iter_fn)
+        else:
+            records = iter([b.to_dict() for b in await self.load_books()])
+            current = True
+
+        def take() -> List[dict]:
+            if current:
+                return list(islice(records, batch_size))
+            return [Book.from_dict(r).to_dict() for r in islice(records, batch_size)]
+
+        while True:
+            batch = await self.executor.run(take)
+            if not batch:
+                return
+            yield batch
+
+
+class AsyncUserRepository:
+    """Coroutine interface to a ``UserRepository``."""
+
+    def __init__(self, storage: UserRepository, executor: StorageExecutor):
+        self.storage = storage
+        self.executor = executor
+
+    async def load_users(self) -> List[User]:
+        return await self.executor.run(self.storage.load_users)
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        return await self.executor.run(self.storage.get_user_by_id, user_id)
+
+    async def get_user_by_username(self, username: str) -> Optional[User]:
+        return await self.executor.run(self.storage.get_user_by_username, username)
+
+    async def create_user(
+        self, username: str, password: str, role: Role
+    ) -> Optional[User]:
+        return await self.executor.run(
+            self.storage.create_user, username, password, role
+        )
+
+    async def update_user(self, user: User) -> bool:
+        return await self.executor.run(self.storage.update_user, user)
+
+    async def remove_user(self, user_id: int) -> bool:
+        return await self.executor.run(self.storage.remove_user, user_id)
+
+    async def user_exists(self, username: str) -> bool:
+        return await self.executor.run(self.storage.user_exists, username)
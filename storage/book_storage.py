@@ -1,19 +1,139 @@
 """Book storage operations using JSON persistence."""
 
 import json
+import os
 import shutil
+import threading
+from contextlib import contextmanager
+from dataclasses import replace
 from pathlib import Path
-from typing import List, Optional
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from lib_logging.logger import get_logger
+from lib_logging.slow_ops import instrument
 from models.book import Book
 
+from .errors import VersionConflictError
+from .id_allocator import IdBlockAllocator
+from .migrations import CURRENT_SCHEMA_VERSION
+
+try:
+    import fcntl
+except ImportError:  # Windows: commits are not serialized across processes
+    fcntl = None
+
 logger = get_logger(__name__)
 
+# How often a writer re-reads and re-applies its change after another
+# process replaced books.json between its read and its commit.
+MAX_COMMIT_ATTEMPTS = 50
+
+_FileToken = Tuple[int, int, int]
+
+# Read size for incremental parsing of books.json
+_READ_CHUNK_CHARS = 64 * 1024
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+class _JSONArrayReader:
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Only the current element (plus one read chunk) is held in memory.
+    Iterating raises ``json.JSONDecodeError`` if the stream is not a
+    well-formed JSON array.
+    """
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, fp: IO[str]):
+        self.fp = fp
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Drop consumed text and append the next chunk (False at end of stream)."""
+        if self.eof:
+            return False
+        chunk = self.fp.read(_READ_CHUNK_CHARS)
+        self.buf, self.pos = self.buf[self.pos :] + chunk, 0
+        self.eof = not chunk
+        return not self.eof
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character ("" at end of stream)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
 
+    def _expect(self, chars: str) -> str:
+        c = self._peek()
+        if not c or c not in chars:
+            raise json.JSONDecodeError(f"Expected one of {chars!r}", self.buf, self.pos)
+        self.pos += 1
+        return c
+
+    def _decode(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                item, end = self._decoder.raw_decode(self.buf, self.pos)
+                # A value may be cut short by the buffer end (e.g. "2." of
+                # "2.5"), so only trust it once a delimiter follows.
+                if self.eof or (end < len(self.buf) and self.buf[end] in _DELIMITERS):
+                    self.pos = end
+                    return item
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def __iter__(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            return
+        while True:
+            yield self._decode()
+            if self._expect(",]") == "]":
+                return
+
+
+@instrument("json")
 class BookStorage:
     """Handles book data persistence in JSON format
-    with auto-incrementing IDs."""
+    with auto-incrementing IDs.
+
+    Writes are optimistic: a mutation reads books.json, applies its change in
+    memory, writes a private temp file and then swaps it in only if
+    books.json is still the file it read. The swap is the only step done
+    under a (very short) inter-process lock; if another process got there
+    first the change is re-applied to the fresh file. ``update_book`` and
+    ``update_books`` additionally check each record's ``version`` and raise
+    ``VersionConflictError`` when the caller's copy is stale.
+
+    Once schema.json records the current schema (see ``storage.migrations``)
+    records are decoded without the legacy coercions of ``Book.from_dict``.
+    """
+
+    # Every bulk write rewrites the whole file, so bulk callers should use
+    # large batches to keep the number of rewrites small.
+    preferred_batch_size = 50_000
 
     def __init__(self, data_dir: Optional[Path] = None):
         if data_dir is None:
@@ -21,9 +141,42 @@ class BookStorage:
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.books_file = self.data_dir / "books.json"
+        self.lock_file = self.data_dir / "books.json.lock"
+        # Last book ID handed out in a block (see storage.id_allocator)
+        self.id_sequence_file = self.data_dir / "book_ids.seq"
+        self._ids = IdBlockAllocator(self._reserve_ids)
+        self.schema_file = self.data_dir / "schema.json"
+        self.schema_version = self._read_schema_version()
+
+    def _read_schema_version(self) -> int:
+        try:
+            data = json.loads(self.schema_file.read_text(encoding="utf-8"))
+            return int(data["books"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+
+    def set_schema_version(self, version: int) -> None:
+        """Record that books.json is at schema ``version`` (atomic replace)."""
+        temp_file = self.schema_file.with_name(
+            f"schema.json.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        temp_file.write_text(json.dumps({"books": version}), encoding="utf-8")
+        os.replace(temp_file, self.schema_file)
+        self.schema_version = version
+
+    def ping(self) -> None:
+        """Raise ``OSError`` unless the data directory is writable."""
+        if not os.access(self.data_dir, os.W_OK | os.X_OK):
+            raise OSError(f"{self.data_dir} is not writable")
 
     def load_books(self) -> List[Book]:
-        """Load all books from JSON file."""
+        """Load all books from JSON file.
+
+        Raises ``OSError`` or ``json.JSONDecodeError`` if books.json exists
+        but cannot be read (a backup is made of an unparsable file), and the
+        parsing error of a record that ``Book.from_dict`` rejects too:
+        returning fewer books would let the next write drop the rest.
+        """
         if not self.books_file.exists():
             logger.info("Books file not found, creating empty file")
             self._save_books_internal([])
@@ -32,55 +185,269 @@ class BookStorage:
         try:
             with open(self.books_file, "r", encoding="utf-8") as f:
                 data = json.load(f)
-            books = []
-            for item in data:
-                book_id = item.get("id")
-                if isinstance(book_id, str) and book_id.isdigit():
-                    item["id"] = int(book_id)
-                books.append(Book.from_dict(item))
-            logger.info("Loaded %d books from storage", len(books))
-            return books
-        except (json.JSONDecodeError, KeyError) as e:
+        except json.JSONDecodeError as e:
             logger.error("Failed to parse books JSON: %s", e)
-            if self.books_file.exists():
-                backup = self.books_file.with_suffix(".json.bak")
-                shutil.copy2(self.books_file, backup)
-                logger.warning("Created backup at %s", backup)
-            return []
-        except Exception as e:
+            backup = self.books_file.with_suffix(".json.bak")
+            shutil.copy2(self.books_file, backup)
+            logger.warning("Created backup at %s", backup)
+            raise
+        except OSError as e:
             logger.error("Error loading books: %s", e)
-            return []
+            raise
+        books = [self._record_to_book(item) for item in data]
+        logger.info("Loaded %d books from storage", len(books))
+        return books
+
+    def _record_to_book(self, item: dict) -> Book:
+        """Book from a books.json record.
+
+        Once the file is at the current schema ``Book.from_record`` skips the
+        coercions of ``Book.from_dict``; a record that still needs them (say,
+        edited by hand since the migration) falls back to ``from_dict``.
+        """
+        if self.schema_version >= CURRENT_SCHEMA_VERSION:
+            try:
+                book = Book.from_record(item)
+                if type(book.id) is not int:
+                    raise TypeError(f"id {book.id!r} is not an int")
+                return book
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(
+                    "Book record %s is not in the current schema (%r), "
+                    "parsing it as a legacy record",
+                    item.get("id") if isinstance(item, dict) else item,
+                    e,
+                )
+        try:
+            return Book.from_dict(item)
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            logger.error("Invalid book record %r: %r", item, e)
+            raise
+
+    def catalog_version(self) -> Optional[str]:
+        """Return a cheap token that changes whenever books.json is rewritten."""
+        try:
+            st = self.books_file.stat()
+        except OSError:
+            return None
+        return f"{st.st_mtime_ns}:{st.st_size}"
+
+    def iter_book_records(
+        self, fields: Optional[Sequence[str]] = None
+    ) -> Iterator[dict]:
+        """Yield raw book dicts without materializing ``Book`` objects.
 
-    def _save_books_internal(self, books: List[Book]) -> bool:
-        """Save books to JSON with atomic write."""
-        temp_file = self.books_file.with_suffix(".json.tmp")
+        books.json is parsed incrementally, so memory use does not grow with
+        the catalog. ``fields`` is a projection hint; the JSON backend always
+        yields whole records. Like ``load_books`` it raises if books.json
+        cannot be read or parsed, after yielding the records before the error.
+        """
+        if not self.books_file.exists():
+            return
+        try:
+            with open(self.books_file, "r", encoding="utf-8") as f:
+                yield from _JSONArrayReader(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error("Failed to read books JSON: %s", e)
+            raise
+
+    def _file_token(self) -> Optional[_FileToken]:
+        """Identity of the current books.json (changes on every replace)."""
+        try:
+            st = self.books_file.stat()
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @contextmanager
+    def _commit_lock(self):
+        """Serialize the compare-and-swap of books.json across processes."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _temp_file(self, kind: str = "") -> Path:
+        # Per-writer temp name so concurrent processes never share a file
+        return self.books_file.with_name(
+            f"books.json.{os.getpid()}.{threading.get_ident()}{kind}.tmp"
+        )
+
+    def _write_temp(self, books: List[Book]) -> Path:
+        temp_file = self._temp_file()
         try:
             with open(temp_file, "w", encoding="utf-8") as f:
                 data = [b.to_dict() for b in books]
                 json.dump(data, f, indent=2, ensure_ascii=False)
-            temp_file.replace(self.books_file)
+        except Exception:
+            temp_file.unlink(missing_ok=True)
+            raise
+        return temp_file
+
+    def _save_books_internal(
+        self, books: List[Book], expected: Optional[_FileToken] = None
+    ) -> Optional[bool]:
+        """Save books to JSON with atomic write.
+
+        If ``expected`` is given, the file is replaced only if it is still the
+        one identified by that token; otherwise nothing is written and None
+        is returned.
+        """
+        temp_file = None
+        try:
+            temp_file = self._write_temp(books)
+            with self._commit_lock():
+                if expected is not None and self._file_token() != expected:
+                    temp_file.unlink(missing_ok=True)
+                    return None
+                temp_file.replace(self.books_file)
             logger.info("Saved %d books to storage", len(books))
             return True
         except Exception as e:
             logger.error("Error writing books file: %s", e)
-            if temp_file.exists():
+            if temp_file is not None:
                 temp_file.unlink(missing_ok=True)
             return False
 
     def save_books(self, books: List[Book]) -> bool:
-        """Save books to JSON file."""
+        """Save books to JSON file (unconditionally replaces the catalog)."""
         try:
-            return self._save_books_internal(books)
+            return bool(self._save_books_internal(books))
         except Exception as e:
             logger.error("Error saving books: %s", e)
             return False
 
+    def _mutate(self, apply: Callable[[List[Book]], Optional[List[Book]]]) -> bool:
+        """Optimistic read-modify-write of the whole catalog.
+
+        ``apply`` receives freshly loaded books and returns the new list, or
+        None to abort without writing. It may be called more than once if
+        another process commits in between, so it must not have side effects
+        beyond its return value.
+        """
+        for _ in range(MAX_COMMIT_ATTEMPTS):
+            if not self.books_file.exists():
+                self.load_books()
+            token = self._file_token()
+            new_books = apply(self.load_books())
+            if new_books is None:
+                return False
+            saved = self._save_books_internal(new_books, expected=token)
+            if saved is not None:
+                return saved
+            logger.info("books.json changed during write, re-applying change")
+        logger.error("Giving up write after %d attempts", MAX_COMMIT_ATTEMPTS)
+        return False
+
+    def _write_records_temp(
+        self, transform: Callable[[dict], dict]
+    ) -> Tuple[Path, int, int]:
+        """Stream books.json through ``transform`` into a temp file.
+
+        Returns ``(temp file, records changed, records)``; the output has
+        the layout ``json.dump(..., indent=2)`` gives the whole list.
+        """
+        # Distinct from _write_temp's name: ``transform`` may itself save books
+        temp_file = self._temp_file(".rewrite")
+        changed = total = 0
+        try:
+            with (
+                open(self.books_file, "r", encoding="utf-8") as src,
+                open(temp_file, "w", encoding="utf-8") as dst,
+            ):
+                dst.write("[")
+                for record in _JSONArrayReader(src):
+                    new = transform(record)
+                    changed += new is not record
+                    dst.write(",\n  " if total else "\n  ")
+                    text = json.dumps(new, indent=2, ensure_ascii=False)
+                    dst.write(text.replace("\n", "\n  "))
+                    total += 1
+                dst.write("\n]" if total else "]")
+        except Exception:
+            temp_file.unlink(missing_ok=True)
+            raise
+        return temp_file, changed, total
+
+    def rewrite_records(self, transform: Callable[[dict], dict]) -> Tuple[int, int]:
+        """Pass every raw record through ``transform`` and commit the result.
+
+        ``transform`` returns the record itself when it has nothing to
+        change. books.json is streamed, and replaced only if some record
+        changed and no other writer committed meanwhile; otherwise the pass
+        starts over on the fresh file, like ``_mutate``. Returns
+        ``(records changed, records)``.
+
+        Raises:
+            json.JSONDecodeError: books.json is not a JSON array
+            RuntimeError: Other writers kept committing first
+        """
+        for _ in range(MAX_COMMIT_ATTEMPTS):
+            token = self._file_token()
+            if token is None:
+                return 0, 0
+            temp_file, changed, total = self._write_records_temp(transform)
+            if not changed:
+                temp_file.unlink(missing_ok=True)
+                return 0, total
+            with self._commit_lock():
+                if self._file_token() == token:
+                    temp_file.replace(self.books_file)
+                    logger.info("Rewrote %d of %d book records", changed, total)
+                    return changed, total
+            temp_file.unlink(missing_ok=True)
+            logger.info("books.json changed during rewrite, starting over")
+        raise RuntimeError(
+            f"books.json kept changing over {MAX_COMMIT_ATTEMPTS} passes"
+        )
+
     def get_next_book_id(self) -> int:
-        """Return next available integer ID (max existing + 1)."""
-        books = self.load_books()
-        if not books:
-            return 1
-        return max(b.id for b in books) + 1
+        """Return an unused integer ID above every existing one."""
+        return self._ids.next_id()
+
+    def get_next_book_ids(self, count: int) -> List[int]:
+        """Return ``count`` unused IDs (at most one catalog scan)."""
+        return self._ids.next_ids(count)
+
+    def _max_book_id(self) -> int:
+        top = 0
+        for record in self.iter_book_records(["id"]):
+            try:
+                top = max(top, int(record.get("id")))
+            except (TypeError, ValueError):
+                continue
+        return top
+
+    def _reserve_ids(self, count: int) -> int:
+        """Advance book_ids.seq by ``count`` and return its new value.
+
+        The sequence is first raised to the highest ID in the catalog, so
+        blocks start above books added with an explicit ID. That is one
+        streamed scan of the IDs per block; saves never touch book_ids.seq.
+        """
+        floor = self._max_book_id()
+        with self._commit_lock():
+            value = max(self._read_id_sequence(), floor) + count
+            self._write_id_sequence(value)
+        return value
+
+    def _read_id_sequence(self) -> int:
+        try:
+            return int(self.id_sequence_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return 0
+
+    def _write_id_sequence(self, value: int) -> None:
+        temp_file = self.id_sequence_file.with_name(
+            f"book_ids.seq.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        temp_file.write_text(str(value), encoding="utf-8")
+        os.replace(temp_file, self.id_sequence_file)
 
     def get_book_by_id(self, book_id: int) -> Optional[Book]:
         """Get a book by integer ID."""
@@ -92,28 +459,137 @@ class BookStorage:
 
     def add_book(self, book: Book) -> bool:
         """Add a book to storage."""
-        books = self.load_books()
-        if any(b.id == book.id for b in books):
-            logger.warning("Book with ID %s already exists", book.id)
-            return False
-        books.append(book)
-        return self.save_books(books)
+
+        def apply(books: List[Book]) -> Optional[List[Book]]:
+            if any(b.id == book.id for b in books):
+                logger.warning("Book with ID %s already exists", book.id)
+                return None
+            books.append(book)
+            return books
+
+        return self._mutate(apply)
 
     def update_book(self, book: Book) -> bool:
-        """Update an existing book in storage."""
-        books = self.load_books()
-        for i, b in enumerate(books):
-            if b.id == book.id:
-                books[i] = book
-                return self.save_books(books)
-        logger.warning("Book with ID %s not found for update", book.id)
-        return False
+        """Update an existing book if its stored version matches ``book.version``.
+
+        On success ``book.version`` is incremented to the stored value.
+
+        Raises:
+            VersionConflictError: The stored book was changed since it was read
+        """
+
+        def apply(books: List[Book]) -> Optional[List[Book]]:
+            for i, b in enumerate(books):
+                if b.id == book.id:
+                    if b.version != book.version:
+                        raise VersionConflictError([book.id])
+                    books[i] = replace(book, version=book.version + 1)
+                    return books
+            logger.warning("Book with ID %s not found for update", book.id)
+            return None
+
+        if not self._mutate(apply):
+            return False
+        book.version += 1
+        return True
 
     def remove_book(self, book_id: int) -> bool:
         """Remove a book from storage by ID."""
-        books = self.load_books()
-        new_books = [b for b in books if b.id != book_id]
-        if len(new_books) == len(books):
-            logger.warning("Book with ID %s not found for removal", book_id)
+
+        def apply(books: List[Book]) -> Optional[List[Book]]:
+            new_books = [b for b in books if b.id != book_id]
+            if len(new_books) == len(books):
+                logger.warning("Book with ID %s not found for removal", book_id)
+                return None
+            return new_books
+
+        return self._mutate(apply)
+
+    def get_books_by_ids(self, book_ids: Iterable[int]) -> Dict[int, Book]:
+        """Get several books with a single file read (missing IDs are omitted)."""
+        wanted = set(book_ids)
+        return {b.id: b for b in self.load_books() if b.id in wanted}
+
+    def update_books(self, books: List[Book]) -> bool:
+        """Replace several existing books with one read and one atomic write.
+
+        Books whose stored version matches are written and get their
+        ``version`` incremented; stale ones are left untouched.
+
+        Raises:
+            VersionConflictError: Some books were stale (the rest were written)
+        """
+        by_id = {b.id: b for b in books}
+        conflicts: List[int] = []
+
+        def apply(current: List[Book]) -> Optional[List[Book]]:
+            stored = {b.id: b.version for b in current if b.id in by_id}
+            if len(stored) != len(by_id):
+                logger.warning(
+                    "Batch update: %d of %d books not found",
+                    len(by_id) - len(stored),
+                    len(by_id),
+                )
+                return None
+            conflicts[:] = [i for i, v in stored.items() if v != by_id[i].version]
+            if len(conflicts) == len(by_id):
+                return None
+            stale = set(conflicts)
+            return [
+                (
+                    replace(by_id[b.id], version=b.version + 1)
+                    if b.id in by_id and b.id not in stale
+                    else b
+                )
+                for b in current
+            ]
+
+        written = self._mutate(apply)
+        if not written and len(conflicts) < len(by_id):
             return False
-        return self.save_books(new_books)
+        if written:
+            stale = set(conflicts)
+            for book in by_id.values():
+                if book.id not in stale:
+                    book.version += 1
+        if conflicts:
+            raise VersionConflictError(conflicts)
+        return True
+
+    def remove_books(self, book_ids: Iterable[int]) -> bool:
+        """Remove several books with one read and one atomic write."""
+        wanted = set(book_ids)
+
+        def apply(books: List[Book]) -> Optional[List[Book]]:
+            new_books = [b for b in books if b.id not in wanted]
+            if len(books) - len(new_books) != len(wanted):
+                logger.warning("Batch removal: some of %d books not found", len(wanted))
+                return None
+            return new_books
+
+        return self._mutate(apply)
+
+    def add_books(self, books: List[Book]) -> List[int]:
+        """Add several books with one read and one atomic write.
+
+        Books whose ID already exists (or repeats within ``books``) are skipped.
+
+        Returns:
+            IDs of the books actually added
+        """
+        added: List[int] = []
+
+        def apply(current: List[Book]) -> Optional[List[Book]]:
+            added.clear()
+            seen = {b.id for b in current}
+            for book in books:
+                if book.id in seen:
+                    continue
+                seen.add(book.id)
+                current.append(book)
+                added.append(book.id)
+            return current if added else None
+
+        if not self._mutate(apply):
+            return []
+        return added
@@ -0,0 +1,35 @@
+"""Exceptions raised by storage implementations."""
+
+from typing import Iterable
+
+
+class VersionConflictError(Exception):
+    """A conditional update found a newer version of the record in storage.
+
+    Raised by ``update_book``/``update_books`` when the version the caller
+    read is no longer current (another process wrote in between). For batch
+    updates the non-conflicting books have already been written and
+    ``book_ids`` lists the ones that were not. The MongoDB ``remove_books``
+    raises it the same way for books it could not delete.
+    """
+
+    def __init__(self, book_ids: Iterable[int]):
+        self.book_ids = list(book_ids)
+        super().__init__(
+            f"Version conflict for book(s): {', '.join(map(str, self.book_ids))}"
+        )
+
+
+class StorageUnavailableError(Exception):
+    """The storage backend is known to be down; the call was not attempted.
+
+    Raised by the MongoDB circuit breaker while it is open: for writes, and
+    for reads that no snapshot can answer. ``retry_after`` is the number of
+    seconds until the next recovery probe.
+    """
+
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(
+            f"Database unavailable (read-only mode), retry in {retry_after}s"
+        )
@@ -0,0 +1,129 @@
+"""Catalog change events in an append-only JSON lines file."""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from lib_logging.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are not serialized across processes
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# Once the log grows past this, the older half is dropped
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+# Bytes read from the end of the file to find the last event
+_TAIL_BYTES = 64 * 1024
+
+
+class FileEventLog:
+    """Change events (see ``EventLog``) in ``data/events.jsonl``, one per line.
+
+    Appends take an inter-process lock only long enough to number the new
+    events after the last line and write them. Readers never lock: a line
+    still being written has no trailing newline yet and is left for the
+    next read. Each instance remembers how far into the file it has read,
+    so polling for new events only reads what was appended since.
+    """
+
+    def __init__(
+        self, data_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        if data_dir is None:
+            data_dir = Path(__file__).parent.parent / "data"
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.events_file = self.data_dir / "events.jsonl"
+        self.lock_file = self.data_dir / "events.jsonl.lock"
+        self.max_bytes = max_bytes
+        # (inode, offset, id): every line before offset has an id <= id
+        self._cursor: Optional[Tuple[int, int, int]] = None
+
+    @contextmanager
+    def _append_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def latest_id(self) -> int:
+        try:
+            with open(self.events_file, "rb") as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - _TAIL_BYTES))
+                tail = f.read()
+        except FileNotFoundError:
+            return 0
+        # The last element is "" or a line still being written
+        for line in reversed(tail.split(b"\n")[:-1]):
+            try:
+                return int(json.loads(line)["id"])
+            except (ValueError, KeyError, TypeError):
+                continue
+        return 0
+
+    def append(self, events: List[dict]) -> List[dict]:
+        if not events:
+            return []
+        with self._append_lock():
+            last = self.latest_id()
+            now = time.time()
+            stored = [dict(e, id=last + i, at=now) for i, e in enumerate(events, 1)]
+            data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in stored)
+            with open(self.events_file, "a", encoding="utf-8") as f:
+                f.write(data)
+            if self.events_file.stat().st_size > self.max_bytes:
+                self._truncate()
+        return stored
+
+    def _truncate(self) -> None:
+        """Keep the newer half of the log (caller holds the append lock)."""
+        with open(self.events_file, "rb") as f:
+            f.seek(-(self.max_bytes // 2), os.SEEK_END)
+            f.readline()  # skip to a line boundary
+            rest = f.read()
+        temp_file = self.events_file.with_name(
+            f"events.jsonl.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        temp_file.write_bytes(rest)
+        os.replace(temp_file, self.events_file)
+        logger.info(f"Truncated the event log to {len(rest)} bytes")
+
+    def read_after(self, after: int, limit: int = 1000) -> List[dict]:
+        try:
+            f = open(self.events_file, "rb")
+        except FileNotFoundError:
+            return []
+        events: List[dict] = []
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            cursor = self._cursor
+            if cursor is not None and cursor[0] == inode and cursor[2] <= after:
+                f.seek(cursor[1])
+            while len(events) < limit:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    event = json.loads(line)
+                    event_id = int(event["id"])
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"Skipping a corrupt line in {self.events_file}")
+                    continue
+                if event_id > after:
+                    events.append(event)
+                self._cursor = (inode, f.tell(), event_id)
+        return events
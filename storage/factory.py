@@ -19,9 +19,18 @@ class StorageFactory:
 
         if storage_type == "mongodb":
             from storage.mongodb.book_storage import MongoDBBookStorage
+            from storage.mongodb.cache import CachedMongoDBBookStorage, cache_from_env
+            from storage.mongodb.circuit_breaker import CircuitBreakerBookStorage
 
             if "book_storage_mongodb" not in cls._instances:
-                cls._instances["book_storage_mongodb"] = MongoDBBookStorage()
+                storage = MongoDBBookStorage()
+                cache = cache_from_env("books")
+                if cache is not None:
+                    storage = CachedMongoDBBookStorage(storage, cache)
+                breaker = cls._mongodb_breaker()
+                if breaker is not None:
+                    storage = CircuitBreakerBookStorage(storage, breaker)
+                cls._instances["book_storage_mongodb"] = storage
             return cls._instances["book_storage_mongodb"]
 
         elif storage_type == "json":
@@ -49,10 +58,19 @@ class StorageFactory:
         storage_type = os.getenv("DATABASE_TYPE", "json").lower()
 
         if storage_type == "mongodb":
+            from storage.mongodb.cache import CachedMongoDBUserStorage, cache_from_env
+            from storage.mongodb.circuit_breaker import CircuitBreakerUserStorage
             from storage.mongodb.user_storage import MongoDBUserStorage
 
             if "user_storage_mongodb" not in cls._instances:
-                cls._instances["user_storage_mongodb"] = MongoDBUserStorage()
+                storage = MongoDBUserStorage()
+                cache = cache_from_env("users")
+                if cache is not None:
+                    storage = CachedMongoDBUserStorage(storage, cache)
+                breaker = cls._mongodb_breaker()
+                if breaker is not None:
+                    storage = CircuitBreakerUserStorage(storage, breaker)
+                cls._instances["user_storage_mongodb"] = storage
             return cls._instances["user_storage_mongodb"]
 
         elif storage_type == "json":
@@ -73,6 +91,73 @@ class StorageFactory:
             logger.error(f"Unknown database type: {storage_type}")
             raise ValueError(f"Unsupported DATABASE_TYPE: {storage_type}")
 
+    @classmethod
+    def _mongodb_breaker(cls):
+        """The circuit breaker shared by this process's MongoDB storages."""
+        if "mongodb_breaker" not in cls._instances:
+            from storage.mongodb.circuit_breaker import breaker_from_env
+
+            cls._instances["mongodb_breaker"] = breaker_from_env()
+        return cls._instances["mongodb_breaker"]
+
+    @classmethod
+    def create_event_log(cls):
+        """Create the catalog change event log for the configured backend."""
+        storage_type = os.getenv("DATABASE_TYPE", "json").lower()
+
+        if storage_type == "mongodb":
+            from storage.mongodb.event_log import MongoDBEventLog
+
+            if "event_log_mongodb" not in cls._instances:
+                cls._instances["event_log_mongodb"] = MongoDBEventLog()
+            return cls._instances["event_log_mongodb"]
+
+        elif storage_type == "json":
+            from storage.event_log import FileEventLog
+
+            if "event_log_json" not in cls._instances:
+                cls._instances["event_log_json"] = FileEventLog()
+            return cls._instances["event_log_json"]
+
+        elif storage_type == "fake":
+            from storage.fake.event_log import FakeEventLog
+
+            if "event_log_fake" not in cls._instances:
+                cls._instances["event_log_fake"] = FakeEventLog()
+            return cls._instances["event_log_fake"]
+
+        else:
+            logger.error(f"Unknown database type: {storage_type}")
+            raise ValueError(f"Unsupported DATABASE_TYPE: {storage_type}")
+
+    @classmethod
+    def create_rate_limit_store(cls):
+        """Create the rate limiter's bucket store.
+
+        Buckets live in this process unless ``RATE_LIMIT_STORE=shared`` and
+        the backend is MongoDB, in which case all processes share them.
+        """
+        shared = os.getenv("RATE_LIMIT_STORE", "memory").lower() == "shared"
+        storage_type = os.getenv("DATABASE_TYPE", "json").lower()
+
+        if shared and storage_type == "mongodb":
+            from storage.mongodb.rate_limit_store import MongoDBRateLimitStore
+
+            if "rate_limit_store_mongodb" not in cls._instances:
+                cls._instances["rate_limit_store_mongodb"] = MongoDBRateLimitStore()
+            return cls._instances["rate_limit_store_mongodb"]
+
+        if shared:
+            logger.warning(
+                f"Shared rate limit buckets need MongoDB, not {storage_type}; "
+                "using per-process buckets"
+            )
+        from storage.rate_limit_store import MemoryRateLimitStore
+
+        if "rate_limit_store_memory" not in cls._instances:
+            cls._instances["rate_limit_store_memory"] = MemoryRateLimitStore()
+        return cls._instances["rate_limit_store_memory"]
+
     @classmethod
     def reset(cls) -> None:
         """Reset all cached instances (useful for testing)."""
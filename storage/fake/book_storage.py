@@ -4,10 +4,13 @@ This implementation mirrors the public API of the production storages but
 keeps everything in memory for deterministic, fast tests.
 """
 
-from typing import List, Optional
+from dataclasses import replace
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
 
 from lib_logging.logger import get_logger
-from models.book import Book
+from models.book import Book, BookStatus
+from storage.errors import VersionConflictError
+from storage.migrations import CURRENT_SCHEMA_VERSION
 
 logger = get_logger(__name__)
 
@@ -15,19 +18,42 @@ logger = get_logger(__name__)
 class FakeBookStorage:
     """In-memory book storage used for tests."""
 
+    # Records are produced by ``Book.to_dict``, so always in the current shape
+    schema_version = CURRENT_SCHEMA_VERSION
+
     def __init__(self):
         self._books: List[Book] = []
         self._next_id: int = 1
+        self._version: int = 0
+
+    def ping(self) -> None:
+        pass
 
+    # Books are handed out as copies so callers holding a stale copy see a
+    # version conflict, exactly like with the persistent backends.
     def load_books(self) -> List[Book]:
-        return list(self._books)
+        return [replace(b) for b in self._books]
+
+    def catalog_version(self) -> str:
+        return str(self._version)
+
+    def iter_book_records(
+        self, fields: Optional[Sequence[str]] = None
+    ) -> Iterator[dict]:
+        return (b.to_dict() for b in list(self._books))
+
+    def find_books_by_status(self, status: BookStatus) -> List[Book]:
+        found = [replace(b) for b in self._books if b.status == status]
+        return sorted(found, key=lambda b: b.id)
 
     def _reset(self) -> None:
         self._books = []
         self._next_id = 1
+        self._version += 1
 
     def save_books(self, books: List[Book]) -> bool:
-        self._books = list(books)
+        self._books = [replace(b) for b in books]
+        self._version += 1
         return True
 
     def get_next_book_id(self) -> int:
@@ -35,23 +61,33 @@ class FakeBookStorage:
         self._next_id += 1
         return nid
 
+    def get_next_book_ids(self, count: int) -> List[int]:
+        ids = list(range(self._next_id, self._next_id + count))
+        self._next_id += count
+        return ids
+
     def get_book_by_id(self, book_id: int) -> Optional[Book]:
         for b in self._books:
             if b.id == book_id:
-                return b
+                return replace(b)
         return None
 
     def add_book(self, book: Book) -> bool:
         if any(b.id == book.id for b in self._books):
             logger.warning("Book with ID %s already exists", book.id)
             return False
-        self._books.append(book)
+        self._books.append(replace(book))
+        self._version += 1
         return True
 
     def update_book(self, book: Book) -> bool:
         for i, b in enumerate(self._books):
             if b.id == book.id:
-                self._books[i] = book
+                if b.version != book.version:
+                    raise VersionConflictError([book.id])
+                book.version += 1
+                self._books[i] = replace(book)
+                self._version += 1
                 return True
         logger.warning("Book with ID %s not found for update", book.id)
         return False
@@ -62,4 +98,53 @@ class FakeBookStorage:
             logger.warning("Book with ID %s not found for removal", book_id)
             return False
         self._books = new_books
+        self._version += 1
+        return True
+
+    def get_books_by_ids(self, book_ids: Iterable[int]) -> Dict[int, Book]:
+        wanted = set(book_ids)
+        return {b.id: replace(b) for b in self._books if b.id in wanted}
+
+    def update_books(self, books: List[Book]) -> bool:
+        by_id = {b.id: b for b in books}
+        if len(by_id) != sum(1 for b in self._books if b.id in by_id):
+            logger.warning("Batch update: some of %d books not found", len(by_id))
+            return False
+        conflicts = []
+        for i, b in enumerate(self._books):
+            new = by_id.get(b.id)
+            if new is None:
+                continue
+            if b.version != new.version:
+                conflicts.append(b.id)
+                continue
+            new.version += 1
+            self._books[i] = replace(new)
+        if len(conflicts) < len(by_id):
+            self._version += 1
+        if conflicts:
+            raise VersionConflictError(conflicts)
+        return True
+
+    def remove_books(self, book_ids: Iterable[int]) -> bool:
+        wanted = set(book_ids)
+        new_books = [b for b in self._books if b.id not in wanted]
+        if len(self._books) - len(new_books) != len(wanted):
+            logger.warning("Batch removal: some of %d books not found", len(wanted))
+            return False
+        self._books = new_books
+        self._version += 1
         return True
+
+    def add_books(self, books: List[Book]) -> List[int]:
+        seen = {b.id for b in self._books}
+        added: List[int] = []
+        for book in books:
+            if book.id in seen:
+                continue
+            seen.add(book.id)
+            self._books.append(replace(book))
+            added.append(book.id)
+        if added:
+            self._version += 1
+        return added
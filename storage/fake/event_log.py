@@ -0,0 +1,33 @@
+"""In-memory (fake) change event log used for unit tests and CI."""
+
+import threading
+import time
+from typing import List
+
+from lib_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class FakeEventLog:
+    """In-memory event log used for tests."""
+
+    def __init__(self):
+        self._events: List[dict] = []
+        self._lock = threading.Lock()
+
+    def append(self, events: List[dict]) -> List[dict]:
+        with self._lock:
+            last = self._events[-1]["id"] if self._events else 0
+            now = time.time()
+            stored = [dict(e, id=last + i, at=now) for i, e in enumerate(events, 1)]
+            self._events.extend(stored)
+        return [dict(e) for e in stored]
+
+    def read_after(self, after: int, limit: int = 1000) -> List[dict]:
+        with self._lock:
+            return [dict(e) for e in self._events if e["id"] > after][:limit]
+
+    def latest_id(self) -> int:
+        with self._lock:
+            return self._events[-1]["id"] if self._events else 0
@@ -21,6 +21,9 @@ class FakeUserStorage:
     def _reset(self) -> None:
         self._users = []
 
+    def ping(self) -> None:
+        pass
+
     def load_users(self) -> List[User]:
         return list(self._users)
 
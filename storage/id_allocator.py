@@ -0,0 +1,84 @@
+"""Block-allocated id sequences.
+
+Instead of one atomic counter update per new entity, the shared counter is
+advanced by a whole block of ids at once and the block is handed out from
+memory. Processes reserve disjoint blocks, so ids stay unique across
+processes, but they are not dense: ids left in a block when a process
+exits are never used, and ids from concurrent processes interleave rather
+than strictly increase.
+
+To keep those gaps small for short-lived processes (a one-shot CLI
+command adds one book), the first block is exactly as large as the first
+request and each further block doubles, up to ``ID_BLOCK_SIZE`` (default
+100). Only processes that keep allocating reach full-size blocks.
+"""
+
+import os
+import threading
+from typing import Callable, List, Optional
+
+from lib_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+BLOCK_SIZE_ENV = "ID_BLOCK_SIZE"
+DEFAULT_BLOCK_SIZE = 100
+
+
+def block_size_from_env() -> int:
+    """``ID_BLOCK_SIZE`` if it is a positive integer, else the default."""
+    raw = os.environ.get(BLOCK_SIZE_ENV)
+    if not raw:
+        return DEFAULT_BLOCK_SIZE
+    try:
+        size = int(raw)
+        if size < 1:
+            raise ValueError(raw)
+        return size
+    except ValueError:
+        logger.error(f"Ignoring {BLOCK_SIZE_ENV}={raw!r}: expected a positive integer")
+        return DEFAULT_BLOCK_SIZE
+
+
+class IdBlockAllocator:
+    """Hand out ids from blocks reserved with ``reserve``.
+
+    ``reserve(count)`` must atomically advance the shared counter by
+    ``count`` and return its new value; the ids ``value - count + 1`` to
+    ``value`` then belong to this allocator. Blocks grow from one id to
+    ``block_size`` (see the module docstring); a request larger than the
+    block is reserved whole. Thread-safe.
+    """
+
+    def __init__(self, reserve: Callable[[int], int], block_size: Optional[int] = None):
+        self._reserve = reserve
+        self.block_size = block_size or block_size_from_env()
+        # Size of the next block, doubled after each reservation
+        self._grow = 1
+        self._lock = threading.Lock()
+        self._next = 1
+        self._end = 0  # last id of the current block; next > end means empty
+
+    def next_id(self) -> int:
+        return self.next_ids(1)[0]
+
+    def next_ids(self, count: int) -> List[int]:
+        """``count`` unused ids, with at most one ``reserve`` call."""
+        with self._lock:
+            ids = list(range(self._next, min(self._next + count, self._end + 1)))
+            self._next += len(ids)
+            missing = count - len(ids)
+            if missing > 0:
+                size = max(missing, self._grow)
+                self._grow = min(self._grow * 2, self.block_size)
+                last = self._reserve(size)
+                first = last - size + 1
+                ids.extend(range(first, first + missing))
+                self._next, self._end = first + missing, last
+            return ids
+
+    def reset(self) -> None:
+        """Forget the current block (after the shared counter was reset)."""
+        with self._lock:
+            self._next, self._end = 1, 0
+            self._grow = 1
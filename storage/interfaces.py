@@ -5,7 +5,7 @@ Dependency Inversion and enables different implementations (JSON, MongoDB,
 in-memory/fake) to be substituted without changing business logic.
 """
 
-from typing import List, Optional, Protocol
+from typing import Dict, Iterable, List, Optional, Protocol, Tuple
 
 from models.book import Book
 from models.role import Role
@@ -19,10 +19,21 @@ class BookRepository(Protocol):
 
     def add_book(self, book: Book) -> bool: ...
 
+    # Conditional on ``book.version``: raises VersionConflictError if the
+    # stored record changed since it was read, bumps ``book.version`` on success.
     def update_book(self, book: Book) -> bool: ...
 
     def remove_book(self, book_id: int) -> bool: ...
 
+    # Batch operations: one read / one write (or bulk_write) per call.
+    def get_books_by_ids(self, book_ids: Iterable[int]) -> Dict[int, Book]: ...
+
+    def add_books(self, books: List[Book]) -> List[int]: ...
+
+    def update_books(self, books: List[Book]) -> bool: ...
+
+    def remove_books(self, book_ids: Iterable[int]) -> bool: ...
+
 
 class UserRepository(Protocol):
     def load_users(self) -> List[User]: ...
@@ -40,3 +51,23 @@ class UserRepository(Protocol):
     def remove_user(self, user_id: int) -> bool: ...
 
     def user_exists(self, username: str) -> bool: ...
+
+
+class RateLimitStore(Protocol):
+    # Token bucket ``key``: refill at ``rate`` tokens/s up to ``burst``, then
+    # try to take ``cost``. Returns (allowed, seconds until it would be).
+    def take(
+        self, key: str, rate: float, burst: float, cost: float = 1.0
+    ) -> Tuple[bool, float]: ...
+
+
+class EventLog(Protocol):
+    # Store change events in order, numbering them with increasing ``id``s
+    # (and stamping ``at``); returns the events as stored.
+    def append(self, events: List[dict]) -> List[dict]: ...
+
+    # Up to ``limit`` events with an ``id`` above ``after``, oldest first.
+    def read_after(self, after: int, limit: int = 1000) -> List[dict]: ...
+
+    # Highest ``id`` handed out so far (0 before the first event).
+    def latest_id(self) -> int: ...
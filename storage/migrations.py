@@ -0,0 +1,161 @@
+"""Versioned schema migrations for stored book records.
+
+Book records written by older releases may hold digit-string ids, legacy
+status spellings (``"BORROWED"``, ``"available"``), empty optional fields
+and leftover keys. ``Book.from_dict`` copes with all of that on every
+read. The migrations below rewrite the stored records once instead, and
+each backend records the schema version it reached:
+
+* JSON: ``data/schema.json`` (``{"books": <version>}``), see ``BookStorage``
+* MongoDB: the ``books`` document of the ``schema_migrations`` collection,
+  see ``storage.mongodb.migrations``
+
+A storage whose data is at ``CURRENT_SCHEMA_VERSION`` decodes with
+``Book.from_record`` and streams its records without re-encoding them
+(``schema_is_current``). The version is read when the storage is created,
+so processes started before a migration keep the defensive path until
+they restart.
+
+Migrations run online: the JSON backend rewrites books.json with the same
+compare-and-swap as every other writer, and MongoDB documents are updated
+in ``_id`` order in batches, each update guarded by the values it replaces,
+with a resume point saved after every batch. Every writer already stores
+records in the current shape, so a record changed concurrently needs no
+migrating.
+
+Run them with ``python scripts/migrate_schema.py``.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from lib_logging.logger import get_logger
+from models.book import parse_status
+
+logger = get_logger(__name__)
+
+# Documents scanned per MongoDB batch
+DEFAULT_BATCH_SIZE = 1000
+
+_BOOK_FIELDS = ("id", "title", "author", "status", "picked_by", "isbn", "version")
+# Bookkeeping keys a backend keeps next to the record (MongoDB ``_id``)
+_BACKEND_KEYS = ("_id",)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema step: ``upgrade`` returns the record itself if unchanged."""
+
+    version: int
+    description: str
+    upgrade: Callable[[dict], dict]
+
+
+def _integer_ids(record: dict) -> dict:
+    book_id = record.get("id")
+    if isinstance(book_id, str) and book_id.strip().isdigit():
+        return dict(record, id=int(book_id))
+    return record
+
+
+def _canonical_statuses(record: dict) -> dict:
+    status = record.get("status")
+    canonical = parse_status(status).value
+    if status == canonical:
+        return record
+    return dict(record, status=canonical)
+
+
+def _book_fields_only(record: dict) -> dict:
+    isbn = record.get("isbn")
+    if isbn and not isinstance(isbn, str):
+        record = dict(record, isbn=str(isbn))
+    keep = _BOOK_FIELDS + _BACKEND_KEYS
+    drop = [
+        key
+        for key, value in record.items()
+        if key not in keep or (key in ("picked_by", "isbn", "version") and not value)
+    ]
+    if not drop:
+        return record
+    return {key: value for key, value in record.items() if key not in drop}
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "book ids are integers", _integer_ids),
+    Migration(2, "statuses use the canonical BookStatus values", _canonical_statuses),
+    Migration(
+        3,
+        "records hold only Book fields; empty isbn/picked_by/version are omitted",
+        _book_fields_only,
+    ),
+]
+
+CURRENT_SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def upgrade_record(record: dict, from_version: int = 0) -> dict:
+    """Apply every migration after ``from_version``; ``record`` itself if unchanged."""
+    for migration in MIGRATIONS:
+        if migration.version > from_version:
+            record = migration.upgrade(record)
+    return record
+
+
+def schema_is_current(storage) -> bool:
+    """True if ``storage`` reports data at ``CURRENT_SCHEMA_VERSION``.
+
+    Its records then equal ``Book.from_dict(record).to_dict()`` and can be
+    passed on as they are.
+    """
+    return getattr(storage, "schema_version", 0) >= CURRENT_SCHEMA_VERSION
+
+
+@dataclass
+class MigrationReport:
+    """Outcome of one ``migrate_books`` run."""
+
+    from_version: int
+    to_version: int = CURRENT_SCHEMA_VERSION
+    scanned: int = 0
+    updated: int = 0
+    # Updates rejected by the backend (duplicate ids after conversion)
+    conflicts: int = 0
+    # Continued from the resume point of an interrupted run
+    resumed: bool = False
+
+    @property
+    def completed(self) -> bool:
+        return self.conflicts == 0
+
+
+def migrate_json_books(storage) -> MigrationReport:
+    """Bring books.json of a ``BookStorage`` to the current schema."""
+    report = MigrationReport(storage.schema_version)
+    if report.from_version >= CURRENT_SCHEMA_VERSION:
+        return report
+    report.updated, report.scanned = storage.rewrite_records(
+        lambda record: upgrade_record(record, report.from_version)
+    )
+    storage.set_schema_version(CURRENT_SCHEMA_VERSION)
+    logger.info(
+        f"Migrated books.json from schema {report.from_version} to "
+        f"{CURRENT_SCHEMA_VERSION}: {report.updated} of {report.scanned} records"
+    )
+    return report
+
+
+def migrate_books(
+    storage,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Callable[[MigrationReport], None]] = None,
+) -> MigrationReport:
+    """Run the pending migrations on a JSON or MongoDB book storage."""
+    if callable(getattr(storage, "rewrite_records", None)):
+        report = migrate_json_books(storage)
+        if progress is not None:
+            progress(report)
+        return report
+    from storage.mongodb.migrations import migrate_mongodb_books
+
+    return migrate_mongodb_books(storage, batch_size, progress)
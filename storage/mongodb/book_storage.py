@@ -1,18 +1,30 @@
 """MongoDB implementation of book storage."""
 
-from typing import List, Optional
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
 
-from pymongo import ASCENDING
+from pymongo import ReplaceOne
 from pymongo.collection import Collection
-from pymongo.errors import PyMongoError
+from pymongo.errors import BulkWriteError, PyMongoError
 
 from config.database import MongoDBConnection
 from lib_logging.logger import get_logger
-from models.book import Book
+from lib_logging.slow_ops import instrument
+from models.book import Book, BookStatus
+from storage.errors import VersionConflictError
+from storage.id_allocator import IdBlockAllocator
+from storage.migrations import CURRENT_SCHEMA_VERSION
+from storage.mongodb.indexes import ensure_collection_indexes
+from storage.mongodb.migrations import read_schema_version
 
 logger = get_logger(__name__)
 
+# Tags the documents replaced by one ``update_books`` call (see there);
+# not part of a book record, so it is left out of raw reads.
+WRITE_TAG = "_write"
 
+
+@instrument("mongodb")
 class MongoDBBookStorage:
     """MongoDB implementation of book storage with auto-incrementing ID support."""
 
@@ -21,23 +33,27 @@ class MongoDBBookStorage:
         self.db = MongoDBConnection.get_database()
         self.collection: Collection = self.db["books"]
         self.id_counter: Collection = self.db["book_id_counter"]
+        # One counter round trip per block of IDs, not per insert
+        self._ids = IdBlockAllocator(self._reserve_ids)
         self._ensure_indexes()
         self._ensure_counter()
+        # Schema of the stored documents (see storage.mongodb.migrations)
+        self.schema_version = self._read_schema_version()
 
-    def _ensure_indexes(self) -> None:
-        """Create necessary indexes for efficient querying."""
+    def _read_schema_version(self) -> int:
         try:
-            # Index on book ID for quick lookups
-            self.collection.create_index([("id", ASCENDING)], unique=True)
-            # Index on title for searching
-            self.collection.create_index([("title", ASCENDING)])
-            # Index on author for searching
-            self.collection.create_index([("author", ASCENDING)])
-            # Index on status for filtering
-            self.collection.create_index([("status", ASCENDING)])
-            logger.info("Book collection indexes ensured")
+            return read_schema_version(self.db)
         except PyMongoError as e:
-            logger.warning(f"Error creating indexes: {e}")
+            logger.warning(f"Could not read the books schema version: {e}")
+            return 0
+
+    def _ensure_indexes(self) -> None:
+        """Create the registry's book indexes (see storage.mongodb.indexes).
+
+        Non-unique indexes are built on a background thread.
+        """
+        self._index_build = ensure_collection_indexes(self.collection)
+        logger.info("Book collection indexes ensured")
 
     def _ensure_counter(self) -> None:
         """Ensure ID counter exists."""
@@ -45,21 +61,29 @@ class MongoDBBookStorage:
             self.id_counter.insert_one({"_id": "book_id", "sequence_value": 0})
             logger.info("Initialized book ID counter")
 
-    def _get_next_id(self) -> int:
-        """Get the next book ID using atomic increment."""
+    def _reserve_ids(self, count: int) -> int:
+        """Atomically advance the book ID counter by ``count``; returns its new value."""
         try:
             result = self.id_counter.find_one_and_update(
                 {"_id": "book_id"},
-                {"$inc": {"sequence_value": 1}},
+                {"$inc": {"sequence_value": count}},
                 return_document=True,
             )
             if result is None:
                 raise RuntimeError("Book ID counter missing")
             return int(result["sequence_value"])
         except PyMongoError as e:
-            logger.error(f"Error getting next ID: {e}")
+            logger.error(f"Error reserving book IDs: {e}")
             raise
 
+    def _get_next_id(self) -> int:
+        """Get the next book ID from the block reserved by this process."""
+        return self._ids.next_id()
+
+    def ping(self) -> None:
+        """Round trip to the server (raises ``PyMongoError`` if unreachable)."""
+        self.db.command("ping")
+
     def load_books(self) -> List[Book]:
         """Load all books from MongoDB."""
         try:
@@ -72,6 +96,21 @@ class MongoDBBookStorage:
             logger.error(f"Error loading books: {e}")
             raise
 
+    def iter_book_records(
+        self, fields: Optional[Sequence[str]] = None
+    ) -> Iterator[dict]:
+        """Stream raw book documents (no ``Book`` objects), optionally projected."""
+        projection: dict = {"_id": 0}
+        if fields:
+            projection.update({f: 1 for f in fields})
+        else:
+            projection[WRITE_TAG] = 0
+        try:
+            yield from self.collection.find({}, projection).sort("id", 1)
+        except PyMongoError as e:
+            logger.error(f"Error streaming books: {e}")
+            raise
+
     def get_book_by_id(self, book_id: int) -> Optional[Book]:
         """Get a specific book by ID."""
         try:
@@ -83,10 +122,27 @@ class MongoDBBookStorage:
             logger.error(f"Error getting book {book_id}: {e}")
             raise
 
+    def find_books_by_status(self, status: BookStatus) -> List[Book]:
+        """Books with ``status``, sorted by id.
+
+        Picked and Borrowed listings are served by the partial
+        ``(status, id)`` index, which leaves out the available books.
+        """
+        try:
+            cursor = self.collection.find({"status": status.value}).sort("id", 1)
+            return [self._doc_to_book(doc) for doc in cursor]
+        except PyMongoError as e:
+            logger.error(f"Error listing {status.value} books: {e}")
+            raise
+
     def get_next_book_id(self) -> int:
         """Get the next available book ID."""
         return self._get_next_id()
 
+    def get_next_book_ids(self, count: int) -> List[int]:
+        """Get ``count`` unused book IDs with at most one counter update."""
+        return self._ids.next_ids(count)
+
     def add_book(self, book: Book) -> bool:
         """Add a new book to MongoDB."""
         try:
@@ -98,15 +154,40 @@ class MongoDBBookStorage:
             logger.error(f"Error adding book: {e}")
             return False
 
+    @staticmethod
+    def _version_filter(book: Book) -> dict:
+        """Match ``book`` only at the version the caller read.
+
+        Documents written before versioning have no ``version`` field and
+        count as version 0.
+        """
+        if book.version:
+            return {"id": book.id, "version": book.version}
+        return {"id": book.id, "version": {"$in": [0, None]}}
+
+    def _versioned_doc(self, book: Book) -> dict:
+        doc = self._book_to_doc(book)
+        doc["version"] = book.version + 1
+        return doc
+
     def update_book(self, book: Book) -> bool:
-        """Update an existing book in MongoDB."""
+        """Update an existing book if its stored version matches ``book.version``.
+
+        Raises:
+            VersionConflictError: The stored book was changed since it was read
+        """
         try:
-            doc = self._book_to_doc(book)
-            result = self.collection.replace_one({"id": book.id}, doc)
+            result = self.collection.replace_one(
+                self._version_filter(book), self._versioned_doc(book)
+            )
             if result.matched_count == 0:
+                if self.collection.count_documents({"id": book.id}, limit=1):
+                    logger.info(f"Version conflict updating book {book.id}")
+                    raise VersionConflictError([book.id])
                 logger.warning(f"Book {book.id} not found for update")
                 return False
-            logger.info(f"Updated book {book.id}")
+            book.version += 1
+            logger.info(f"Updated book {book.id} to version {book.version}")
             return True
         except PyMongoError as e:
             logger.error(f"Error updating book {book.id}: {e}")
@@ -125,6 +206,136 @@ class MongoDBBookStorage:
             logger.error(f"Error removing book {book_id}: {e}")
             return False
 
+    def get_books_by_ids(self, book_ids: Iterable[int]) -> Dict[int, Book]:
+        """Get several books with a single ``$in`` query."""
+        ids = list(book_ids)
+        try:
+            books = {}
+            for doc in self.collection.find({"id": {"$in": ids}}):
+                book = self._doc_to_book(doc)
+                books[book.id] = book
+            return books
+        except PyMongoError as e:
+            logger.error(f"Error getting {len(ids)} books: {e}")
+            raise
+
+    def add_books(self, books: List[Book]) -> List[int]:
+        """Insert several books with one unordered ``insert_many``.
+
+        Duplicate IDs are rejected by the unique ``id`` index and skipped.
+
+        Returns:
+            IDs of the books actually added
+        """
+        if not books:
+            return []
+        docs = [self._book_to_doc(b) for b in books]
+        try:
+            self.collection.insert_many(docs, ordered=False)
+            failed: set = set()
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            failed = {err["index"] for err in errors}
+            non_dup = [err for err in errors if err.get("code") != 11000]
+            if non_dup:
+                logger.error(f"Bulk insert errors: {non_dup[:3]}")
+        except PyMongoError as e:
+            logger.error(f"Error adding {len(books)} books: {e}")
+            return []
+        added = [b.id for i, b in enumerate(books) if i not in failed]
+        logger.info(f"Bulk inserted {len(added)} of {len(books)} books")
+        return added
+
+    def update_books(self, books: List[Book]) -> bool:
+        """Replace several existing books with one ``bulk_write`` round trip.
+
+        Each replace is conditional on the book's version; matching books are
+        written and get their ``version`` incremented.
+
+        Raises:
+            VersionConflictError: Some books were stale (the rest were written)
+        """
+        if not books:
+            return True
+        tag = uuid.uuid4().hex
+        try:
+            ops = [
+                ReplaceOne(
+                    self._version_filter(b), {**self._versioned_doc(b), WRITE_TAG: tag}
+                )
+                for b in books
+            ]
+            result = self.collection.bulk_write(ops, ordered=False)
+            if result.matched_count == len(ops):
+                for b in books:
+                    b.version += 1
+                logger.info(f"Updated {len(ops)} books in one bulk write")
+                return True
+
+            # Find out which replaces matched: only those documents carry this
+            # call's tag (a concurrent writer may have reached the same version).
+            written = {
+                doc["id"]
+                for doc in self.collection.find(
+                    {"id": {"$in": [b.id for b in books]}, WRITE_TAG: tag},
+                    {"_id": 0, "id": 1},
+                )
+            }
+            conflicts = []
+            for b in books:
+                if b.id in written:
+                    b.version += 1
+                else:
+                    conflicts.append(b.id)
+            logger.info(
+                f"Batch update matched {result.matched_count} of {len(ops)} books, "
+                f"version conflict on {len(conflicts)}"
+            )
+            raise VersionConflictError(conflicts)
+        except PyMongoError as e:
+            logger.error(f"Error updating {len(books)} books: {e}")
+            return False
+
+    def remove_books(self, book_ids: Iterable[int]) -> bool:
+        """Remove several books with one ``delete_many``.
+
+        ``delete_many`` is not atomic, so if it deletes fewer books than
+        asked (or fails part way) the books still stored are looked up: the
+        ones gone count as removed, the others are reported like stale
+        batch updates so the caller can re-check them.
+
+        Raises:
+            VersionConflictError: Some books are still stored (the rest are gone)
+        """
+        ids = list(dict.fromkeys(book_ids))
+        failed = False
+        try:
+            result = self.collection.delete_many({"id": {"$in": ids}})
+            if result.deleted_count == len(ids):
+                logger.info(f"Removed {result.deleted_count} books")
+                return True
+            logger.warning(
+                f"Batch removal deleted {result.deleted_count} of {len(ids)} books"
+            )
+        except PyMongoError as e:
+            logger.error(f"Error removing {len(ids)} books: {e}")
+            failed = True
+        try:
+            remaining = {
+                doc["id"]
+                for doc in self.collection.find(
+                    {"id": {"$in": ids}}, {"_id": 0, "id": 1}
+                )
+            }
+        except PyMongoError as e:
+            logger.error(f"Could not check which of {len(ids)} books were removed: {e}")
+            return False
+        if failed and len(remaining) == len(ids):
+            return False
+        if remaining:
+            raise VersionConflictError([i for i in ids if i in remaining])
+        return True
+
     def search_books(self, **kwargs) -> List[Book]:
         """Search books by various criteria."""
         try:
@@ -146,25 +357,17 @@ class MongoDBBookStorage:
 
     @staticmethod
     def _book_to_doc(book: Book) -> dict:
-        """Convert Book object to MongoDB document."""
-        return {
-            "id": book.id,
-            "title": book.title,
-            "author": book.author,
-            "status": book.status.value,
-            "picked_by": book.picked_by,
-        }
+        """Convert Book object to MongoDB document (shared ``Book.to_dict`` codec)."""
+        return book.to_dict()
 
-    @staticmethod
-    def _doc_to_book(doc: dict) -> Book:
+    def _doc_to_book(self, doc: dict) -> Book:
         """Convert MongoDB document to Book object using model deserializer.
 
-        Use `Book.from_dict` to centralize parsing/validation (handles string
-        IDs, unknown status strings and ignores extra fields). This makes the
-        storage layer more robust to schema drift.
+        Until the collection is migrated to the current schema, `Book.from_dict`
+        centralizes parsing/validation (handles string IDs and unknown status
+        strings); afterwards `Book.from_record` skips those coercions. Both
+        ignore extra fields such as `_id`.
         """
-        # Ensure `id` is an int when stored as a string in some environments
-        if isinstance(doc.get("id"), str) and doc["id"].isdigit():
-            doc = dict(doc)
-            doc["id"] = int(doc["id"])
+        if self.schema_version >= CURRENT_SCHEMA_VERSION:
+            return Book.from_record(doc)
         return Book.from_dict(doc)
@@ -0,0 +1,378 @@
+"""Read-through caching for the MongoDB repositories.
+
+Lookups by key (``get_book_by_id``, ``get_books_by_ids``, ``get_user_by_id``,
+``get_user_by_username``) are answered from a bounded LRU cache whose
+entries expire after a TTL; everything else goes straight to the wrapped
+storage. Writes made through the wrapper invalidate the entries they touch.
+
+Writes by other processes (CLI commands, other server replicas) are applied
+by a change stream listener when the server is a replica set, as Atlas
+always is. On a standalone server there are no change streams and the TTL
+bounds how long another process's write can go unseen. Lookups that find
+nothing are not cached, so a newly registered user can log in everywhere at
+once.
+
+``MONGO_CACHE_SIZE`` sets the entries per collection (default 10000, ``0``
+disables caching) and ``MONGO_CACHE_TTL`` the lifetime in seconds
+(default 5).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from pymongo.errors import PyMongoError
+
+from lib_logging.logger import get_logger
+from models.book import Book
+from models.role import Role
+from models.user import User
+
+try:
+    from prometheus_client import Counter
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+CACHE_SIZE_ENV = "MONGO_CACHE_SIZE"
+CACHE_TTL_ENV = "MONGO_CACHE_TTL"
+DEFAULT_CACHE_SIZE = 10_000
+DEFAULT_CACHE_TTL = 5.0
+
+# Longest pause between attempts to reopen a failed change stream
+MAX_WATCH_DELAY = 30.0
+
+if PROMETHEUS_AVAILABLE:
+    STORAGE_CACHE_EVENTS_TOTAL = Counter(
+        "library_storage_cache_events_total",
+        "Repository cache lookups and removals",
+        ["cache", "event"],  # hit, miss, evicted, expired, invalidated
+    )
+
+
+def _count(cache: str, event: str, amount: int = 1) -> None:
+    if PROMETHEUS_AVAILABLE and amount:
+        STORAGE_CACHE_EVENTS_TOTAL.labels(cache=cache, event=event).inc(amount)
+
+
+class LRUCache:
+    """Thread-safe LRU mapping whose entries expire ``ttl`` seconds after a put."""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        ttl: float = DEFAULT_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Bumped by every invalidation; see put()
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > self._clock():
+                    self._entries.move_to_end(key)
+                    _count(self.name, "hit")
+                    return value
+                del self._entries[key]
+                _count(self.name, "expired")
+        _count(self.name, "miss")
+        return None
+
+    def put(self, key: Hashable, value: Any, generation: int) -> None:
+        """Store ``value`` read while ``self.generation`` was ``generation``.
+
+        If anything was invalidated since, the value may predate that write
+        and is dropped rather than cached.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        _count(self.name, "evicted", evicted)
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            self.generation += 1
+            removed = sum(self._entries.pop(key, None) is not None for key in keys)
+        _count(self.name, "invalidated", removed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            removed = len(self._entries)
+            self._entries.clear()
+        _count(self.name, "invalidated", removed)
+
+
+def cache_from_env(name: str) -> Optional[LRUCache]:
+    """A cache configured by ``MONGO_CACHE_SIZE``/``MONGO_CACHE_TTL``, or None."""
+    try:
+        size = int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_CACHE_SIZE))
+        ttl = float(os.environ.get(CACHE_TTL_ENV, DEFAULT_CACHE_TTL))
+    except ValueError as e:
+        logger.error(f"Ignoring invalid cache settings: {e}")
+        size, ttl = DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL
+    if size <= 0 or ttl <= 0:
+        return None
+    return LRUCache(name, size, ttl)
+
+
+def supports_change_streams(db) -> bool:
+    """True when connected to a replica set or sharded cluster."""
+    try:
+        hello = db.client.admin.command("hello")
+    except PyMongoError as e:
+        logger.warning(f"Cannot tell whether change streams are available: {e}")
+        return False
+    return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+
+class ChangeStreamInvalidator:
+    """Background thread feeding a collection's change events to a cache.
+
+    ``on_change`` gets each event (with the post-write document for inserts,
+    updates and replaces). ``on_gap`` is called whenever events may have
+    been missed: when the stream is (re)opened after a failure.
+    """
+
+    def __init__(
+        self,
+        collection,
+        on_change: Callable[[dict], None],
+        on_gap: Callable[[], None],
+    ):
+        self.collection = collection
+        self.on_change = on_change
+        self.on_gap = on_gap
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"cache-invalidator-{self.collection.name}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        delay = 1.0
+        while not self._stop.is_set():
+            try:
+                with self.collection.watch(
+                    full_document="updateLookup", max_await_time_ms=1000
+                ) as stream:
+                    # Writes between the last event seen and now are lost
+                    self.on_gap()
+                    delay = 1.0
+                    while not self._stop.is_set():
+                        change = stream.try_next()
+                        if change is not None:
+                            self.on_change(change)
+            except PyMongoError as e:
+                logger.warning(
+                    f"Change stream on {self.collection.name} failed, "
+                    f"retrying in {delay:.0f}s: {e}"
+                )
+                self.on_gap()
+                self._stop.wait(delay)
+                delay = min(delay * 2, MAX_WATCH_DELAY)
+
+
+class _CachedStorage:
+    """Shared plumbing: delegation, and the change stream listener."""
+
+    def __init__(self, storage, cache: LRUCache, watch: bool = True):
+        self._storage = storage
+        self.cache = cache
+        self._watcher: Optional[ChangeStreamInvalidator] = None
+        if watch and supports_change_streams(storage.db):
+            self._watcher = ChangeStreamInvalidator(
+                storage.collection, self._on_change, cache.clear
+            )
+            self._watcher.start()
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything that is not cached goes to the wrapped storage
+        if name == "_storage":
+            raise AttributeError(name)
+        return getattr(self._storage, name)
+
+    def _on_change(self, change: dict) -> None:
+        self.cache.clear()
+
+    def stop_watching(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+
+
+class CachedMongoDBBookStorage(_CachedStorage):
+    """``MongoDBBookStorage`` with read-through caching of books by id."""
+
+    def _on_change(self, change: dict) -> None:
+        doc = change.get("fullDocument")
+        if doc and "id" in doc:
+            self.cache.invalidate(doc["id"])
+        else:
+            # Deletes only carry the ObjectId, not the book id
+            self.cache.clear()
+
+    def get_book_by_id(self, book_id: int) -> Optional[Book]:
+        book = self.cache.get(book_id)
+        if book is not None:
+            return replace(book)
+        generation = self.cache.generation
+        book = self._storage.get_book_by_id(book_id)
+        if book is not None:
+            self.cache.put(book_id, replace(book), generation)
+        return book
+
+    def get_books_by_ids(self, book_ids: Iterable[int]) -> Dict[int, Book]:
+        """Cached books, plus one ``$in`` query for the rest."""
+        books: Dict[int, Book] = {}
+        missing: List[int] = []
+        for book_id in book_ids:
+            book = self.cache.get(book_id)
+            if book is None:
+                missing.append(book_id)
+            else:
+                books[book_id] = replace(book)
+        if missing:
+            generation = self.cache.generation
+            fetched = self._storage.get_books_by_ids(missing)
+            for book_id, book in fetched.items():
+                self.cache.put(book_id, replace(book), generation)
+            books.update(fetched)
+        return books
+
+    def add_book(self, book: Book) -> bool:
+        try:
+            return self._storage.add_book(book)
+        finally:
+            self.cache.invalidate(book.id)
+
+    def update_book(self, book: Book) -> bool:
+        # Also on VersionConflictError: the cached copy is the stale one
+        try:
+            return self._storage.update_book(book)
+        finally:
+            self.cache.invalidate(book.id)
+
+    def remove_book(self, book_id: int) -> bool:
+        try:
+            return self._storage.remove_book(book_id)
+        finally:
+            self.cache.invalidate(book_id)
+
+    def add_books(self, books: List[Book]) -> List[int]:
+        try:
+            return self._storage.add_books(books)
+        finally:
+            self.cache.invalidate(*(b.id for b in books))
+
+    def update_books(self, books: List[Book]) -> bool:
+        try:
+            return self._storage.update_books(books)
+        finally:
+            self.cache.invalidate(*(b.id for b in books))
+
+    def remove_books(self, book_ids: Iterable[int]) -> bool:
+        ids = list(book_ids)
+        try:
+            return self._storage.remove_books(ids)
+        finally:
+            self.cache.invalidate(*ids)
+
+
+def _copy_user(user: User) -> User:
+    return replace(user, borrowed_book_ids=list(user.borrowed_book_ids))
+
+
+class CachedMongoDBUserStorage(_CachedStorage):
+    """``MongoDBUserStorage`` with read-through caching by id and username.
+
+    A user is cached under both keys. Any user write clears the whole cache
+    (a renamed user would otherwise stay cached under the old name); user
+    writes are rare next to logins.
+    """
+
+    def _lookup(self, key: tuple, load: Callable[[], Optional[User]]):
+        user = self.cache.get(key)
+        if user is not None:
+            return _copy_user(user)
+        generation = self.cache.generation
+        user = load()
+        if user is not None:
+            self.cache.put(("id", user.id), _copy_user(user), generation)
+            self.cache.put(("username", user.username), _copy_user(user), generation)
+        return user
+
+    def get_user_by_id(self, user_id: int) -> Optional[User]:
+        return self._lookup(
+            ("id", user_id), lambda: self._storage.get_user_by_id(user_id)
+        )
+
+    def get_user_by_username(self, username: str) -> Optional[User]:
+        return self._lookup(
+            ("username", username),
+            lambda: self._storage.get_user_by_username(username),
+        )
+
+    def user_exists(self, username: str) -> bool:
+        try:
+            return self.get_user_by_username(username) is not None
+        except Exception:
+            return False
+
+    def add_user(self, user: User) -> bool:
+        try:
+            return self._storage.add_user(user)
+        finally:
+            self.cache.clear()
+
+    def create_user(self, username: str, password: str, role: Role) -> Optional[User]:
+        try:
+            return self._storage.create_user(username, password, role)
+        finally:
+            self.cache.clear()
+
+    def update_user(self, user: User) -> bool:
+        try:
+            return self._storage.update_user(user)
+        finally:
+            self.cache.clear()
+
+    def remove_user(self, user_id: int) -> bool:
+        try:
+            return self._storage.remove_user(user_id)
+        finally:
+            self.cache.clear()
@@ -0,0 +1,367 @@
+"""Circuit breaker and degraded read-only mode for the MongoDB storages.
+
+Without a breaker every repository call made while Atlas is unreachable
+blocks for the full server selection timeout. The breaker counts
+consecutive outage errors (connection failures and timeouts, not rejected
+queries); after ``MONGO_BREAKER_FAILURES`` of them (default 3, ``0``
+disables the breaker) it opens and calls fail fast:
+
+* Reads are answered from the last full catalog read (``load_books`` or an
+  unprojected ``iter_book_records``, kept at most every
+  ``SNAPSHOT_INTERVAL`` seconds) and from the users seen so far. Storages
+  expose ``stale_since`` (the snapshot's wall-clock time) while they do
+  this, so responses can be flagged as stale.
+* Writes raise ``StorageUnavailableError``. They are rejected rather than
+  queued: a queued update would be applied later on top of a record its
+  caller never saw.
+
+A background thread pings the server every ``MONGO_BREAKER_PROBE_INTERVAL``
+seconds (default 5) while the breaker is open and closes it on the first
+success. Book and user storages share one breaker per process.
+"""
+
+import math
+import os
+import threading
+import time
+from dataclasses import replace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from pymongo.errors import ConnectionFailure, ExecutionTimeout, WTimeoutError
+
+from lib_logging.logger import get_logger
+from models.book import Book, BookStatus
+from models.role import Role
+from models.user import User
+from storage.errors import StorageUnavailableError
+
+try:
+    from prometheus_client import Counter, Gauge
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+FAILURES_ENV = "MONGO_BREAKER_FAILURES"
+PROBE_INTERVAL_ENV = "MONGO_BREAKER_PROBE_INTERVAL"
+DEFAULT_FAILURES = 3
+DEFAULT_PROBE_INTERVAL = 5.0
+
+# Minimum seconds between two catalog snapshots
+SNAPSHOT_INTERVAL = 30.0
+
+# The server is unreachable or too slow. Other errors (duplicate keys,
+# validation) come from a healthy server and do not count.
+OUTAGE_ERRORS = (ConnectionFailure, ExecutionTimeout, WTimeoutError)
+
+if PROMETHEUS_AVAILABLE:
+    CIRCUIT_OPEN = Gauge(
+        "library_storage_circuit_open",
+        "1 while the MongoDB circuit breaker is open",
+        multiprocess_mode="max",
+    )
+    CIRCUIT_SHORT_CIRCUITS_TOTAL = Counter(
+        "library_storage_circuit_short_circuits_total",
+        "Storage calls answered without MongoDB while the breaker was open",
+        ["outcome"],  # stale_read, rejected
+    )
+
+
+def _short_circuit(outcome: str) -> None:
+    if PROMETHEUS_AVAILABLE:
+        CIRCUIT_SHORT_CIRCUITS_TOTAL.labels(outcome=outcome).inc()
+
+
+class CircuitBreaker:
+    """Fail fast after ``failure_threshold`` consecutive outage errors."""
+
+    def __init__(
+        self,
+        probe: Callable[[], Any],
+        failure_threshold: int = DEFAULT_FAILURES,
+        probe_interval: float = DEFAULT_PROBE_INTERVAL,
+    ):
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.probe_interval))
+
+    def check(self) -> None:
+        """Raise ``StorageUnavailableError`` if the breaker is open."""
+        if self.is_open:
+            _short_circuit("rejected")
+            raise StorageUnavailableError(self.retry_after())
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        self.check()
+        try:
+            result = fn(*args, **kwargs)
+        except OUTAGE_ERRORS:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def record_success(self) -> None:
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.is_open or self.failures < self.failure_threshold:
+                return
+            self.opened_at = time.time()
+        logger.error(
+            f"MongoDB circuit breaker opened after {self.failures} failures; "
+            f"serving reads from snapshots, probing every {self.probe_interval}s"
+        )
+        if PROMETHEUS_AVAILABLE:
+            CIRCUIT_OPEN.set(1)
+        threading.Thread(
+            target=self._probe_until_recovered, name="mongodb-breaker", daemon=True
+        ).start()
+
+    def _probe_until_recovered(self) -> None:
+        while True:
+            time.sleep(self.probe_interval)
+            try:
+                self.probe()
+            except Exception as e:
+                logger.warning(f"MongoDB still unavailable: {e}")
+                continue
+            with self._lock:
+                self.failures = 0
+                self.opened_at = None
+            if PROMETHEUS_AVAILABLE:
+                CIRCUIT_OPEN.set(0)
+            logger.info("MongoDB reachable again, circuit breaker closed")
+            return
+
+
+def breaker_from_env() -> Optional[CircuitBreaker]:
+    """The process's breaker as configured by the environment, or None."""
+    from config.database import MongoDBConnection
+
+    try:
+        failures = int(os.environ.get(FAILURES_ENV, DEFAULT_FAILURES))
+        interval = float(os.environ.get(PROBE_INTERVAL_ENV, DEFAULT_PROBE_INTERVAL))
+    except ValueError as e:
+        logger.error(f"Ignoring invalid circuit breaker settings: {e}")
+        failures, interval = DEFAULT_FAILURES, DEFAULT_PROBE_INTERVAL
+    if failures <= 0:
+        return None
+    return CircuitBreaker(
+        lambda: MongoDBConnection.get_connection().admin.command("ping"),
+        failure_threshold=failures,
+        probe_interval=max(interval, 0.1),
+    )
+
+
+class _GuardedStorage:
+    """Delegation to the wrapped storage for everything not guarded here."""
+
+    def __init__(self, storage, breaker: CircuitBreaker):
+        self._storage = storage
+        self.breaker = breaker
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_storage":
+            raise AttributeError(name)
+        return getattr(self._storage, name)
+
+    def _degraded(self, available: bool) -> bool:
+        """True if the breaker is open; raises if nothing can be served."""
+        if not self.breaker.is_open:
+            return False
+        if not available:
+            self.breaker.check()
+        _short_circuit("stale_read")
+        return True
+
+
+class CircuitBreakerBookStorage(_GuardedStorage):
+    """Book storage that falls back to a catalog snapshot while MongoDB is down."""
+
+    def __init__(self, storage, breaker: CircuitBreaker):
+        super().__init__(storage, breaker)
+        self._records: Optional[List[dict]] = None
+        self._by_id: Dict[int, dict] = {}
+        self._snapshot_at = 0.0  # wall-clock time
+
+    @property
+    def stale_since(self) -> Optional[float]:
+        """When the data being served was read, if it is a snapshot."""
+        if self.breaker.is_open and self._records is not None:
+            return self._snapshot_at
+        return None
+
+    def _snapshot_due(self) -> bool:
+        return time.time() - self._snapshot_at >= SNAPSHOT_INTERVAL
+
+    def _keep_snapshot(self, records: List[dict]) -> None:
+        self._by_id = {int(r["id"]): r for r in records if "id" in r}
+        self._records, self._snapshot_at = records, time.time()
+        logger.debug(f"Kept a snapshot of {len(records)} books")
+
+    def _snapshot_book(self, book_id: int) -> Optional[Book]:
+        record = self._by_id.get(book_id)
+        return Book.from_dict(record) if record else None
+
+    def load_books(self) -> List[Book]:
+        if self._degraded(self._records is not None):
+            return [Book.from_dict(r) for r in self._records or []]
+        books = self.breaker.call(self._storage.load_books)
+        if self._snapshot_due():
+            self._keep_snapshot([b.to_dict() for b in books])
+        return books
+
+    def iter_book_records(
+        self, fields: Optional[Sequence[str]] = None
+    ) -> Iterator[dict]:
+        # Not a generator itself: an open breaker with no snapshot raises
+        # here, before a caller has started sending a response
+        if self._degraded(self._records is not None):
+            return self._iter_snapshot(self._records or [], fields)
+        self.breaker.check()
+        return self._iter_live(fields)
+
+    @staticmethod
+    def _iter_snapshot(
+        records: List[dict], fields: Optional[Sequence[str]]
+    ) -> Iterator[dict]:
+        for record in records:
+            yield {f: record.get(f) for f in fields} if fields else dict(record)
+
+    def _iter_live(self, fields: Optional[Sequence[str]]) -> Iterator[dict]:
+        keep: Optional[List[dict]] = None
+        if not fields and self._snapshot_due():
+            keep = []
+        try:
+            for record in self._storage.iter_book_records(fields):
+                if keep is not None:
+                    keep.append(record)
+                yield record
+        except OUTAGE_ERRORS:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        if keep is not None:
+            self._keep_snapshot(keep)
+
+    def get_book_by_id(self, book_id: int) -> Optional[Book]:
+        if self._degraded(self._records is not None):
+            return self._snapshot_book(book_id)
+        return self.breaker.call(self._storage.get_book_by_id, book_id)
+
+    def get_books_by_ids(self, book_ids: Iterable[int]) -> Dict[int, Book]:
+        if self._degraded(self._records is not None):
+            found = (self._snapshot_book(i) for i in book_ids)
+            return {b.id: b for b in found if b is not None}
+        return self.breaker.call(self._storage.get_books_by_ids, book_ids)
+
+    def find_books_by_status(self, status: BookStatus) -> List[Book]:
+        if self._degraded(self._records is not None):
+            books = [Book.from_dict(r) for r in self._records or []]
+            return sorted((b for b in books if b.status == status), key=lambda b: b.id)
+        return self.breaker.call(self._storage.find_books_by_status, status)
+
+    def get_next_book_id(self) -> int:
+        return self.breaker.call(self._storage.get_next_book_id)
+
+    def get_next_book_ids(self, count: int) -> List[int]:
+        return self.breaker.call(self._storage.get_next_book_ids, count)
+
+    def add_book(self, book: Book) -> bool:
+        return self.breaker.call(self._storage.add_book, book)
+
+    def update_book(self, book: Book) -> bool:
+        return self.breaker.call(self._storage.update_book, book)
+
+    def remove_book(self, book_id: int) -> bool:
+        return self.breaker.call(self._storage.remove_book, book_id)
+
+    def add_books(self, books: List[Book]) -> List[int]:
+        return self.breaker.call(self._storage.add_books, books)
+
+    def update_books(self, books: List[Book]) -> bool:
+        return self.breaker.call(self._storage.update_books, books)
+
+    def remove_books(self, book_ids: Iterable[int]) -> bool:
+        return self.breaker.call(self._storage.remove_books, book_ids)
+
+
+class CircuitBreakerUserStorage(_GuardedStorage):
+    """User storage that answers from the users seen so far while MongoDB is down."""
+
+    def __init__(self, storage, breaker: CircuitBreaker):
+        super().__init__(storage, breaker)
+        self._known: Dict[str, User] = {}
+
+    def _remember(self, user: Optional[User]) -> Optional[User]:
+        if user is not None:
+            self._known[user.username] = replace(
+                user, borrowed_book_ids=list(user.borrowed_book_ids)
+            )
+        return user
+
+    def _known_user(self, username: str) -> Optional[User]:
+        user = self._known.get(username)
+        if user is None:
+            return None
+        return replace(user, borrowed_book_ids=list(user.borrowed_book_ids))
+
+    def load_users(self) -> List[User]:
+        if self._degraded(bool(self._known)):
+            return [self._known_user(name) for name in self._known]
+        users = self.breaker.call(self._storage.load_users)
+        self._known = {}
+        for user in users:
+            self._remember(user)
+        return users
+
+    def get_user_by_id(self, user_id: int) -> Optional[User]:
+        if self._degraded(bool(self._known)):
+            for user in self._known.values():
+                if user.id == user_id:
+                    return self._known_user(user.username)
+            return None
+        return self._remember(self.breaker.call(self._storage.get_user_by_id, user_id))
+
+    def get_user_by_username(self, username: str) -> Optional[User]:
+        if self._degraded(bool(self._known)):
+            return self._known_user(username)
+        return self._remember(
+            self.breaker.call(self._storage.get_user_by_username, username)
+        )
+
+    def user_exists(self, username: str) -> bool:
+        return self.get_user_by_username(username) is not None
+
+    def add_user(self, user: User) -> bool:
+        return self.breaker.call(self._storage.add_user, user)
+
+    def create_user(self, username: str, password: str, role: Role) -> Optional[User]:
+        return self._remember(
+            self.breaker.call(self._storage.create_user, username, password, role)
+        )
+
+    def update_user(self, user: User) -> bool:
+        updated = self.breaker.call(self._storage.update_user, user)
+        if updated:
+            self._remember(user)
+        return updated
+
+    def remove_user(self, user_id: int) -> bool:
+        self._known = {n: u for n, u in self._known.items() if u.id != user_id}
+        return self.breaker.call(self._storage.remove_user, user_id)
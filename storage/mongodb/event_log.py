@@ -0,0 +1,72 @@
+"""MongoDB change event log, shared by every process using the database."""
+
+import time
+from datetime import datetime, timezone
+from typing import List
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+
+from config.database import MongoDBConnection
+from lib_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Events are removed by a TTL index this long after they were written
+DEFAULT_RETENTION_SECONDS = 24 * 60 * 60
+
+
+class MongoDBEventLog:
+    """Change events (see ``EventLog``) in the ``book_events`` collection.
+
+    Ids come from a counter document advanced once per ``append``. Two
+    processes appending at the same time may insert their events out of id
+    order, so a reader can briefly see a gap in the ids; readers that must
+    not miss events wait a little before skipping one (see
+    ``web.events.ChangeFeed``).
+    """
+
+    def __init__(self, retention_seconds: int = DEFAULT_RETENTION_SECONDS):
+        self.db = MongoDBConnection.get_database()
+        self.collection: Collection = self.db["book_events"]
+        self.id_counter: Collection = self.db["event_id_counter"]
+        self.retention_seconds = retention_seconds
+        self._ensure_indexes()
+
+    def _ensure_indexes(self) -> None:
+        try:
+            self.collection.create_index([("id", ASCENDING)], unique=True)
+            self.collection.create_index(
+                [("created_at", ASCENDING)], expireAfterSeconds=self.retention_seconds
+            )
+        except PyMongoError as e:
+            logger.warning(f"Error creating event log indexes: {e}")
+
+    def append(self, events: List[dict]) -> List[dict]:
+        if not events:
+            return []
+        counter = self.id_counter.find_one_and_update(
+            {"_id": "event_id"},
+            {"$inc": {"sequence_value": len(events)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        first = int(counter["sequence_value"]) - len(events) + 1
+        now = time.time()
+        stored = [dict(e, id=first + i, at=now) for i, e in enumerate(events)]
+        created_at = datetime.now(timezone.utc)
+        self.collection.insert_many([dict(e, created_at=created_at) for e in stored])
+        return stored
+
+    def read_after(self, after: int, limit: int = 1000) -> List[dict]:
+        cursor = (
+            self.collection.find({"id": {"$gt": after}}, {"_id": 0, "created_at": 0})
+            .sort("id", ASCENDING)
+            .limit(limit)
+        )
+        return list(cursor)
+
+    def latest_id(self) -> int:
+        counter = self.id_counter.find_one({"_id": "event_id"})
+        return int(counter["sequence_value"]) if counter else 0
@@ -0,0 +1,223 @@
+"""Declarative MongoDB index registry and an ``explain()``-based query advisor.
+
+``INDEXES`` lists every index the application relies on, per collection.
+The storages ensure their collection's entries when they are created
+(unique indexes right away, the others on a background thread so a large
+collection does not hold up startup), and ``scripts/init_mongodb.py``
+builds them all up front.
+
+``QUERIES`` lists the shapes of the queries the repositories send.
+``advise`` runs each through ``explain()`` and reports the ones answered
+by a collection scan or an in-memory sort; ``scripts/index_advisor.py``
+prints that report. Keep both lists in step with the storages' queries.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
+
+from lib_logging.logger import get_logger
+from models.book import BookStatus
+
+logger = get_logger(__name__)
+
+Keys = Tuple[Tuple[str, int], ...]
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """One index: ``keys`` plus options, and the queries it is there for."""
+
+    keys: Keys
+    unique: bool = False
+    # Index only documents matching this filter (partialFilterExpression)
+    partial: Optional[dict] = None
+    purpose: str = ""
+
+    @property
+    def name(self) -> str:
+        base = "_".join(f"{k}_{d}" for k, d in self.keys)
+        return f"{base}_partial" if self.partial else base
+
+    def model(self) -> IndexModel:
+        options: dict = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.partial:
+            options["partialFilterExpression"] = self.partial
+        return IndexModel(list(self.keys), **options)
+
+
+# Picked and Borrowed sort after "Available", so this matches exactly the
+# books that are not available (statuses are canonical, see
+# storage.migrations)
+NOT_AVAILABLE = {"status": {"$gt": BookStatus.AVAILABLE.value}}
+
+INDEXES: Dict[str, List[IndexSpec]] = {
+    "books": [
+        IndexSpec((("id", ASCENDING),), unique=True, purpose="lookups by id"),
+        IndexSpec((("title", ASCENDING),), purpose="title search"),
+        IndexSpec((("author", ASCENDING),), purpose="author search"),
+        IndexSpec((("status", ASCENDING),), purpose="status filters"),
+        IndexSpec(
+            (("status", ASCENDING), ("id", ASCENDING)),
+            partial=NOT_AVAILABLE,
+            purpose="picked/borrowed listings sorted by id",
+        ),
+        IndexSpec(
+            (("picked_by", ASCENDING), ("id", ASCENDING)),
+            partial={"picked_by": {"$exists": True}},
+            purpose="books held by a user",
+        ),
+    ],
+    "users": [
+        IndexSpec((("id", ASCENDING),), unique=True, purpose="lookups by id"),
+        IndexSpec((("username", ASCENDING),), unique=True, purpose="login"),
+        IndexSpec((("role", ASCENDING),), purpose="role filters"),
+    ],
+}
+
+
+def ensure_indexes(collection: Collection, specs: Sequence[IndexSpec]) -> int:
+    """Create ``specs`` on ``collection`` (existing ones are a no-op).
+
+    Each index is created on its own, so one failure (e.g. an index of the
+    same name with other options) does not stop the rest. Returns how many
+    could not be created.
+    """
+    failed = 0
+    for spec in specs:
+        try:
+            collection.create_indexes([spec.model()])
+        except PyMongoError as e:
+            failed += 1
+            logger.warning(f"Could not create index {collection.name}.{spec.name}: {e}")
+    return failed
+
+
+def ensure_indexes_in_background(
+    collection: Collection, specs: Sequence[IndexSpec]
+) -> Optional[threading.Thread]:
+    """``ensure_indexes`` on a daemon thread (None if there is nothing to do)."""
+    if not specs:
+        return None
+
+    def build() -> None:
+        failed = ensure_indexes(collection, specs)
+        logger.info(
+            f"{collection.name} indexes ensured in the background "
+            f"({len(specs) - failed} of {len(specs)})"
+        )
+
+    thread = threading.Thread(
+        target=build, name=f"index-build-{collection.name}", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def ensure_collection_indexes(collection: Collection) -> Optional[threading.Thread]:
+    """Ensure the registry's indexes for ``collection`` as the storages do.
+
+    Unique indexes are created before returning, since they guard writes;
+    the rest are built on the returned background thread.
+    """
+    specs = INDEXES.get(collection.name, [])
+    ensure_indexes(collection, [s for s in specs if s.unique])
+    return ensure_indexes_in_background(collection, [s for s in specs if not s.unique])
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """A query a repository sends, with representative values."""
+
+    name: str
+    collection: str
+    filter: dict
+    sort: Keys = ()
+
+
+QUERIES: List[QueryShape] = [
+    QueryShape("book by id", "books", {"id": 1}),
+    QueryShape("books by ids", "books", {"id": {"$in": [1, 2, 3]}}),
+    QueryShape("catalog sorted by id", "books", {}, (("id", ASCENDING),)),
+    QueryShape(
+        "picked books sorted by id",
+        "books",
+        {"status": BookStatus.PICKED.value},
+        (("id", ASCENDING),),
+    ),
+    QueryShape("books by status", "books", {"status": BookStatus.AVAILABLE.value}),
+    QueryShape("books held by a user", "books", {"picked_by": "user"}),
+    QueryShape("title search", "books", {"title": {"$regex": "a", "$options": "i"}}),
+    QueryShape("user by id", "users", {"id": 1}),
+    QueryShape("user by username", "users", {"username": "user"}),
+    QueryShape("users sorted by id", "users", {}, (("id", ASCENDING),)),
+    QueryShape("users by role", "users", {"role": "user"}),
+]
+
+
+def plan_stages(plan: dict) -> List[dict]:
+    """Every stage of an explain plan tree, root first."""
+    # Slot-based engine plans nest the classic tree under "queryPlan"
+    plan = plan.get("queryPlan", plan)
+    stages = [plan]
+    for child in [plan.get("inputStage")] + list(plan.get("inputStages", [])):
+        if child:
+            stages.extend(plan_stages(child))
+    return stages
+
+
+@dataclass
+class QueryAdvice:
+    """How MongoDB plans to answer one ``QueryShape``."""
+
+    query: QueryShape
+    stages: List[str] = field(default_factory=list)
+    indexes: List[str] = field(default_factory=list)
+
+    @property
+    def collection_scan(self) -> bool:
+        return "COLLSCAN" in self.stages
+
+    @property
+    def in_memory_sort(self) -> bool:
+        return "SORT" in self.stages
+
+    @property
+    def ok(self) -> bool:
+        return not (self.collection_scan or self.in_memory_sort)
+
+
+def explain_query(db: Database, query: QueryShape) -> QueryAdvice:
+    cursor = db[query.collection].find(query.filter)
+    if query.sort:
+        cursor = cursor.sort(list(query.sort))
+    plan = cursor.explain()["queryPlanner"]["winningPlan"]
+    stages = plan_stages(plan)
+    return QueryAdvice(
+        query,
+        [s.get("stage", "?") for s in stages],
+        [s["indexName"] for s in stages if "indexName" in s],
+    )
+
+
+def advise(
+    db: Database, queries: Sequence[QueryShape] = tuple(QUERIES)
+) -> List[QueryAdvice]:
+    """Explain every query shape against ``db``."""
+    return [explain_query(db, query) for query in queries]
+
+
+def missing_indexes(db: Database) -> List[Tuple[str, IndexSpec]]:
+    """Registry entries that do not exist (by name) in ``db``."""
+    missing = []
+    for collection, specs in INDEXES.items():
+        existing = db[collection].index_information()
+        missing.extend((collection, s) for s in specs if s.name not in existing)
+    return missing
@@ -0,0 +1,133 @@
+"""Schema migrations for the MongoDB ``books`` collection.
+
+See ``storage.migrations`` for the migrations themselves. Documents are
+scanned in ``_id`` order, one batch per round trip, and every changed
+document gets an ``UpdateOne`` matching the values it replaces, so a
+document a writer changed in the meantime is left as that writer stored
+it. After each batch the last ``_id`` is saved as the resume point; an
+interrupted run picks up there. The schema version is advanced only when
+every update went through: an id that collides with an existing integer id
+after conversion is logged, and the next run scans the collection again.
+"""
+
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+
+from lib_logging.logger import get_logger
+from storage.migrations import (
+    CURRENT_SCHEMA_VERSION,
+    DEFAULT_BATCH_SIZE,
+    MigrationReport,
+    upgrade_record,
+)
+
+logger = get_logger(__name__)
+
+STATE_COLLECTION = "schema_migrations"
+_STATE_ID = "books"
+_DUPLICATE_KEY = 11000
+_MISSING = object()
+
+
+def read_schema_state(db: Database) -> dict:
+    """The ``books`` schema document (``{}`` before the first migration)."""
+    return db[STATE_COLLECTION].find_one({"_id": _STATE_ID}) or {}
+
+
+def read_schema_version(db: Database) -> int:
+    return int(read_schema_state(db).get("version", 0))
+
+
+def _update_for(doc: dict, from_version: int) -> Optional[UpdateOne]:
+    """The guarded update bringing ``doc`` to the current schema, if any."""
+    new = upgrade_record(doc, from_version)
+    if new is doc:
+        return None
+    changed = {k: v for k, v in new.items() if doc.get(k, _MISSING) != v}
+    removed = [k for k in doc if k not in new]
+    match = {"_id": doc["_id"]}
+    for key in list(changed) + removed:
+        match[key] = doc[key] if key in doc else {"$exists": False}
+    update: dict = {}
+    if changed:
+        update["$set"] = changed
+    if removed:
+        update["$unset"] = {k: "" for k in removed}
+    return UpdateOne(match, update)
+
+
+def _write(collection, ops: List[UpdateOne], report: MigrationReport) -> None:
+    try:
+        report.updated += collection.bulk_write(ops, ordered=False).modified_count
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != _DUPLICATE_KEY for err in errors):
+            raise
+        report.updated += e.details.get("nModified", 0)
+        report.conflicts += len(errors)
+        for err in errors:
+            logger.warning(f"Book not migrated, its id is taken: {err.get('op')}")
+
+
+def migrate_mongodb_books(
+    storage,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Callable[[MigrationReport], None]] = None,
+) -> MigrationReport:
+    """Bring a ``MongoDBBookStorage``'s collection to the current schema."""
+    state_collection = storage.db[STATE_COLLECTION]
+    state = read_schema_state(storage.db)
+    report = MigrationReport(int(state.get("version", 0)))
+    if report.from_version >= CURRENT_SCHEMA_VERSION:
+        return report
+
+    resume_after = None
+    if state.get("target") == CURRENT_SCHEMA_VERSION:
+        resume_after = state.get("resume_after")
+    report.resumed = resume_after is not None
+
+    while True:
+        query = {} if resume_after is None else {"_id": {"$gt": resume_after}}
+        docs = list(
+            storage.collection.find(query).sort("_id", ASCENDING).limit(batch_size)
+        )
+        if not docs:
+            break
+        ops = [_update_for(doc, report.from_version) for doc in docs]
+        ops = [op for op in ops if op is not None]
+        if ops:
+            _write(storage.collection, ops, report)
+        report.scanned += len(docs)
+        resume_after = docs[-1]["_id"]
+        state_collection.update_one(
+            {"_id": _STATE_ID},
+            {
+                "$set": {
+                    "target": CURRENT_SCHEMA_VERSION,
+                    "resume_after": resume_after,
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            },
+            upsert=True,
+        )
+        if progress is not None:
+            progress(report)
+
+    finished = {"updated_at": datetime.now(timezone.utc)}
+    if report.completed:
+        finished["version"] = CURRENT_SCHEMA_VERSION
+        storage.schema_version = CURRENT_SCHEMA_VERSION
+    state_collection.update_one(
+        {"_id": _STATE_ID},
+        {"$set": finished, "$unset": {"target": "", "resume_after": ""}},
+        upsert=True,
+    )
+    logger.info(
+        f"Migrated books from schema {report.from_version}: {report.updated} of "
+        f"{report.scanned} documents updated, {report.conflicts} conflicts"
+    )
+    return report
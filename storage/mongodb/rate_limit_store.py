@@ -0,0 +1,76 @@
+"""MongoDB token bucket store, shared by every server process."""
+
+import time
+from typing import Tuple
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+
+from config.database import MongoDBConnection
+from lib_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class MongoDBRateLimitStore:
+    """Token buckets in the ``rate_limits`` collection (see ``RateLimitStore``).
+
+    Each ``take`` is a single atomic ``find_one_and_update`` with an update
+    pipeline (MongoDB 4.2+), so concurrent workers never spend the same
+    token twice. A TTL index removes buckets once they would have refilled
+    completely.
+    """
+
+    def __init__(self):
+        self.db = MongoDBConnection.get_database()
+        self.collection: Collection = self.db["rate_limits"]
+        self._ensure_indexes()
+
+    def _ensure_indexes(self) -> None:
+        try:
+            self.collection.create_index(
+                [("expires_at", ASCENDING)], expireAfterSeconds=0
+            )
+        except PyMongoError as e:
+            logger.warning(f"Error creating rate limit indexes: {e}")
+
+    def take(
+        self, key: str, rate: float, burst: float, cost: float = 1.0
+    ) -> Tuple[bool, float]:
+        now = time.time()
+        elapsed = {"$max": [0, {"$subtract": [now, {"$ifNull": ["$updated", now]}]}]}
+        refilled = {
+            "$min": [
+                burst,
+                {
+                    "$add": [
+                        {"$ifNull": ["$tokens", burst]},
+                        {"$multiply": [elapsed, rate]},
+                    ]
+                },
+            ]
+        }
+        allowed = {"$gte": ["$tokens", cost]}
+        full_in_ms = {"$multiply": [{"$subtract": [burst, "$tokens"]}, 1000 / rate]}
+        pipeline = [
+            {"$set": {"tokens": refilled, "updated": now}},
+            {
+                "$set": {
+                    "allowed": allowed,
+                    "tokens": {
+                        "$cond": [allowed, {"$subtract": ["$tokens", cost]}, "$tokens"]
+                    },
+                }
+            },
+            {"$set": {"expires_at": {"$add": ["$$NOW", full_in_ms]}}},
+        ]
+        doc = self.collection.find_one_and_update(
+            {"_id": key},
+            pipeline,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc["allowed"]:
+            return True, 0.0
+        return False, (cost - doc["tokens"]) / rate
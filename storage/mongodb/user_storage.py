@@ -2,18 +2,21 @@
 
 from typing import List, Optional
 
-from pymongo import ASCENDING
 from pymongo.collection import Collection
 from pymongo.errors import PyMongoError
 
 from config.database import MongoDBConnection
 from lib_logging.logger import get_logger
+from lib_logging.slow_ops import instrument
 from models.role import Role
 from models.user import User
+from storage.id_allocator import IdBlockAllocator
+from storage.mongodb.indexes import ensure_collection_indexes
 
 logger = get_logger(__name__)
 
 
+@instrument("mongodb")
 class MongoDBUserStorage:
     """MongoDB implementation of user storage."""
 
@@ -22,21 +25,18 @@ class MongoDBUserStorage:
         self.db = MongoDBConnection.get_database()
         self.collection: Collection = self.db["users"]
         self.id_counter: Collection = self.db["user_id_counter"]
+        # One counter round trip per block of IDs, not per insert
+        self._ids = IdBlockAllocator(self._reserve_ids)
         self._ensure_indexes()
         self._ensure_counter()
 
     def _ensure_indexes(self) -> None:
-        """Create necessary indexes for efficient querying."""
-        try:
-            # Index on user ID for quick lookups
-            self.collection.create_index([("id", ASCENDING)], unique=True)
-            # Index on username for quick lookups
-            self.collection.create_index([("username", ASCENDING)], unique=True)
-            # Index on role for filtering
-            self.collection.create_index([("role", ASCENDING)])
-            logger.info("User collection indexes ensured")
-        except PyMongoError as e:
-            logger.warning(f"Error creating indexes: {e}")
+        """Create the registry's user indexes (see storage.mongodb.indexes).
+
+        Non-unique indexes are built on a background thread.
+        """
+        self._index_build = ensure_collection_indexes(self.collection)
+        logger.info("User collection indexes ensured")
 
     def _ensure_counter(self) -> None:
         """Ensure ID counter exists."""
@@ -44,21 +44,29 @@ class MongoDBUserStorage:
             self.id_counter.insert_one({"_id": "user_id", "sequence_value": 0})
             logger.info("Initialized user ID counter")
 
-    def _get_next_id(self) -> int:
-        """Get the next user ID using atomic increment."""
+    def _reserve_ids(self, count: int) -> int:
+        """Atomically advance the user ID counter by ``count``; returns its new value."""
         try:
             result = self.id_counter.find_one_and_update(
                 {"_id": "user_id"},
-                {"$inc": {"sequence_value": 1}},
+                {"$inc": {"sequence_value": count}},
                 return_document=True,
             )
             if result is None:
                 raise RuntimeError("User ID counter missing")
             return int(result["sequence_value"])
         except PyMongoError as e:
-            logger.error(f"Error getting next ID: {e}")
+            logger.error(f"Error reserving user IDs: {e}")
             raise
 
+    def _get_next_id(self) -> int:
+        """Get the next user ID from the block reserved by this process."""
+        return self._ids.next_id()
+
+    def ping(self) -> None:
+        """Round trip to the server (raises ``PyMongoError`` if unreachable)."""
+        self.db.command("ping")
+
     def load_users(self) -> List[User]:
         """Load all users from MongoDB."""
         try:
@@ -211,22 +219,10 @@ class MongoDBUserStorage:
 
     @staticmethod
     def _user_to_doc(user: User) -> dict:
-        """Convert User object to MongoDB document."""
-        return {
-            "id": int(user.id),
-            "username": user.username,
-            "password": user.password,
-            "role": user.role.value,
-            "borrowed_book_ids": getattr(user, "borrowed_book_ids", []),
-        }
+        """Convert User object to MongoDB document (shared ``User.to_dict`` codec)."""
+        return user.to_dict()
 
     @staticmethod
     def _doc_to_user(doc: dict) -> User:
-        """Convert MongoDB document to User object."""
-        return User(
-            id=int(doc["id"]),
-            username=doc["username"],
-            password=doc.get("password", ""),  # Backward compatibility
-            role=Role(doc["role"]),
-            borrowed_book_ids=doc.get("borrowed_book_ids", []),
-        )
+        """Convert MongoDB document to User object (shared ``User.from_dict`` codec)."""
+        return User.from_dict(doc)
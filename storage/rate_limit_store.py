@@ -0,0 +1,68 @@
+"""In-process token bucket store for the web rate limiter."""
+
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+from lib_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class MemoryRateLimitStore:
+    """Token buckets held in this process (see ``RateLimitStore``).
+
+    A bucket is one ``(tokens, updated, full_at)`` tuple in a plain dict.
+    Once ``full_at`` has passed the bucket has refilled completely and is
+    indistinguishable from a missing one, so ``sweep`` (run at most every
+    ``sweep_interval`` seconds) drops it. ``max_buckets`` bounds memory
+    under a flood of distinct keys by dropping the least recently used
+    bucket; the dict's insertion order is the LRU order.
+    """
+
+    def __init__(
+        self,
+        max_buckets: int = 100_000,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_buckets = max_buckets
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = clock() + sweep_interval
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(
+        self, key: str, rate: float, burst: float, cost: float = 1.0
+    ) -> Tuple[bool, float]:
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.pop(key, None)  # re-inserted as most recent
+            if bucket is None:
+                tokens = burst
+            else:
+                tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+
+            if len(self._buckets) > self.max_buckets:
+                del self._buckets[next(iter(self._buckets))]
+            if now >= self._next_sweep:
+                self.sweep(now)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    def sweep(self, now: float) -> int:
+        """Drop buckets that have refilled completely; returns how many."""
+        before = len(self._buckets)
+        self._buckets = {k: b for k, b in self._buckets.items() if b[2] > now}
+        self._next_sweep = now + self.sweep_interval
+        evicted = before - len(self._buckets)
+        if evicted:
+            logger.debug(f"Evicted {evicted} idle rate limit buckets")
+        return evicted
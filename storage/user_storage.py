@@ -1,17 +1,20 @@
 """User storage operations using JSON persistence."""
 
 import json
+import os
 import shutil
 from pathlib import Path
 from typing import List, Optional
 
 from lib_logging.logger import get_logger
+from lib_logging.slow_ops import instrument
 from models.role import Role
 from models.user import User
 
 logger = get_logger(__name__)
 
 
+@instrument("json")
 class UserStorage:
     """Handles user data persistence in JSON format."""
 
@@ -28,6 +31,11 @@ class UserStorage:
         self.data_dir.mkdir(exist_ok=True)
         self.users_file = self.data_dir / "users.json"
 
+    def ping(self) -> None:
+        """Raise ``OSError`` unless the data directory is writable."""
+        if not os.access(self.data_dir, os.W_OK | os.X_OK):
+            raise OSError(f"{self.data_dir} is not writable")
+
     def load_users(self) -> List[User]:
         """
         Load all users from JSON file.
@@ -13,6 +13,7 @@ import pytest
 from config.database import MongoDBConfig, MongoDBConnection
 from lib_logging.logger import get_logger
 from storage.mongodb.book_storage import MongoDBBookStorage
+from storage.mongodb.rate_limit_store import MongoDBRateLimitStore
 from storage.mongodb.user_storage import MongoDBUserStorage
 
 logger = get_logger(__name__)
@@ -110,3 +111,21 @@ def mongodb_user_storage(
         {"$set": {"sequence_value": 0}},
         upsert=True,
     )
+
+
+@pytest.fixture
+def mongodb_rate_limit_store(
+    mongodb_connection_check,
+    reset_mongodb_connection,
+) -> Generator[MongoDBRateLimitStore, None, None]:
+    """
+    Provide the MongoDB rate limit store for integration tests.
+
+    Cleanup: Clears the rate_limits collection.
+    """
+    store = MongoDBRateLimitStore()
+    store.collection.delete_many({})
+
+    yield store
+
+    store.collection.delete_many({})
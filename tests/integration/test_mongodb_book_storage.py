@@ -1,6 +1,7 @@
 import pytest
 
 from models.book import Book, BookStatus
+from storage.errors import VersionConflictError
 
 pytestmark = pytest.mark.integration
 
@@ -94,3 +95,28 @@ class TestMongoDBBookStorage:
         book = Book.create(999, "Ghost", "Nobody")
         result = mongodb_book_storage.update_book(book)
         assert result is False
+
+    def test_batch_update_reports_concurrent_write_to_same_version(
+        self, mongodb_book_storage
+    ):
+        mongodb_book_storage.add_books([Book.create(i, "T", "A") for i in (1, 2)])
+        stale = mongodb_book_storage.get_books_by_ids([1, 2])
+        other = mongodb_book_storage.get_book_by_id(2)
+        other.title = "Other writer"
+        mongodb_book_storage.update_book(other)  # version 1, as ours would be
+
+        with pytest.raises(VersionConflictError) as exc:
+            mongodb_book_storage.update_books(list(stale.values()))
+        assert exc.value.book_ids == [2]
+        assert stale[1].version == 1 and stale[2].version == 0
+        assert mongodb_book_storage.get_book_by_id(2).title == "Other writer"
+        assert all(
+            "_write" not in doc for doc in mongodb_book_storage.iter_book_records()
+        )
+
+    def test_batch_remove_counts_concurrently_removed_books(self, mongodb_book_storage):
+        mongodb_book_storage.add_books([Book.create(i, "T", "A") for i in (1, 2)])
+        mongodb_book_storage.remove_book(2)  # another writer
+
+        assert mongodb_book_storage.remove_books([1, 2]) is True
+        assert mongodb_book_storage.get_books_by_ids([1, 2]) == {}
@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from models.book import Book
+from storage.mongodb.cache import (
+    CachedMongoDBBookStorage,
+    LRUCache,
+    supports_change_streams,
+)
+
+pytestmark = pytest.mark.integration
+
+
+class TestCachedMongoDBBookStorage:
+    """Integration tests for the read-through book cache."""
+
+    def test_local_writes_invalidate(self, mongodb_book_storage):
+        books = CachedMongoDBBookStorage(
+            mongodb_book_storage, LRUCache("books"), watch=False
+        )
+        books.add_book(Book.create(1, "Old", "A"))
+        book = books.get_book_by_id(1)
+
+        book.title = "New"
+        assert books.update_book(book)
+
+        assert books.get_book_by_id(1).title == "New"
+
+    def test_change_stream_invalidates_other_writers(self, mongodb_book_storage):
+        if not supports_change_streams(mongodb_book_storage.db):
+            pytest.skip("Change streams need a replica set")
+        books = CachedMongoDBBookStorage(mongodb_book_storage, LRUCache("books"))
+        try:
+            mongodb_book_storage.add_book(Book.create(1, "Old", "A"))
+            time.sleep(1)  # let the listener open its stream
+            assert books.get_book_by_id(1).title == "Old"
+
+            # Another process writes directly to the collection
+            mongodb_book_storage.collection.update_one(
+                {"id": 1}, {"$set": {"title": "New"}}
+            )
+
+            deadline = time.monotonic() + 5
+            while books.get_book_by_id(1).title != "New":
+                assert time.monotonic() < deadline, "cache never invalidated"
+                time.sleep(0.05)
+        finally:
+            books.stop_watching()
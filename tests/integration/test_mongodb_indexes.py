@@ -0,0 +1,25 @@
+import pytest
+
+from models.book import Book, BookStatus
+from storage.mongodb.indexes import QUERIES, advise, missing_indexes
+
+pytestmark = pytest.mark.integration
+
+
+class TestMongoDBIndexes:
+    """Integration tests for the index registry and advisor."""
+
+    def test_registry_indexes_serve_the_picked_listing(self, mongodb_book_storage):
+        mongodb_book_storage._index_build.join(timeout=30)
+        books = [Book.create(i, "T", "A") for i in range(1, 4)]
+        books[2].status, books[2].picked_by = BookStatus.PICKED, "ann"
+        mongodb_book_storage.add_books(books)
+
+        picked = mongodb_book_storage.find_books_by_status(BookStatus.PICKED)
+        assert [b.id for b in picked] == [3]
+
+        db = mongodb_book_storage.db
+        assert not [m for m in missing_indexes(db) if m[0] == "books"]
+        query = next(q for q in QUERIES if q.name == "picked books sorted by id")
+        (advice,) = advise(db, [query])
+        assert advice.ok and advice.indexes == ["status_1_id_1_partial"]
@@ -0,0 +1,75 @@
+import pytest
+
+from models.book import BookStatus
+from storage.migrations import CURRENT_SCHEMA_VERSION
+from storage.mongodb.book_storage import MongoDBBookStorage
+from storage.mongodb.migrations import (
+    STATE_COLLECTION,
+    migrate_mongodb_books,
+    read_schema_state,
+)
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def books(mongodb_book_storage):
+    mongodb_book_storage.db[STATE_COLLECTION].delete_many({})
+    yield mongodb_book_storage
+    mongodb_book_storage.db[STATE_COLLECTION].delete_many({})
+
+
+class TestMongoDBMigrations:
+    """Integration tests for the books schema migrations."""
+
+    def test_migrates_in_batches_and_records_the_version(self, books):
+        books.collection.insert_many(
+            [
+                {"id": str(i), "title": "T", "author": "A", "status": "BORROWED"}
+                for i in range(1, 6)
+            ]
+            + [{"id": 6, "title": "T", "author": "A", "isbn": None}]
+        )
+
+        report = migrate_mongodb_books(books, batch_size=2)
+
+        assert (report.scanned, report.updated, report.completed) == (6, 6, True)
+        assert read_schema_state(books.db)["version"] == CURRENT_SCHEMA_VERSION
+        reopened = MongoDBBookStorage()
+        assert reopened.schema_version == CURRENT_SCHEMA_VERSION
+        loaded = reopened.load_books()
+        assert [b.id for b in loaded] == [1, 2, 3, 4, 5, 6]
+        assert loaded[0].status == BookStatus.BORROWED
+        assert "isbn" not in books.collection.find_one({"id": 6})
+
+    def test_resumes_after_the_last_batch(self, books):
+        books.collection.insert_many(
+            [{"id": str(i), "title": "T", "author": "A"} for i in range(1, 5)]
+        )
+        first_two = list(books.collection.find().sort("_id", 1).limit(2))
+        books.db[STATE_COLLECTION].insert_one(
+            {
+                "_id": "books",
+                "target": CURRENT_SCHEMA_VERSION,
+                "resume_after": first_two[-1]["_id"],
+            }
+        )
+
+        report = migrate_mongodb_books(books)
+
+        assert report.resumed and report.scanned == 2
+        assert books.collection.count_documents({"id": {"$type": "string"}}) == 2
+
+    def test_taken_ids_block_the_version(self, books):
+        books.collection.insert_many(
+            [
+                {"id": 1, "title": "T", "author": "A", "status": "Available"},
+                {"id": "1", "title": "Dup", "author": "A", "status": "Available"},
+            ]
+        )
+
+        report = migrate_mongodb_books(books)
+
+        assert report.conflicts == 1 and not report.completed
+        state = read_schema_state(books.db)
+        assert "version" not in state and "resume_after" not in state
@@ -0,0 +1,28 @@
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+class TestMongoDBRateLimitStore:
+    """Integration tests for MongoDBRateLimitStore."""
+
+    def test_bucket_allows_burst_then_denies(self, mongodb_rate_limit_store):
+        results = [
+            mongodb_rate_limit_store.take("login|ip|1.2.3.4", rate=0.1, burst=2)
+            for _ in range(3)
+        ]
+
+        assert [allowed for allowed, _ in results] == [True, True, False]
+        assert results[2][1] == pytest.approx(10, abs=1)
+
+    def test_buckets_are_independent(self, mongodb_rate_limit_store):
+        assert mongodb_rate_limit_store.take("a", rate=0.1, burst=1)[0] is True
+        assert mongodb_rate_limit_store.take("a", rate=0.1, burst=1)[0] is False
+        assert mongodb_rate_limit_store.take("b", rate=0.1, burst=1)[0] is True
+
+    def test_bucket_document_expires_when_full(self, mongodb_rate_limit_store):
+        mongodb_rate_limit_store.take("k", rate=1.0, burst=5)
+
+        doc = mongodb_rate_limit_store.collection.find_one({"_id": "k"})
+        assert doc["tokens"] == 4
+        assert doc["expires_at"] is not None
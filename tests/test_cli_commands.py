@@ -11,6 +11,7 @@ from cli.commands import (
     handle_delete_book,
     handle_list_books,
     handle_pick_book,
+    handle_stats,
     handle_update_status,
 )
 from models.book import Book, BookStatus
@@ -180,3 +181,13 @@ class TestCLICommands:
 
         assert result == 0
         mock_service.update_book_status.assert_called_once()
+
+    def test_handle_stats_permission_denied(self, capsys):
+        """Test statistics without librarian permission."""
+        mock_service = Mock()
+
+        result = handle_stats(False, "testuser", stats_service=mock_service)
+
+        assert result == 1
+        assert "Only librarians can view catalog statistics" in capsys.readouterr().out
+        mock_service.get_stats.assert_not_called()
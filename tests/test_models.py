@@ -63,6 +63,29 @@ class TestBook:
         assert book.title == "Extra Book"
         assert book.status == BookStatus.AVAILABLE
 
+    def test_book_is_slotted(self):
+        """Book instances carry no per-instance __dict__."""
+        book = Book.create(1, "Test Book", "Test Author")
+        assert not hasattr(book, "__dict__")
+
+    def test_from_dict_coerces_legacy_values(self):
+        """String ids, legacy status casing and unknown statuses are normalized."""
+        book = Book.from_dict(
+            {"id": "1001", "title": "T", "author": "A", "status": "borrowed"}
+        )
+        assert book.id == 1001
+        assert book.status == BookStatus.BORROWED
+
+        book = Book.from_dict({"id": 2, "title": "T", "author": "A", "status": "?"})
+        assert book.status == BookStatus.AVAILABLE
+
+    def test_round_trip(self):
+        """to_dict/from_dict round-trip preserves every field."""
+        book = Book.create(
+            5, "T", "A", status=BookStatus.PICKED, picked_by="bob", isbn="1234"
+        )
+        assert Book.from_dict(book.to_dict()) == book
+
 
 class TestUser:
     """Test User model."""
@@ -82,3 +105,10 @@ class TestUser:
         assert user_dict["username"] == "testuser"
         assert user_dict["password"] == "1234"
         assert user_dict["role"] == "user"
+
+    def test_user_from_dict_accepts_upper_case_role(self):
+        """Seeded documents may store role names in upper case."""
+        user = User.from_dict({"id": 1, "username": "admin", "role": "LIBRARIAN"})
+        assert user.role == Role.LIBRARIAN
+        assert user.borrowed_book_ids == []
+        assert not hasattr(user, "__dict__")
@@ -0,0 +1,128 @@
+import http.client
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+from web.admission import (
+    AdmissionController,
+    Rejected,
+    RouteLimit,
+    parse_limits,
+    request_deadline,
+    time_left,
+)
+from web.app_server import AppWebHandler
+
+
+def _controller(concurrency=1, queue=1, max_wait=5.0):
+    return AdmissionController(
+        {
+            "/api/execute": RouteLimit(concurrency, queue, max_wait),
+            "*": RouteLimit(8, 8, max_wait),
+        }
+    )
+
+
+def test_queued_request_gets_the_next_free_slot():
+    controller = _controller()
+    first = controller.admit("/api/execute")
+    admitted = []
+
+    waiter = threading.Thread(
+        target=lambda: admitted.append(controller.admit("/api/execute"))
+    )
+    waiter.start()
+    time.sleep(0.1)
+    assert controller.snapshot()["/api/execute"]["queued"] == 1
+    assert not admitted
+
+    first.release()
+    waiter.join(timeout=5)
+
+    assert len(admitted) == 1
+    assert controller.snapshot()["/api/execute"] == {
+        "active": 1,
+        "queued": 0,
+        "shed": 0,
+    }
+
+
+def test_full_queue_is_shed_immediately():
+    controller = _controller(queue=0)
+    controller.admit("/api/execute")
+
+    started = time.monotonic()
+    with pytest.raises(Rejected) as excinfo:
+        controller.admit("/api/execute")
+
+    assert excinfo.value.reason == "queue_full"
+    assert excinfo.value.retry_after >= 1
+    assert time.monotonic() - started < 0.5
+    assert controller.snapshot()["/api/execute"]["shed"] == 1
+
+
+def test_wait_is_bounded_by_the_client_deadline():
+    controller = _controller(max_wait=30.0)
+    controller.admit("/api/execute")
+
+    started = time.monotonic()
+    with pytest.raises(Rejected) as excinfo:
+        controller.admit("/api/execute", deadline=time.monotonic() + 0.2)
+
+    assert excinfo.value.reason == "timeout"
+    assert time.monotonic() - started < 2
+    assert controller.snapshot()["/api/execute"]["queued"] == 0
+
+
+def test_expired_deadline_and_priority_paths():
+    controller = _controller(concurrency=1, queue=0)
+
+    with pytest.raises(Rejected) as excinfo:
+        controller.admit("/api/books", deadline=time.monotonic() - 1)
+    assert excinfo.value.reason == "deadline"
+
+    # Never limited, even with the deadline gone
+    assert controller.admit("/health", deadline=time.monotonic() - 1) is None
+
+
+def test_limit_spec_and_deadline_helpers():
+    assert parse_limits("/api/execute=2:4:1.5, *=10:20") == {
+        "/api/execute": RouteLimit(2, 4, 1.5),
+        "*": RouteLimit(10, 20, 5.0),
+    }
+    with pytest.raises(ValueError):
+        parse_limits("/api/execute=0:4")
+
+    assert request_deadline(None) is None
+    assert request_deadline("abc") is None
+    assert time_left(request_deadline("2"), 30) <= 2
+    assert time_left(None, 30) == 30
+
+
+def test_saturated_route_returns_503_with_retry_after(monkeypatch):
+    controller = _controller(queue=0)
+    monkeypatch.setattr(AppWebHandler, "ADMISSION", controller)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), AppWebHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    busy = controller.admit("/api/execute")
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        conn.request("POST", "/api/execute", body=b"{}")
+        response = conn.getresponse()
+        body = json.loads(response.read())
+
+        assert response.status == 503
+        assert int(response.getheader("Retry-After")) >= 1
+        assert body["success"] is False
+
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        conn.request("GET", "/health")
+        assert conn.getresponse().status == 200
+    finally:
+        busy.release()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+from models.book import Book, BookStatus
+from models.role import Role
+from storage.async_adapters import (
+    AsyncBookRepository,
+    AsyncUserRepository,
+    StorageExecutor,
+)
+from storage.fake.book_storage import FakeBookStorage
+from storage.fake.user_storage import FakeUserStorage
+
+
+def test_book_repository_round_trip_and_batched_iteration():
+    async def scenario():
+        executor = StorageExecutor(max_workers=2)
+        books = AsyncBookRepository(FakeBookStorage(), executor)
+        for i in range(5):
+            assert await books.add_book(
+                Book(
+                    id=1001 + i, title=f"T{i}", author="A", status=BookStatus.AVAILABLE
+                )
+            )
+
+        book = await books.get_book_by_id(1003)
+        book.title = "Changed"
+        assert await books.update_book(book)
+        assert (await books.get_books_by_ids([1003]))[1003].title == "Changed"
+
+        batches = [b async for b in books.iter_book_batches(batch_size=2)]
+        executor.shutdown()
+        return batches
+
+    batches = asyncio.run(scenario())
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert [r["id"] for b in batches for r in b] == [1001, 1002, 1003, 1004, 1005]
+
+
+def test_user_repository_lookup():
+    async def scenario():
+        users = AsyncUserRepository(FakeUserStorage(), StorageExecutor(max_workers=1))
+        await users.create_user("reader", "secret", Role.USER)
+        return await users.get_user_by_username("reader")
+
+    assert asyncio.run(scenario()).username == "reader"
+
+
+def test_executor_bounds_threads_without_blocking_the_loop():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def blocking_call():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    async def scenario():
+        executor = StorageExecutor(max_workers=2)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        tick_task = asyncio.create_task(ticker())
+        await asyncio.gather(*(executor.run(blocking_call) for _ in range(8)))
+        tick_task.cancel()
+        executor.shutdown()
+        return ticks
+
+    ticks = asyncio.run(scenario())
+    assert peak[0] == 2
+    assert ticks > 10  # the event loop kept running while calls waited
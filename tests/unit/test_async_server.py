@@ -0,0 +1,348 @@
+import asyncio
+import gzip
+import http.client
+import json
+import threading
+
+from lib_logging.slow_ops import SLOW_OPS
+from models.book import Book, BookStatus
+from models.role import Role
+from storage.async_adapters import StorageExecutor
+from storage.fake.book_storage import FakeBookStorage
+from storage.fake.event_log import FakeEventLog
+from storage.fake.user_storage import FakeUserStorage
+from storage.mongodb.circuit_breaker import CircuitBreaker, CircuitBreakerBookStorage
+from web import async_server, events
+from web.admission import AdmissionController, RouteLimit
+from web.app_server import AppWebHandler
+from web.async_server import AsyncLibraryServer
+from web.events import ChangeFeed
+
+
+def _serve(scenario, books=None, users=None):
+    """Run ``scenario(port, books, users)`` against a server on a free port."""
+    books = books if books is not None else FakeBookStorage()
+    users = users if users is not None else FakeUserStorage()
+
+    async def main():
+        app = AsyncLibraryServer(StorageExecutor(max_workers=2), books, users)
+        server = await app.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await scenario(port, books, users)
+        finally:
+            server.close()
+            await server.wait_closed()
+            app.readiness.stop()
+            app.handlers.shutdown()
+            app.executor.shutdown()
+
+    return asyncio.run(main())
+
+
+def _request(port, method, path, body=None, headers=None, conn=None):
+    conn = conn or http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request(method, path, body=body, headers=headers or {})
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def test_keep_alive_serves_several_requests_on_one_connection():
+    async def scenario(port, books, users):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        first = await asyncio.to_thread(_request, port, "GET", "/health", conn=conn)
+        sock = conn.sock
+        second = await asyncio.to_thread(_request, port, "GET", "/health", conn=conn)
+        reused = conn.sock is sock
+        conn.close()
+        return first, second, reused
+
+    (first, body), (second, _), same_socket = _serve(scenario)
+    assert first.status == second.status == 200
+    assert json.loads(body) == {"status": "ok"}
+    assert first.getheader("Connection") == "keep-alive"
+    assert same_socket
+
+
+def test_books_are_streamed_compressed():
+    async def scenario(port, books, users):
+        for i in range(3):
+            books.add_book(
+                Book(
+                    id=1001 + i,
+                    title=f"Book {i}",
+                    author="A",
+                    status=BookStatus.AVAILABLE,
+                )
+            )
+        return await asyncio.to_thread(
+            _request, port, "GET", "/api/books", headers={"Accept-Encoding": "gzip"}
+        )
+
+    response, body = _serve(scenario)
+    assert response.status == 200
+    assert response.getheader("Transfer-Encoding") == "chunked"
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert [b["id"] for b in json.loads(gzip.decompress(body))] == [1001, 1002, 1003]
+
+
+def test_login_checks_the_user_repository():
+    async def scenario(port, books, users):
+        users.create_user("reader", "secret", Role.USER)
+        ok = await asyncio.to_thread(
+            _request,
+            port,
+            "POST",
+            "/api/login",
+            json.dumps({"username": "reader", "password": "secret"}),
+        )
+        bad = await asyncio.to_thread(
+            _request,
+            port,
+            "POST",
+            "/v1/api/login",
+            json.dumps({"username": "reader", "password": "wrong"}),
+        )
+        return ok, bad
+
+    (ok, ok_body), (bad, _) = _serve(scenario)
+    assert ok.status == 200
+    assert json.loads(ok_body) == {
+        "success": True,
+        "role": "user",
+        "username": "reader",
+    }
+    assert bad.status == 401
+
+
+def test_idle_connections_do_not_block_other_clients():
+    async def scenario(port, books, users):
+        idle = []
+        for _ in range(200):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /health HTTP/1.1\r\n")  # never finished
+            idle.append(writer)
+        await asyncio.sleep(0)
+        result = await asyncio.wait_for(
+            asyncio.to_thread(_request, port, "GET", "/health"), timeout=5
+        )
+        for writer in idle:
+            writer.close()
+        return result
+
+    response, _ = _serve(scenario)
+    assert response.status == 200
+
+
+def test_static_assets_support_conditional_requests():
+    async def scenario(port, books, users):
+        first = await asyncio.to_thread(_request, port, "GET", "/app/app.js")
+        etag = first[0].getheader("ETag")
+        second = await asyncio.to_thread(
+            _request, port, "GET", "/app/app.js", headers={"If-None-Match": etag}
+        )
+        return first, second
+
+    (first, body), (second, second_body) = _serve(scenario)
+    assert first.status == 200 and body
+    assert second.status == 304 and second_body == b""
+
+
+def test_other_routes_are_delegated_to_the_blocking_handler():
+    async def scenario(port, books, users):
+        missing = await asyncio.to_thread(_request, port, "GET", "/api/nope")
+        batch = await asyncio.to_thread(
+            _request,
+            port,
+            "POST",
+            "/api/books/batch",
+            json.dumps({"action": "burn", "ids": [1]}),
+        )
+        return missing, batch
+
+    (missing, _), (batch, batch_body) = _serve(scenario)
+    assert missing.status == 404
+    assert batch.status == 400
+    assert "Unsupported action" in json.loads(batch_body)["error"]
+
+
+def test_malformed_request_is_rejected():
+    async def scenario(port, books, users):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"NONSENSE\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        return response
+
+    assert _serve(scenario).startswith(b"HTTP/1.1 400 ")
+
+
+def test_storage_outage_is_a_503_with_retry_after():
+    breaker = CircuitBreaker(lambda: None, failure_threshold=1, probe_interval=60)
+    breaker.opened_at = 0.0  # open, with no probe thread
+    books = CircuitBreakerBookStorage(FakeBookStorage(), breaker)
+
+    async def scenario(port, books, users):
+        return await asyncio.to_thread(_request, port, "GET", "/api/books")
+
+    response, body = _serve(scenario, books=books)
+    assert response.status == 503
+    assert response.getheader("Retry-After") == "60"
+    assert "read-only" in json.loads(body)["error"]
+
+
+def test_change_feed_streams_and_long_polls(monkeypatch):
+    log = FakeEventLog()
+    feed = ChangeFeed(lambda: log, poll_interval=0.01)
+    monkeypatch.setattr(AppWebHandler, "CHANGE_FEED", feed)
+    monkeypatch.setattr(events, "STREAM_SECONDS", 0.5)
+
+    def read_stream(port):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        conn.request("GET", "/api/events", headers={"Accept": "text/event-stream"})
+        response = conn.getresponse()
+        lines = [response.fp.readline() for _ in range(6)]  # retry, ready
+        log.append([{"type": "book.deleted", "book_id": 7, "book": None}])
+        lines += [response.fp.readline() for _ in range(3)]
+        rest = response.read()  # the server ends the stream
+        conn.close()
+        return response, lines, rest
+
+    async def scenario(port, books, users):
+        stream = await asyncio.to_thread(read_stream, port)
+        poll = await asyncio.to_thread(
+            _request, port, "GET", "/api/events?after=0&wait=5"
+        )
+        return stream, poll
+
+    (response, lines, rest), (poll, poll_body) = _serve(scenario)
+    feed.stop()
+    assert response.getheader("Content-Type") == "text/event-stream"
+    assert lines[2:4] == [b"event: ready\n", b"id: 0\n"]
+    assert lines[6:8] == [b"event: change\n", b"id: 1\n"]
+    assert json.loads(lines[8][len(b"data: ") :])["book_id"] == 7
+    assert rest == b"\n"
+    assert poll.status == 200
+    assert [e["id"] for e in json.loads(poll_body)["events"]] == [1]
+
+
+def test_debug_endpoints_need_the_debug_token(monkeypatch):
+    monkeypatch.setattr(SLOW_OPS, "threshold", 0.0)
+    monkeypatch.setattr(SLOW_OPS, "log_file", None)
+    SLOW_OPS.clear()
+    SLOW_OPS.record("BookStorage.load_books", "json", 0.8, {})
+
+    async def scenario(port, books, users):
+        def get(token=None):
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            return _request(port, "GET", "/api/debug/slow-ops", headers=headers)
+
+        disabled = await asyncio.to_thread(get, "s3cret")
+        monkeypatch.setenv("DEBUG_TOKEN", "s3cret")
+        return (
+            disabled,
+            await asyncio.to_thread(get),
+            await asyncio.to_thread(get, "s3cret"),
+        )
+
+    monkeypatch.delenv("DEBUG_TOKEN", raising=False)
+    (disabled, _), (anonymous, _), (allowed, body) = _serve(scenario)
+    assert (disabled.status, anonymous.status, allowed.status) == (404, 401, 200)
+    data = json.loads(body)
+    assert data["threshold_ms"] == 0
+    assert data["operations"][0]["op"] == "BookStorage.load_books"
+    SLOW_OPS.clear()
+
+
+def test_cpu_profile_capture_over_http(monkeypatch):
+    monkeypatch.setenv("DEBUG_TOKEN", "s3cret")
+    auth = {"Authorization": "Bearer s3cret"}
+
+    async def scenario(port, books, users):
+        def call(method, path):
+            return _request(port, method, path, headers=auth)
+
+        started = await asyncio.to_thread(call, "POST", "/api/debug/profile/cpu/start")
+        again = await asyncio.to_thread(call, "POST", "/api/debug/profile/cpu/start")
+        await asyncio.to_thread(call, "GET", "/api/debug/slow-ops")
+        report = await asyncio.to_thread(
+            call, "POST", "/api/debug/profile/cpu/stop?sort=cumulative&limit=200"
+        )
+        stopped = await asyncio.to_thread(call, "POST", "/api/debug/profile/cpu/stop")
+        return started, again, report, stopped
+
+    (started, _), (again, _), (report, text), (stopped, _) = _serve(scenario)
+    assert (started.status, again.status, stopped.status) == (200, 409, 409)
+    assert report.status == 200
+    assert report.getheader("Content-type").startswith("text/plain")
+    assert text.startswith(b"# 2 requests profiled")  # the 409 start, slow-ops
+    assert b"serve_slow_ops" in text
+
+
+def test_readiness_reports_the_servers_storages():
+    async def scenario(port, books, users):
+        live = await asyncio.to_thread(_request, port, "GET", "/health/live")
+        ready = await asyncio.to_thread(_request, port, "GET", "/health/ready")
+        while json.loads(ready[1])["status"] == "starting":
+            await asyncio.sleep(0.01)
+            ready = await asyncio.to_thread(_request, port, "GET", "/health/ready")
+        return live, ready
+
+    (live, live_body), (ready, ready_body) = _serve(scenario)
+    report = json.loads(ready_body)
+    assert live.status == ready.status == 200
+    assert json.loads(live_body) == {"status": "ok"}
+    assert report["storage"]["books"]["ok"] and report["storage"]["users"]["ok"]
+    assert report["pools"]["storage_executor"]["workers"] == 2
+
+
+def test_delegated_requests_do_not_hold_storage_threads(monkeypatch):
+    release = threading.Event()
+    real_run_buffered = async_server._run_buffered
+
+    def slow_run_buffered(*args):
+        release.wait(10)  # like /api/execute waiting on its CLI
+        return real_run_buffered(*args)
+
+    monkeypatch.setattr(async_server, "_run_buffered", slow_run_buffered)
+
+    async def scenario(port, books, users):
+        # The test server's storage executor has two workers
+        slow = [
+            asyncio.create_task(asyncio.to_thread(_request, port, "GET", "/api/logs"))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.2)
+        try:
+            native = await asyncio.wait_for(
+                asyncio.to_thread(_request, port, "GET", "/api/books"), 5
+            )
+        finally:
+            release.set()
+        await asyncio.gather(*slow)
+        return native
+
+    response, body = _serve(scenario)
+    assert response.status == 200 and json.loads(body) == []
+
+
+def test_native_routes_are_admitted_on_the_event_loop(monkeypatch):
+    controller = AdmissionController({"*": RouteLimit(1, 1, max_wait=5.0)})
+    monkeypatch.setattr(AppWebHandler, "ADMISSION", controller)
+    held = controller.admit("/api/books")  # the only "*" slot
+
+    async def scenario(port, books, users):
+        queued = asyncio.create_task(
+            asyncio.to_thread(_request, port, "GET", "/api/books")
+        )
+        await asyncio.sleep(0.2)
+        shed = await asyncio.to_thread(_request, port, "GET", "/api/stats")
+        snapshot = controller.snapshot()["*"]
+        held.release()
+        return shed, snapshot, await queued
+
+    (shed, _), snapshot, (queued, body) = _serve(scenario)
+    assert shed.status == 503 and shed.getheader("Retry-After")
+    assert snapshot == {"active": 1, "queued": 1, "shed": 1}
+    assert queued.status == 200 and json.loads(body) == []
+    assert controller.snapshot()["*"] == {"active": 0, "queued": 0, "shed": 1}
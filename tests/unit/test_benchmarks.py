@@ -0,0 +1,108 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks import bench_http
+from benchmarks.harness import compare, percentile
+from models.book import Book, BookStatus
+from models.role import Role
+from storage.async_adapters import StorageExecutor
+from storage.fake.book_storage import FakeBookStorage
+from storage.fake.user_storage import FakeUserStorage
+from web.app_server import AppWebHandler
+from web.async_server import AsyncLibraryServer
+from web.rate_limit import RateLimiter
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_percentile_and_regression_comparison():
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 99) == 4
+    assert percentile([], 95) == 0.0
+
+    key = {"suite": "books", "backend": "fake", "size": 10}
+    baseline = [
+        {**key, "op": "get_book_by_id", "p50_ms": 1.0},
+        {**key, "op": "add_book", "p50_ms": 1.0},
+    ]
+    current = [
+        {**key, "op": "get_book_by_id", "p50_ms": 1.2},
+        {**key, "op": "add_book", "p50_ms": 1.5},
+        {**key, "op": "remove_book", "p50_ms": 9.0},  # not in the baseline
+    ]
+
+    rows = compare(baseline, current, threshold=0.25)
+
+    assert [(r["op"], r["regression"]) for r in rows] == [
+        ("get_book_by_id", False),
+        ("add_book", True),
+    ]
+
+
+def test_storage_benchmark_writes_comparable_results(tmp_path):
+    out = tmp_path / "results.json"
+    args = [sys.executable, "benchmarks/bench_storage.py", "--backends", "fake"]
+    args += ["--sizes", "50", "--users", "20", "--seconds", "0.01"]
+    result = subprocess.run(
+        [*args, "--json", str(out)],
+        cwd=ROOT,
+        env=dict(os.environ, LOG_DIR=str(tmp_path)),
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+
+    data = json.loads(out.read_text())
+    assert data["meta"]["commit"]
+    ops = {(r["suite"], r["op"]) for r in data["results"]}
+    assert {("books", "get_book_by_id"), ("service", "list_all_books")} <= ops
+    assert all(
+        r["samples"] >= 3 and r["p99_ms"] >= r["p50_ms"] for r in data["results"]
+    )
+
+    rerun = subprocess.run(
+        [*args, "--baseline", str(out), "--threshold", "1000"],
+        cwd=ROOT,
+        env=dict(os.environ, LOG_DIR=str(tmp_path)),
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert rerun.returncode == 0, rerun.stderr
+    assert "0 of" in rerun.stdout
+
+
+def test_http_load_test_reports_each_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(AppWebHandler, "RATE_LIMITER", RateLimiter({}))
+    books, users = FakeBookStorage(), FakeUserStorage()
+    users.create_user("reader", "secret", Role.USER)
+    books.add_book(Book(id=1, title="T", author="A", status=BookStatus.BORROWED))
+    out = tmp_path / "http.json"
+
+    async def main():
+        app = AsyncLibraryServer(StorageExecutor(max_workers=2), books, users)
+        server = await app.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        argv = [f"--url=http://127.0.0.1:{port}", "--users=3", "--duration=0.3"]
+        argv += ["--think=0", "--librarian-ratio=0", "--students=reader:secret"]
+        try:
+            return await asyncio.to_thread(bench_http.main, [*argv, f"--json={out}"])
+        finally:
+            server.close()
+            await server.wait_closed()
+            app.executor.shutdown()
+
+    assert asyncio.run(main()) == 0
+
+    data = json.loads(out.read_text())
+    assert data["meta"]["sessions"] > 0
+    by_op = {r["op"]: r for r in data["results"]}
+    assert set(by_op) == {"POST /api/login", "GET /api/books"}
+    login = by_op["POST /api/login"]
+    assert login["outcomes"] == {"ok": login["samples"]}
+    assert login["error_rate"] == 0 and login["ops_per_sec"] > 0
@@ -0,0 +1,92 @@
+from unittest.mock import Mock
+
+from cli.commands import handle_book_batch
+from models.book import Book, BookStatus
+from services.book_service import BookService
+from storage.errors import VersionConflictError
+from storage.fake.book_storage import FakeBookStorage
+from storage.fake.event_log import FakeEventLog
+
+
+def _service():
+    s = FakeBookStorage()
+    s.add_book(Book.create(1001, "A", "X", status=BookStatus.PICKED, picked_by="al"))
+    s.add_book(Book.create(1002, "B", "X", status=BookStatus.PICKED, picked_by="bo"))
+    s.add_book(Book.create(1003, "C", "X"))
+    return BookService(storage=s), s
+
+
+def test_approve_borrows_reports_per_item():
+    svc, storage = _service()
+    results = svc.approve_borrows([1001, 1003, 9999, 1002, 1001])
+
+    assert [r.success for r in results] == [True, False, False, True, False]
+    assert "not in Picked status" in results[1].error
+    assert "not found" in results[2].error
+    assert "Duplicate" in results[4].error
+    assert storage.get_book_by_id(1001).status == BookStatus.BORROWED
+    assert storage.get_book_by_id(1002).status == BookStatus.BORROWED
+
+
+def test_batch_uses_single_bulk_write():
+    storage = Mock()
+    storage.get_books_by_ids.return_value = {
+        1: Book.create(1, "A", "X", status=BookStatus.BORROWED),
+        2: Book.create(2, "B", "X", status=BookStatus.BORROWED),
+    }
+    storage.update_books.return_value = True
+
+    results = BookService(storage=storage).return_books([1, 2])
+
+    assert all(r.success for r in results)
+    storage.update_books.assert_called_once()
+    storage.update_book.assert_not_called()
+
+
+def test_batch_storage_failure_marks_accepted_items_failed():
+    svc, storage = _service()
+    storage.remove_books = Mock(return_value=False)
+
+    results = svc.delete_books([1003])
+
+    assert results[0].success is False
+    assert "storage" in results[0].error
+
+
+def test_partial_batch_delete_reports_removed_books():
+    storage = FakeBookStorage()
+    storage.add_books([Book.create(i, "T", "A") for i in (1, 2)])
+
+    def remove_first_only(book_ids):
+        # delete_many removed book 1; meanwhile book 2 was borrowed
+        storage.remove_book(1)
+        borrowed = storage.get_book_by_id(2)
+        borrowed.status, borrowed.picked_by = BookStatus.BORROWED, "al"
+        storage.update_book(borrowed)
+        raise VersionConflictError([2])
+
+    storage.remove_books = Mock(side_effect=remove_first_only)
+    log = FakeEventLog()
+
+    results = BookService(storage, events=log).delete_books([1, 2])
+
+    assert [r.success for r in results] == [True, False]
+    assert "currently borrowed" in results[1].error
+    assert [(e["type"], e["book_id"]) for e in log.read_after(0)] == [
+        ("book.deleted", 1)
+    ]
+
+
+def test_handle_book_batch_rejects_invalid_ids_before_storage():
+    mock_service = Mock()
+    assert (
+        handle_book_batch("return-book", "1001,abc,-5", True, None, mock_service) == 1
+    )
+    mock_service.return_books.assert_not_called()
+
+
+def test_handle_book_batch_requires_a_librarian(capsys):
+    mock_service = Mock()
+    assert handle_book_batch("delete-book", "1001", False, "al", mock_service) == 1
+    assert "Only librarians can run batch operations" in capsys.readouterr().out
+    mock_service.delete_books.assert_not_called()
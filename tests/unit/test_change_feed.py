@@ -0,0 +1,109 @@
+import time
+
+from models.book import BookStatus
+from services.book_service import BookService
+from services.import_export_service import ImportExportService
+from storage.event_log import FileEventLog
+from storage.fake.book_storage import FakeBookStorage
+from storage.fake.event_log import FakeEventLog
+from web.events import ChangeFeed, next_frames, poll_result
+
+
+def test_file_log_numbers_events_across_instances(tmp_path):
+    first, second = FileEventLog(tmp_path), FileEventLog(tmp_path)
+    first.append([{"type": "book.created", "book_id": 1}])
+    second.append([{"type": "book.updated", "book_id": 1}] * 2)
+
+    assert first.latest_id() == 3
+    assert [e["id"] for e in first.read_after(0)] == [1, 2, 3]
+    assert [e["id"] for e in first.read_after(2)] == [3]
+
+    # A line still being written is left for the next read
+    with open(first.events_file, "a") as f:
+        f.write('{"id": 4, "type"')
+    assert first.read_after(3) == [] and first.latest_id() == 3
+
+
+def test_file_log_drops_its_older_half_when_full(tmp_path):
+    log = FileEventLog(tmp_path, max_bytes=2000)
+    for i in range(100):
+        log.append([{"type": "book.updated", "book_id": i}])
+
+    ids = [e["id"] for e in log.read_after(0)]
+    assert log.events_file.stat().st_size <= 2000
+    assert ids == list(range(ids[0], 101)) and ids[0] > 1
+
+
+def test_book_service_records_committed_changes():
+    log = FakeEventLog()
+    service = BookService(FakeBookStorage(), events=log)
+    service.add_book(1001, "Dune", "Herbert")
+    service.add_book(1002, "Emma", "Austen")
+    service.pick_book(1001, "ann")
+    service.pick_book(1002, "bob")
+    service.pick_book(1001, "bob")  # rejected: no event
+    service.approve_borrows([1001, 1002, 9999])
+    service.delete_book(1002)  # borrowed: no event
+    service.return_book(1002)
+    service.delete_books([1002])
+
+    events = log.read_after(0)
+    assert [(e["type"], e["book_id"]) for e in events] == [
+        ("book.created", 1001),
+        ("book.created", 1002),
+        ("book.updated", 1001),
+        ("book.updated", 1002),
+        ("book.updated", 1001),
+        ("book.updated", 1002),
+        ("book.updated", 1002),
+        ("book.deleted", 1002),
+    ]
+    assert events[4]["book"]["status"] == BookStatus.BORROWED.value
+    assert events[-1]["book"] is None
+
+
+def test_feed_resumes_from_tokens_and_resets_when_too_far_behind():
+    log = FakeEventLog()
+    log.append([{"type": "book.created", "book_id": 0}])
+    feed = ChangeFeed(lambda: log, buffer_size=3)
+    feed.start()
+    try:
+        frames, token = next_frames(feed, None)
+        assert frames.startswith(b"event: ready\nid: 1\n") and token == 1
+
+        log.append([{"type": "book.updated", "book_id": i} for i in (1, 2)])
+        assert feed.poll() == 2
+        frames, token = next_frames(feed, token)
+        assert frames.count(b"event: change") == 2 and token == 3
+        assert [e["id"] for e in poll_result(feed, 2)["events"]] == [3]
+
+        log.append([{"type": "book.updated", "book_id": i} for i in (3, 4)])
+        feed.poll()  # the buffer now holds ids 3-5
+        assert poll_result(feed, 1)["reset"]
+        assert poll_result(feed, 2)["events"][0]["id"] == 3
+        assert next_frames(feed, 99)[0].startswith(b"event: reset\nid: 5\n")
+    finally:
+        feed.stop()
+
+
+def test_feed_waits_for_a_missing_event_before_skipping_it():
+    log = FakeEventLog()
+    feed = ChangeFeed(lambda: log)
+    feed.start()
+    try:
+        log._events.append({"id": 2, "at": time.time(), "type": "book.updated"})
+        assert feed.poll() == 0  # id 1 may still be being written
+        log._events[0]["at"] -= 60
+        assert feed.poll() == 1 and feed.head == 2
+    finally:
+        feed.stop()
+
+
+def test_import_records_a_single_catalog_reset():
+    log = FakeEventLog()
+    service = ImportExportService(FakeBookStorage(), events=log)
+    service.import_rows(
+        (i, {"id": str(1000 + i), "title": "T", "author": "A"}) for i in range(5)
+    )
+
+    assert [e["type"] for e in log.read_after(0)] == ["catalog.reset"]
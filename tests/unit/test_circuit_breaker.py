@@ -0,0 +1,115 @@
+import time
+
+import pytest
+from pymongo.errors import DuplicateKeyError, ServerSelectionTimeoutError
+
+from models.book import Book
+from models.role import Role
+from storage.errors import StorageUnavailableError
+from storage.fake.book_storage import FakeBookStorage
+from storage.fake.user_storage import FakeUserStorage
+from storage.mongodb.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerBookStorage,
+    CircuitBreakerUserStorage,
+)
+from web.responses import stale_headers
+
+
+class Outage:
+    """A probe (and switch) for a database that can be taken down."""
+
+    def __init__(self):
+        self.down = False
+
+    def __call__(self):
+        if self.down:
+            raise ServerSelectionTimeoutError("no servers")
+
+
+class FlakyBooks(FakeBookStorage):
+    def __init__(self, outage):
+        super().__init__()
+        self.outage = outage
+
+    def load_books(self):
+        self.outage()
+        return super().load_books()
+
+    def get_book_by_id(self, book_id):
+        self.outage()
+        return super().get_book_by_id(book_id)
+
+    def update_book(self, book):
+        self.outage()
+        return super().update_book(book)
+
+
+def _wait_closed(breaker, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while breaker.is_open:
+        assert time.monotonic() < deadline, "breaker never closed"
+        time.sleep(0.01)
+
+
+def test_breaker_serves_the_snapshot_and_rejects_writes_until_recovery():
+    outage = Outage()
+    breaker = CircuitBreaker(outage, failure_threshold=2, probe_interval=0.05)
+    inner = FlakyBooks(outage)
+    inner.add_books([Book.create(i, f"T{i}", "A") for i in (1, 2)])
+    books = CircuitBreakerBookStorage(inner, breaker)
+    assert len(books.load_books()) == 2  # taken as the snapshot
+    assert books.stale_since is None and stale_headers(books) == {}
+
+    outage.down = True
+    for _ in range(2):
+        with pytest.raises(ServerSelectionTimeoutError):
+            books.get_book_by_id(1)
+    assert breaker.is_open
+
+    assert books.get_book_by_id(2).title == "T2"
+    assert [r["id"] for r in books.iter_book_records(fields=["id"])] == [1, 2]
+    assert books.stale_since is not None
+    assert "X-Stale-Since" in stale_headers(books)
+    with pytest.raises(StorageUnavailableError) as excinfo:
+        books.update_book(Book.create(1, "New", "A"))
+    assert excinfo.value.retry_after == 1
+
+    outage.down = False
+    _wait_closed(breaker)
+    assert books.update_book(Book.create(1, "New", "A"))
+    assert books.get_book_by_id(1).title == "New"
+
+
+def test_rejected_queries_do_not_trip_the_breaker():
+    breaker = CircuitBreaker(Outage(), failure_threshold=1)
+
+    def duplicate():
+        raise DuplicateKeyError("E11000")
+
+    with pytest.raises(DuplicateKeyError):
+        breaker.call(duplicate)
+    assert not breaker.is_open
+
+
+def test_users_seen_before_the_outage_can_still_log_in():
+    outage = Outage()
+    breaker = CircuitBreaker(outage, failure_threshold=1, probe_interval=60)
+    users = CircuitBreakerUserStorage(FakeUserStorage(), breaker)
+    users.create_user("ann", "pw", Role.USER)
+
+    breaker.record_failure()
+
+    assert users.get_user_by_username("ann").password == "pw"
+    assert users.get_user_by_username("bob") is None
+    with pytest.raises(StorageUnavailableError):
+        users.create_user("bob", "pw", Role.USER)
+
+
+def test_open_breaker_without_a_snapshot_fails_fast():
+    breaker = CircuitBreaker(Outage(), failure_threshold=1, probe_interval=60)
+    books = CircuitBreakerBookStorage(FakeBookStorage(), breaker)
+    breaker.record_failure()
+
+    with pytest.raises(StorageUnavailableError):
+        books.iter_book_records()
@@ -0,0 +1,117 @@
+import io
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from cli import daemon
+
+ROOT = Path(__file__).resolve().parents[2]
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="requires Unix domain sockets"
+)
+
+
+@pytest.fixture
+def cli_env(tmp_path, monkeypatch):
+    sock = tmp_path / "cli.sock"
+    env = dict(
+        os.environ,
+        DATABASE_TYPE="fake",
+        LOG_DIR=str(tmp_path),
+        LIBRARY_CLI_SOCKET=str(sock),
+    )
+    env.pop(daemon.DISABLE_ENV, None)
+    for name in ("DATABASE_TYPE", "LIBRARY_CLI_SOCKET"):
+        monkeypatch.setenv(name, env[name])
+    return env
+
+
+@pytest.fixture
+def running_daemon(cli_env):
+    proc = subprocess.Popen(
+        [sys.executable, "main.py", "serve-cli"],
+        cwd=ROOT,
+        env=cli_env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    sock = Path(cli_env["LIBRARY_CLI_SOCKET"])
+    deadline = time.monotonic() + 20
+    while not sock.exists():
+        assert proc.poll() is None, proc.stdout.read()
+        assert time.monotonic() < deadline, "daemon did not start"
+        time.sleep(0.05)
+    yield proc
+    proc.terminate()
+    proc.wait(timeout=10)
+
+
+def _main(cli_env, *argv):
+    return subprocess.run(
+        [sys.executable, "main.py", *argv],
+        cwd=ROOT,
+        env=cli_env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_call_without_daemon_returns_none(cli_env):
+    assert daemon.call(["list-books", "--librarian"]) is None
+
+
+def test_commands_share_the_daemon_state(cli_env, running_daemon):
+    # The fake storage lives in the daemon's memory, so the second command
+    # only sees the book if both ran in the same process.
+    added = _main(
+        cli_env,
+        "add-book",
+        "--id",
+        "1001",
+        "--title",
+        "T",
+        "--author",
+        "A",
+        "--librarian",
+    )
+    assert added.returncode == 0, added.stdout
+    listed = _main(cli_env, "list-books", "--librarian")
+    assert listed.returncode == 0
+    assert "1001" in listed.stdout
+
+
+def test_exit_code_and_output_are_forwarded(cli_env, running_daemon):
+    out, err = io.StringIO(), io.StringIO()
+    code = daemon.call(["delete-book", "--id", "9999", "--librarian"], out, err)
+    assert code == 1
+    assert out.getvalue().startswith("ERROR:")
+
+
+def test_argparse_errors_do_not_stop_the_daemon(cli_env, running_daemon):
+    out, err = io.StringIO(), io.StringIO()
+    assert daemon.call(["add-book"], out, err) == 2
+    assert "required" in err.getvalue()
+    assert daemon.call(["list-books", "--librarian"], io.StringIO(), err) == 0
+
+
+def test_different_storage_configuration_falls_back(
+    cli_env, running_daemon, monkeypatch
+):
+    monkeypatch.setenv("DATABASE_TYPE", "json")
+    assert daemon.call(["list-books", "--librarian"]) is None
+
+
+def test_terminated_daemon_removes_its_socket(cli_env, running_daemon):
+    running_daemon.terminate()
+    running_daemon.wait(timeout=10)
+    assert not Path(cli_env["LIBRARY_CLI_SOCKET"]).exists()
+    # Falls back to in-process execution
+    assert _main(cli_env, "list-books", "--librarian").returncode == 0
@@ -0,0 +1,78 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from models.book import Book
+from storage.book_storage import BookStorage
+from storage.id_allocator import IdBlockAllocator
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+class Counter:
+    """A shared sequence that records each reservation."""
+
+    def __init__(self):
+        self.value = 0
+        self.calls = []
+
+    def reserve(self, count):
+        self.calls.append(count)
+        self.value += count
+        return self.value
+
+
+def test_blocks_start_at_the_request_size_and_grow():
+    counter = Counter()
+    first = IdBlockAllocator(counter.reserve, 10)
+    second = IdBlockAllocator(counter.reserve, 10)
+
+    a = [first.next_id() for _ in range(3)]
+    b = [second.next_id()]  # a one-shot process reserves only what it uses
+    a += first.next_ids(20)  # larger than a block: reserved whole
+    a += [first.next_id() for _ in range(12)]
+
+    assert a[:3] == [1, 2, 3] and b == [4]
+    assert a[3:] == list(range(5, 37))
+    # 1, 2, then 4 would do but 20 were asked for; doubling stops at 10
+    assert counter.calls == [1, 2, 1, 20, 8, 10]
+    assert len(set(a + b)) == len(a + b)
+
+
+def test_json_sequence_skips_existing_ids(tmp_path):
+    storage = BookStorage(data_dir=tmp_path)
+    storage.add_books([Book.create(i, "T", "A") for i in (5, 40)])
+    assert storage.get_next_book_id() == 41
+
+    # Another process (here: another instance) gets the next block
+    other = BookStorage(data_dir=tmp_path)
+    assert other.get_next_book_ids(2) == [42, 43]
+    storage.add_book(Book.create(90, "T", "A"))
+    assert storage.id_sequence_file.read_text() == "43"  # saves leave it alone
+    assert other.get_next_book_id() == 91  # the next block starts above 90
+    assert storage.get_next_book_id() == 93
+
+
+def test_json_sequence_is_unique_across_processes(tmp_path):
+    code = (
+        "import sys\n"
+        "from storage.book_storage import BookStorage\n"
+        "from storage.id_allocator import IdBlockAllocator\n"
+        "s = BookStorage(data_dir=sys.argv[1])\n"
+        "s._ids = IdBlockAllocator(s._reserve_ids, 7)\n"
+        "print(' '.join(str(s.get_next_book_id()) for _ in range(100)))\n"
+    )
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", code, str(tmp_path)],
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        for _ in range(4)
+    ]
+    ids = [int(i) for p in procs for i in p.communicate(timeout=60)[0].split()]
+
+    assert len(ids) == 400
+    assert len(set(ids)) == 400
@@ -0,0 +1,74 @@
+import io
+
+from cli.commands import handle_export_books
+from models.book import Book, BookStatus
+from services.import_export_service import ImportExportService, iter_rows
+from storage.book_storage import BookStorage
+from storage.fake.book_storage import FakeBookStorage
+
+CSV = """id,title,author,status,picked_by
+1001,Dune,Herbert,Available,
+1002,Emma,Austen,Picked,al
+12,Bad,Id,,
+1003,,No Title,,
+1001,Dup,Herbert,,
+"""
+
+
+def test_csv_import_validates_and_batches():
+    storage = FakeBookStorage()
+    storage.add_book(Book.create(1002, "Existing", "X"))
+    batches = []
+
+    report = ImportExportService(storage).import_file(
+        io.StringIO(CSV),
+        "csv",
+        batch_size=2,
+        progress=lambda r: batches.append(r.processed),
+    )
+
+    assert report.processed == 5
+    assert report.added == 1
+    assert report.duplicates == 2
+    assert report.rejected == 2
+    assert batches == [2, 4, 5]
+    assert report.errors[0].startswith("line 4:")
+    assert storage.get_book_by_id(1001).title == "Dune"
+
+
+def test_ndjson_export_round_trip():
+    source = FakeBookStorage()
+    source.add_book(
+        Book.create(2001, "A", "B", status=BookStatus.PICKED, picked_by="x")
+    )
+    source.add_book(Book.create(2002, "C", "D"))
+
+    out = io.StringIO()
+    assert ImportExportService(source).export_file(out, "ndjson").processed == 2
+
+    out.seek(0)
+    rows = list(iter_rows(out, "ndjson"))
+    target = FakeBookStorage()
+    report = ImportExportService(target).import_rows(rows)
+    assert report.added == 2
+    assert target.load_books() == source.load_books()
+
+
+def test_ndjson_bad_lines_are_rejected_not_fatal():
+    data = '{"id": 3001, "title": "T", "author": "A"}\nnot json\n[1]\n'
+    report = ImportExportService(FakeBookStorage()).import_file(
+        io.StringIO(data), "ndjson"
+    )
+    assert (report.added, report.rejected) == (1, 2)
+
+
+def test_export_of_corrupt_catalog_fails(tmp_path, capsys):
+    (tmp_path / "books.json").write_text('[{"id": 1, "title": "T", "author": "A"}, {')
+    service = ImportExportService(BookStorage(data_dir=tmp_path))
+
+    code = handle_export_books(
+        str(tmp_path / "out.ndjson"), is_librarian=True, service=service
+    )
+
+    assert code == 1
+    assert "ERROR: Export" in capsys.readouterr().out
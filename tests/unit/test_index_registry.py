@@ -0,0 +1,68 @@
+from models.book import BookStatus
+from services.book_service import BookService
+from storage.fake.book_storage import FakeBookStorage
+from storage.mongodb.indexes import INDEXES, QueryShape, explain_query, plan_stages
+
+
+class ExplainingCursor:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def sort(self, keys):
+        return self
+
+    def explain(self):
+        return {"queryPlanner": {"winningPlan": self.plan}}
+
+
+class PlanCollection:
+    """Collection whose queries all explain as ``plan``."""
+
+    def __init__(self, plan):
+        self.plan = plan
+
+    def find(self, query):
+        return ExplainingCursor(self.plan)
+
+
+def test_registry_names_partial_indexes_apart():
+    specs = {s.name: s for s in INDEXES["books"]}
+    partial = specs["status_1_id_1_partial"].model().document
+
+    assert partial["key"] == {"status": 1, "id": 1}
+    assert partial["partialFilterExpression"] == {"status": {"$gt": "Available"}}
+    assert specs["id_1"].model().document["unique"] is True
+
+
+def test_explain_flags_scans_and_in_memory_sorts():
+    sort_over_scan = {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}
+    # Slot-based engine plans nest the tree under "queryPlan"
+    fetch = {
+        "queryPlan": {
+            "stage": "FETCH",
+            "inputStage": {"stage": "IXSCAN", "indexName": "status_1_id_1_partial"},
+        }
+    }
+    db = {"books": PlanCollection(sort_over_scan), "users": PlanCollection(fetch)}
+
+    scan = explain_query(db, QueryShape("all", "books", {}, (("id", 1),)))
+    indexed = explain_query(db, QueryShape("picked", "users", {"status": "Picked"}))
+
+    assert scan.collection_scan and scan.in_memory_sort and not scan.ok
+    assert indexed.ok and indexed.indexes == ["status_1_id_1_partial"]
+    assert [s["stage"] for s in plan_stages(fetch)] == ["FETCH", "IXSCAN"]
+
+
+def test_picked_listing_uses_the_storage_query():
+    storage = FakeBookStorage()
+    service = BookService(storage)
+    for book_id in (1003, 1001, 1002):
+        service.add_book(book_id, f"Title {book_id}", "Author")
+    service.pick_book(1003, "ann")
+    service.pick_book(1001, "bob")
+    calls = []
+    find = storage.find_books_by_status
+    storage.find_books_by_status = lambda status: calls.append(status) or find(status)
+
+    assert [b.id for b in service.list_picked_books()] == [1001, 1003]
+    assert calls == [BookStatus.PICKED]
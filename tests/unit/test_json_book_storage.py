@@ -0,0 +1,76 @@
+import json
+import tracemalloc
+
+import pytest
+
+from models.book import Book
+from services.book_service import BookService
+from storage.book_storage import BookStorage
+from storage.migrations import CURRENT_SCHEMA_VERSION
+
+
+def test_iter_book_records_streams_whole_catalog(tmp_path):
+    storage = BookStorage(data_dir=tmp_path)
+    books = [Book.create(i, f"Title {i}", "Author " * 10) for i in range(1, 20001)]
+    storage.add_books(books)
+    file_size = storage.books_file.stat().st_size
+
+    tracemalloc.start()
+    count = sum(1 for _ in storage.iter_book_records())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert count == len(books)
+    assert peak < file_size / 5
+
+
+def test_iter_book_dicts_normalizes_legacy_records(tmp_path):
+    (tmp_path / "books.json").write_text(
+        json.dumps([{"id": "1001", "title": "T", "author": "A", "status": "BORROWED"}])
+    )
+    service = BookService(BookStorage(data_dir=tmp_path))
+
+    assert list(service.iter_book_dicts()) == [
+        {"id": 1001, "title": "T", "author": "A", "status": "Borrowed"}
+    ]
+
+
+def test_iter_book_records_raises_on_corrupt_file(tmp_path):
+    (tmp_path / "books.json").write_text('[{"id": 1, "title": "T"}, {"id": ')
+    records = BookStorage(data_dir=tmp_path).iter_book_records()
+
+    assert next(records) == {"id": 1, "title": "T"}
+    with pytest.raises(json.JSONDecodeError):
+        next(records)
+
+
+def test_load_books_parses_stray_legacy_record_of_migrated_catalog(tmp_path):
+    storage = BookStorage(data_dir=tmp_path)
+    storage.set_schema_version(CURRENT_SCHEMA_VERSION)
+    storage.books_file.write_text(
+        json.dumps(
+            [
+                {"id": 1, "title": "T", "author": "A", "status": "Available"},
+                {"id": "2", "title": "U", "author": "B", "status": "BORROWED"},
+            ]
+        )
+    )
+
+    assert [(b.id, b.status.value) for b in storage.load_books()] == [
+        (1, "Available"),
+        (2, "Borrowed"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "content", ['[{"id": 1, "title": "T", "author": "A"}, {"id": ', '[{"id": 2}]']
+)
+def test_unreadable_catalog_fails_writes_instead_of_emptying(tmp_path, content):
+    storage = BookStorage(data_dir=tmp_path)
+    storage.books_file.write_text(content)
+
+    with pytest.raises((ValueError, KeyError)):  # bad JSON / missing title
+        storage.load_books()
+    with pytest.raises((ValueError, KeyError)):
+        storage.add_book(Book.create(3, "New", "Author"))
+    assert storage.books_file.read_text() == content
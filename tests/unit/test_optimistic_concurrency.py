@@ -0,0 +1,156 @@
+import multiprocessing
+
+import pytest
+
+from models.book import Book, BookStatus
+from services.book_service import BookService
+from services.retry import NO_RETRY, RetryPolicy
+from storage.book_storage import BookStorage
+from storage.errors import VersionConflictError
+from storage.fake.book_storage import FakeBookStorage
+
+FAST_RETRY = RetryPolicy(max_attempts=5, base_delay=0, max_delay=0)
+
+
+@pytest.fixture(params=["fake", "json"])
+def storage(request, tmp_path):
+    if request.param == "json":
+        return BookStorage(data_dir=tmp_path)
+    return FakeBookStorage()
+
+
+def test_stale_update_is_rejected(storage):
+    storage.add_book(Book.create(1001, "T", "A"))
+    first = storage.get_book_by_id(1001)
+    second = storage.get_book_by_id(1001)
+
+    first.title = "First"
+    assert storage.update_book(first) is True
+    assert first.version == 1
+
+    second.title = "Second"
+    with pytest.raises(VersionConflictError):
+        storage.update_book(second)
+    assert storage.get_book_by_id(1001).title == "First"
+
+
+def test_batch_update_writes_fresh_books_and_reports_stale(storage):
+    storage.add_books([Book.create(i, "T", "A") for i in (1001, 1002)])
+    stale = storage.get_books_by_ids([1001, 1002])
+    fresh = storage.get_book_by_id(1002)
+    fresh.title = "Other writer"
+    storage.update_book(fresh)
+
+    with pytest.raises(VersionConflictError) as exc:
+        storage.update_books(list(stale.values()))
+    assert exc.value.book_ids == [1002]
+    assert storage.get_book_by_id(1001).version == 1
+    assert storage.get_book_by_id(1002).title == "Other writer"
+
+
+class _RacingStorage(FakeBookStorage):
+    """Lets another writer slip in once between a read and the next write."""
+
+    def __init__(self, racer):
+        super().__init__()
+        self.racer = racer
+
+    def _race(self):
+        racer, self.racer = self.racer, None
+        if racer is not None:
+            racer(self)
+
+    def update_book(self, book):
+        self._race()
+        return super().update_book(book)
+
+    def update_books(self, books):
+        self._race()
+        return super().update_books(books)
+
+
+def _picked_by_other(storage):
+    book = storage.get_book_by_id(1001)
+    book.status, book.picked_by = BookStatus.PICKED, "other"
+    FakeBookStorage.update_book(storage, book)
+
+
+def test_retry_revalidates_against_fresh_state():
+    storage = _RacingStorage(_picked_by_other)
+    storage.add_book(Book.create(1001, "T", "A"))
+
+    book, error = BookService(storage, FAST_RETRY).pick_book(1001, "me")
+
+    assert book is None
+    assert "not available" in error
+    assert storage.get_book_by_id(1001).picked_by == "other"
+
+
+def test_retry_succeeds_after_unrelated_change():
+    def retitle(storage):
+        book = storage.get_book_by_id(1001)
+        book.title = "Retitled"
+        FakeBookStorage.update_book(storage, book)
+
+    storage = _RacingStorage(retitle)
+    storage.add_book(Book.create(1001, "T", "A"))
+
+    book, error = BookService(storage, FAST_RETRY).pick_book(1001, "me")
+
+    assert error == ""
+    stored = storage.get_book_by_id(1001)
+    assert (stored.title, stored.picked_by, stored.version) == ("Retitled", "me", 2)
+
+
+def test_conflict_without_retries_reports_error():
+    storage = _RacingStorage(_picked_by_other)
+    storage.add_book(Book.create(1001, "T", "A"))
+
+    book, error = BookService(storage, NO_RETRY).pick_book(1001, "me")
+
+    assert book is None
+    assert "modified concurrently" in error
+
+
+def test_batch_rechecks_only_conflicted_books():
+    def return_one(storage):
+        book = storage.get_book_by_id(1002)
+        book.status, book.picked_by = BookStatus.AVAILABLE, None
+        FakeBookStorage.update_book(storage, book)
+
+    storage = _RacingStorage(return_one)
+    for i in (1001, 1002):
+        storage.add_book(Book.create(i, "T", "A", BookStatus.PICKED, "al"))
+
+    results = BookService(storage, FAST_RETRY).approve_borrows([1001, 1002])
+
+    assert [r.success for r in results] == [True, False]
+    assert "not in Picked status" in results[1].error
+    assert storage.get_book_by_id(1001).status == BookStatus.BORROWED
+
+
+def _retitle_worker(data_dir, book_id, rounds):
+    service = BookService(BookStorage(data_dir=data_dir), RetryPolicy(50))
+    for n in range(rounds):
+        book, error = service.update_book_info(book_id, title=f"Round {n}")
+        assert book is not None, error
+
+
+def test_concurrent_processes_do_not_lose_updates(tmp_path):
+    ids = [1001, 1002, 1003, 1004]
+    BookStorage(data_dir=tmp_path).add_books([Book.create(i, "T", "A") for i in ids])
+
+    rounds = 10
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(target=_retitle_worker, args=(tmp_path, i, rounds)) for i in ids
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+    assert [p.exitcode for p in procs] == [0] * len(ids)
+
+    books = BookStorage(data_dir=tmp_path).get_books_by_ids(ids)
+    assert all(b.version == rounds for b in books.values())
+    assert {b.title for b in books.values()} == {f"Round {rounds - 1}"}
@@ -0,0 +1,123 @@
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from web import prefork
+
+ROOT = Path(__file__).resolve().parents[2]
+
+pytestmark = pytest.mark.skipif(
+    not Path("/proc/self/task").exists(), reason="needs fork and /proc"
+)
+
+# Supervisor with two blocking workers on an ephemeral port; prints the port
+SUPERVISOR = """
+import socket, sys
+from web import prefork
+prefork.prepare_metrics_dir()
+listener = socket.create_server(("127.0.0.1", 0))
+print(listener.getsockname()[1], flush=True)
+sys.exit(prefork.PreforkServer(listener, 2, prefork.serve_blocking).run())
+"""
+
+
+def _children(pid):
+    path = Path(f"/proc/{pid}/task/{pid}/children")
+    return set(map(int, path.read_text().split()))
+
+
+def _get(port, path):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", path)
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def supervisor(tmp_path):
+    env = dict(
+        os.environ,
+        DATABASE_TYPE="fake",
+        LOG_DIR=str(tmp_path / "logs"),
+        PROMETHEUS_MULTIPROC_DIR=str(tmp_path / "metrics"),
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-c", SUPERVISOR],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    port = int(proc.stdout.readline())
+    assert _wait_for(lambda: len(_children(proc.pid)) == 2)
+    yield proc, port
+    if proc.poll() is None:
+        proc.kill()
+        proc.wait()
+
+
+def test_crashed_worker_is_replaced(supervisor):
+    proc, port = supervisor
+    before = _children(proc.pid)
+
+    victim = min(before)
+    os.kill(victim, signal.SIGKILL)
+
+    def replaced():
+        children = _children(proc.pid)
+        return len(children) == 2 and victim not in children
+
+    assert _wait_for(replaced)
+    assert _get(port, "/health")[0] == 200
+
+
+def test_metrics_cover_all_workers(supervisor):
+    _, port = supervisor
+    for _ in range(6):
+        assert _get(port, "/health")[0] == 200
+
+    status, body = _get(port, "/metrics")
+
+    assert status == 200
+    assert (
+        b'library_http_requests_total{method="GET",path="/health",status="200"} 6.0'
+        in body
+    )
+
+
+def test_sigterm_stops_supervisor_and_workers(supervisor):
+    proc, _ = supervisor
+    workers = _children(proc.pid)
+
+    proc.terminate()
+
+    assert proc.wait(timeout=prefork.SHUTDOWN_TIMEOUT + 5) == 0
+    for pid in workers:
+        assert not Path(f"/proc/{pid}").exists()
+
+
+def test_available_cpus_is_capped_by_cgroup_quota(monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(8)))
+    monkeypatch.setattr(prefork, "_cgroup_cpu_limit", lambda: 1.5)
+
+    assert prefork.available_cpus() == 2
+    assert prefork.parse_workers("auto") == 2
+    assert prefork.parse_workers("0") == 2
+    assert prefork.parse_workers("3") == 3
+    assert prefork.parse_workers(None) == 1
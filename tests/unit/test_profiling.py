@@ -0,0 +1,73 @@
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+from web.profiling import CpuProfiler, MemoryTracer, sample_wall_clock
+
+
+def busy_work():
+    return sum(i * i for i in range(20000))
+
+
+def test_cpu_capture_keeps_only_requests_run_during_it():
+    profiler = CpuProfiler()
+    with profiler.profile():
+        busy_work()  # before the capture: not profiled
+    assert profiler.start() and not profiler.start()
+
+    with profiler.profile():
+        busy_work()
+    in_flight = profiler.profile()
+    in_flight.__enter__()
+    capture = profiler.stop()
+    in_flight.__exit__(None, None, None)
+
+    assert capture.requests == 1 and profiler.stop() is None
+    assert "busy_work" in capture.report("tottime", 10)
+    assert "tests/unit/test_profiling.py:busy_work;" in capture.collapsed()
+
+
+def test_wall_clock_sampling_sees_waiting_threads():
+    release = threading.Event()
+
+    def parked_in_test():
+        release.wait(5)
+
+    worker = threading.Thread(target=parked_in_test, name="parked")
+    worker.start()
+    results = []
+    sampler = threading.Thread(
+        target=lambda: results.append(sample_wall_clock(0.3, 0.01))
+    )
+    sampler.start()
+    time.sleep(0.05)
+    concurrent, error = sample_wall_clock(0.1)
+    sampler.join()
+    release.set()
+    worker.join()
+
+    (stacks, rounds), _ = results[0]
+    parked = {s: n for s, n in stacks.items() if s.startswith("parked;")}
+    assert concurrent is None and "already" in error
+    assert rounds > 5
+    assert any(s.endswith(":wait") and "parked_in_test" in s for s in parked)
+
+
+@pytest.mark.skipif(tracemalloc.is_tracing(), reason="tracemalloc already in use")
+def test_memory_diff_reports_growth_since_the_snapshot():
+    tracer = MemoryTracer()
+    assert tracer.diff()[1] == "tracemalloc is not running"
+    assert tracer.start(frames=5)
+    try:
+        assert tracer.diff()[1] == "Take a snapshot first"
+        tracer.snapshot(limit=5)
+        leak = [bytearray(1000) for _ in range(200)]
+        diff, _ = tracer.diff(limit=5)
+        growth = diff["top"][0]
+        assert growth["where"].startswith("tests/unit/test_profiling.py:")
+        assert growth["size_diff_bytes"] >= 200 * 1000
+        del leak
+    finally:
+        assert tracer.stop() and not tracer.stop()
@@ -0,0 +1,107 @@
+import http.client
+import http.server
+import json
+import threading
+
+import pytest
+
+from storage.rate_limit_store import MemoryRateLimitStore
+from web.app_server import AppWebHandler
+from web.rate_limit import Budget, RateLimiter, parse_budgets
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = Clock()
+    store = MemoryRateLimitStore(clock=clock)
+
+    assert [store.take("k", rate=1.0, burst=3)[0] for _ in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    allowed, retry_after = store.take("k", rate=1.0, burst=3)
+    assert not allowed and retry_after == pytest.approx(1.0)
+
+    clock.now += 1.5
+    assert store.take("k", rate=1.0, burst=3) == (True, 0.0)
+    assert store.take("k", rate=1.0, burst=3)[0] is False
+
+
+def test_idle_and_excess_buckets_are_evicted():
+    clock = Clock()
+    store = MemoryRateLimitStore(max_buckets=3, sweep_interval=10, clock=clock)
+    for key in "abcd":
+        store.take(key, rate=1.0, burst=2)
+
+    assert len(store) == 3  # "a" was the least recently used
+
+    clock.now += 0.5
+    store.take("b", rate=1.0, burst=2)  # not refilled yet
+    clock.now += 9.6
+    store.take("e", rate=1.0, burst=2)  # triggers the sweep
+
+    assert len(store) == 1  # only the fresh bucket remains
+
+
+def test_budget_spec_parsing():
+    assert parse_budgets("/api/login:ip=10/60, /api/execute:ip=120/60:30") == {
+        ("/api/login", "ip"): Budget(10 / 60, 10),
+        ("/api/execute", "ip"): Budget(2.0, 30),
+    }
+    assert parse_budgets("/api/login:username=0/1") == {
+        ("/api/login", "username"): None
+    }
+    with pytest.raises(ValueError):
+        parse_budgets("/api/login=10")
+
+
+def test_store_failure_allows_requests():
+    class BrokenStore:
+        def take(self, *args):
+            raise ConnectionError("down")
+
+    limiter = RateLimiter({("/api/login", "ip"): Budget(1, 1)}, BrokenStore())
+
+    assert limiter.check("/api/login", "ip", "10.0.0.1") == (True, 0.0)
+    assert limiter.check("/api/books", "ip", "10.0.0.1") == (True, 0.0)
+
+
+def test_login_attempts_are_limited_per_username(monkeypatch):
+    monkeypatch.setenv("DATABASE_TYPE", "fake")
+    limiter = RateLimiter(
+        {
+            ("/api/login", "ip"): Budget(rate=1, burst=100),
+            ("/api/login", "username"): Budget(rate=1 / 60, burst=2),
+        },
+        MemoryRateLimitStore(),
+    )
+    monkeypatch.setattr(AppWebHandler, "RATE_LIMITER", limiter)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), AppWebHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def login(username):
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        body = json.dumps({"username": username, "password": "wrong"})
+        conn.request("POST", "/api/login", body=body)
+        response = conn.getresponse()
+        response.read()
+        return response.status, response.getheader("Retry-After")
+
+    try:
+        assert login("alice")[0] == 401
+        assert login("alice")[0] == 401
+        status, retry_after = login("alice")
+        assert status == 429 and int(retry_after) >= 30
+        assert login("bob")[0] == 401
+    finally:
+        server.shutdown()
+        server.server_close()
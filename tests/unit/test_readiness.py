@@ -0,0 +1,85 @@
+import threading
+
+from config.database import PoolMonitor
+from storage.fake.book_storage import FakeBookStorage
+from storage.fake.user_storage import FakeUserStorage
+from web.readiness import ReadinessChecker
+
+
+class OpenBreaker:
+    is_open = True
+
+
+class BrokenStorage:
+    def ping(self):
+        raise OSError("data directory is not writable")
+
+
+def test_report_is_built_in_the_background(tmp_path):
+    release = threading.Event()
+
+    def slow_books():
+        release.wait(5)
+        return FakeBookStorage()
+
+    checker = ReadinessChecker(
+        {"books": slow_books, "users": FakeUserStorage},
+        {"busy": lambda: {"saturation": 0.95}, "unused": lambda: None},
+        interval=60,
+        log_dir=tmp_path,
+    )
+    try:
+        starting = checker.report()
+        release.set()
+        while checker.report()[1]["status"] == "starting":
+            release.wait(0.01)
+        status, report = checker.report()
+    finally:
+        checker.stop()
+
+    assert starting[0] == 503 and starting[1]["status"] == "starting"
+    assert status == 200 and report["status"] == "ready"
+    assert report["storage"]["books"]["ok"] and report["logs"]["writable"]
+    assert list(report["pools"]) == ["busy"]
+    assert report["warnings"] == ["busy pool is saturated"]
+
+
+def test_unreachable_storage_or_stale_report_is_not_ready(tmp_path):
+    guarded = FakeBookStorage()
+    guarded.breaker = OpenBreaker()
+    checker = ReadinessChecker(
+        {"books": lambda: guarded, "users": BrokenStorage},
+        interval=60,
+        log_dir=tmp_path / "missing",
+    )
+    report = checker.check()
+    assert not report["ready"]
+    assert report["storage"]["books"]["error"] == "MongoDB circuit breaker is open"
+    assert report["storage"]["users"]["error"].startswith("OSError")
+    assert report["warnings"] == ["log directory is not writable"]
+
+    checker.storages = {"books": FakeBookStorage}
+    checker.check()
+    checker._checked -= 600  # as if the checker had hung for ten minutes
+    checker._thread = threading.current_thread()  # keep report() from starting it
+    status, stale = checker.report()
+    assert status == 503 and stale["warnings"][-1] == "readiness report is stale"
+
+
+def test_pool_monitor_counts_checkouts_and_waiters():
+    monitor = PoolMonitor()
+    monitor.max_size = 4
+    for _ in range(3):
+        monitor.connection_check_out_started(None)
+    monitor.connection_checked_out(None)
+    monitor.connection_checked_out(None)
+    monitor.connection_check_out_failed(None)
+    monitor.connection_checked_in(None)
+
+    assert monitor.snapshot() == {
+        "in_use": 1,
+        "max_size": 4,
+        "waiting": 0,
+        "checkout_failures": 1,
+        "saturation": 0.25,
+    }
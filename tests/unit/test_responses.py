@@ -0,0 +1,54 @@
+import gzip
+import io
+import json
+import zlib
+
+from web.responses import (
+    StreamWriter,
+    compress,
+    dumps,
+    iter_json_array,
+    negotiate_encoding,
+)
+
+
+def _dechunk(raw):
+    body, rest = b"", raw
+    while True:
+        size_line, rest = rest.split(b"\r\n", 1)
+        size = int(size_line, 16)
+        if size == 0:
+            assert rest == b"\r\n"
+            return body
+        body, rest = body + rest[:size], rest[size + 2 :]
+
+
+def test_compact_by_default_and_utf8():
+    assert dumps({"a": [1, 2], "t": "كتاب"}) == '{"a":[1,2],"t":"كتاب"}'.encode()
+    assert b"\n" in dumps({"a": 1}, pretty=True)
+
+
+def test_negotiation_prefers_gzip_and_respects_q0():
+    assert negotiate_encoding("deflate, gzip") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") == "deflate"
+    assert negotiate_encoding(None) is None
+    assert zlib.decompress(compress(b"x" * 100, "deflate")) == b"x" * 100
+
+
+def test_streamed_array_is_chunked_and_compressed():
+    items = [{"id": i, "title": f"Book {i}"} for i in range(5000)]
+    out = io.BytesIO()
+    writer = StreamWriter(out, "gzip", chunked=True)
+    for piece in iter_json_array(iter(items)):
+        writer.write(piece)
+    writer.close()
+
+    assert json.loads(gzip.decompress(_dechunk(out.getvalue()))) == items
+
+
+def test_empty_and_pretty_arrays_are_valid_json():
+    assert json.loads(b"".join(iter_json_array([]))) == []
+    assert json.loads(b"".join(iter_json_array([{"a": 1}, 2], pretty=True))) == [
+        {"a": 1},
+        2,
+    ]
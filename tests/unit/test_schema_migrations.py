@@ -0,0 +1,69 @@
+import json
+
+from models.book import Book, BookStatus
+from services.book_service import BookService
+from storage.book_storage import BookStorage
+from storage.migrations import (
+    CURRENT_SCHEMA_VERSION,
+    migrate_books,
+    schema_is_current,
+    upgrade_record,
+)
+
+LEGACY = [
+    {"id": "1001", "title": "Dune", "author": "Herbert", "status": "BORROWED"},
+    {"id": 1002, "title": "Emma", "author": "Austen", "status": "picked",
+     "picked_by": "ann", "isbn": "", "version": 0, "shelf": "B2"},
+    {"id": 1003, "title": "Ulysses", "author": "Joyce", "isbn": 9780199535675},
+]  # fmt: skip
+
+
+def test_upgrade_record_normalizes_legacy_shapes():
+    assert [upgrade_record(r) for r in LEGACY] == [
+        {"id": 1001, "title": "Dune", "author": "Herbert", "status": "Borrowed"},
+        {"id": 1002, "title": "Emma", "author": "Austen", "status": "Picked",
+         "picked_by": "ann"},
+        {"id": 1003, "title": "Ulysses", "author": "Joyce", "status": "Available",
+         "isbn": "9780199535675"},
+    ]  # fmt: skip
+    current = Book.create(7, "T", "A").to_dict()
+    assert upgrade_record(current) is current
+
+
+def test_json_migration_records_the_schema_version(tmp_path):
+    (tmp_path / "books.json").write_text(json.dumps(LEGACY))
+    storage = BookStorage(data_dir=tmp_path)
+    assert not schema_is_current(storage)
+
+    report = migrate_books(storage)
+    assert (report.scanned, report.updated, report.completed) == (3, 3, True)
+
+    reopened = BookStorage(data_dir=tmp_path)
+    assert reopened.schema_version == CURRENT_SCHEMA_VERSION
+    expected = [upgrade_record(r) for r in LEGACY]
+    assert [b.to_dict() for b in reopened.load_books()] == expected
+    assert json.loads(storage.books_file.read_text()) == expected
+    # Records are now streamed as stored
+    assert list(BookService(reopened).iter_book_dicts()) == expected
+    assert migrate_books(reopened).scanned == 0
+
+
+def test_json_migration_keeps_a_concurrent_write(tmp_path):
+    (tmp_path / "books.json").write_text(json.dumps(LEGACY[:1]))
+    storage = BookStorage(data_dir=tmp_path)
+    writer = BookStorage(data_dir=tmp_path)
+    calls = []
+
+    def upgrade(record):
+        if not calls:
+            # Another process commits while the migration is mid-pass
+            writer.add_book(Book.create(2000, "New", "Author"))
+        calls.append(record["id"])
+        return upgrade_record(record)
+
+    # The writer stored every record in the current shape, so the second
+    # pass over its file has nothing left to change
+    assert storage.rewrite_records(upgrade) == (0, 2)
+    books = {b.id: b for b in BookStorage(data_dir=tmp_path).load_books()}
+    assert books[1001].status == BookStatus.BORROWED and 2000 in books
+    assert calls == ["1001", 1001, 2000]
@@ -0,0 +1,69 @@
+import json
+
+from lib_logging import slow_ops
+from lib_logging.slow_ops import SlowOpRecorder, instrument, redact
+from models.book import Book
+from models.role import Role
+from models.user import User
+
+
+@instrument("json")
+class Repository:
+    def save(self, book, user, password, tags=()):
+        return True
+
+    def fail(self):
+        raise KeyError("missing")
+
+    def _private(self):
+        return True
+
+
+def test_slow_calls_are_recorded_with_redacted_arguments(tmp_path, monkeypatch):
+    recorder = SlowOpRecorder(0.0, buffer_size=2, log_file=tmp_path / "slow.ndjson")
+    monkeypatch.setattr(slow_ops, "SLOW_OPS", recorder)
+    user = User(id=3, username="ann", password="hunter2", role=Role.USER)
+
+    Repository().save(
+        Book.create(1001, "T", "A"), user, "hunter2", tags=list("abcdefg")
+    )
+    try:
+        Repository().fail()
+    except KeyError:
+        pass
+    Repository()._private()
+
+    failed, saved = recorder.recent()
+    assert saved["op"] == "Repository.save" and saved["backend"] == "json"
+    assert saved["args"] == {
+        "book": "Book(id=1001)",
+        "user": "User(id=3)",
+        "password": "***",
+        "tags": ["a", "b", "c", "d", "e", "... 7 items"],
+    }
+    assert saved["stack"][-1].startswith("tests/unit/test_slow_ops.py:")
+    assert failed["error"] == "KeyError"
+    lines = (tmp_path / "slow.ndjson").read_text().splitlines()
+    assert [json.loads(line)["op"] for line in lines] == [
+        "Repository.save",
+        "Repository.fail",
+    ]
+
+
+def test_fast_calls_and_disabled_recorder_record_nothing(monkeypatch):
+    recorder = SlowOpRecorder(60.0, log_file=None)
+    monkeypatch.setattr(slow_ops, "SLOW_OPS", recorder)
+    Repository().save(None, None, "x")
+    recorder.threshold = None
+    Repository().save(None, None, "x")
+    assert recorder.recent() == []
+
+
+def test_redact_hides_credentials_in_nested_values():
+    assert redact({"username": "ann", "Password": "x", "meta": {"token": "t"}}) == {
+        "username": "ann",
+        "Password": "***",
+        "meta": {"token": "***"},
+    }
+    assert redact(iter([1, 2])) == "<list_iterator>"
+    assert redact("x" * 500).endswith("...")
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Modules a plain book command must not pay for at start-up
+HEAVY_MODULES = (
+    "pymongo",
+    "dotenv",
+    "prometheus_client",
+    "csv",
+    "services.import_export_service",
+    "services.stats_service",
+    "services.user_service",
+)
+
+
+def _run(code_or_args, tmp_path):
+    env = dict(os.environ, DATABASE_TYPE="fake", LOG_DIR=str(tmp_path))
+    return subprocess.run(
+        [sys.executable, *code_or_args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_book_command_does_not_import_unused_modules(tmp_path):
+    code = (
+        "import sys, main\n"
+        "main.main(['list-books', '--librarian'])\n"
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+    )
+    result = _run(["-c", code], tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_profile_startup_prints_import_breakdown(tmp_path):
+    result = _run(["main.py", "--profile-startup", "--help"], tmp_path)
+    assert result.returncode == 0
+    assert "usage:" in result.stdout
+    assert "STARTUP:" in result.stderr
+    assert "cumulative ms" in result.stderr
+
+
+def test_loggers_share_one_file_handler(tmp_path):
+    code = (
+        "from lib_logging.logger import get_logger\n"
+        "a, b = get_logger('x.a'), get_logger('x.b')\n"
+        "print(a.handlers == b.handlers and len(a.handlers) == 2)\n"
+    )
+    result = _run(["-c", code], tmp_path)
+    assert result.stdout.strip() == "True", result.stderr
@@ -0,0 +1,69 @@
+import gzip
+import os
+
+from web.static_assets import AssetCache, accepts_encoding
+
+
+def _site(tmp_path):
+    app = tmp_path / "web" / "app"
+    app.mkdir(parents=True)
+    (app / "app.js").write_text("console.log('hi');\n" * 100)
+    (app / "index.html").write_text('<script src="/app/app.js"></script>')
+    return AssetCache(tmp_path, check_interval=0), app
+
+
+def test_accept_encoding_negotiation():
+    assert accepts_encoding("gzip, deflate, br", "br")
+    assert accepts_encoding("*", "gzip")
+    assert not accepts_encoding("gzip;q=0, deflate", "gzip")
+    assert not accepts_encoding("", "gzip")
+
+
+def test_precompressed_variants_and_etags(tmp_path):
+    cache, _ = _site(tmp_path)
+    asset = cache.get("web/app/app.js")
+
+    body, coding = asset.select("gzip")
+    assert coding == "gzip"
+    assert gzip.decompress(body) == asset.body
+    assert asset.select("identity") == (asset.body, None)
+    assert asset.etag("gzip") != asset.etag()
+    assert asset.not_modified(asset.etag("gzip"), asset.etag("gzip"), None)
+    assert not asset.not_modified(asset.etag(), '"other"', None)
+    assert asset.not_modified(asset.etag(), None, asset.last_modified)
+
+
+def test_html_links_are_fingerprinted_and_follow_changes(tmp_path):
+    cache, app = _site(tmp_path)
+    js = cache.get("web/app/app.js")
+    page = cache.get("web/app/index.html")
+    assert f"/app/app.js?v={js.fingerprint}".encode() in page.body
+
+    (app / "app.js").write_text("console.log('changed');\n" * 100)
+    st = (app / "app.js").stat()
+    os.utime(app / "app.js", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    new_page = cache.get("web/app/index.html")
+    new_js = cache.get("web/app/app.js")
+    assert new_js.fingerprint != js.fingerprint
+    assert f"?v={new_js.fingerprint}".encode() in new_page.body
+
+
+def test_paths_outside_root_are_not_served(tmp_path):
+    cache, _ = _site(tmp_path)
+    (tmp_path.parent / "secret.txt").write_text("x")
+    assert cache.get("web/../../secret.txt") is None
+    assert cache.get("web/app/missing.js") is None
+
+
+def test_paths_outside_the_assets_directory_are_not_served(tmp_path):
+    cache, app = _site(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "users.json").write_text('[{"password_hash": "x"}]')
+    (tmp_path / ".env").write_text("SECRET=x")
+    (tmp_path / "web" / "server.py").write_text("TOKEN = 'x'")
+
+    assert cache.get("web/app/../../data/users.json") is None
+    assert cache.get("web/app/../../.env") is None
+    assert cache.get("web/app/../server.py") is None
+    assert cache.get("web/app/../app/app.js") is not None
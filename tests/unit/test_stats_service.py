@@ -0,0 +1,35 @@
+from models.book import Book, BookStatus
+from services.stats_service import CatalogSnapshot, StatsService
+from storage.fake.book_storage import FakeBookStorage
+
+
+def _storage():
+    s = FakeBookStorage()
+    s.add_book(Book.create(1, "A", "Tolkien"))
+    s.add_book(Book.create(2, "B", "Tolkien", status=BookStatus.PICKED, picked_by="al"))
+    s.add_book(
+        Book.create(3, "C", "Hawking", status=BookStatus.BORROWED, picked_by="al")
+    )
+    s.add_book(Book.create(4, "D", "Martin", status=BookStatus.PICKED, picked_by="bo"))
+    return s
+
+
+def test_snapshot_counts():
+    snap = CatalogSnapshot.from_records(b.to_dict() for b in _storage().load_books())
+    assert len(snap) == 4
+    assert snap.status_codes.typecode == "B"
+    assert snap.count_by_status() == {"Available": 1, "Picked": 2, "Borrowed": 1}
+    assert snap.top_authors(1) == [("Tolkien", 2)]
+    assert snap.picked_per_user() == [("al", 2), ("bo", 1)]
+
+
+def test_snapshot_reused_until_catalog_changes():
+    storage = _storage()
+    svc = StatsService(storage)
+    first = svc.snapshot()
+    assert StatsService(storage).snapshot() is first
+
+    storage.remove_book(1)
+    second = svc.snapshot()
+    assert second is not first
+    assert svc.get_stats()["by_status"]["Available"] == 0
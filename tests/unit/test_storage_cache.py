@@ -0,0 +1,95 @@
+from models.book import Book
+from models.role import Role
+from storage.fake.book_storage import FakeBookStorage
+from storage.fake.user_storage import FakeUserStorage
+from storage.mongodb.cache import (
+    CachedMongoDBBookStorage,
+    CachedMongoDBUserStorage,
+    LRUCache,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingBooks(FakeBookStorage):
+    """Fake storage that counts the lookups reaching it."""
+
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+
+    def get_book_by_id(self, book_id):
+        self.lookups += 1
+        return super().get_book_by_id(book_id)
+
+    def get_books_by_ids(self, book_ids):
+        self.lookups += 1
+        return super().get_books_by_ids(book_ids)
+
+
+def test_lru_evicts_least_recent_and_expires_entries():
+    clock = Clock()
+    cache = LRUCache("t", max_entries=2, ttl=10, clock=clock)
+    cache.put("a", 1, cache.generation)
+    cache.put("b", 2, cache.generation)
+    assert cache.get("a") == 1  # "b" is now the least recent
+    cache.put("c", 3, cache.generation)
+
+    assert cache.get("b") is None and len(cache) == 2
+
+    clock.now = 10.5
+    assert cache.get("a") is None and cache.get("c") is None
+
+
+def test_fill_racing_an_invalidation_is_not_cached():
+    cache = LRUCache("t")
+    generation = cache.generation  # read starts
+    cache.invalidate("a")  # concurrent write
+    cache.put("a", "old", generation)
+
+    assert cache.get("a") is None
+
+
+def test_book_lookups_hit_the_cache_until_written():
+    inner = CountingBooks()
+    inner.add_books([Book.create(i, f"T{i}", "A") for i in (1, 2, 3)])
+    books = CachedMongoDBBookStorage(inner, LRUCache("books"), watch=False)
+
+    first = books.get_book_by_id(1)
+    first.title = "changed by the caller"
+    assert books.get_book_by_id(1).title == "T1"
+    assert set(books.get_books_by_ids([1, 2, 3])) == {1, 2, 3}
+    assert books.get_books_by_ids([2, 3])[3].title == "T3"
+    assert inner.lookups == 2  # id 1, then ids 2 and 3
+
+    book = books.get_book_by_id(2)
+    book.title = "New"
+    books.update_book(book)
+    assert books.get_book_by_id(2).title == "New"
+    assert inner.lookups == 3
+    # Changes seen on another replica's change stream
+    books._on_change({"operationType": "update", "fullDocument": {"id": 3}})
+    books.get_book_by_id(3)
+    assert inner.lookups == 4
+
+
+def test_users_are_cached_but_not_when_missing():
+    inner = FakeUserStorage()
+    users = CachedMongoDBUserStorage(inner, LRUCache("users"), watch=False)
+
+    assert users.get_user_by_username("ann") is None
+    users.create_user("ann", "pw", Role.USER)
+    assert users.user_exists("ann")
+
+    # Written by another process
+    inner.get_user_by_username("ann").password = "new"
+    assert users.get_user_by_username("ann").password == "pw"
+
+    users._on_change({"operationType": "delete", "documentKey": {}})
+    assert users.get_user_by_username("ann").password == "new"
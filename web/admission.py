@@ -0,0 +1,347 @@
+"""Admission control for the web server.
+
+Every request passes through an ``AdmissionController`` before its handler
+runs. Each route has a concurrency limit and a bounded wait queue:
+
+* a free slot admits the request immediately;
+* otherwise it waits in the route's queue until a slot frees up, its wait
+  budget (``max_wait``) runs out or the client's deadline passes;
+* a full queue rejects it at once.
+
+Rejected requests get a fast ``503`` with ``Retry-After`` instead of piling
+up behind work whose clients have already given up. Priority paths
+(the ``/health`` probes, ``/metrics``) are never queued or rejected.
+
+Clients can send ``X-Request-Timeout: <seconds>``; the resulting deadline
+bounds both the queue wait and the work done for the request (for example
+the CLI timeout of ``/api/execute``).
+
+Limits come from ``DEFAULT_LIMITS``, overridden per route by
+``ADMISSION_LIMITS``, e.g. ``/api/execute=4:16:5,*=32:128:5``
+(``route=concurrency:queue:max_wait``; ``*`` is every other route).
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, Optional
+
+from lib_logging.logger import get_logger
+
+try:
+    from prometheus_client import Counter, Gauge
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+LIMITS_ENV = "ADMISSION_LIMITS"
+TIMEOUT_HEADER = "X-Request-Timeout"
+DEFAULT_ROUTE = "*"
+PRIORITY_PATHS = frozenset({"/health", "/health/live", "/health/ready", "/metrics"})
+
+# Weight of the newest sample in the per-route service time average
+SERVICE_TIME_ALPHA = 0.2
+
+if PROMETHEUS_AVAILABLE:
+    ADMISSION_ACTIVE = Gauge(
+        "library_admission_active_requests",
+        "Requests currently running, per admission route",
+        ["route"],
+        multiprocess_mode="livesum",
+    )
+    ADMISSION_QUEUE_DEPTH = Gauge(
+        "library_admission_queue_depth",
+        "Requests waiting for a slot, per admission route",
+        ["route"],
+        multiprocess_mode="livesum",
+    )
+    ADMISSION_SHED_TOTAL = Counter(
+        "library_admission_shed_total",
+        "Requests rejected by admission control",
+        ["route", "reason"],
+    )
+
+
+@dataclass(frozen=True)
+class RouteLimit:
+    """Concurrency limit, queue size and queue wait budget of one route."""
+
+    concurrency: int
+    queue: int
+    max_wait: float = 5.0
+
+
+DEFAULT_LIMITS: Dict[str, RouteLimit] = {
+    # Each command may hold a CLI process for up to CLI_TIMEOUT seconds
+    "/api/execute": RouteLimit(concurrency=4, queue=16, max_wait=5.0),
+    "/api/books/batch": RouteLimit(concurrency=2, queue=8, max_wait=5.0),
+    # Change feed streams stay open for minutes; keep them off the "*" slots
+    "/api/events": RouteLimit(concurrency=64, queue=0, max_wait=0.0),
+    DEFAULT_ROUTE: RouteLimit(concurrency=32, queue=128, max_wait=5.0),
+}
+
+
+def parse_limits(spec: str) -> Dict[str, RouteLimit]:
+    """Parse ``route=concurrency:queue[:max_wait],...`` (see module docstring)."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, values = item.partition("=")
+        fields = values.split(":")
+        if not route or len(fields) not in (2, 3):
+            raise ValueError(f"Invalid admission limit {item!r}")
+        concurrency, queue = int(fields[0]), int(fields[1])
+        max_wait = float(fields[2]) if len(fields) == 3 else 5.0
+        if concurrency < 1 or queue < 0 or max_wait < 0:
+            raise ValueError(f"Invalid admission limit {item!r}")
+        limits[route.strip()] = RouteLimit(concurrency, queue, max_wait)
+    return limits
+
+
+def request_deadline(timeout_header: Optional[str]) -> Optional[float]:
+    """Monotonic deadline from an ``X-Request-Timeout`` value (None if unset)."""
+    try:
+        seconds = float(timeout_header) if timeout_header else 0.0
+    except ValueError:
+        return None
+    return time.monotonic() + seconds if seconds > 0 else None
+
+
+def time_left(deadline: Optional[float], default: float) -> float:
+    """Seconds of ``default`` work that still fit before ``deadline``."""
+    if deadline is None:
+        return default
+    return max(0.0, min(default, deadline - time.monotonic()))
+
+
+class Rejected(Exception):
+    """A request was shed; ``retry_after`` is a hint in whole seconds."""
+
+    def __init__(self, route: str, reason: str, retry_after: int):
+        super().__init__(f"{route}: {reason}")
+        self.route = route
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """An admitted request; ``release()`` frees its slot exactly once."""
+
+    __slots__ = ("_gate", "_started")
+
+    def __init__(self, gate: "_RouteGate"):
+        self._gate = gate
+        self._started = time.monotonic()
+
+    def release(self) -> None:
+        if self._gate is not None:
+            self._gate.leave(time.monotonic() - self._started)
+            self._gate = None
+
+
+class _AsyncWaiter:
+    """A coroutine queued at a gate; ``wake()`` may be called from any thread."""
+
+    __slots__ = ("loop", "event")
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def wake(self) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:  # loop already closed
+            pass
+
+
+class _RouteGate:
+    """Slots and FIFO wait queue of one route."""
+
+    def __init__(self, route: str, limit: RouteLimit):
+        self.route = route
+        self.limit = limit
+        self.active = 0
+        self.shed = 0
+        self.service_time = 1.0
+        self._cond = threading.Condition()
+        self._waiting: Deque[object] = deque()
+
+    def retry_after(self) -> int:
+        """Rough seconds until the queue ahead would have drained."""
+        backlog = (len(self._waiting) + 1) / self.limit.concurrency
+        return max(1, math.ceil(backlog * self.service_time))
+
+    def enter(self, deadline: Optional[float]) -> Ticket:
+        with self._cond:
+            if self.active < self.limit.concurrency and not self._waiting:
+                self.active += 1
+                return self._admitted()
+            if len(self._waiting) >= self.limit.queue:
+                raise self._reject("queue_full")
+
+            give_up = self._give_up(deadline)
+            me = object()
+            self._waiting.append(me)
+            self._export()
+            try:
+                while (
+                    self.active >= self.limit.concurrency or self._waiting[0] is not me
+                ):
+                    remaining = give_up - time.monotonic()
+                    if remaining <= 0:
+                        raise self._reject("timeout")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting.remove(me)
+                # The next waiter may be able to go now (or need to give up)
+                self._notify()
+            self.active += 1
+            return self._admitted()
+
+    async def enter_async(self, deadline: Optional[float]) -> Ticket:
+        """``enter`` for coroutines: queued requests wait on the event loop."""
+        with self._cond:
+            if self.active < self.limit.concurrency and not self._waiting:
+                self.active += 1
+                return self._admitted()
+            if len(self._waiting) >= self.limit.queue:
+                raise self._reject("queue_full")
+            give_up = self._give_up(deadline)
+            me = _AsyncWaiter()
+            self._waiting.append(me)
+            self._export()
+        try:
+            while True:
+                with self._cond:
+                    if self.active < self.limit.concurrency and self._waiting[0] is me:
+                        self.active += 1
+                        return self._admitted()
+                    remaining = give_up - time.monotonic()
+                    if remaining <= 0:
+                        raise self._reject("timeout")
+                    me.event.clear()
+                try:
+                    await asyncio.wait_for(me.event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._cond:
+                self._waiting.remove(me)
+                self._notify()
+
+    def leave(self, elapsed: float) -> None:
+        with self._cond:
+            self.active -= 1
+            self.service_time += SERVICE_TIME_ALPHA * (elapsed - self.service_time)
+            self._export()
+            self._notify()
+
+    def _give_up(self, deadline: Optional[float]) -> float:
+        give_up = time.monotonic() + self.limit.max_wait
+        return give_up if deadline is None else min(give_up, deadline)
+
+    def _notify(self) -> None:
+        """Let every waiter re-check its turn (caller holds the lock)."""
+        self._cond.notify_all()
+        for waiter in self._waiting:
+            if isinstance(waiter, _AsyncWaiter):
+                waiter.wake()
+
+    def _admitted(self) -> Ticket:
+        self._export()
+        return Ticket(self)
+
+    def _reject(self, reason: str) -> Rejected:
+        self.shed += 1
+        if PROMETHEUS_AVAILABLE:
+            ADMISSION_SHED_TOTAL.labels(route=self.route, reason=reason).inc()
+        return Rejected(self.route, reason, self.retry_after())
+
+    def _export(self) -> None:
+        if PROMETHEUS_AVAILABLE:
+            ADMISSION_ACTIVE.labels(route=self.route).set(self.active)
+            ADMISSION_QUEUE_DEPTH.labels(route=self.route).set(len(self._waiting))
+
+
+class AdmissionController:
+    """Per-route concurrency limits with bounded, deadline-aware queues."""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, RouteLimit]] = None,
+        priority_paths: Iterable[str] = PRIORITY_PATHS,
+    ):
+        limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        limits.setdefault(DEFAULT_ROUTE, DEFAULT_LIMITS[DEFAULT_ROUTE])
+        self.priority_paths = frozenset(priority_paths)
+        self._gates = {
+            route: _RouteGate(route, limit) for route, limit in limits.items()
+        }
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        limits = dict(DEFAULT_LIMITS)
+        spec = os.environ.get(LIMITS_ENV, "")
+        try:
+            limits.update(parse_limits(spec))
+        except ValueError as e:
+            logger.error(f"Ignoring {LIMITS_ENV}: {e}")
+        return cls(limits)
+
+    def admit(self, path: str, deadline: Optional[float] = None) -> Optional[Ticket]:
+        """Wait for a slot for ``path``; None for priority paths.
+
+        ``deadline`` is a ``time.monotonic()`` value. Raises ``Rejected``
+        when the route's queue is full or no slot frees up in time.
+        """
+        if path in self.priority_paths:
+            return None
+        return self._gate(path, deadline).enter(deadline)
+
+    async def admit_async(
+        self, path: str, deadline: Optional[float] = None
+    ) -> Optional[Ticket]:
+        """``admit`` for coroutines: a queued request holds no thread."""
+        if path in self.priority_paths:
+            return None
+        return await self._gate(path, deadline).enter_async(deadline)
+
+    def _gate(self, path: str, deadline: Optional[float]) -> _RouteGate:
+        gate = self._gates.get(path) or self._gates[DEFAULT_ROUTE]
+        if deadline is not None and deadline <= time.monotonic():
+            raise gate._reject("deadline")
+        return gate
+
+    def capacity(self, exclude: Iterable[str] = ()) -> int:
+        """Total concurrency of the routes not in ``exclude``."""
+        exclude = frozenset(exclude)
+        return sum(
+            gate.limit.concurrency
+            for route, gate in self._gates.items()
+            if route not in exclude
+        )
+
+    def utilization(self) -> Dict[str, float]:
+        """Share of each route's slots in use (this process only)."""
+        return {
+            route: round(gate.active / gate.limit.concurrency, 3)
+            for route, gate in self._gates.items()
+        }
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Active, queued and shed counts per route (this process only)."""
+        return {
+            route: {
+                "active": gate.active,
+                "queued": len(gate._waiting),
+                "shed": gate.shed,
+            }
+            for route, gate in self._gates.items()
+        }
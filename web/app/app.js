@@ -75,6 +75,30 @@
       return { success: false, stderr: err.message };
     }
   }
+  // Apply one librarian action to many books in a single request.
+  async function batchApi(action, ids) {
+    try {
+      const res = await fetch('/api/books/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ action, ids, librarian: true }),
+      });
+      return await res.json();
+    } catch (err) {
+      toast('خطأ في الاتصال. تأكد من تشغيل الخادم.', 'error');
+      return { success: false, error: err.message, results: [] };
+    }
+  }
+  // normalize REST/event book keys to match parseBooks expectations
+  function toClientBook(b) {
+    return {
+      id: b.id,
+      title: b.title,
+      author: b.author,
+      status: b.status || 'Available',
+      pickedBy: b.picked_by || null,
+    };
+  }
   // Try fetching books directly from the REST API (/api/books).
   // Falls back to the CLI execution API when not available.
   async function fetchBooksFromServer() {
@@ -82,14 +106,7 @@
       const res = await fetch('/api/books');
       if (!res.ok) throw new Error('Not available');
       const data = await res.json();
-      // normalize keys to match parseBooks expectations
-      return data.map(b => ({
-        id: b.id,
-        title: b.title,
-        author: b.author,
-        status: b.status || 'Available',
-        pickedBy: b.picked_by || null,
-      }));
+      return data.map(toClientBook);
     } catch (err) {
       return null; // signal to use CLI fallback
     }
@@ -194,15 +211,25 @@
 
       allUserBooks = parseBooks(r.stdout);
     }
+    renderUserBooks();
+  }
+
+  function renderUserBooks() {
+    const list = $('#books-list');
+    const empty = $('#books-empty');
+    if (!list) return;
+
     const searchQ = ($('#search-user-books') || {}).value || '';
     const books = filterBooks(allUserBooks, searchQ);
     if (books.length === 0) {
+      list.innerHTML = '';
       if (empty) {
         empty.textContent = searchQ ? 'لا توجد نتائج للبحث' : 'لا توجد كتب';
         empty.classList.remove('hidden');
       }
       return;
     }
+    if (empty) empty.classList.add('hidden');
 
     list.innerHTML = books.map(b => `
       <div class="book-card">
@@ -219,8 +246,7 @@
         const r2 = await api('pick-book', ['--id', id, '--username', currentUsername]);
         if (r2.success) {
           toast('تم الحجز بنجاح', 'success');
-          loadUserBooks();
-          loadUserPicked();
+          reloadUnlessLive(loadUserBooks, loadUserPicked);
         } else {
           toast(r2.stderr || 'حدث خطأ', 'error');
         }
@@ -231,8 +257,10 @@
   async function loadUserPicked() {
     const r = await api('list-books', ['--username', currentUsername]);
     const books = r.success ? parseBooks(r.stdout) : [];
-    const picked = books.filter(b => b.pickedBy === currentUsername);
+    renderUserPicked(books.filter(b => b.pickedBy === currentUsername));
+  }
 
+  function renderUserPicked(picked) {
     const list = $('#my-picked-list');
     const empty = $('#my-picked-empty');
     if (!list) return;
@@ -289,7 +317,7 @@
         const r2 = await api('delete-book', ['--id', idStr, '--librarian']);
         if (r2.success) {
           toast('تم الحذف', 'success');
-          loadLibBooks();
+          reloadUnlessLive(loadLibBooks);
         } else {
           toast(r2.stderr || 'حدث خطأ', 'error');
         }
@@ -301,8 +329,7 @@
         const r2 = await api('return-book', ['--id', id, '--librarian']);
         if (r2.success) {
           toast('تم إرجاع الكتاب', 'success');
-          loadLibBooks();
-          loadLibPicked();
+          reloadUnlessLive(loadLibBooks, loadLibPicked);
         } else {
           toast(r2.stderr || 'حدث خطأ', 'error');
         }
@@ -331,15 +358,18 @@
 
   async function loadLibPicked() {
     const r = await api('list-picked', ['--librarian']);
+    renderLibPicked(r.success ? parsePicked(r.stdout) : []);
+  }
+
+  function renderLibPicked(books) {
     const container = $('#lib-picked-list');
     if (!container) return;
 
-    if (!r.success || !parsePicked(r.stdout).length) {
+    if (!books.length) {
       container.innerHTML = '<div class="empty-state">لا توجد كتب محجوزة</div>';
       return;
     }
-    const books = parsePicked(r.stdout);
-    container.innerHTML = `<table class="data-table"><thead><tr><th>#</th><th>العنوان</th><th>المؤلف</th><th>محجوز</th><th>إجراءات</th></tr></thead><tbody>${
+    container.innerHTML = `<button type="button" class="btn btn-primary btn-sm btn-approve-all">موافقة على الكل (${books.length})</button><table class="data-table"><thead><tr><th>#</th><th>العنوان</th><th>المؤلف</th><th>محجوز</th><th>إجراءات</th></tr></thead><tbody>${
       books.map(b => `<tr>
         <td>${b.id}</td><td>${esc(b.title)}</td><td>${esc(b.author)}</td><td>${esc(b.pickedBy || '-')}</td>
         <td class="cell-actions">
@@ -349,14 +379,26 @@
       </tr>`).join('')
     }</tbody></table>`;
 
+    const approveAll = container.querySelector('.btn-approve-all');
+    if (approveAll) {
+      approveAll.addEventListener('click', async () => {
+        const r2 = await batchApi('approve-borrow', books.map(b => b.id));
+        if (r2.success) {
+          toast(`تمت الموافقة على ${r2.succeeded} كتاب`, 'success');
+        } else {
+          toast(r2.error || `فشل ${r2.failed} من ${(r2.results || []).length}`, 'error');
+        }
+        reloadUnlessLive(loadLibBooks, loadLibPicked);
+      });
+    }
+
     container.querySelectorAll('.btn-approve').forEach(btn => {
       btn.addEventListener('click', async () => {
         const id = btn.dataset.id;
         const r2 = await api('approve-borrow', ['--id', id, '--librarian']);
         if (r2.success) {
           toast('تمت الموافقة', 'success');
-          loadLibBooks();
-          loadLibPicked();
+          reloadUnlessLive(loadLibBooks, loadLibPicked);
         } else {
           toast(r2.stderr || 'حدث خطأ', 'error');
         }
@@ -369,8 +411,7 @@
         const r2 = await api('update-status', ['--id', id, '--status', 'Available', '--librarian']);
         if (r2.success) {
           toast('تم رفض الحجز وإرجاع الكتاب إلى متاح', 'success');
-          loadLibBooks();
-          loadLibPicked();
+          reloadUnlessLive(loadLibBooks, loadLibPicked);
         } else {
           toast(r2.stderr || 'حدث خطأ', 'error');
         }
@@ -378,8 +419,84 @@
     });
   }
 
+  // ========== التحديثات المباشرة ==========
+  // Catalog changes arrive from /api/events (Server-Sent Events) and are
+  // patched into the tables. "ready" (first connection) and "reset" (too
+  // far behind to resume) mean: reload everything once. The browser
+  // reconnects by itself and resumes from the last event id.
+  let changeFeed = null;
+
+  function liveUpdatesConnected() {
+    return !!changeFeed && changeFeed.readyState === EventSource.OPEN;
+  }
+
+  // Without live updates, reload after our own changes instead
+  function reloadUnlessLive(...loaders) {
+    if (!liveUpdatesConnected()) loaders.forEach(load => load());
+  }
+
+  function reloadViews() {
+    if (currentRole === 'user') {
+      loadUserBooks();
+      loadUserPicked();
+    } else if (currentRole) {
+      loadLibBooks();
+      loadLibPicked();
+    }
+  }
+
+  function patchBooks(books, change) {
+    if (!change.book) return books.filter(b => b.id !== change.book_id);
+    const book = toClientBook(change.book);
+    const i = books.findIndex(b => b.id === book.id);
+    if (i === -1) return [...books, book].sort((a, b) => a.id - b.id);
+    const patched = books.slice();
+    patched[i] = book;
+    return patched;
+  }
+
+  function applyChange(change) {
+    if (change.type === 'catalog.reset') {
+      reloadViews();
+    } else if (currentRole === 'user') {
+      allUserBooks = patchBooks(allUserBooks, change);
+      renderUserBooks();
+      renderUserPicked(allUserBooks.filter(b => b.pickedBy === currentUsername));
+    } else if (currentRole) {
+      allLibBooks = patchBooks(allLibBooks, change);
+      renderLibBooksTable(allLibBooks);
+      renderLibPicked(allLibBooks.filter(b => b.status === 'Picked'));
+    }
+  }
+
+  function subscribeToChanges() {
+    unsubscribeFromChanges();
+    if (typeof EventSource === 'undefined') {
+      reloadViews();
+      return;
+    }
+    const feed = new EventSource('/api/events');
+    feed.addEventListener('ready', reloadViews);
+    feed.addEventListener('reset', reloadViews);
+    feed.addEventListener('change', e => applyChange(JSON.parse(e.data)));
+    feed.onerror = () => {
+      // Closed for good (e.g. an older server without the feed): load once
+      if (feed.readyState === EventSource.CLOSED && changeFeed === feed) {
+        changeFeed = null;
+        reloadViews();
+      }
+    };
+    changeFeed = feed;
+  }
+
+  function unsubscribeFromChanges() {
+    if (changeFeed) changeFeed.close();
+    changeFeed = null;
+  }
+
   // ========== خروج ==========
   function logout() {
+    unsubscribeFromChanges();
     clearSession();
     currentRole = null;
     currentUsername = null;
@@ -434,15 +551,13 @@
         showView('user', 'user-books');
         setNavActive('user', 'user-books');
         $('#user-page-title').textContent = 'جميع الكتب';
-        loadUserBooks();
-        loadUserPicked();
+        subscribeToChanges();
       } else {
         showPage('librarian');
         showView('librarian', 'lib-books');
         setNavActive('librarian', 'lib-books');
         $('#lib-page-title').textContent = 'جميع الكتب';
-        loadLibBooks();
-        loadLibPicked();
+        subscribeToChanges();
       }
     });
 
@@ -498,7 +613,7 @@
       if (r.success) {
         toast('تمت إضافة الكتاب', 'success');
         e.target.reset();
-        loadLibBooks();
+        reloadUnlessLive(loadLibBooks);
       } else {
         toast(r.stderr || 'حدث خطأ', 'error');
       }
@@ -541,7 +656,7 @@
       if (r.success) {
         toast('تم التعديل', 'success');
         $('#modal-edit').classList.remove('show');
-        loadLibBooks();
+        reloadUnlessLive(loadLibBooks);
       } else {
         toast(r.stderr || 'حدث خطأ', 'error');
       }
@@ -553,42 +668,7 @@
 
     // البحث
     $('#search-user-books')?.addEventListener('input', () => {
-      if (allUserBooks.length === 0) return;
-      const q = $('#search-user-books').value.trim();
-      const books = filterBooks(allUserBooks, q);
-      const list = $('#books-list');
-      const empty = $('#books-empty');
-      if (!list) return;
-      if (books.length === 0) {
-        list.innerHTML = '';
-        if (empty) {
-          empty.textContent = q ? 'لا توجد نتائج للبحث' : 'لا توجد كتب';
-          empty.classList.remove('hidden');
-        }
-      } else {
-        if (empty) empty.classList.add('hidden');
-        list.innerHTML = books.map(b => `
-          <div class="book-card">
-            <h3>${esc(b.title)}</h3>
-            <p class="author">${esc(b.author)}</p>
-            <span class="status-badge ${statusClass(b.status)}">${statusLabel(b.status)}</span>
-            ${b.status === 'Available' ? `<button type="button" class="btn btn-primary btn-sm btn-pick" data-id="${b.id}">حجز</button>` : ''}
-          </div>
-        `).join('');
-        list.querySelectorAll('.btn-pick').forEach(btn => {
-          btn.addEventListener('click', async () => {
-            const id = btn.dataset.id;
-            const r2 = await api('pick-book', [id, currentUsername]);
-            if (r2.success) {
-              toast('تم الحجز بنجاح', 'success');
-              loadUserBooks();
-              loadUserPicked();
-            } else {
-              toast(r2.stderr || 'حدث خطأ', 'error');
-            }
-          });
-        });
-      }
+      if (allUserBooks.length > 0) renderUserBooks();
     });
     $('#search-lib-books')?.addEventListener('input', () => {
       if (allLibBooks.length > 0) renderLibBooksTable(allLibBooks);
@@ -606,15 +686,12 @@
         $('#user-display-name').textContent = currentUsername;
         showView('user', 'user-books');
         setNavActive('user', 'user-books');
-        loadUserBooks();
-        loadUserPicked();
       } else {
         showPage('librarian');
         showView('librarian', 'lib-books');
         setNavActive('librarian', 'lib-books');
-        loadLibBooks();
-        loadLibPicked();
       }
+      subscribeToChanges();
     } else {
       showPage('login');
     }
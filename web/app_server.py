@@ -23,7 +23,7 @@ if env_file.exists():
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from web.server import LibraryWebHandler  # noqa: E402
+from web.server import STATIC_FILES, LibraryWebHandler  # noqa: E402
 
 
 class AppWebHandler(LibraryWebHandler):
@@ -47,24 +47,13 @@ class AppWebHandler(LibraryWebHandler):
             self.serve_file(app_routes[path])
             return
 
-        # نقطة فحص الصحة (لـ Docker و Azure)
-        if path == "/health":
-            self.send_response(200)
-            self.send_header("Content-type", "application/json")
-            self.end_headers()
-            self.wfile.write(b'{"status":"ok"}')
-            return
-
         super().do_GET()
 
 
-def run_server(port=8000):
-    """تشغيل الخادم مع دعم واجهة المستخدم الجديدة"""
-    import http.server
+def initialize_database():
+    """Seed the database with test data (scripts/init_db.py), if present."""
     import subprocess
-    from pathlib import Path
 
-    # Initialize database with test data
     init_script = Path(__file__).parent.parent / "scripts" / "init_db.py"
     if init_script.exists():
         try:
@@ -82,8 +71,18 @@ def run_server(port=8000):
         except Exception as e:
             print(f"Warning: Could not initialize database: {e}")
 
+
+def run_server(port=8000):
+    """تشغيل الخادم مع دعم واجهة المستخدم الجديدة"""
+    import http.server
+
+    initialize_database()
+
     server_address = ("", port)
-    httpd = http.server.HTTPServer(server_address, AppWebHandler)
+    # One thread per connection; AppWebHandler.ADMISSION bounds the work
+    httpd = http.server.ThreadingHTTPServer(server_address, AppWebHandler)
+    AppWebHandler.STATIC_ASSETS.preload(STATIC_FILES)
+    AppWebHandler.READINESS.start()
 
     print("\nLibrary Management System - Web Interface")
     print(f"Server running at http://localhost:{port}/")
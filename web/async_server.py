@@ -0,0 +1,778 @@
+"""Asyncio web server: one event loop serves many concurrent clients.
+
+An alternative to the blocking ``http.server`` servers, started with
+``python run_app.py --async`` (or ``SERVER_MODE=async``). Connections are
+kept alive and cost no thread while idle. The hot paths (static assets,
+health probes, login, the book list, statistics and the change feed) are
+handled natively on
+top of the async repository adapters. Every other route runs the regular
+``AppWebHandler`` on a separate handler pool, so the two servers behave the
+same; those responses are buffered and close the connection.
+"""
+
+import asyncio
+import functools
+import html
+import http.client
+import http.server
+import io
+import json
+import math
+import signal
+import socket
+import time
+from email.utils import formatdate
+from http import HTTPStatus
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from lib_logging.logger import get_logger
+from storage.async_adapters import (
+    AsyncBookRepository,
+    AsyncUserRepository,
+    StorageExecutor,
+)
+from storage.errors import StorageUnavailableError
+from storage.factory import StorageFactory
+from web import events, readiness
+from web import server as sync_server
+from web.admission import TIMEOUT_HEADER, Rejected, Ticket, request_deadline
+from web.app_server import AppWebHandler, initialize_database
+from web.responses import (
+    COMPRESS_MIN_BYTES,
+    JSON_CONTENT_TYPE,
+    StreamWriter,
+    array_delimiters,
+    compress,
+    dumps,
+    negotiate_encoding,
+    stale_headers,
+)
+
+logger = get_logger(__name__)
+
+SERVER_NAME = "LibraryAsync/1.0"
+
+# Idle keep-alive connections (and slow requests) are dropped after this
+KEEPALIVE_TIMEOUT = 15.0
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+# GET paths (trailing slash stripped) served from the static asset cache
+STATIC_ROUTES = {
+    "/": "web/app/index.html",
+    "/index.html": "web/app/index.html",
+    "/app": "web/app/index.html",
+    "/docs.html": "web/docs.html",
+    "/logs.html": "web/logs.html",
+    "/api-docs": "web/swagger.html",
+    "/api/openapi.yaml": "web/openapi.yaml",
+}
+
+
+def static_path(path: str) -> Optional[str]:
+    """Map a GET path to the asset it serves, or None."""
+    path = path.rstrip("/") or "/"
+    if path in STATIC_ROUTES:
+        return STATIC_ROUTES[path]
+    if path.startswith("/app/"):
+        return "web" + path
+    return None
+
+
+def normalize_api_path(path: str) -> str:
+    """``/v1/api/*`` and ``/api/*`` map to the same handlers."""
+    path = path.rstrip("/") or "/"
+    if path.startswith("/v1/api/"):
+        return "/api/" + path[len("/v1/api/") :]
+    return path
+
+
+class BadRequest(Exception):
+    """The request cannot be parsed; answered with ``status`` and closed."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    """A parsed HTTP request (``raw`` keeps the bytes for delegation)."""
+
+    __slots__ = ("method", "target", "version", "headers", "body", "raw")
+
+    def __init__(self, method, target, version, headers, body, raw):
+        self.method: str = method
+        self.target: str = target
+        self.version: str = version
+        self.headers: http.client.HTTPMessage = headers
+        self.body: bytes = body
+        self.raw: bytes = raw
+
+    @property
+    def path(self) -> str:
+        return urlparse(self.target).path
+
+    def query(self, name: str, default: str = "") -> str:
+        return parse_qs(urlparse(self.target).query).get(name, [default])[0]
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = (self.headers.get("Connection") or "").lower()
+        if self.version == "HTTP/1.1":
+            return connection != "close"
+        return connection == "keep-alive"
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Read one request; None if the client closed the connection first."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as exc:
+        if not exc.partial.strip():
+            return None
+        raise BadRequest(400, "Incomplete request")
+    except asyncio.LimitOverrunError:
+        raise BadRequest(431, "Request header fields too large")
+
+    request_line, _, header_block = head.partition(b"\r\n")
+    parts = request_line.decode("iso-8859-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+        raise BadRequest(400, f"Bad request syntax ({request_line[:100]!r})")
+    headers = http.client.parse_headers(io.BytesIO(header_block))
+
+    if "chunked" in (headers.get("Transfer-Encoding") or "").lower():
+        raise BadRequest(411, "Chunked request bodies are not supported")
+    try:
+        length = int(headers.get("Content-Length") or 0)
+    except ValueError:
+        raise BadRequest(400, "Invalid Content-Length")
+    if length < 0 or length > MAX_BODY_BYTES:
+        raise BadRequest(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return Request(parts[0], parts[1], parts[2], headers, body, head + body)
+
+
+class _TransportFile:
+    """Minimal file interface over an asyncio ``StreamWriter``.
+
+    ``write`` only buffers; callers await ``drain`` for back-pressure.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self._writer = writer
+
+    def write(self, data: bytes) -> None:
+        self._writer.write(data)
+
+    def flush(self) -> None:
+        pass
+
+
+class Exchange:
+    """The response side of one request on a connection."""
+
+    def __init__(self, request: Request, writer: asyncio.StreamWriter):
+        self.request = request
+        self.writer = writer
+        self.keep_alive = request.keep_alive
+        self.status: Optional[int] = None
+
+    def _write_head(self, status: int, headers: List[Tuple[str, str]]) -> None:
+        self.status = status
+        lines = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            f"Server: {SERVER_NAME}",
+            f"Date: {formatdate(usegmt=True)}",
+        ]
+        lines += [f"{name}: {value}" for name, value in headers]
+        lines.append(f"Connection: {'keep-alive' if self.keep_alive else 'close'}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def send(
+        self, status: int, headers: List[Tuple[str, str]], body: bytes = b""
+    ) -> None:
+        self._write_head(status, headers)
+        if body:
+            self.writer.write(body)
+        await self.writer.drain()
+
+    async def send_error(self, status: int, message: str) -> None:
+        """Same HTML error page as ``BaseHTTPRequestHandler.send_error``."""
+        body = http.server.DEFAULT_ERROR_MESSAGE % {
+            "code": status,
+            "message": html.escape(message, quote=False),
+            "explain": html.escape(HTTPStatus(status).description, quote=False),
+        }
+        data = body.encode("utf-8", "replace")
+        headers = [
+            ("Content-Type", http.server.DEFAULT_ERROR_CONTENT_TYPE),
+            ("Content-Length", str(len(data))),
+        ]
+        await self.send(status, headers, data)
+
+    def _wants_pretty(self) -> bool:
+        return self.request.query("pretty").lower() in ("1", "true", "yes")
+
+    def _json_headers(self, coding: Optional[str]) -> List[Tuple[str, str]]:
+        headers = [
+            ("Content-type", JSON_CONTENT_TYPE),
+            ("Access-Control-Allow-Origin", "*"),
+            ("Vary", "Accept-Encoding"),
+        ]
+        if coding:
+            headers.append(("Content-Encoding", coding))
+        return headers
+
+    async def send_json(
+        self,
+        data,
+        status: int = 200,
+        extra_headers: Optional[List[Tuple[str, str]]] = None,
+    ) -> None:
+        """JSON body, compressed if large and the client accepts it."""
+        body = dumps(data, pretty=self._wants_pretty())
+        coding = None
+        if len(body) >= COMPRESS_MIN_BYTES:
+            coding = negotiate_encoding(self.request.headers.get("Accept-Encoding"))
+            if coding:
+                body = compress(body, coding)
+        headers = self._json_headers(coding) + (extra_headers or [])
+        headers.append(("Content-length", str(len(body))))
+        await self.send(status, headers, body)
+
+    async def stream_json(
+        self,
+        batches: AsyncIterator[List[dict]],
+        extra_headers: Optional[List[Tuple[str, str]]] = None,
+    ) -> None:
+        """Stream batches of items as one JSON array (chunked when HTTP/1.1).
+
+        A failure after the headers went out drops the connection without
+        the final chunk, so the client sees an incomplete response.
+        """
+        coding = negotiate_encoding(self.request.headers.get("Accept-Encoding"))
+        chunked = self.request.version == "HTTP/1.1"
+        headers = self._json_headers(coding) + (extra_headers or [])
+        if chunked:
+            headers.append(("Transfer-Encoding", "chunked"))
+        else:
+            self.keep_alive = False  # the body ends when the connection closes
+        self._write_head(200, headers)
+
+        pretty = self._wants_pretty()
+        opening, separator, closing = array_delimiters(pretty)
+        out = StreamWriter(_TransportFile(self.writer), coding, chunked)
+        out.write(opening)
+        first = True
+        try:
+            async for batch in batches:
+                for item in batch:
+                    if not first:
+                        out.write(separator)
+                    first = False
+                    out.write(dumps(item, pretty))
+                await self.writer.drain()
+        except ConnectionError:
+            raise
+        except Exception as e:
+            logger.error(f"Error while streaming response: {e}", exc_info=True)
+            self.keep_alive = False
+            return
+        out.write(closing)
+        out.close()
+        await self.writer.drain()
+
+    async def stream_events(self, frames: AsyncIterator[bytes]) -> None:
+        """Send Server-Sent Events frames as they come; the body ends at close."""
+        self.keep_alive = False
+        self._write_head(
+            200,
+            [
+                ("Content-Type", events.EVENT_STREAM_TYPE),
+                ("Cache-Control", "no-cache"),
+                ("Access-Control-Allow-Origin", "*"),
+                ("X-Accel-Buffering", "no"),
+            ],
+        )
+        async for frame in frames:
+            self.writer.write(frame)
+            await self.writer.drain()
+
+
+class _BufferedHandler(AppWebHandler):
+    """Runs one request through the blocking handler on in-memory buffers."""
+
+    def __init__(self, raw: bytes, client_address, deadline: Optional[float] = None):
+        self._raw = raw
+        self._deadline = deadline
+        super().__init__(None, client_address, None)
+
+    def parse_request(self):
+        # The event loop already applied the IP rate limit and admission
+        if not http.server.BaseHTTPRequestHandler.parse_request(self):
+            return False
+        self.deadline = self._deadline
+        return True
+
+    def setup(self):
+        self.rfile = io.BytesIO(self._raw)
+        self.wfile = io.BytesIO()
+
+    def finish(self):
+        pass
+
+
+def _run_buffered(
+    raw: bytes, client_address, deadline: Optional[float] = None
+) -> bytes:
+    return _BufferedHandler(raw, client_address, deadline).wfile.getvalue()
+
+
+def _record_metrics(method: str, path: str, status: int, elapsed: float) -> None:
+    if not sync_server.PROMETHEUS_AVAILABLE:
+        return
+    sync_server.HTTP_REQUESTS_TOTAL.labels(
+        method=method, path=path, status=str(status)
+    ).inc()
+    sync_server.HTTP_REQUEST_DURATION.labels(method=method, path=path).observe(elapsed)
+
+
+class AsyncLibraryServer:
+    """Serves the web UI and API from one event loop."""
+
+    def __init__(
+        self,
+        executor: Optional[StorageExecutor] = None,
+        book_storage=None,
+        user_storage=None,
+        handlers: Optional[StorageExecutor] = None,
+    ):
+        """Storages default to the configured ones (``DATABASE_TYPE``).
+
+        ``executor`` runs storage calls only. Delegated requests run on
+        ``handlers``, by default a pool with one thread per admission slot
+        of the routes that can be delegated, so slow delegated requests
+        (``/api/execute`` waiting on its CLI) never hold a storage thread.
+        """
+        self.executor = executor or StorageExecutor()
+        self.assets = AppWebHandler.STATIC_ASSETS
+        self._books: Optional[AsyncBookRepository] = None
+        self._users: Optional[AsyncUserRepository] = None
+        if book_storage is not None:
+            self._books = AsyncBookRepository(book_storage, self.executor)
+        if user_storage is not None:
+            self._users = AsyncUserRepository(user_storage, self.executor)
+        self._stats_service = None
+        self.routes = {
+            ("GET", "/health"): self.serve_health,
+            ("GET", "/health/live"): self.serve_health,
+            ("GET", "/health/ready"): self.serve_readiness,
+            ("GET", "/api/books"): self.serve_books,
+            ("GET", "/api/stats"): self.serve_stats,
+            ("GET", "/api/events"): self.serve_events,
+            ("POST", "/api/login"): self.handle_login,
+        }
+        self.handlers = handlers or StorageExecutor(
+            AppWebHandler.ADMISSION.capacity(exclude={p for _, p in self.routes}),
+            name="handler",
+        )
+        # Checks this server's own storages and pools
+        self.readiness = readiness.ReadinessChecker.from_env(
+            {"books": self._book_storage, "users": self._user_storage},
+            {
+                "mongodb": readiness.mongodb_pool,
+                "storage_executor": self.executor.snapshot,
+                "handler_pool": self.handlers.snapshot,
+                "admission": functools.partial(
+                    readiness.admission_pool, AppWebHandler.ADMISSION
+                ),
+            },
+        )
+
+    async def start(
+        self, host: str = "", port: int = 8000, sock: Optional[socket.socket] = None
+    ) -> asyncio.AbstractServer:
+        """Listen on ``host:port``, or on an already bound ``sock``."""
+        if sock is not None:
+            return await asyncio.start_server(
+                self.handle_connection, sock=sock, limit=MAX_HEADER_BYTES
+            )
+        return await asyncio.start_server(
+            self.handle_connection, host or None, port, limit=MAX_HEADER_BYTES
+        )
+
+    # --- connection handling ---------------------------------------------
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        peer = writer.get_extra_info("peername") or ("", 0)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(
+                        read_request(reader), KEEPALIVE_TIMEOUT
+                    )
+                except BadRequest as exc:
+                    request = Request(
+                        "", "/", "HTTP/1.0", http.client.HTTPMessage(), b"", b""
+                    )
+                    await Exchange(request, writer).send_error(exc.status, exc.message)
+                    break
+                if request is None or not await self._dispatch(request, writer, peer):
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    def _route(self, request: Request) -> Optional[Callable[[Exchange], Awaitable]]:
+        if request.method == "GET":
+            asset_path = static_path(request.path)
+            if asset_path is not None and self.assets.get(asset_path) is not None:
+                return functools.partial(self.serve_static, asset_path)
+        return self.routes.get((request.method, normalize_api_path(request.path)))
+
+    async def _dispatch(self, request: Request, writer, peer) -> bool:
+        """Answer one request; returns whether to keep the connection open.
+
+        Every request passes the per-IP rate limit and admission control
+        (as in ``LibraryWebHandler.parse_request``) on the event loop, so a
+        queued request holds no thread; its slot is released once it has
+        been answered.
+        """
+        exchange = Exchange(request, writer)
+        start = time.perf_counter()
+        delegated = False
+        try:
+            if not await self._within_rate_limit(exchange, "ip", peer[0]):
+                return False
+            deadline = request_deadline(request.headers.get(TIMEOUT_HEADER))
+            admitted, ticket = await self._admit(exchange, deadline)
+            if not admitted:
+                return False
+            try:
+                handler = self._route(request)
+                if handler is None:
+                    delegated = True
+                    await self._delegate(request, writer, peer, deadline)
+                    return False
+                return await self._handle(handler, exchange)
+            finally:
+                if ticket is not None:
+                    ticket.release()
+        finally:
+            # Delegated requests are counted by AppWebHandler itself
+            if not delegated:
+                _record_metrics(
+                    request.method,
+                    request.path,
+                    exchange.status or 500,
+                    time.perf_counter() - start,
+                )
+
+    async def _admit(
+        self, exchange: Exchange, deadline: Optional[float]
+    ) -> Tuple[bool, Optional[Ticket]]:
+        """Wait for an admission slot, or answer 503 (``admitted`` False)."""
+        request = exchange.request
+        try:
+            ticket = await AppWebHandler.ADMISSION.admit_async(
+                normalize_api_path(request.path), deadline
+            )
+        except Rejected as e:
+            logger.warning(f"Shedding {request.method} {request.path}: {e.reason}")
+            exchange.keep_alive = False
+            await exchange.send_json(
+                {"success": False, "error": "Server busy, retry later"},
+                status=503,
+                extra_headers=[("Retry-After", str(e.retry_after))],
+            )
+            return False, None
+        return True, ticket
+
+    async def _handle(self, handler, exchange: Exchange) -> bool:
+        """Run a native handler; returns whether to keep the connection open."""
+        request = exchange.request
+        try:
+            await handler(exchange)
+        except ConnectionError:
+            raise
+        except StorageUnavailableError as e:
+            if exchange.status is not None:
+                return False
+            message = str(e)
+            await exchange.send_json(
+                {"success": False, "error": message, "message": message},
+                status=503,
+                extra_headers=[("Retry-After", str(e.retry_after))],
+            )
+        except Exception as e:
+            logger.error(
+                f"Error handling {request.method} {request.path}: {e}", exc_info=True
+            )
+            if sync_server.PROMETHEUS_AVAILABLE:
+                sync_server.APPLICATION_ERRORS_TOTAL.labels(component="web").inc()
+            if exchange.status is None:
+                exchange.keep_alive = False
+                await exchange.send_error(500, f"Internal error: {e}")
+            return False
+        return exchange.keep_alive
+
+    async def _delegate(
+        self, request: Request, writer, peer, deadline: Optional[float] = None
+    ) -> None:
+        """Run the request through ``AppWebHandler`` on the handler pool."""
+        response = await self.handlers.run(_run_buffered, request.raw, peer, deadline)
+        writer.write(response)
+        await writer.drain()
+
+    # --- repositories ----------------------------------------------------
+
+    async def books(self) -> AsyncBookRepository:
+        if self._books is None:
+            storage = await self.executor.run(StorageFactory.create_book_storage)
+            self._books = AsyncBookRepository(storage, self.executor)
+        return self._books
+
+    def _book_storage(self):
+        if self._books is not None:
+            return self._books.storage
+        return StorageFactory.create_book_storage()
+
+    def _user_storage(self):
+        if self._users is not None:
+            return self._users.storage
+        return StorageFactory.create_user_storage()
+
+    async def users(self) -> AsyncUserRepository:
+        if self._users is None:
+            storage = await self.executor.run(StorageFactory.create_user_storage)
+            self._users = AsyncUserRepository(storage, self.executor)
+        return self._users
+
+    # --- native routes ---------------------------------------------------
+
+    async def serve_static(self, asset_path: str, exchange: Exchange) -> None:
+        # In-memory after preload; a changed file is re-read at most once
+        asset = self.assets.get(asset_path)
+        if asset is None:
+            await exchange.send_error(404, "File not found")
+            return
+        headers = exchange.request.headers
+        status, response_headers, body = asset.respond(
+            headers.get("Accept-Encoding", ""),
+            headers.get("If-None-Match"),
+            headers.get("If-Modified-Since"),
+            exchange.request.query("v"),
+        )
+        await exchange.send(status, response_headers, body)
+
+    async def serve_health(self, exchange: Exchange) -> None:
+        body = b'{"status":"ok"}'
+        headers = [
+            ("Content-type", "application/json"),
+            ("Content-Length", str(len(body))),
+        ]
+        await exchange.send(200, headers, body)
+
+    async def serve_readiness(self, exchange: Exchange) -> None:
+        """Latest background readiness report (see ``web.readiness``)."""
+        status, report = self.readiness.report()
+        await exchange.send_json(
+            report, status=status, extra_headers=[("Cache-Control", "no-store")]
+        )
+
+    async def serve_books(self, exchange: Exchange) -> None:
+        books = await self.books()
+        batches = books.iter_book_batches()
+        # Read the first batch before answering: a storage outage becomes a
+        # 503 rather than a 200 cut short
+        first = await anext(batches, None)
+
+        async def all_batches():
+            if first is not None:
+                yield first
+                async for batch in batches:
+                    yield batch
+
+        stale = list(stale_headers(books.storage).items())
+        await exchange.stream_json(all_batches(), extra_headers=stale)
+
+    async def serve_stats(self, exchange: Exchange) -> None:
+        try:
+            top = max(1, min(100, int(exchange.request.query("top", "10"))))
+        except ValueError:
+            await exchange.send_error(400, "Query parameter 'top' must be an integer")
+            return
+        if self._stats_service is None:
+            from core.factory import ServiceFactory
+
+            factory = ServiceFactory(book_storage=(await self.books()).storage)
+            self._stats_service = factory.create_stats_service()
+        stats = await self.executor.run(self._stats_service.get_stats, top=top)
+        stale = list(stale_headers(self._stats_service.storage).items())
+        await exchange.send_json(stats, extra_headers=stale)
+
+    async def serve_events(self, exchange: Exchange) -> None:
+        """Catalog change feed (see ``AppWebHandler.serve_events_api``)."""
+        request = exchange.request
+        token = events.parse_token(
+            request.headers.get("Last-Event-ID") or request.query("after") or None
+        )
+        feed = AppWebHandler.CHANGE_FEED
+        await self.executor.run(feed.start)
+
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def wake() -> None:
+            try:
+                loop.call_soon_threadsafe(changed.set)
+            except RuntimeError:  # loop already closed
+                pass
+
+        feed.add_listener(wake)
+        events.subscribed(1)
+        try:
+            if events.EVENT_STREAM_TYPE in request.headers.get("Accept", ""):
+                await exchange.stream_events(self._event_frames(feed, token, changed))
+                return
+            changed.clear()
+            result = events.poll_result(feed, token)
+            if token is not None and not result["events"] and not result["reset"]:
+                await _wait_for(changed, events.poll_wait(request.query("wait", None)))
+                result = events.poll_result(feed, token)
+            await exchange.send_json(
+                result, extra_headers=[("Cache-Control", "no-cache")]
+            )
+        finally:
+            feed.remove_listener(wake)
+            events.subscribed(-1)
+
+    async def _event_frames(
+        self, feed: events.ChangeFeed, token: Optional[int], changed: asyncio.Event
+    ) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        end = loop.time() + events.STREAM_SECONDS
+        yield events.SSE_PREAMBLE
+        while True:
+            changed.clear()
+            frames, token = events.next_frames(feed, token)
+            if frames:
+                yield frames
+            remaining = end - loop.time()
+            if remaining <= 0:
+                return
+            woken = await _wait_for(changed, min(events.HEARTBEAT_SECONDS, remaining))
+            if not woken and loop.time() < end:
+                yield events.SSE_HEARTBEAT
+
+    async def _within_rate_limit(self, exchange: Exchange, kind: str, key: str) -> bool:
+        """Spend from ``key``'s budget (see ``LibraryWebHandler``), else 429."""
+        route = normalize_api_path(exchange.request.path)
+        if AppWebHandler.RATE_LIMITER.budgets.get((route, kind)) is None:
+            return True
+        allowed, retry_after = await self.executor.run(
+            AppWebHandler.RATE_LIMITER.check, route, kind, key
+        )
+        if not allowed:
+            message = "Too many requests, retry later"
+            exchange.keep_alive = False
+            await exchange.send_json(
+                {"success": False, "error": message, "message": message},
+                status=429,
+                extra_headers=[("Retry-After", str(max(1, math.ceil(retry_after))))],
+            )
+        return allowed
+
+    async def handle_login(self, exchange: Exchange) -> None:
+        """Authenticate against the user repository (see ``handle_login_api``)."""
+        if not exchange.request.body:
+            await exchange.send_error(400, "Empty request body")
+            return
+        try:
+            data = json.loads(exchange.request.body.decode("utf-8"))
+            username = data.get("username")
+            password = data.get("password")
+        except (ValueError, AttributeError):
+            await exchange.send_error(400, "Invalid JSON in request body")
+            return
+
+        if not username or not password:
+            await exchange.send_json(
+                {"success": False, "message": "Username and password are required"},
+                status=400,
+            )
+            return
+        if not await self._within_rate_limit(exchange, "username", username):
+            return
+
+        user = await (await self.users()).get_user_by_username(username)
+        if user and user.password == password:
+            logger.info(f"User '{username}' authenticated successfully.")
+            await exchange.send_json(
+                {"success": True, "role": user.role.value, "username": user.username}
+            )
+        else:
+            logger.warning(f"Authentication failed for user '{username}'.")
+            await exchange.send_json(
+                {"success": False, "message": "Invalid username or password"},
+                status=401,
+            )
+
+
+async def _wait_for(event: asyncio.Event, timeout: float) -> bool:
+    """Wait up to ``timeout`` seconds for ``event``; returns whether it was set."""
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def serve(
+    port: int = 8000, host: str = "", sock: Optional[socket.socket] = None
+) -> None:
+    """Serve until cancelled or SIGTERM (pre-fork workers pass ``sock``)."""
+    app = AsyncLibraryServer()
+    server = await app.start(host, port, sock=sock)
+    app.readiness.start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    async with server:
+        try:
+            serving = asyncio.ensure_future(server.serve_forever())
+            await stop.wait()
+            serving.cancel()
+        finally:
+            loop.remove_signal_handler(signal.SIGTERM)
+            app.readiness.stop()
+            app.handlers.shutdown(wait=False)
+            app.executor.shutdown(wait=False)
+
+
+def run_server(port=8000):
+    """Run the asyncio server (blocks until Ctrl+C)."""
+    initialize_database()
+    AppWebHandler.STATIC_ASSETS.preload(sync_server.STATIC_FILES)
+
+    print("\nLibrary Management System - Web Interface (asyncio)")
+    print(f"Server running at http://localhost:{port}/")
+    print(f"  - New User App:    http://localhost:{port}/app")
+    print(f"  - Documentation:   http://localhost:{port}/docs.html")
+    print(f"  - Logs Dashboard:  http://localhost:{port}/logs.html")
+    print(f"  - API Docs:        http://localhost:{port}/api-docs")
+    print("\nPress Ctrl+C to stop")
+
+    try:
+        asyncio.run(serve(port))
+    except KeyboardInterrupt:
+        print("\nShutting down...")
@@ -0,0 +1,47 @@
+"""Access control for the ``/api/debug/*`` endpoints.
+
+Debug endpoints expose internals (call arguments, stacks), so they only
+exist when ``DEBUG_TOKEN`` is set, and every request must present it as
+``Authorization: Bearer <token>``. Without the variable they answer 404
+like any unknown path.
+"""
+
+import hmac
+import os
+from typing import Optional
+
+DEBUG_PREFIX = "/api/debug/"
+
+
+def debug_token() -> Optional[str]:
+    return os.environ.get("DEBUG_TOKEN") or None
+
+
+def debug_status(authorization: Optional[str]) -> int:
+    """HTTP status for a debug request: 200 if allowed, else 404/401."""
+    token = debug_token()
+    if token is None:
+        return 404
+    scheme, _, presented = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        presented.strip().encode(), token.encode()
+    ):
+        return 401
+    return 200
+
+
+def limit_param(raw: Optional[str], default: int = 50, cap: int = 1000) -> int:
+    """``?limit=`` clamped to ``1..cap`` (``default`` if absent or invalid)."""
+    try:
+        return min(max(int(raw), 1), cap)
+    except (TypeError, ValueError):
+        return default
+
+
+def float_param(raw: Optional[str], default: float, low: float, high: float) -> float:
+    """A numeric query parameter clamped to ``low..high``."""
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        return default
+    return default if value != value else min(max(value, low), high)
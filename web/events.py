@@ -0,0 +1,218 @@
+"""Catalog change feed for web clients (``GET /api/events``).
+
+The services append every committed catalog change to the shared event log
+(see ``services.events``), whichever process made it: the web server, the
+CLI daemon or a one-off CLI command. Each server process runs one
+``ChangeFeed`` that polls the log and keeps the recent events in memory,
+so any number of connected clients cost one log read per poll interval.
+
+Clients subscribe with Server-Sent Events (``Accept: text/event-stream``)
+or, without SSE, long-poll for JSON. Event ids are the resume tokens: an
+EventSource sends the last one back as ``Last-Event-ID`` when it
+reconnects, long-poll clients pass it as ``?after=``. A new subscriber
+first gets a ``ready`` event carrying the current position; a resume token
+the feed can no longer serve from memory gets ``reset``. Either way the
+client reloads the catalog once and then applies ``change`` events.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Set, Tuple
+
+from lib_logging.logger import get_logger
+from storage.interfaces import EventLog
+
+try:
+    from prometheus_client import Gauge
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+EVENT_STREAM_TYPE = "text/event-stream"
+
+# Seconds between two reads of the event log
+POLL_INTERVAL = 1.0
+# Recent events kept in memory for clients resuming after a disconnect
+BUFFER_SIZE = 1000
+# A missing id is skipped once the event after it is this old: its writer
+# is assumed to have failed (see MongoDBEventLog)
+GAP_GRACE = 5.0
+# An SSE response ends after this long and the client reconnects (with
+# Last-Event-ID), so a blocking server does not hold a thread forever
+STREAM_SECONDS = 300.0
+# Comment line sent on an idle stream so proxies keep the connection open
+HEARTBEAT_SECONDS = 15.0
+# Longest long-poll wait (?wait=)
+MAX_POLL_WAIT = 30.0
+# Client reconnect delay, sent as the SSE ``retry`` field
+RETRY_MS = 3000
+
+if PROMETHEUS_AVAILABLE:
+    EVENT_SUBSCRIBERS = Gauge(
+        "library_event_subscribers",
+        "Clients connected to the catalog change feed",
+        multiprocess_mode="livesum",
+    )
+
+
+def subscribed(delta: int) -> None:
+    """Count a change feed client connecting (+1) or leaving (-1)."""
+    if PROMETHEUS_AVAILABLE:
+        EVENT_SUBSCRIBERS.inc(delta)
+
+
+def parse_token(raw: Optional[str]) -> Optional[int]:
+    """Resume token from ``Last-Event-ID``/``?after=``: None if absent, -1 if bad."""
+    if raw is None or not raw.strip():
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        return -1
+
+
+class ChangeFeed:
+    """Fans the shared event log out to this process's subscribers.
+
+    The log is opened and the poller started on first use, so creating a
+    feed (as a class attribute of the web handler) touches no storage.
+    """
+
+    def __init__(
+        self,
+        log_factory: Callable[[], EventLog],
+        poll_interval: float = POLL_INTERVAL,
+        buffer_size: int = BUFFER_SIZE,
+    ):
+        self.log_factory = log_factory
+        self.poll_interval = poll_interval
+        self._buffer: Deque[dict] = deque(maxlen=buffer_size)
+        self._cond = threading.Condition()
+        self._listeners: Set[Callable[[], None]] = set()
+        self._log: Optional[EventLog] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # Last event id taken from the log, and the id below which events
+        # are no longer (or were never) in the buffer
+        self.head = 0
+        self._floor = 0
+
+    def start(self) -> None:
+        """Open the log and start polling (no-op once started)."""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._log = self.log_factory()
+            self.head = self._floor = self._log.latest_id()
+            self._thread = threading.Thread(
+                target=self._run, name="change-feed", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Reading the change event log failed: {e}")
+
+    def poll(self) -> int:
+        """Take new events from the log; returns how many were added."""
+        events = self._log.read_after(self.head, limit=self._buffer.maxlen)
+        accepted = []
+        expected = self.head + 1
+        for event in events:
+            if event["id"] != expected and time.time() - event["at"] < GAP_GRACE:
+                break  # an earlier event may still be being written
+            accepted.append(event)
+            expected = event["id"] + 1
+        if not accepted:
+            return 0
+        with self._cond:
+            for event in accepted:
+                if len(self._buffer) == self._buffer.maxlen:
+                    self._floor = self._buffer[0]["id"]
+                self._buffer.append(event)
+            self.head = accepted[-1]["id"]
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener()
+        return len(accepted)
+
+    def changes_after(self, token: Optional[int]) -> Tuple[Optional[List[dict]], int]:
+        """``(events after token, head)``; events is None if the client must reload."""
+        with self._cond:
+            if token is None or not self._floor <= token <= self.head:
+                return None, self.head
+            return [e for e in self._buffer if e["id"] > token], self.head
+
+    def wait(self, token: int, timeout: float) -> None:
+        """Block until there are events after ``token`` or ``timeout`` passes."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self.head != token or self._stop.is_set(), timeout
+            )
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Call ``listener()`` (from the poller thread) whenever events arrive."""
+        with self._cond:
+            self._listeners.add(listener)
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        with self._cond:
+            self._listeners.discard(listener)
+
+
+def sse_frame(kind: str, event_id: int, data: dict) -> bytes:
+    return (
+        f"event: {kind}\nid: {event_id}\ndata: {json.dumps(data, ensure_ascii=False)}"
+        "\n\n"
+    ).encode("utf-8")
+
+
+SSE_PREAMBLE = f"retry: {RETRY_MS}\n\n".encode("ascii")
+SSE_HEARTBEAT = b": keep-alive\n\n"
+
+
+def next_frames(feed: ChangeFeed, token: Optional[int]) -> Tuple[bytes, int]:
+    """SSE frames for everything after ``token``, and the token to continue from.
+
+    ``token`` None (a new subscriber) gives ``ready``; a token the feed
+    cannot serve gives ``reset``. Both carry the current head.
+    """
+    events, head = feed.changes_after(token)
+    if events is None:
+        kind = "ready" if token is None else "reset"
+        return sse_frame(kind, head, {"last_event_id": head}), head
+    if not events:
+        return b"", token
+    frames = b"".join(sse_frame("change", e["id"], e) for e in events)
+    return frames, events[-1]["id"]
+
+
+def poll_result(feed: ChangeFeed, token: Optional[int]) -> dict:
+    """Long-poll response body for ``token`` (see ``next_frames``)."""
+    events, head = feed.changes_after(token)
+    if events is None:
+        return {"events": [], "last_event_id": head, "reset": token is not None}
+    last = events[-1]["id"] if events else token
+    return {"events": events, "last_event_id": last, "reset": False}
+
+
+def poll_wait(raw: Optional[str]) -> float:
+    """Seconds a long-poll may wait (``?wait=``, default and cap MAX_POLL_WAIT)."""
+    try:
+        return min(max(float(raw), 0.0), MAX_POLL_WAIT)
+    except (TypeError, ValueError):
+        return MAX_POLL_WAIT
@@ -0,0 +1,317 @@
+"""Pre-fork multi-process serving for ``run_app.py``.
+
+``python run_app.py --workers 4`` (or ``WEB_WORKERS=4``; ``auto`` means one
+per available CPU) binds the listening socket once, then forks worker
+processes that all accept on it. The kernel spreads connections across
+them, so CPU-bound work such as JSON encoding and log parsing scales past
+the GIL. Each worker runs the regular blocking server, or the asyncio one
+with ``--async``. The parent only supervises: a worker that exits is
+replaced (with a growing back-off while workers keep dying right after
+start), and SIGTERM or Ctrl+C stops all of them.
+
+Metrics: ``prepare_metrics_dir`` points ``PROMETHEUS_MULTIPROC_DIR`` at a
+fresh directory before prometheus_client is imported. Every worker writes
+its own files there and ``/metrics`` (in any worker) aggregates them with a
+``MultiProcessCollector``.
+
+In-process caches, and what keeps each worker's copy current:
+
+* Static assets (``AssetCache``) are preloaded by the parent and inherited.
+  Each worker re-checks a file's mtime and size at most once per second,
+  so a changed file is served by every worker within a second.
+* Catalog statistics (``StatsService`` snapshots): with JSON storage they
+  are keyed by ``catalog_version()``, a token built from the books file's
+  inode, mtime and size, so a write by any process invalidates every
+  worker's snapshot on its next read. MongoDB has no such token, and its
+  snapshots expire after ``ttl_seconds``.
+* MongoDB lookup caches (``storage.mongodb.cache``) belong to the storage
+  instances, which are dropped in each new worker because a MongoClient
+  must not be shared across ``fork``. Every worker's cache follows the
+  collection's change stream on a replica set, and otherwise expires
+  entries after ``MONGO_CACHE_TTL`` seconds.
+"""
+
+import math
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from lib_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+WORKERS_ENV = "WEB_WORKERS"
+METRICS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Seconds workers get to finish in-flight requests before SIGKILL
+SHUTDOWN_TIMEOUT = 10.0
+# A worker that dies sooner than this after starting counts as a crash loop
+MIN_WORKER_LIFETIME = 1.0
+MAX_RESTART_DELAY = 30.0
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU limit of the container (cgroup v2 ``cpu.max`` or v1 CFS quota)."""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        cgroup_v1 = Path("/sys/fs/cgroup/cpu")
+        quota_us = int((cgroup_v1 / "cpu.cfs_quota_us").read_text())
+        period_us = int((cgroup_v1 / "cpu.cfs_period_us").read_text())
+        return quota_us / period_us if quota_us > 0 and period_us > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: affinity mask capped by the cgroup quota."""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:  # not Linux
+        count = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit:
+        count = min(count, max(1, math.ceil(limit)))
+    return count
+
+
+def parse_workers(value: Optional[str]) -> int:
+    """Worker count from ``--workers``/``WEB_WORKERS``: a number or ``auto``."""
+    if value is None or value == "":
+        return 1
+    if value.lower() == "auto":
+        return available_cpus()
+    count = int(value)
+    return available_cpus() if count <= 0 else count
+
+
+def prepare_metrics_dir() -> Path:
+    """Enable prometheus_client multiprocess mode with an empty directory.
+
+    Must run before prometheus_client is first imported.
+    """
+    configured = os.environ.get(METRICS_DIR_ENV)
+    if configured:
+        directory = Path(configured)
+        directory.mkdir(parents=True, exist_ok=True)
+        for stale in directory.glob("*.db"):
+            stale.unlink()
+    else:
+        directory = Path(tempfile.mkdtemp(prefix="library-metrics-"))
+        os.environ[METRICS_DIR_ENV] = str(directory)
+    return directory
+
+
+def _mark_worker_dead(pid: int) -> None:
+    if not os.environ.get(METRICS_DIR_ENV):
+        return
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(pid)
+
+
+def _exit_with_parent() -> None:
+    """SIGTERM this worker if the supervisor disappears (no orphans)."""
+    parent = os.getppid()
+
+    def watch():
+        while os.getppid() == parent:
+            time.sleep(1.0)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    threading.Thread(target=watch, name="parent-watch", daemon=True).start()
+
+
+class PreforkServer:
+    """Supervises ``workers`` processes running ``worker_main(listener)``."""
+
+    def __init__(
+        self,
+        listener: socket.socket,
+        workers: int,
+        worker_main: Callable[[socket.socket], None],
+    ):
+        self.listener = listener
+        self.worker_count = workers
+        self.worker_main = worker_main
+        self.workers: Dict[int, float] = {}  # pid -> start time
+        self._restart_delay = 0.0
+        self._stopping = False
+        self._interruptible = False
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:  # worker
+            code = 0
+            try:
+                # Ctrl+C reaches the whole process group; let the parent decide
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                _exit_with_parent()
+                self.worker_main(self.listener)
+            except BaseException as e:
+                logger.error(f"Worker {os.getpid()} failed: {e}", exc_info=True)
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+        return pid
+
+    def _request_stop(self, signum, frame) -> None:
+        # Only interrupt blocking waits: an exception raised while forking or
+        # logging can be swallowed ("Exception ignored in ..."), losing the stop.
+        self._stopping = True
+        if self._interruptible:
+            raise KeyboardInterrupt
+
+    def _sleep_or_wait(self, seconds: Optional[float] = None):
+        """``os.wait()`` (or sleep), raising KeyboardInterrupt once stopping."""
+        self._interruptible = True
+        try:
+            if self._stopping:
+                raise KeyboardInterrupt
+            return os.wait() if seconds is None else time.sleep(seconds)
+        finally:
+            self._interruptible = False
+
+    def run(self) -> int:
+        """Start the workers and keep them running until SIGTERM/Ctrl+C."""
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        try:
+            for _ in range(self.worker_count):
+                self.spawn()
+            while True:
+                pid, status = self._sleep_or_wait()
+                self._replace(pid, status)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+        return 0
+
+    def _replace(self, pid: int, status: int) -> None:
+        started = self.workers.pop(pid, None)
+        if started is None:
+            return
+        _mark_worker_dead(pid)
+        lifetime = time.monotonic() - started
+        logger.warning(
+            f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)} "
+            f"after {lifetime:.1f}s; starting a replacement"
+        )
+        if lifetime < MIN_WORKER_LIFETIME:
+            self._restart_delay = min(
+                MAX_RESTART_DELAY, max(0.5, self._restart_delay * 2)
+            )
+            self._sleep_or_wait(self._restart_delay)
+        else:
+            self._restart_delay = 0.0
+        self.spawn()
+
+    def stop(self) -> None:
+        """SIGTERM every worker; SIGKILL those still running after the timeout."""
+        self._signal_all(signal.SIGTERM)
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        while self.workers and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.05)
+            else:
+                self.workers.pop(pid, None)
+        if self.workers:
+            logger.warning(f"Workers {sorted(self.workers)} did not stop; killing")
+            self._signal_all(signal.SIGKILL)
+            for pid in self.workers:
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+        self.workers.clear()
+
+    def _signal_all(self, signum: int) -> None:
+        for pid in self.workers:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+
+def serve_blocking(listener: socket.socket) -> None:
+    """Worker: the ``http.server`` based app server on the shared socket."""
+    import http.server
+
+    from storage.factory import StorageFactory
+    from web.app_server import AppWebHandler
+
+    StorageFactory.reset()
+    # Losers of the accept race must not block inside accept()
+    listener.setblocking(False)
+    httpd = http.server.ThreadingHTTPServer(
+        listener.getsockname()[:2], AppWebHandler, bind_and_activate=False
+    )
+    httpd.socket.close()
+    httpd.socket = listener
+
+    def request_shutdown(*_):
+        # shutdown() waits for serve_forever, so it must run on another thread
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, request_shutdown)
+    httpd.serve_forever()
+
+
+def serve_async(listener: socket.socket) -> None:
+    """Worker: the asyncio app server on the shared socket."""
+    import asyncio
+
+    from storage.factory import StorageFactory
+    from web.async_server import serve
+
+    StorageFactory.reset()
+    asyncio.run(serve(sock=listener))
+
+
+def run_prefork(port: int, workers: int, use_async: bool = False) -> int:
+    """Bind ``port`` and serve it with ``workers`` processes until stopped."""
+    from web.app_server import AppWebHandler, initialize_database
+    from web.server import STATIC_FILES
+
+    initialize_database()
+    listener = socket.create_server(("", port), backlog=1024)
+    # Workers inherit the warm cache instead of each reading the files
+    AppWebHandler.STATIC_ASSETS.preload(STATIC_FILES)
+
+    mode = "asyncio" if use_async else "blocking"
+    print("\nLibrary Management System - Web Interface")
+    print(f"Server running at http://localhost:{port}/ ({workers} {mode} workers)")
+    print(f"  - New User App:    http://localhost:{port}/app")
+    print(f"  - Metrics:         http://localhost:{port}/metrics")
+    print("\nPress Ctrl+C to stop")
+
+    metrics_dir = os.environ.get(METRICS_DIR_ENV)
+    supervisor = PreforkServer(
+        listener, workers, serve_async if use_async else serve_blocking
+    )
+    try:
+        return supervisor.run()
+    finally:
+        listener.close()
+        if metrics_dir and Path(metrics_dir).name.startswith("library-metrics-"):
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+        print("\nShutting down...")
@@ -0,0 +1,340 @@
+"""On-demand CPU and memory profiling of the running server.
+
+Served under ``/api/debug/`` (debug token required, see ``web.debug``):
+
+* ``CPU_PROFILER``: while a capture runs, each request handled by
+  ``LibraryWebHandler`` runs under its own ``cProfile.Profile``; stopping
+  the capture merges them into one report (pstats text or collapsed
+  caller;callee pairs). Only requests that start after the capture are
+  included, and requests the async server answers natively are not.
+* ``sample_wall_clock``: samples every thread's stack for a few seconds
+  and returns collapsed stacks (flamegraph.pl / speedscope input). Nothing
+  is hooked into the code being sampled, so it is cheap enough for live
+  traffic; waiting threads are sampled too, so idle time shows up.
+* ``MEMORY_TRACER``: ``tracemalloc`` snapshots, and diffs against the
+  last snapshot to find what keeps growing.
+
+State is per process: under the prefork server each worker profiles
+itself, so responses carry the worker's pid.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from lib_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_SAMPLE_SECONDS = 60.0
+DEFAULT_SAMPLE_INTERVAL = 0.01
+# Innermost frames kept per sampled stack
+MAX_STACK_DEPTH = 64
+SORT_KEYS = tuple(sorted(pstats.Stats.sort_arg_dict_default))
+GROUP_BY = ("lineno", "filename", "traceback")
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(_PROJECT_ROOT) and "site-packages" not in filename:
+        return os.path.relpath(filename, _PROJECT_ROOT)
+    return os.path.basename(filename)
+
+
+def frame_label(filename: str, name: str) -> str:
+    """``path:function`` as used in collapsed stacks."""
+    if filename == "~":  # built-in functions in cProfile stats
+        return name
+    return f"{_short_path(filename)}:{name}"
+
+
+@dataclass
+class CpuCapture:
+    """The profiles of the requests handled during one capture."""
+
+    profiles: List[cProfile.Profile]
+    seconds: float
+    # Requests not profiled because another profiler was active
+    skipped: int = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.profiles)
+
+    def stats(self, stream=None) -> Optional[pstats.Stats]:
+        if not self.profiles:
+            return None
+        stats = pstats.Stats(self.profiles[0], stream=stream)
+        for profile in self.profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def report(self, sort: str = "cumulative", limit: int = 50) -> str:
+        """``pstats`` listing of the ``limit`` top functions by ``sort``."""
+        out = io.StringIO()
+        out.write(
+            f"# {self.requests} requests profiled over {self.seconds:.1f}s "
+            f"({self.skipped} skipped), pid {os.getpid()}\n"
+        )
+        stats = self.stats(stream=out)
+        if stats is not None:
+            stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def collapsed(self) -> str:
+        """``caller;callee microseconds`` lines of own time per call edge.
+
+        cProfile only records one level of callers, so these are edges
+        rather than full stacks; functions without a profiled caller are
+        listed alone.
+        """
+        stats = self.stats()
+        if stats is None:
+            return ""
+        lines = []
+        for func, (_cc, _nc, tt, _ct, callers) in stats.stats.items():
+            callee = frame_label(func[0], func[2])
+            if not callers:
+                lines.append((callee, tt))
+            for caller, edge in callers.items():
+                lines.append((f"{frame_label(caller[0], caller[2])};{callee}", edge[2]))
+        return "".join(
+            f"{stack} {round(t * 1e6)}\n"
+            for stack, t in sorted(lines)
+            if round(t * 1e6) > 0
+        )
+
+
+class CpuProfiler:
+    """Profiles every request that runs while a capture is in progress."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._running: Optional[int] = None
+        self._started = 0.0
+        self._profiles: List[cProfile.Profile] = []
+        self._skipped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._running is not None
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._running is not None,
+                "seconds": (
+                    round(time.monotonic() - self._started, 1)
+                    if self._running is not None
+                    else None
+                ),
+                "requests": len(self._profiles),
+                "pid": os.getpid(),
+            }
+
+    def start(self) -> bool:
+        """Start a capture (False if one is already running)."""
+        with self._lock:
+            if self._running is not None:
+                return False
+            self._generation += 1
+            self._running = self._generation
+            self._started = time.monotonic()
+            self._profiles = []
+            self._skipped = 0
+        logger.info("CPU profile capture started")
+        return True
+
+    def stop(self) -> Optional[CpuCapture]:
+        """End the capture and return it (None if none was running).
+
+        Requests still in flight are left out of the result.
+        """
+        with self._lock:
+            if self._running is None:
+                return None
+            self._running = None
+            capture = CpuCapture(
+                self._profiles, time.monotonic() - self._started, self._skipped
+            )
+            self._profiles = []
+        logger.info(f"CPU profile capture stopped ({capture.requests} requests)")
+        return capture
+
+    @contextmanager
+    def profile(self) -> Iterator[None]:
+        """Profile the calling thread for the block if a capture is running."""
+        generation = self._running
+        profile = None
+        if generation is not None:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:  # another profiler is active on this thread
+                profile = None
+                with self._lock:
+                    self._skipped += 1
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                with self._lock:
+                    if self._running == generation:
+                        self._profiles.append(profile)
+
+
+CPU_PROFILER = CpuProfiler()
+
+_sampling = threading.Lock()
+
+
+def _collapse(frame, thread_name: str) -> str:
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(frame_label(frame.f_code.co_filename, frame.f_code.co_name))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+def sample_wall_clock(
+    seconds: float, interval: float = DEFAULT_SAMPLE_INTERVAL
+) -> Tuple[Optional[Tuple[Dict[str, int], int]], Optional[str]]:
+    """Sample all threads' stacks every ``interval`` for ``seconds``.
+
+    Returns ``((collapsed stack -> samples, rounds), error)``. The calling
+    thread is not sampled; only one sampling runs at a time per process.
+    """
+    if not _sampling.acquire(blocking=False):
+        return None, "A wall-clock profile is already being taken"
+    try:
+        me = threading.get_ident()
+        stacks: Dict[str, int] = Counter()
+        rounds = 0
+        deadline = time.monotonic() + min(seconds, MAX_SAMPLE_SECONDS)
+        while time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    stacks[_collapse(frame, names.get(ident, str(ident)))] += 1
+            rounds += 1
+            time.sleep(interval)
+        return (dict(stacks), rounds), None
+    finally:
+        _sampling.release()
+
+
+def format_collapsed(stacks: Dict[str, int]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def _statistic(stat, group_by: str) -> dict:
+    frame = stat.traceback[0]
+    entry = {
+        "where": f"{_short_path(frame.filename)}:{frame.lineno}",
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+    if hasattr(stat, "size_diff"):
+        entry["size_diff_bytes"] = stat.size_diff
+        entry["count_diff"] = stat.count_diff
+    if group_by == "traceback":
+        entry["traceback"] = [
+            f"{_short_path(f.filename)}:{f.lineno}" for f in stat.traceback
+        ]
+    return entry
+
+
+class MemoryTracer:
+    """``tracemalloc`` control with a baseline snapshot for diffs."""
+
+    # Allocations made by tracemalloc and the import system are noise here
+    FILTERS = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    def status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "baseline": self._baseline is not None,
+            "pid": os.getpid(),
+        }
+
+    def start(self, frames: int = 1) -> bool:
+        """Start tracing allocations (False if already tracing)."""
+        with self._lock:
+            if tracemalloc.is_tracing():
+                return False
+            tracemalloc.start(frames)
+            self._baseline = None
+        logger.info(f"tracemalloc started ({frames} frames)")
+        return True
+
+    def stop(self) -> bool:
+        """Stop tracing and drop the baseline (False if not tracing)."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                return False
+            tracemalloc.stop()
+            self._baseline = None
+        logger.info("tracemalloc stopped")
+        return True
+
+    def _take(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+
+    def snapshot(
+        self, limit: int = 50, group_by: str = "lineno"
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """Top allocation sites now; the snapshot becomes the diff baseline."""
+        if not tracemalloc.is_tracing():
+            return None, "tracemalloc is not running"
+        snapshot = self._take()
+        with self._lock:
+            self._baseline = snapshot
+        top = snapshot.statistics(group_by)[:limit]
+        return {**self.status(), "top": [_statistic(s, group_by) for s in top]}, None
+
+    def diff(
+        self, limit: int = 50, group_by: str = "lineno"
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """Growth since the last ``snapshot``, largest first.
+
+        The baseline is kept, so repeated diffs show growth over a longer
+        and longer period.
+        """
+        if not tracemalloc.is_tracing():
+            return None, "tracemalloc is not running"
+        with self._lock:
+            baseline = self._baseline
+        if baseline is None:
+            return None, "Take a snapshot first"
+        top = self._take().compare_to(baseline, group_by)[:limit]
+        return {**self.status(), "top": [_statistic(s, group_by) for s in top]}, None
+
+
+MEMORY_TRACER = MemoryTracer()
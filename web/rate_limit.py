@@ -0,0 +1,121 @@
+"""Per-client rate limiting for the web API.
+
+Each limited route has a token bucket budget per key kind: the client IP
+(checked before the request body is read) and, for ``/api/login``, the
+username being tried (checked once the body is parsed). A client over
+budget gets ``429 Too Many Requests`` with ``Retry-After``.
+
+Budgets come from ``DEFAULT_BUDGETS``, overridden by ``RATE_LIMITS``, e.g.
+``/api/login:ip=10/60,/api/execute:ip=120/60:30``
+(``route:kind=requests/seconds[:burst]``; the burst defaults to the request
+count, ``0/1`` disables a budget).
+
+Buckets are kept by ``StorageFactory.create_rate_limit_store()``: in-process
+by default, shared through MongoDB with ``RATE_LIMIT_STORE=shared``. If the
+store fails the request is allowed; rate limiting must not take the API down.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from lib_logging.logger import get_logger
+
+try:
+    from prometheus_client import Counter
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+BUDGETS_ENV = "RATE_LIMITS"
+
+if PROMETHEUS_AVAILABLE:
+    RATE_LIMIT_DECISIONS_TOTAL = Counter(
+        "library_rate_limit_decisions_total",
+        "Rate limiter decisions",
+        ["route", "key", "decision"],
+    )
+
+
+@dataclass(frozen=True)
+class Budget:
+    """``rate`` requests per second on average, ``burst`` at once."""
+
+    rate: float
+    burst: float
+
+
+DEFAULT_BUDGETS: Dict[Tuple[str, str], Budget] = {
+    # Password guessing: per address and per targeted account
+    ("/api/login", "ip"): Budget(rate=20 / 60, burst=20),
+    ("/api/login", "username"): Budget(rate=5 / 60, burst=5),
+    ("/api/execute", "ip"): Budget(rate=120 / 60, burst=30),
+    ("/api/books/batch", "ip"): Budget(rate=30 / 60, burst=10),
+}
+
+
+def parse_budgets(spec: str) -> Dict[Tuple[str, str], Optional[Budget]]:
+    """Parse ``route:kind=requests/seconds[:burst],...``; None disables."""
+    budgets: Dict[Tuple[str, str], Optional[Budget]] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            target, value = item.split("=")
+            route, kind = target.rsplit(":", 1)
+            amount, _, burst = value.partition(":")
+            requests, seconds = amount.split("/")
+            rate = float(requests) / float(seconds)
+            burst_value = float(burst) if burst else float(requests)
+        except ValueError:
+            raise ValueError(f"Invalid rate limit {item!r}") from None
+        if rate < 0 or burst_value < 0:
+            raise ValueError(f"Invalid rate limit {item!r}")
+        budgets[(route, kind)] = Budget(rate, burst_value) if rate else None
+    return budgets
+
+
+class RateLimiter:
+    """Token bucket budgets per (route, key kind), kept in a ``RateLimitStore``."""
+
+    def __init__(self, budgets=None, store=None):
+        self.budgets = dict(DEFAULT_BUDGETS if budgets is None else budgets)
+        self._store = store
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        budgets: Dict[Tuple[str, str], Optional[Budget]] = dict(DEFAULT_BUDGETS)
+        try:
+            budgets.update(parse_budgets(os.environ.get(BUDGETS_ENV, "")))
+        except ValueError as e:
+            logger.error(f"Ignoring {BUDGETS_ENV}: {e}")
+        return cls({k: b for k, b in budgets.items() if b is not None})
+
+    @property
+    def store(self):
+        if self._store is None:
+            from storage.factory import StorageFactory
+
+            self._store = StorageFactory.create_rate_limit_store()
+        return self._store
+
+    def check(self, route: str, kind: str, key: str) -> Tuple[bool, float]:
+        """Spend one request of ``key``'s budget: (allowed, retry_after)."""
+        budget = self.budgets.get((route, kind))
+        if budget is None:
+            return True, 0.0
+        try:
+            allowed, retry_after = self.store.take(
+                f"{route}|{kind}|{key}", budget.rate, budget.burst
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit store failed, allowing request: {e}")
+            return True, 0.0
+        if PROMETHEUS_AVAILABLE:
+            RATE_LIMIT_DECISIONS_TOTAL.labels(
+                route=route, key=kind, decision="allowed" if allowed else "limited"
+            ).inc()
+        if not allowed:
+            logger.warning(f"Rate limited {route} for {kind} {key!r}")
+        return allowed, retry_after
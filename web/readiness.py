@@ -0,0 +1,207 @@
+"""Readiness reporting for the web servers.
+
+``/health`` and ``/health/live`` only say that the process answers HTTP.
+``/health/ready`` says whether it can serve the API. Its report is built
+by ``ReadinessChecker`` on a background thread every
+``READINESS_INTERVAL`` seconds (default 5), so answering a probe is a
+memory read and probes never add load to the storage.
+
+The report covers:
+
+* storage reachability: a ``ping()`` of the book and user storages, and
+  whether the MongoDB circuit breaker is open;
+* when an instrumented storage call last succeeded (see
+  ``lib_logging.slow_ops``);
+* pool saturation: MongoDB connection checkouts, admission slots and,
+  under the async server, the storage executor;
+* whether the log directory is writable.
+
+The process is ready while every storage answers and the report is fresh.
+Saturation and the log directory only produce warnings: taking a busy
+instance out of rotation would just push its load onto the others.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from lib_logging.logger import get_logger
+from lib_logging.slow_ops import last_success
+
+logger = get_logger(__name__)
+
+INTERVAL_ENV = "READINESS_INTERVAL"
+DEFAULT_INTERVAL = 5.0
+# A report older than this many intervals (a check is hanging) is not ready
+STALE_INTERVALS = 3
+# Pools with at least this share in use are reported as saturated
+SATURATED = 0.9
+STORAGE_BACKENDS = ("json", "mongodb")
+
+PoolSnapshot = Callable[[], Optional[dict]]
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(
+        timespec="milliseconds"
+    )
+
+
+def check_storage(factory: Callable[[], Any]) -> dict:
+    """Create (or get) a storage and ping it."""
+    start = time.perf_counter()
+    try:
+        storage = factory()
+        ping = getattr(storage, "ping", None)
+        if ping is not None:
+            ping()
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    result = {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+    breaker = getattr(storage, "breaker", None)
+    if breaker is not None and breaker.is_open:
+        result.update(ok=False, error="MongoDB circuit breaker is open")
+    return result
+
+
+def mongodb_pool() -> Optional[dict]:
+    """Connection checkouts, once this process has connected to MongoDB."""
+    try:
+        from config.database import POOL_MONITOR
+    except ImportError:  # pymongo is not installed
+        return None
+    return POOL_MONITOR.snapshot() if POOL_MONITOR.max_size else None
+
+
+def admission_pool(controller) -> dict:
+    """Slot use per route of an ``AdmissionController``."""
+    routes = controller.utilization()
+    return {"routes": routes, "saturation": max(routes.values(), default=0.0)}
+
+
+class ReadinessChecker:
+    """Refreshes a readiness report every ``interval`` seconds."""
+
+    def __init__(
+        self,
+        storages: Dict[str, Callable[[], Any]],
+        pools: Optional[Dict[str, PoolSnapshot]] = None,
+        interval: float = DEFAULT_INTERVAL,
+        log_dir: Optional[Path] = None,
+    ):
+        """``storages`` and ``pools`` map report names to factories/snapshots."""
+        self.storages = storages
+        self.pools = dict(pools or {})
+        self.interval = interval
+        self.log_dir = log_dir or Path(os.environ.get("LOG_DIR", "logs"))
+        self._report: Optional[dict] = None
+        self._checked = 0.0  # time.monotonic() of the report
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_env(
+        cls,
+        storages: Dict[str, Callable[[], Any]],
+        pools: Optional[Dict[str, PoolSnapshot]] = None,
+    ) -> "ReadinessChecker":
+        raw = os.environ.get(INTERVAL_ENV, "")
+        try:
+            interval = float(raw) if raw else DEFAULT_INTERVAL
+        except ValueError:
+            logger.warning(f"Ignoring invalid {INTERVAL_ENV}={raw!r}")
+            interval = DEFAULT_INTERVAL
+        return cls(storages, pools, max(interval, 0.1))
+
+    def start(self) -> None:
+        """Start the background checks (no-op once started)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="readiness", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                logger.warning(f"Readiness check failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def _pool_snapshots(self) -> Dict[str, dict]:
+        pools = {}
+        for name, snapshot in self.pools.items():
+            try:
+                pool = snapshot()
+            except Exception as e:
+                pool = {"error": str(e)}
+            if pool is not None:
+                pools[name] = pool
+        return pools
+
+    def check(self) -> dict:
+        """Run every check now and keep the result as the current report."""
+        storages = {name: check_storage(f) for name, f in self.storages.items()}
+        pools = self._pool_snapshots()
+        logs = {
+            "dir": str(self.log_dir),
+            "writable": os.access(self.log_dir, os.W_OK | os.X_OK),
+        }
+        warnings = [
+            f"{name} pool is saturated"
+            for name, pool in pools.items()
+            if (pool.get("saturation") or 0) >= SATURATED
+        ]
+        if not logs["writable"]:
+            warnings.append("log directory is not writable")
+        last = {}
+        for backend in STORAGE_BACKENDS:
+            if last_success(backend) is not None:
+                last[backend] = _iso(last_success(backend))
+        report = {
+            "ready": all(s["ok"] for s in storages.values()),
+            "checked_at": _iso(time.time()),
+            "storage": storages,
+            "last_success": last,
+            "pools": pools,
+            "logs": logs,
+            "warnings": warnings,
+        }
+        with self._lock:
+            self._report, self._checked = report, time.monotonic()
+        return report
+
+    def report(self) -> Tuple[int, dict]:
+        """``(HTTP status, body)`` from the latest report (200 if ready, else 503).
+
+        Starts the checker on first use; until its first check completes
+        the status is ``starting``.
+        """
+        self.start()
+        with self._lock:
+            report, checked = self._report, self._checked
+        if report is None:
+            return 503, {"status": "starting", "pid": os.getpid()}
+        age = time.monotonic() - checked
+        body = {**report, "age_seconds": round(age, 1), "pid": os.getpid()}
+        ready = body.pop("ready")
+        if age > STALE_INTERVALS * self.interval:
+            ready = False
+            body["warnings"] = report["warnings"] + ["readiness report is stale"]
+        return (200 if ready else 503), {
+            "status": "ready" if ready else "not_ready",
+            **body,
+        }
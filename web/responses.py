@@ -0,0 +1,137 @@
+"""JSON response encoding for the web handlers.
+
+Bodies are serialized compactly unless a pretty form is requested, and are
+gzip/deflate compressed when the client accepts it and the body is large
+enough for compression to pay off. List endpoints can stream their items
+as a JSON array with chunked transfer encoding, so the first bytes leave
+before the whole body has been built.
+"""
+
+import json
+import os
+import zlib
+from email.utils import formatdate
+from typing import IO, Any, Iterable, Iterator, Optional, Tuple
+
+from web.static_assets import accepts_encoding
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+# Bodies smaller than this are sent uncompressed (not worth the CPU)
+COMPRESS_MIN_BYTES = int(os.environ.get("JSON_COMPRESS_MIN_BYTES", "1024"))
+COMPRESSION_LEVEL = 6
+
+# Streamed output is buffered into chunks of roughly this size
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# zlib wbits per HTTP content-coding ("deflate" means the zlib format)
+_WBITS = {"gzip": 31, "deflate": 15}
+
+
+def stale_headers(storage: Any) -> dict:
+    """Headers flagging a response built from a storage snapshot (else {}).
+
+    Storages that can serve stale data while the database is down expose
+    ``stale_since``, the wall-clock time the snapshot was taken.
+    """
+    since = getattr(storage, "stale_since", None)
+    if since is None:
+        return {}
+    return {
+        "Warning": '110 - "Response is Stale"',
+        "X-Stale-Since": formatdate(since, usegmt=True),
+    }
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick gzip or deflate from an ``Accept-Encoding`` header, or None."""
+    for coding in ("gzip", "deflate"):
+        if accepts_encoding(accept_encoding or "", coding):
+            return coding
+    return None
+
+
+def dumps(data: Any, pretty: bool = False) -> bytes:
+    """Serialize ``data`` to UTF-8 JSON (compact unless ``pretty``)."""
+    if pretty:
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+    else:
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    return text.encode("utf-8")
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    """Compress a whole body with the given content-coding."""
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, _WBITS[coding])
+    return compressor.compress(body) + compressor.flush()
+
+
+def array_delimiters(pretty: bool = False) -> Tuple[bytes, bytes, bytes]:
+    """Opening, separator and closing bytes of a streamed JSON array."""
+    if pretty:
+        return b"[\n", b",\n", b"\n]"
+    return b"[", b",", b"]"
+
+
+def iter_json_array(items: Iterable[Any], pretty: bool = False) -> Iterator[bytes]:
+    """Yield the UTF-8 encoding of ``items`` as a JSON array, item by item."""
+    opening, separator, closing = array_delimiters(pretty)
+    yield opening
+    first = True
+    for item in items:
+        if not first:
+            yield separator
+        first = False
+        yield dumps(item, pretty)
+    yield closing
+
+
+class StreamWriter:
+    """Write a response body incrementally.
+
+    Small writes are buffered up to ``STREAM_CHUNK_BYTES``, optionally
+    compressed, and framed with chunked transfer encoding when ``chunked``
+    is set (HTTP/1.1). Without chunking the body ends when the connection
+    closes.
+    """
+
+    def __init__(self, wfile: IO[bytes], coding: Optional[str], chunked: bool):
+        self.wfile = wfile
+        self.chunked = chunked
+        self._compressor = (
+            zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, _WBITS[coding])
+            if coding
+            else None
+        )
+        self._buffer = bytearray()
+        self.bytes_sent = 0
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+        if len(self._buffer) >= STREAM_CHUNK_BYTES:
+            self._flush()
+
+    def close(self) -> None:
+        """Flush everything and terminate the body."""
+        self._flush(final=True)
+        if self.chunked:
+            self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _flush(self, final: bool = False) -> None:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+            data += self._compressor.flush(
+                zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+            )
+        if not data:
+            return
+        if self.chunked:
+            self.wfile.write(b"%x\r\n" % len(data))
+            self.wfile.write(data)
+            self.wfile.write(b"\r\n")
+        else:
+            self.wfile.write(data)
+        self.bytes_sent += len(data)
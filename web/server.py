@@ -1,7 +1,10 @@
 """HTTP server for serving HTML pages and API endpoints."""
 
+import functools
 import http.server
+import io
 import json
+import math
 import os
 import re
 import subprocess
@@ -9,11 +12,35 @@ import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, urlparse
 
 from dotenv import load_dotenv
 
+from cli import daemon as cli_daemon
 from lib_logging.logger import get_logger
+from lib_logging.slow_ops import SLOW_OPS
+from storage.errors import StorageUnavailableError
+from storage.factory import StorageFactory
+from web import debug, events, profiling, readiness
+from web.admission import (
+    TIMEOUT_HEADER,
+    AdmissionController,
+    Rejected,
+    request_deadline,
+    time_left,
+)
+from web.rate_limit import RateLimiter
+from web.responses import (
+    COMPRESS_MIN_BYTES,
+    JSON_CONTENT_TYPE,
+    StreamWriter,
+    compress,
+    dumps,
+    iter_json_array,
+    negotiate_encoding,
+    stale_headers,
+)
+from web.static_assets import AssetCache
 
 # Load environment variables from .env file
 _root = Path(__file__).resolve().parent.parent
@@ -34,6 +61,18 @@ try:
 except ImportError:
     PROMETHEUS_AVAILABLE = False
 
+
+def metrics_registry():
+    """Registry to expose: all workers' metrics when running pre-forked."""
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    from prometheus_client import CollectorRegistry, multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
 # Application metrics for Prometheus (errors, request count, latency)
 if PROMETHEUS_AVAILABLE:
     HTTP_REQUESTS_TOTAL = Counter(
@@ -56,10 +95,28 @@ if PROMETHEUS_AVAILABLE:
 # Logger
 logger = get_logger(__name__)
 
+# Static files loaded and precompressed when the server starts
+STATIC_FILES = (
+    "web/app/index.html",
+    "web/app/app.css",
+    "web/app/app.js",
+    "web/docs.html",
+    "web/logs.html",
+    "web/swagger.html",
+    "web/openapi.yaml",
+)
+
+# Seconds a CLI command run from the web UI may take
+CLI_TIMEOUT = 30
+
 
 class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
     """HTTP request handler for library web interface."""
 
+    # HTTP/1.1 is needed for chunked streaming; connections are still closed
+    # after every response (see end_headers).
+    protocol_version = "HTTP/1.1"
+
     # Allowed commands for security
     ALLOWED_COMMANDS = {
         "add-book",
@@ -72,40 +129,147 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
         "approve-borrow",
         "return-book",
         "register-user",
+        "stats",
+    }
+
+    # GET API routes (after /v1 normalization) -> handler method name
+    API_GET_ROUTES = {
+        "/api/logs": "serve_logs_api",
+        "/api/books": "serve_books_api",
+        "/api/stats": "serve_stats_api",
+        "/api/events": "serve_events_api",
+        "/api/openapi.yaml": "serve_openapi",
+        "/health": "serve_health",
+        "/health/live": "serve_health",
+        "/health/ready": "serve_readiness",
+    }
+
+    # GET /api/debug/* routes (token-protected, see web.debug) -> handler
+    DEBUG_GET_ROUTES = {
+        "/api/debug/slow-ops": "serve_slow_ops",
+        "/api/debug/profile/cpu": "serve_cpu_profile_status",
+        "/api/debug/profile/wall": "serve_wall_profile",
+        "/api/debug/memory": "serve_memory_status",
+        "/api/debug/memory/snapshot": "serve_memory_snapshot",
+        "/api/debug/memory/diff": "serve_memory_diff",
+    }
+
+    # POST /api/debug/* routes -> handler
+    DEBUG_POST_ROUTES = {
+        "/api/debug/profile/cpu/start": "handle_cpu_profile_start",
+        "/api/debug/profile/cpu/stop": "handle_cpu_profile_stop",
+        "/api/debug/memory/start": "handle_memory_start",
+        "/api/debug/memory/stop": "handle_memory_stop",
+    }
+
+    # POST /api/books/batch actions -> BookService batch method
+    BATCH_ACTIONS = {
+        "approve-borrow": "approve_borrows",
+        "return-book": "return_books",
+        "delete-book": "delete_books",
     }
+    MAX_BATCH_SIZE = 1000
 
     # Project root directory
     PROJECT_ROOT = Path(__file__).parent.parent
 
-    def handle(self):
-        """Wrap request to record Prometheus metrics (latency, count, status)."""
+    # Shared by all handler instances (one per request)
+    STATIC_ASSETS = AssetCache(PROJECT_ROOT)
+    ADMISSION = AdmissionController.from_env()
+    RATE_LIMITER = RateLimiter.from_env()
+    CHANGE_FEED = events.ChangeFeed(StorageFactory.create_event_log)
+    READINESS = readiness.ReadinessChecker.from_env(
+        {
+            "books": StorageFactory.create_book_storage,
+            "users": StorageFactory.create_user_storage,
+        },
+        {
+            "mongodb": readiness.mongodb_pool,
+            "admission": functools.partial(readiness.admission_pool, ADMISSION),
+        },
+    )
+
+    # time.monotonic() by which the client wants an answer (X-Request-Timeout)
+    deadline = None
+
+    def handle_one_request(self):
+        """Wrap each request to record Prometheus metrics (latency, count, status)."""
         start = time.perf_counter()
-        status = 500  # default if something breaks
-        method = ""
-        path = ""
+        self._status_code = 500  # default if something breaks
+        self.command, self.path = "", ""
+        self._ticket = None
         try:
             # Let the base class parse the request first (it sets `self.path` and `self.command`).
-            super().handle()
-            method = getattr(self, "command", "")
-            path = urlparse(getattr(self, "path", "")).path
-            status = getattr(self, "_status_code", 200)
+            with profiling.CPU_PROFILER.profile():
+                super().handle_one_request()
         except Exception:
             if PROMETHEUS_AVAILABLE:
                 APPLICATION_ERRORS_TOTAL.labels(component="web").inc()
             raise
         finally:
-            if PROMETHEUS_AVAILABLE:
+            if self._ticket is not None:
+                self._ticket.release()
+                self._ticket = None
+            if PROMETHEUS_AVAILABLE and self.command:
+                method = self.command
+                path = urlparse(self.path).path
                 HTTP_REQUESTS_TOTAL.labels(
-                    method=method, path=path, status=str(status)
+                    method=method, path=path, status=str(self._status_code)
                 ).inc()
                 HTTP_REQUEST_DURATION.labels(method=method, path=path).observe(
                     time.perf_counter() - start
                 )
 
+    def parse_request(self):
+        """Parse the request line and headers, then apply rate and admission limits."""
+        return (
+            super().parse_request()
+            and self._within_rate_limit("ip", self.client_address[0])
+            and self._admit()
+        )
+
+    def _within_rate_limit(self, kind, key):
+        """Spend from ``key``'s budget for this route, or answer 429 (returns False)."""
+        route = self._normalize_api_path(urlparse(self.path).path)
+        allowed, retry_after = self.RATE_LIMITER.check(route, kind, key)
+        if not allowed:
+            message = "Too many requests, retry later"
+            self.close_connection = True
+            self.send_json_response(
+                {"success": False, "error": message, "message": message},
+                status=429,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+        return allowed
+
+    def _admit(self):
+        """Hold a slot for this request's route, or answer 503 (returns False)."""
+        path = self._normalize_api_path(urlparse(self.path).path)
+        self.deadline = request_deadline(self.headers.get(TIMEOUT_HEADER))
+        try:
+            self._ticket = self.ADMISSION.admit(path, self.deadline)
+            return True
+        except Rejected as e:
+            logger.warning(f"Shedding {self.command} {path}: {e.reason}")
+            self.close_connection = True
+            self.send_json_response(
+                {"success": False, "error": "Server busy, retry later"},
+                status=503,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            return False
+
     def send_response(self, code, message=None):
         self._status_code = code
         super().send_response(code, message)
 
+    def end_headers(self):
+        # One request per connection: an idle keep-alive client would
+        # otherwise pin a server thread (or, single-threaded, block everyone).
+        if not self.close_connection:
+            self.send_header("Connection", "close")
+        super().end_headers()
+
     def _normalize_api_path(self, path):
         """Support API versioning: /v1/api/* and /api/* map to same handlers."""
         if path.startswith("/v1/api/"):
@@ -130,12 +294,10 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
         elif path.startswith("/app/"):
             # Serve static files from web/app/ directory
             self.serve_file("web" + path)
-        elif api_path == "/api/logs":
-            self.serve_logs_api()
-        elif api_path == "/api/books":
-            self.serve_books_api()
-        elif api_path == "/api/openapi.yaml":
-            self.serve_openapi()
+        elif api_path in self.API_GET_ROUTES:
+            getattr(self, self.API_GET_ROUTES[api_path])()
+        elif api_path.startswith(debug.DEBUG_PREFIX):
+            self.serve_debug_api(self.DEBUG_GET_ROUTES.get(api_path))
         elif path == "/metrics":
             self.serve_metrics()
         else:
@@ -151,36 +313,38 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
             self.handle_execute_api()
         elif api_path == "/api/login":
             self.handle_login_api()
+        elif api_path == "/api/books/batch":
+            self.handle_books_batch_api()
+        elif api_path.startswith(debug.DEBUG_PREFIX):
+            self.serve_debug_api(self.DEBUG_POST_ROUTES.get(api_path))
         else:
             self.send_error(404, "Endpoint not found")
 
     def serve_file(self, file_path):
-        """Serve a static file."""
+        """Serve a static file from the in-memory asset cache.
+
+        Supports ``Accept-Encoding`` negotiation (br/gzip), strong ETags and
+        304 responses. URLs carrying the asset's current fingerprint
+        (``?v=<hash>``) are cacheable forever; everything else is revalidated.
+        """
         try:
-            file_full_path = self.PROJECT_ROOT / file_path
-            if not file_full_path.exists():
+            asset = self.STATIC_ASSETS.get(file_path)
+            if asset is None:
                 self.send_error(404, "File not found")
                 return
 
-            # Determine content type
-            if file_path.endswith(".html"):
-                content_type = "text/html"
-            elif file_path.endswith(".css"):
-                content_type = "text/css"
-            elif file_path.endswith(".js"):
-                content_type = "application/javascript"
-            else:
-                content_type = "text/plain"
-
-            with open(file_full_path, "rb") as f:
-                content = f.read()
-
-            self.send_response(200)
-            self.send_header("Content-type", content_type)
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.send_header("Content-length", str(len(content)))
+            status, headers, body = asset.respond(
+                self.headers.get("Accept-Encoding", ""),
+                self.headers.get("If-None-Match"),
+                self.headers.get("If-Modified-Since"),
+                parse_qs(urlparse(self.path).query).get("v", [""])[0],
+            )
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
             self.end_headers()
-            self.wfile.write(content)
+            if body:
+                self.wfile.write(body)
         except Exception as e:
             self.send_error(500, f"Error serving file: {str(e)}")
 
@@ -192,25 +356,160 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
         self.send_response(200)
         self.send_header("Content-Type", CONTENT_TYPE_LATEST)
         self.end_headers()
-        self.wfile.write(generate_latest(REGISTRY))
+        self.wfile.write(generate_latest(metrics_registry()))
+
+    def serve_health(self):
+        """Liveness: the process answers HTTP."""
+        body = b'{"status":"ok"}'
+        self.send_response(200)
+        self.send_header("Content-type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def serve_readiness(self):
+        """Latest background readiness report: 200 if ready, else 503."""
+        status, report = self.READINESS.report()
+        self.send_json_response(
+            report, status=status, headers={"Cache-Control": "no-store"}
+        )
 
     def serve_openapi(self):
         """Serve OpenAPI 3 spec (YAML) for Swagger UI."""
-        try:
-            spec_path = self.PROJECT_ROOT / "web" / "openapi.yaml"
-            if not spec_path.exists():
-                self.send_error(404, "OpenAPI spec not found")
-                return
-            with open(spec_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            self.send_response(200)
-            self.send_header("Content-Type", "application/x-yaml")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.send_header("Content-Length", str(len(content.encode("utf-8"))))
-            self.end_headers()
-            self.wfile.write(content.encode("utf-8"))
-        except Exception as e:
-            self.send_error(500, str(e))
+        self.serve_file("web/openapi.yaml")
+
+    def serve_debug_api(self, handler):
+        """Run a debug handler if the request carries the debug token."""
+        status = debug.debug_status(self.headers.get("Authorization"))
+        if handler is None or status == 404:
+            self.send_error(404, "File not found")
+        elif status == 401:
+            self.send_json_response(
+                {"success": False, "error": "Debug token required"},
+                status=401,
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        else:
+            getattr(self, handler)()
+
+    def serve_slow_ops(self):
+        """This process's recent slow repository/service calls, newest first."""
+        query = parse_qs(urlparse(self.path).query)
+        threshold = SLOW_OPS.threshold
+        self.send_json_response(
+            {
+                "threshold_ms": None if threshold is None else threshold * 1000,
+                "pid": os.getpid(),
+                "operations": SLOW_OPS.recent(
+                    debug.limit_param(query.get("limit", [None])[0])
+                ),
+            },
+            headers={"Cache-Control": "no-store"},
+        )
+
+    def _debug_query(self, name, default=None):
+        return parse_qs(urlparse(self.path).query).get(name, [default])[0]
+
+    def _send_debug_conflict(self, message):
+        self.send_json_response({"success": False, "error": message}, status=409)
+
+    def serve_cpu_profile_status(self):
+        self.send_json_response(
+            profiling.CPU_PROFILER.status(), headers={"Cache-Control": "no-store"}
+        )
+
+    def handle_cpu_profile_start(self):
+        """Profile every request from now until the capture is stopped."""
+        if not profiling.CPU_PROFILER.start():
+            self._send_debug_conflict("A CPU profile capture is already running")
+            return
+        self.send_json_response({"success": True, **profiling.CPU_PROFILER.status()})
+
+    def handle_cpu_profile_stop(self):
+        """End the capture: pstats text (default) or ``?format=collapsed``."""
+        sort = self._debug_query("sort", "cumulative")
+        output = self._debug_query("format", "pstats")
+        if sort not in profiling.SORT_KEYS or output not in ("pstats", "collapsed"):
+            self.send_json_response(
+                {"success": False, "error": "Unknown sort key or format"}, status=400
+            )
+            return
+        capture = profiling.CPU_PROFILER.stop()
+        if capture is None:
+            self._send_debug_conflict("No CPU profile capture is running")
+            return
+        if output == "collapsed":
+            text = capture.collapsed()
+        else:
+            text = capture.report(sort, debug.limit_param(self._debug_query("limit")))
+        self.send_text_response(text, headers=self._profile_headers())
+
+    def serve_wall_profile(self):
+        """Sample all threads for ``?seconds=`` and return collapsed stacks."""
+        seconds = debug.float_param(
+            self._debug_query("seconds"), 5.0, 0.1, profiling.MAX_SAMPLE_SECONDS
+        )
+        interval = debug.float_param(
+            self._debug_query("interval"),
+            profiling.DEFAULT_SAMPLE_INTERVAL,
+            0.001,
+            1.0,
+        )
+        result, error = profiling.sample_wall_clock(seconds, interval)
+        if error:
+            self._send_debug_conflict(error)
+            return
+        stacks, rounds = result
+        headers = self._profile_headers()
+        headers["X-Profile-Samples"] = str(rounds)
+        self.send_text_response(profiling.format_collapsed(stacks), headers=headers)
+
+    def _profile_headers(self):
+        return {"Cache-Control": "no-store", "X-Process-Id": str(os.getpid())}
+
+    def serve_memory_status(self):
+        self.send_json_response(
+            profiling.MEMORY_TRACER.status(), headers={"Cache-Control": "no-store"}
+        )
+
+    def handle_memory_start(self):
+        """Start tracemalloc, keeping ``?frames=`` frames per allocation."""
+        frames = int(debug.float_param(self._debug_query("frames"), 1, 1, 50))
+        if not profiling.MEMORY_TRACER.start(frames):
+            self._send_debug_conflict("tracemalloc is already running")
+            return
+        self.send_json_response({"success": True, **profiling.MEMORY_TRACER.status()})
+
+    def handle_memory_stop(self):
+        if not profiling.MEMORY_TRACER.stop():
+            self._send_debug_conflict("tracemalloc is not running")
+            return
+        self.send_json_response({"success": True, **profiling.MEMORY_TRACER.status()})
+
+    def serve_memory_snapshot(self):
+        """Top allocation sites; also the baseline for ``/memory/diff``."""
+        self._serve_memory(profiling.MEMORY_TRACER.snapshot)
+
+    def serve_memory_diff(self):
+        """Allocation growth since the last snapshot."""
+        self._serve_memory(profiling.MEMORY_TRACER.diff)
+
+    def _serve_memory(self, take):
+        group_by = self._debug_query("group_by", "lineno")
+        if group_by not in profiling.GROUP_BY:
+            self.send_json_response(
+                {
+                    "success": False,
+                    "error": f"group_by must be one of {profiling.GROUP_BY}",
+                },
+                status=400,
+            )
+            return
+        result, error = take(debug.limit_param(self._debug_query("limit")), group_by)
+        if error:
+            self._send_debug_conflict(error)
+            return
+        self.send_json_response(result, headers={"Cache-Control": "no-store"})
 
     def serve_logs_api(self):
         """Serve log data as JSON."""
@@ -224,8 +523,7 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
                 self.send_json_response([])
                 return
 
-            logs = self.parse_log_file(log_file)
-            self.send_json_response(logs)
+            self.send_json_stream(self.iter_log_entries(log_file))
         except Exception as e:
             self.send_error(500, f"Error reading logs: {str(e)}")
 
@@ -234,7 +532,15 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
         Parse log file and return structured data.
         Supports: (1) NDJSON from structured logger (2) legacy text format.
         """
-        logs = []
+        return list(self.iter_log_entries(log_file_path))
+
+    def iter_log_entries(self, log_file_path):
+        """
+        Yield structured log entries one line at a time (see ``parse_log_file``).
+
+        The file is read lazily, so streaming the result keeps memory flat
+        regardless of log size.
+        """
         legacy_pattern = re.compile(
             r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - ([^-]+) - (INFO|WARNING|ERROR) - (.+)$"
         )
@@ -250,15 +556,13 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
                     try:
                         obj = json.loads(line)
                         ts = obj.get("timestamp", "")
-                        logs.append(
-                            {
-                                "timestamp": ts,
-                                "datetime": ts,
-                                "logger": obj.get("logger", "unknown"),
-                                "level": obj.get("level", "INFO"),
-                                "message": obj.get("message", line),
-                            }
-                        )
+                        yield {
+                            "timestamp": ts,
+                            "datetime": ts,
+                            "logger": obj.get("logger", "unknown"),
+                            "level": obj.get("level", "INFO"),
+                            "message": obj.get("message", line),
+                        }
                         continue
                     except json.JSONDecodeError:
                         pass
@@ -274,37 +578,29 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
                             datetime_iso = ts_dt.isoformat()
                         except ValueError:
                             datetime_iso = None
-                        logs.append(
-                            {
-                                "timestamp": timestamp_str,
-                                "datetime": datetime_iso,
-                                "logger": logger_name.strip(),
-                                "level": level,
-                                "message": message,
-                            }
-                        )
+                        yield {
+                            "timestamp": timestamp_str,
+                            "datetime": datetime_iso,
+                            "logger": logger_name.strip(),
+                            "level": level,
+                            "message": message,
+                        }
                     else:
-                        logs.append(
-                            {
-                                "timestamp": "",
-                                "datetime": None,
-                                "logger": "unknown",
-                                "level": "INFO",
-                                "message": line,
-                            }
-                        )
+                        yield {
+                            "timestamp": "",
+                            "datetime": None,
+                            "logger": "unknown",
+                            "level": "INFO",
+                            "message": line,
+                        }
         except Exception as e:
-            logs.append(
-                {
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "datetime": datetime.now().isoformat(),
-                    "logger": "server",
-                    "level": "ERROR",
-                    "message": f"Error parsing log file: {str(e)}",
-                }
-            )
-
-        return logs
+            yield {
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "datetime": datetime.now().isoformat(),
+                "logger": "server",
+                "level": "ERROR",
+                "message": f"Error parsing log file: {str(e)}",
+            }
 
     def serve_books_api(self):
         """Serve list of all books from database as JSON."""
@@ -321,17 +617,98 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
                 f"Using storage backend: {storage_name.__class__.__name__ if storage_name else 'unknown'}"
             )
 
-            # Get all books
-            books = book_service.list_all_books()
-
-            # Use the model's `to_dict()` (robust and forward-compatible)
-            books_data = [book.to_dict() for book in books]
-
-            self.send_json_response(books_data)
+            # Stream books straight from the repository iterator
+            self.send_json_stream(
+                book_service.iter_book_dicts(),
+                headers=stale_headers(book_service.storage),
+            )
+        except StorageUnavailableError as e:
+            self.send_unavailable(e)
         except Exception as e:
             logger.error(f"Error serving books API: {e}")
             self.send_error(500, f"Error retrieving books: {str(e)}")
 
+    def serve_stats_api(self):
+        """Serve catalog statistics computed from the columnar snapshot."""
+        try:
+            params = parse_qs(urlparse(self.path).query)
+            try:
+                top = max(1, min(100, int(params.get("top", ["10"])[0])))
+            except ValueError:
+                self.send_error(400, "Query parameter 'top' must be an integer")
+                return
+
+            from core.factory import ServiceFactory
+
+            stats_service = ServiceFactory().create_stats_service()
+            self.send_json_response(
+                stats_service.get_stats(top=top),
+                headers=stale_headers(stats_service.storage),
+            )
+        except StorageUnavailableError as e:
+            self.send_unavailable(e)
+        except Exception as e:
+            logger.error(f"Error serving stats API: {e}")
+            self.send_error(500, f"Error computing stats: {str(e)}")
+
+    def serve_events_api(self):
+        """Catalog changes as Server-Sent Events, or long-polled JSON.
+
+        See ``web.events``; the resume token is ``Last-Event-ID`` or
+        ``?after=``, ``?wait=`` bounds a long-poll.
+        """
+        params = parse_qs(urlparse(self.path).query)
+        token = events.parse_token(
+            self.headers.get("Last-Event-ID") or params.get("after", [None])[0]
+        )
+        try:
+            self.CHANGE_FEED.start()
+        except Exception as e:
+            logger.error(f"Error starting the change feed: {e}")
+            self.send_error(503, "Change feed unavailable")
+            return
+
+        events.subscribed(1)
+        try:
+            if events.EVENT_STREAM_TYPE in self.headers.get("Accept", ""):
+                self._stream_events(token)
+            else:
+                self._long_poll_events(token, params.get("wait", [None])[0])
+        finally:
+            events.subscribed(-1)
+
+    def _long_poll_events(self, token, wait):
+        feed = self.CHANGE_FEED
+        result = events.poll_result(feed, token)
+        if token is not None and not result["events"] and not result["reset"]:
+            feed.wait(token, time_left(self.deadline, events.poll_wait(wait)))
+            result = events.poll_result(feed, token)
+        self.send_json_response(result, headers={"Cache-Control": "no-cache"})
+
+    def _stream_events(self, token):
+        self.send_response(200)
+        self.send_header("Content-Type", events.EVENT_STREAM_TYPE)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("X-Accel-Buffering", "no")
+        self.close_connection = True  # the stream ends when the connection does
+        self.end_headers()
+
+        feed = self.CHANGE_FEED
+        end = time.monotonic() + events.STREAM_SECONDS
+        try:
+            frames, token = events.next_frames(feed, token)
+            self.wfile.write(events.SSE_PREAMBLE + frames)
+            while time.monotonic() < end:
+                feed.wait(token, min(events.HEARTBEAT_SECONDS, end - time.monotonic()))
+                frames, token = events.next_frames(feed, token)
+                if frames:
+                    self.wfile.write(frames)
+                elif time.monotonic() < end:
+                    self.wfile.write(events.SSE_HEARTBEAT)
+        except (ConnectionError, OSError):
+            logger.debug("Change feed client disconnected")
+
     def handle_login_api(self):
         """Handle user login and authenticate against the database."""
         try:
@@ -353,6 +730,9 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
                 )
                 return
 
+            if not self._within_rate_limit("username", username):
+                return
+
             from core.factory import ServiceFactory
 
             factory = ServiceFactory()
@@ -377,6 +757,8 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
 
         except json.JSONDecodeError:
             self.send_error(400, "Invalid JSON in request body")
+        except StorageUnavailableError as e:
+            self.send_unavailable(e)
         except Exception as e:
             logger.error(f"Exception in handle_login_api: {e}", exc_info=True)
             self.send_json_response(
@@ -384,6 +766,105 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
                 status=500,
             )
 
+    def _validate_batch_request(self, data):
+        """
+        Validate a batch request body in one pass.
+
+        Returns:
+            Tuple of (book_ids, error_response, status); error_response is None
+            when the request is valid
+        """
+        action = data.get("action")
+        ids = data.get("ids")
+
+        if action not in self.BATCH_ACTIONS:
+            error = (
+                f"Unsupported action '{action}'. "
+                f"Valid actions: {', '.join(self.BATCH_ACTIONS)}"
+            )
+            return None, {"success": False, "error": error}, 400
+
+        if not isinstance(ids, list) or not ids:
+            return (
+                None,
+                {"success": False, "error": "'ids' must be a non-empty list"},
+                400,
+            )
+
+        if len(ids) > self.MAX_BATCH_SIZE:
+            error = f"At most {self.MAX_BATCH_SIZE} ids per batch"
+            return None, {"success": False, "error": error}, 400
+
+        # Report every bad entry together rather than failing on the first one
+        book_ids, errors = [], []
+        for raw in ids:
+            try:
+                book_id = int(str(raw).strip())
+            except ValueError:
+                book_id = 0
+            if book_id <= 0:
+                errors.append(f"Invalid book ID: {raw!r}")
+            else:
+                book_ids.append(book_id)
+        if errors:
+            return (
+                None,
+                {"success": False, "error": "Invalid ids", "errors": errors},
+                400,
+            )
+
+        if data.get("librarian") is not True:
+            error = "Only librarians can run batch operations"
+            return None, {"success": False, "error": error}, 403
+
+        return book_ids, None, 200
+
+    def handle_books_batch_api(self):
+        """Apply one librarian action to many books in-process (no subprocess).
+
+        Body: {"action": "return-book", "ids": [1001, 1002], "librarian": true}
+        """
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            if content_length == 0:
+                self.send_error(400, "Empty request body")
+                return
+
+            body = self.rfile.read(content_length)
+            data = json.loads(body.decode("utf-8"))
+
+            book_ids, error_response, status = self._validate_batch_request(data)
+            if error_response is not None:
+                self.send_json_response(error_response, status=status)
+                return
+
+            from core.factory import ServiceFactory
+
+            action = data["action"]
+            book_service = ServiceFactory().create_book_service()
+            results = getattr(book_service, self.BATCH_ACTIONS[action])(book_ids)
+            failed = sum(1 for r in results if not r.success)
+
+            self.send_json_response(
+                {
+                    "success": failed == 0,
+                    "action": action,
+                    "succeeded": len(results) - failed,
+                    "failed": failed,
+                    "results": [r.to_dict() for r in results],
+                }
+            )
+        except json.JSONDecodeError:
+            self.send_error(400, "Invalid JSON in request body")
+        except StorageUnavailableError as e:
+            self.send_unavailable(e)
+        except Exception as e:
+            logger.error(f"Exception in handle_books_batch_api: {e}", exc_info=True)
+            self.send_json_response(
+                {"success": False, "error": f"An internal error occurred: {e}"},
+                status=500,
+            )
+
     def _convert_positional_args_to_flags(self, command, args):
         """
         Convert positional arguments to flag-based arguments for CLI commands.
@@ -411,6 +892,7 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
             "update-status": ["--id", "--status"],
             "list-books": [],
             "list-picked": [],
+            "stats": [],
         }
 
         if command not in command_arg_specs:
@@ -523,6 +1005,8 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
         Returns:
             Dictionary with execution results
         """
+        # The client's deadline (X-Request-Timeout) caps the CLI timeout
+        timeout = time_left(self.deadline, CLI_TIMEOUT)
         try:
             # Debug: Log raw args
             logger.info(f"Raw args type: {type(args)}, value: {args}")
@@ -545,6 +1029,7 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
                 "update-status": 2,
                 "list-books": 0,
                 "list-picked": 0,
+                "stats": 0,
             }
 
             # Count non-empty positional args
@@ -569,43 +1054,26 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
 
             logger.info(f"Converted args: {converted_args}")
 
-            # Build command: python main.py <command> <converted_args>
-            main_py = self.PROJECT_ROOT / "main.py"
-            cmd = [sys.executable, str(main_py), command] + converted_args
-
-            # Debug: Log the command being executed
-            debug_msg = f"[EXECUTE] Final cmd list: {cmd}"
-            logger.info(debug_msg)
-            print(debug_msg, flush=True)
-
-            # Copy current environment (already has .env loaded at startup)
-            env = os.environ.copy()
-
-            # Execute with timeout
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30,
-                cwd=str(self.PROJECT_ROOT),
-                env=env,
+            # Prefer a running CLI daemon (main.py serve-cli): no process start-up
+            returncode, stdout, stderr = self._run_cli(
+                [command] + converted_args, timeout
             )
 
             # Sanitize output for HTML
-            stdout = self.sanitize_output(process.stdout)
-            stderr = self.sanitize_output(process.stderr)
+            stdout = self.sanitize_output(stdout)
+            stderr = self.sanitize_output(stderr)
 
             return {
-                "success": process.returncode == 0,
+                "success": returncode == 0,
                 "stdout": stdout,
                 "stderr": stderr,
-                "exit_code": process.returncode,
+                "exit_code": returncode,
             }
-        except subprocess.TimeoutExpired:
+        except (subprocess.TimeoutExpired, TimeoutError):
             return {
                 "success": False,
                 "stdout": "",
-                "stderr": "Command execution timed out (5 seconds)",
+                "stderr": f"Command execution timed out ({timeout:g} seconds)",
                 "exit_code": 1,
             }
         except Exception as e:
@@ -617,6 +1085,42 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
                 "exit_code": 1,
             }
 
+    def _run_cli(self, argv, timeout=CLI_TIMEOUT):
+        """Run ``main.py <argv>``; returns (exit_code, stdout, stderr).
+
+        Commands go to the CLI daemon when one is running with the same
+        storage configuration, otherwise to a fresh ``main.py`` process.
+        """
+        if timeout <= 0:
+            raise TimeoutError("request deadline already passed")
+        out, err = io.StringIO(), io.StringIO()
+        returncode = cli_daemon.call(argv, out, err, timeout=timeout)
+        if returncode is not None:
+            logger.info(f"[EXECUTE] via CLI daemon: {argv}")
+            return returncode, out.getvalue(), err.getvalue()
+
+        # Build command: python main.py <command> <converted_args>
+        cmd = [sys.executable, str(self.PROJECT_ROOT / "main.py")] + argv
+
+        # Debug: Log the command being executed
+        debug_msg = f"[EXECUTE] Final cmd list: {cmd}"
+        logger.info(debug_msg)
+        print(debug_msg, flush=True)
+
+        # Copy current environment (already has .env loaded at startup)
+        env = os.environ.copy()
+
+        # Execute with timeout
+        process = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            cwd=str(self.PROJECT_ROOT),
+            env=env,
+        )
+        return process.returncode, process.stdout, process.stderr
+
     def sanitize_output(self, text):
         """Sanitize output for safe HTML display."""
         if not text:
@@ -631,16 +1135,97 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
 
         return text
 
-    def send_json_response(self, data, status=200):
-        """Send JSON response."""
-        json_data = json.dumps(data, indent=2)
+    def _wants_pretty(self):
+        """Indented JSON only on request (``?pretty=1``); compact by default."""
+        value = parse_qs(urlparse(self.path).query).get("pretty", [""])[0]
+        return value.lower() in ("1", "true", "yes")
+
+    def send_json_response(self, data, status=200, headers=None):
+        """Send JSON response, compressed if large and the client accepts it."""
+        body = dumps(data, pretty=self._wants_pretty())
+        coding = None
+        if len(body) >= COMPRESS_MIN_BYTES:
+            coding = negotiate_encoding(self.headers.get("Accept-Encoding"))
+            if coding:
+                body = compress(body, coding)
 
         self.send_response(status)
-        self.send_header("Content-type", "application/json")
+        self.send_header("Content-type", JSON_CONTENT_TYPE)
         self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Content-length", str(len(json_data.encode("utf-8"))))
+        self.send_header("Vary", "Accept-Encoding")
+        if coding:
+            self.send_header("Content-Encoding", coding)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-length", str(len(body)))
         self.end_headers()
-        self.wfile.write(json_data.encode("utf-8"))
+        self.wfile.write(body)
+
+    def send_text_response(self, text, status=200, headers=None):
+        """Send a plain-text response, compressed if large and accepted."""
+        body = text.encode("utf-8")
+        coding = None
+        if len(body) >= COMPRESS_MIN_BYTES:
+            coding = negotiate_encoding(self.headers.get("Accept-Encoding"))
+            if coding:
+                body = compress(body, coding)
+
+        self.send_response(status)
+        self.send_header("Content-type", "text/plain; charset=utf-8")
+        self.send_header("Vary", "Accept-Encoding")
+        if coding:
+            self.send_header("Content-Encoding", coding)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_unavailable(self, error):
+        """503 for a storage outage (``StorageUnavailableError``)."""
+        message = str(error)
+        self.send_json_response(
+            {"success": False, "error": message, "message": message},
+            status=503,
+            headers={"Retry-After": str(error.retry_after)},
+        )
+
+    def send_json_stream(self, items, status=200, headers=None):
+        """Stream an iterable as a JSON array (chunked, compressed if accepted).
+
+        Items are encoded one at a time, so the first bytes go out before the
+        whole list has been produced. If producing an item fails after the
+        headers were sent, the body is cut short without its final chunk so
+        the client sees an incomplete response rather than truncated JSON.
+        """
+        coding = negotiate_encoding(self.headers.get("Accept-Encoding"))
+        chunked = self.request_version == "HTTP/1.1"
+
+        self.send_response(status)
+        self.send_header("Content-type", JSON_CONTENT_TYPE)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Vary", "Accept-Encoding")
+        if coding:
+            self.send_header("Content-Encoding", coding)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        writer = StreamWriter(self.wfile, coding, chunked)
+        try:
+            for piece in iter_json_array(items, pretty=self._wants_pretty()):
+                writer.write(piece)
+        except ConnectionError:
+            logger.info("Client disconnected during streamed response")
+            self.close_connection = True
+            return
+        except Exception as e:
+            logger.error(f"Error while streaming response: {e}", exc_info=True)
+            self.close_connection = True
+            return
+        writer.close()
 
     def log_message(self, format, *args):
         """Override to reduce server logging noise."""
@@ -652,7 +1237,10 @@ class LibraryWebHandler(http.server.BaseHTTPRequestHandler):
 def run_server(port=8000):
     """Run the HTTP server."""
     server_address = ("", port)
-    httpd = http.server.HTTPServer(server_address, LibraryWebHandler)
+    # One thread per connection; LibraryWebHandler.ADMISSION bounds the work
+    httpd = http.server.ThreadingHTTPServer(server_address, LibraryWebHandler)
+    LibraryWebHandler.STATIC_ASSETS.preload(STATIC_FILES)
+    LibraryWebHandler.READINESS.start()
 
     print("Library Management System Web Interface")
     print(f"Server running at http://localhost:{port}/")
@@ -0,0 +1,286 @@
+"""In-memory static asset cache with precompression and HTTP validators.
+
+Assets are read once (at startup via ``preload`` or on first request),
+precompressed with gzip and, when the optional ``brotli`` package is
+installed, brotli. They are re-read only when the file's mtime or size
+changes. HTML pages have their ``/app/*.js`` and ``/app/*.css`` references
+rewritten to fingerprinted URLs (``?v=<hash>``), so those can be cached
+forever while the pages themselves are always revalidated.
+"""
+
+import gzip
+import hashlib
+import re
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from lib_logging.logger import get_logger
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+    ".yaml": "application/x-yaml",
+    ".json": "application/json",
+}
+DEFAULT_CONTENT_TYPE = "text/plain"
+
+# Below this size compression saves less than the extra header costs
+MIN_COMPRESS_SIZE = 512
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# src="/app/app.js" / href="/app/app.css" inside HTML pages
+_ASSET_REF = re.compile(r'(?:(?<=src=")|(?<=href="))/app/[\w.-]+\.(?:js|css)(?=")')
+
+
+def accepts_encoding(accept_encoding: str, coding: str) -> bool:
+    """Return True if an ``Accept-Encoding`` header allows ``coding``."""
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip() not in (coding, "*"):
+            continue
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class StaticAsset:
+    """One file held in memory together with its precompressed variants."""
+
+    __slots__ = (
+        "path",
+        "content_type",
+        "body",
+        "encoded",
+        "fingerprint",
+        "last_modified",
+        "mtime",
+        "mtime_ns",
+        "size",
+        "deps",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        body: bytes,
+        mtime_ns: int,
+        size: int,
+        deps: Optional[Dict[str, str]] = None,
+        modified_ns: Optional[int] = None,
+    ):
+        self.path = path
+        self.content_type = CONTENT_TYPES.get(
+            Path(path).suffix.lower(), DEFAULT_CONTENT_TYPE
+        )
+        self.body = body
+        self.fingerprint = hashlib.sha256(body).hexdigest()[:16]
+        self.mtime_ns = mtime_ns
+        # Pages count as modified when any asset they link to is
+        self.mtime = (modified_ns or mtime_ns) // 1_000_000_000
+        self.last_modified = formatdate(self.mtime, usegmt=True)
+        self.size = size
+        # Fingerprints of the assets this page links to (HTML only)
+        self.deps = deps or {}
+        self.encoded: Dict[str, bytes] = {}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            if BROTLI_AVAILABLE:
+                self.encoded["br"] = brotli.compress(body, quality=11)
+            self.encoded["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            # Keep only variants that are actually smaller
+            for coding in list(self.encoded):
+                if len(self.encoded[coding]) >= len(body):
+                    del self.encoded[coding]
+
+    @property
+    def is_html(self) -> bool:
+        return self.content_type.startswith("text/html")
+
+    def etag(self, coding: Optional[str] = None) -> str:
+        """Strong ETag; each encoded representation gets its own."""
+        return f'"{self.fingerprint}-{coding}"' if coding else f'"{self.fingerprint}"'
+
+    def select(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """Pick the smallest representation the client accepts."""
+        for coding in ("br", "gzip"):
+            if coding in self.encoded and accepts_encoding(accept_encoding, coding):
+                return self.encoded[coding], coding
+        return self.body, None
+
+    def not_modified(
+        self, etag: str, if_none_match: Optional[str], if_modified_since: Optional[str]
+    ) -> bool:
+        """Evaluate conditional request headers (If-None-Match wins, RFC 9110)."""
+        if if_none_match is not None:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return self.mtime <= since
+        return False
+
+    def respond(
+        self,
+        accept_encoding: str,
+        if_none_match: Optional[str],
+        if_modified_since: Optional[str],
+        version: str = "",
+    ) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """Build the response to a GET: (status, headers, body).
+
+        URLs carrying the asset's current fingerprint (``?v=<hash>``, passed
+        as ``version``) are cacheable forever; everything else is revalidated.
+        """
+        body, coding = self.select(accept_encoding)
+        etag = self.etag(coding)
+        if version == self.fingerprint and not self.is_html:
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            cache_control = REVALIDATE_CACHE_CONTROL
+        headers = [
+            ("ETag", etag),
+            ("Last-Modified", self.last_modified),
+            ("Cache-Control", cache_control),
+            ("Vary", "Accept-Encoding"),
+            ("Access-Control-Allow-Origin", "*"),
+        ]
+        if self.not_modified(etag, if_none_match, if_modified_since):
+            return 304, headers, b""
+
+        headers.append(("Content-type", self.content_type))
+        if coding:
+            headers.append(("Content-Encoding", coding))
+        headers.append(("Content-length", str(len(body))))
+        return 200, headers, body
+
+
+class AssetCache:
+    """Thread-safe cache of ``StaticAsset`` objects keyed by path under ``root``.
+
+    Only files inside ``root / assets_dir`` with a suffix listed in
+    ``CONTENT_TYPES`` are served, wherever a path with ``..`` points.
+
+    A cached asset is re-validated against the file's mtime and size at most
+    once per ``check_interval`` seconds, so steady-state requests cost no
+    filesystem calls at all.
+    """
+
+    def __init__(
+        self, root: Path, check_interval: float = 1.0, assets_dir: str = "web"
+    ):
+        self.root = Path(root).resolve()
+        self.assets_root = (self.root / assets_dir).resolve()
+        self.check_interval = check_interval
+        self._assets: Dict[str, StaticAsset] = {}
+        self._checked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def url_to_path(url: str) -> str:
+        """Map an ``/app/...`` URL to its path relative to the project root."""
+        return "web" + url
+
+    def preload(self, paths: Iterable[str]) -> int:
+        """Load and precompress ``paths`` now. Returns the number loaded."""
+        loaded = sum(1 for p in paths if self.get(p) is not None)
+        logger.info(f"Preloaded {loaded} static assets")
+        return loaded
+
+    def get(self, rel_path: str) -> Optional[StaticAsset]:
+        """Return the asset for ``rel_path``, (re)loading it if needed."""
+        now = time.monotonic()
+        asset = self._assets.get(rel_path)
+        if (
+            asset is not None
+            and now - self._checked.get(rel_path, 0) < self.check_interval
+        ):
+            return asset
+
+        full_path = (self.root / rel_path).resolve()
+        if (
+            not full_path.is_relative_to(self.assets_root)
+            or full_path.suffix.lower() not in CONTENT_TYPES
+        ):
+            return None
+        try:
+            st = full_path.stat()
+        except OSError:
+            with self._lock:
+                self._assets.pop(rel_path, None)
+            return None
+
+        if (
+            asset is None
+            or asset.mtime_ns != st.st_mtime_ns
+            or asset.size != st.st_size
+            or self._deps_changed(asset)
+        ):
+            asset = self._load(rel_path, full_path, st.st_mtime_ns, st.st_size)
+            with self._lock:
+                self._assets[rel_path] = asset
+        self._checked[rel_path] = now
+        return asset
+
+    def _deps_changed(self, asset: StaticAsset) -> bool:
+        for dep_path, fingerprint in asset.deps.items():
+            dep = self.get(dep_path)
+            if dep is None or dep.fingerprint != fingerprint:
+                return True
+        return False
+
+    def _load(self, rel_path: str, full_path: Path, mtime_ns: int, size: int):
+        body = full_path.read_bytes()
+        deps: Dict[str, StaticAsset] = {}
+        if full_path.suffix.lower() == ".html":
+            body = self._fingerprint_refs(body, deps)
+        asset = StaticAsset(
+            rel_path,
+            body,
+            mtime_ns,
+            size,
+            deps={d.path: d.fingerprint for d in deps.values()},
+            modified_ns=max([mtime_ns] + [d.mtime_ns for d in deps.values()]),
+        )
+        logger.info(
+            f"Cached static asset {rel_path} ({len(body)} bytes, "
+            f"encodings: {', '.join(asset.encoded) or 'none'})"
+        )
+        return asset
+
+    def _fingerprint_refs(self, body: bytes, deps: Dict[str, StaticAsset]) -> bytes:
+        """Rewrite local asset links in an HTML page to ``?v=<fingerprint>``.
+
+        The linked assets are collected into ``deps``.
+        """
+
+        def repl(match: "re.Match[str]") -> str:
+            url = match.group(0)
+            dep = self.get(self.url_to_path(url))
+            if dep is None:
+                return url
+            deps[dep.path] = dep
+            return f"{url}?v={dep.fingerprint}"
+
+        return _ASSET_REF.sub(repl, body.decode("utf-8")).encode("utf-8")